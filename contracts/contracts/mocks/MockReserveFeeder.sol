@@ -0,0 +1,38 @@
+// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.12;
+
+/**
+ * @dev A Chainlink PoR feed (AggregatorV3Interface) whose round is set by hand, for development
+ * networks where Vault.checkReserve needs a chainlinkReserveFeeder.
+ */
+contract MockReserveFeeder {
+    uint8 public decimals;
+    uint80 public roundId;
+    int256 public answer;
+    uint256 public updatedAt;
+
+    constructor(uint8 _decimals) {
+        decimals = _decimals;
+    }
+
+    function setRound(int256 _answer, uint256 _updatedAt) external {
+        roundId += 1;
+        answer = _answer;
+        updatedAt = _updatedAt;
+    }
+
+    function latestRoundData() external view returns (uint80, int256, uint256, uint256, uint80) {
+        return (roundId, answer, updatedAt, updatedAt, roundId);
+    }
+}
+
+/**
+ * @dev An IUniBTCSupplyFeeder reporting a total supply set by hand.
+ */
+contract MockSupplyFeeder {
+    uint256 public totalTokenSupply;
+
+    function setTotalTokenSupply(uint256 _totalTokenSupply) external {
+        totalTokenSupply = _totalTokenSupply;
+    }
+}
@@ -0,0 +1,451 @@
+// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.12;
+
+import "@openzeppelin/contracts/token/ERC20/ERC20.sol";
+import "@openzeppelin/contracts/token/ERC20/IERC20.sol";
+import "../../interfaces/IUniswapV3.sol";
+import "../../interfaces/IBalancer.sol";
+
+/**
+ * @dev A two-token pool of one of the SwapProxy protocols, for development networks. It holds its
+ * liquidity as plain token balances and prices swaps with the protocol's own math, the same math
+ * scripts/swap_quoter.py replays off chain. MockSwapRouter moves the tokens through `swap`.
+ */
+abstract contract MockSwapPool {
+    address public immutable token0;
+    address public immutable token1;
+
+    constructor(address _token0, address _token1) {
+        token0 = _token0;
+        token1 = _token1;
+    }
+
+    function quote(address tokenIn, uint256 amountIn) public view virtual returns (uint256);
+
+    function swap(address tokenIn, uint256 amountIn, address to) external returns (uint256 amountOut) {
+        amountOut = quote(tokenIn, amountIn);
+        _beforeTransfer(tokenIn, amountIn);
+        IERC20(tokenIn).transferFrom(msg.sender, address(this), amountIn);
+        IERC20(tokenIn == token0 ? token1 : token0).transfer(to, amountOut);
+    }
+
+    function _beforeTransfer(address tokenIn, uint256 amountIn) internal virtual {}
+
+    function _reserves(address tokenIn) internal view returns (uint256 reserveIn, uint256 reserveOut) {
+        require(tokenIn == token0 || tokenIn == token1, "MockSwapPool: unknown token");
+        address tokenOut = tokenIn == token0 ? token1 : token0;
+        return (IERC20(tokenIn).balanceOf(address(this)), IERC20(tokenOut).balanceOf(address(this)));
+    }
+}
+
+/**
+ * @dev UniswapV2Pair: constant product with the 0.3% fee.
+ */
+contract MockUniswapV2Pair is MockSwapPool {
+    constructor(address _token0, address _token1) MockSwapPool(_token0, _token1) {}
+
+    function getReserves() external view returns (uint112, uint112, uint32) {
+        (uint256 reserve0, uint256 reserve1) = _reserves(token0);
+        return (uint112(reserve0), uint112(reserve1), uint32(block.timestamp));
+    }
+
+    function quote(address tokenIn, uint256 amountIn) public view override returns (uint256) {
+        (uint256 reserveIn, uint256 reserveOut) = _reserves(tokenIn);
+        uint256 amountInWithFee = amountIn * 997;
+        return (amountInWithFee * reserveOut) / (reserveIn * 1000 + amountInWithFee);
+    }
+}
+
+/**
+ * @dev UniswapV3Pool with one position over the whole price range, so every swap is a single
+ * SwapMath step at constant liquidity.
+ */
+contract MockUniswapV3Pool is MockSwapPool {
+    uint24 public fee;
+    uint160 public sqrtPriceX96;
+    uint128 public liquidity;
+
+    constructor(address _token0, address _token1, uint24 _fee, uint160 _sqrtPriceX96, uint128 _liquidity)
+        MockSwapPool(_token0, _token1)
+    {
+        fee = _fee;
+        sqrtPriceX96 = _sqrtPriceX96;
+        liquidity = _liquidity;
+    }
+
+    function slot0() external view returns (uint160, int24, uint16, uint16, uint16, uint8, bool) {
+        return (sqrtPriceX96, 0, 0, 1, 1, 0, true);
+    }
+
+    function quote(address tokenIn, uint256 amountIn) public view override returns (uint256 amountOut) {
+        (amountOut,) = _step(tokenIn, amountIn);
+    }
+
+    function _beforeTransfer(address tokenIn, uint256 amountIn) internal override {
+        (, sqrtPriceX96) = _step(tokenIn, amountIn);
+    }
+
+    function _step(address tokenIn, uint256 amountIn) internal view returns (uint256 amountOut, uint160 next) {
+        _reserves(tokenIn);
+        uint256 amountLessFee = (amountIn * (1e6 - fee)) / 1e6;
+        uint256 numerator = uint256(liquidity) << 96;
+        uint256 price = sqrtPriceX96;
+        if (tokenIn == token0) {
+            // getNextSqrtPriceFromAmount0RoundingUp, then getAmount1Delta rounded down.
+            uint256 denominator = numerator + amountLessFee * price;
+            uint256 nextPrice = (numerator * price + denominator - 1) / denominator;
+            amountOut = (uint256(liquidity) * (price - nextPrice)) >> 96;
+            next = uint160(nextPrice);
+        } else {
+            // getNextSqrtPriceFromAmount1RoundingDown, then getAmount0Delta rounded down.
+            uint256 nextPrice = price + (amountLessFee << 96) / liquidity;
+            amountOut = ((numerator * (nextPrice - price)) / nextPrice) / price;
+            next = uint160(nextPrice);
+        }
+    }
+}
+
+/**
+ * @dev Two-coin Curve stableswap pool with a static fee.
+ */
+contract MockCurvePool is MockSwapPool {
+    uint256 public constant N_COINS = 2;
+    uint256 private constant A_PRECISION = 100;
+    uint256 private constant FEE_DENOMINATOR = 1e10;
+    uint256 private constant PRECISION = 1e18;
+
+    uint256 public A;
+    uint256 public fee;
+
+    constructor(address _token0, address _token1, uint256 _A, uint256 _fee) MockSwapPool(_token0, _token1) {
+        A = _A;
+        fee = _fee;
+    }
+
+    function A_precise() external view returns (uint256) {
+        return A * A_PRECISION;
+    }
+
+    function coins(uint256 i) public view returns (address) {
+        require(i < N_COINS, "MockCurvePool: index out of range");
+        return i == 0 ? token0 : token1;
+    }
+
+    function balances(uint256 i) external view returns (uint256) {
+        return IERC20(coins(i)).balanceOf(address(this));
+    }
+
+    function quote(address tokenIn, uint256 amountIn) public view override returns (uint256) {
+        _reserves(tokenIn);
+        uint256 i = tokenIn == token0 ? 0 : 1;
+        uint256 j = 1 - i;
+        uint256[2] memory rates;
+        uint256[2] memory xp;
+        for (uint256 k = 0; k < N_COINS; k++) {
+            rates[k] = 10 ** (36 - ERC20(coins(k)).decimals());
+            xp[k] = (IERC20(coins(k)).balanceOf(address(this)) * rates[k]) / PRECISION;
+        }
+        uint256 x = xp[i] + (amountIn * rates[i]) / PRECISION;
+        uint256 y = _getY(x, xp);
+        uint256 dy = xp[j] - y - 1;
+        return ((dy - (fee * dy) / FEE_DENOMINATOR) * PRECISION) / rates[j];
+    }
+
+    function _getD(uint256[2] memory xp, uint256 amp) internal pure returns (uint256) {
+        uint256 S = xp[0] + xp[1];
+        if (S == 0) {
+            return 0;
+        }
+        uint256 D = S;
+        uint256 Ann = amp * N_COINS;
+        for (uint256 it = 0; it < 255; it++) {
+            uint256 D_P = D;
+            for (uint256 k = 0; k < N_COINS; k++) {
+                D_P = (D_P * D) / (xp[k] * N_COINS);
+            }
+            uint256 Dprev = D;
+            D = ((Ann * S / A_PRECISION + D_P * N_COINS) * D)
+                / ((Ann - A_PRECISION) * D / A_PRECISION + (N_COINS + 1) * D_P);
+            if (D > Dprev ? D - Dprev <= 1 : Dprev - D <= 1) {
+                return D;
+            }
+        }
+        revert("MockCurvePool: get_D did not converge");
+    }
+
+    function _getY(uint256 x, uint256[2] memory xp) internal view returns (uint256) {
+        uint256 amp = A * A_PRECISION;
+        uint256 D = _getD(xp, amp);
+        uint256 Ann = amp * N_COINS;
+        uint256 c = (D * D) / (x * N_COINS);
+        c = (c * D * A_PRECISION) / (Ann * N_COINS);
+        uint256 b = x + (D * A_PRECISION) / Ann;
+        uint256 y = D;
+        for (uint256 it = 0; it < 255; it++) {
+            uint256 yPrev = y;
+            y = (y * y + c) / (2 * y + b - D);
+            if (y > yPrev ? y - yPrev <= 1 : yPrev - y <= 1) {
+                return y;
+            }
+        }
+        revert("MockCurvePool: get_y did not converge");
+    }
+}
+
+/**
+ * @dev DODO V2 pool (token0 is the base token) whose PMM targets follow its reserves, so it is
+ * always in the R = ONE state.
+ */
+contract MockDODOV2Pool is MockSwapPool {
+    uint256 private constant ONE = 1e18;
+
+    uint256 public _I_;
+    uint256 public _K_;
+    uint256 public _LP_FEE_RATE_;
+
+    constructor(address _base, address _quote, uint256 i, uint256 k, uint256 lpFeeRate) MockSwapPool(_base, _quote) {
+        require(k < ONE, "MockDODOV2Pool: K must be below 1");
+        _I_ = i;
+        _K_ = k;
+        _LP_FEE_RATE_ = lpFeeRate;
+    }
+
+    function _BASE_TOKEN_() external view returns (address) {
+        return token0;
+    }
+
+    function _QUOTE_TOKEN_() external view returns (address) {
+        return token1;
+    }
+
+    function getPMMStateForCall()
+        external
+        view
+        returns (uint256 i, uint256 K, uint256 B, uint256 Q, uint256 B0, uint256 Q0, uint256 R)
+    {
+        (B, Q) = _reserves(token0);
+        return (_I_, _K_, B, Q, B, Q, 0);
+    }
+
+    function getUserFeeRate(address) external view returns (uint256 lpFeeRate, uint256 mtFeeRate) {
+        return (_LP_FEE_RATE_, 0);
+    }
+
+    function quote(address tokenIn, uint256 amountIn) public view override returns (uint256) {
+        (uint256 B, uint256 Q) = _reserves(token0);
+        _reserves(tokenIn);
+        uint256 receiveAmount = tokenIn == token0
+            ? _solveQuadraticFunctionForTrade(Q, Q, amountIn, _I_, _K_)
+            : _solveQuadraticFunctionForTrade(B, B, amountIn, (ONE * ONE) / _I_, _K_);
+        return receiveAmount - (receiveAmount * _LP_FEE_RATE_) / ONE;
+    }
+
+    // DODOMath._SolveQuadraticFunctionForTrade for 0 <= k < 1.
+    function _solveQuadraticFunctionForTrade(uint256 V0, uint256 V1, uint256 delta, uint256 i, uint256 k)
+        internal
+        pure
+        returns (uint256)
+    {
+        require(V0 > 0, "TARGET_IS_ZERO");
+        if (delta == 0) {
+            return 0;
+        }
+        if (k == 0) {
+            uint256 fair = (i * delta) / ONE;
+            return fair > V1 ? V1 : fair;
+        }
+        uint256 part2 = (k * V0) / V1 * V0 + i * delta;
+        uint256 bAbs = (ONE - k) * V1;
+        bool bSig;
+        if (bAbs >= part2) {
+            bAbs = bAbs - part2;
+            bSig = false;
+        } else {
+            bAbs = part2 - bAbs;
+            bSig = true;
+        }
+        bAbs = bAbs / ONE;
+        uint256 squareRoot = ((ONE - k) * 4 * (((k * V0) / ONE) * V0)) / ONE;
+        squareRoot = _sqrt(bAbs * bAbs + squareRoot);
+        uint256 denominator = (ONE - k) * 2;
+        uint256 numerator = bSig ? squareRoot - bAbs : bAbs + squareRoot;
+        uint256 V2 = (numerator * ONE + denominator - 1) / denominator;
+        return V2 > V1 ? 0 : V1 - V2;
+    }
+
+    function _sqrt(uint256 x) internal pure returns (uint256 y) {
+        uint256 z = x / 2 + 1;
+        y = x;
+        while (z < y) {
+            y = z;
+            z = (x / z + z) / 2;
+        }
+    }
+}
+
+/**
+ * @dev Balancer V2 weighted pool with equal weights. Its id is its address, which MockSwapRouter
+ * maps back to the pool.
+ */
+contract MockBalancerPool is MockSwapPool {
+    uint256 private constant ONE = 1e18;
+    uint256 private constant MAX_IN_RATIO = 0.3e18;
+
+    uint256 internal _swapFeePercentage;
+
+    constructor(address _token0, address _token1, uint256 swapFeePercentage) MockSwapPool(_token0, _token1) {
+        _swapFeePercentage = swapFeePercentage;
+    }
+
+    function getSwapFeePercentage() external view returns (uint256) {
+        return _swapFeePercentage;
+    }
+
+    function getPoolId() external view returns (bytes32) {
+        return bytes32(uint256(uint160(address(this))));
+    }
+
+    function getNormalizedWeights() external pure returns (uint256[] memory weights) {
+        weights = new uint256[](2);
+        weights[0] = ONE / 2;
+        weights[1] = ONE / 2;
+    }
+
+    function quote(address tokenIn, uint256 amountIn) public view override returns (uint256) {
+        (uint256 balanceIn, uint256 balanceOut) = _reserves(tokenIn);
+        address tokenOut = tokenIn == token0 ? token1 : token0;
+        uint256 scaleIn = 10 ** (18 - ERC20(tokenIn).decimals());
+        uint256 scaleOut = 10 ** (18 - ERC20(tokenOut).decimals());
+        amountIn = (amountIn - _mulUp(amountIn, _swapFeePercentage)) * scaleIn;
+        balanceIn *= scaleIn;
+        require(amountIn <= (balanceIn * MAX_IN_RATIO) / ONE, "BAL#304");
+        // With equal weights the exponent is ONE and powUp(base, ONE) is the base itself.
+        uint256 base = _divUp(balanceIn, balanceIn + amountIn);
+        return ((balanceOut * scaleOut * (ONE - base)) / ONE) / scaleOut;
+    }
+
+    function _mulUp(uint256 a, uint256 b) internal pure returns (uint256) {
+        uint256 product = a * b;
+        return product == 0 ? 0 : (product - 1) / ONE + 1;
+    }
+
+    function _divUp(uint256 a, uint256 b) internal pure returns (uint256) {
+        return a == 0 ? 0 : (a * ONE - 1) / b + 1;
+    }
+}
+
+/**
+ * @dev Stands in for every SwapProxy router: UniswapV2Router02, UniswapV3 SwapRouter02, the Curve
+ * router, DODOV2Proxy02 (and its approve proxies) and the Balancer V2 Vault. Each call pulls the
+ * input from the caller and swaps it through the MockSwapPool it names or that is registered for
+ * the pair, enforcing the minimum output as the real routers do.
+ */
+contract MockSwapRouter {
+    mapping(address => mapping(address => address)) public uniswapV2Pairs;
+    mapping(address => mapping(address => mapping(uint24 => address))) public uniswapV3Pools;
+
+    function setUniswapV2Pair(address pair) external {
+        address token0 = MockSwapPool(pair).token0();
+        address token1 = MockSwapPool(pair).token1();
+        uniswapV2Pairs[token0][token1] = pair;
+        uniswapV2Pairs[token1][token0] = pair;
+    }
+
+    function setUniswapV3Pool(address pool) external {
+        address token0 = MockSwapPool(pool).token0();
+        address token1 = MockSwapPool(pool).token1();
+        uint24 fee = MockUniswapV3Pool(pool).fee();
+        uniswapV3Pools[token0][token1][fee] = pool;
+        uniswapV3Pools[token1][token0][fee] = pool;
+    }
+
+    function swapExactTokensForTokens(
+        uint256 amountIn,
+        uint256 amountOutMin,
+        address[] calldata path,
+        address to,
+        uint256
+    ) external returns (uint256[] memory amounts) {
+        amounts = new uint256[](2);
+        amounts[0] = amountIn;
+        amounts[1] = _swap(uniswapV2Pairs[path[0]][path[1]], path[0], amountIn, amountOutMin, to);
+    }
+
+    function exactInputSingle(IUniswapV3Router02.ExactInputSingleParams calldata params)
+        external
+        payable
+        returns (uint256)
+    {
+        address pool = uniswapV3Pools[params.tokenIn][params.tokenOut][params.fee];
+        return _swap(pool, params.tokenIn, params.amountIn, params.amountOutMinimum, params.recipient);
+    }
+
+    function exchange(
+        address[11] calldata route,
+        uint256[5][5] calldata,
+        uint256 amount,
+        uint256 minDy,
+        address[5] calldata,
+        address receiver
+    ) external payable returns (uint256) {
+        return _swap(route[1], route[0], amount, minDy, receiver);
+    }
+
+    function dodoSwapV2TokenToToken(
+        address fromToken,
+        address,
+        uint256 fromTokenAmount,
+        uint256 minReturnAmount,
+        address[] memory dodoPairs,
+        uint256,
+        bool,
+        uint256
+    ) external returns (uint256) {
+        return _swap(dodoPairs[0], fromToken, fromTokenAmount, minReturnAmount, msg.sender);
+    }
+
+    function _DODO_APPROVE_PROXY_() external view returns (address) {
+        return address(this);
+    }
+
+    function _DODO_APPROVE_() external view returns (address) {
+        return address(this);
+    }
+
+    function swap(
+        IBalancerVault.SingleSwap memory singleSwap,
+        IBalancerVault.FundManagement memory funds,
+        uint256 limit,
+        uint256
+    ) external payable returns (uint256) {
+        require(singleSwap.kind == IBalancerVault.SwapKind.GIVEN_IN, "MockSwapRouter: GIVEN_IN only");
+        address pool = address(uint160(uint256(singleSwap.poolId)));
+        return _swap(pool, address(singleSwap.assetIn), singleSwap.amount, limit, funds.recipient);
+    }
+
+    function getPoolTokens(bytes32 poolId)
+        external
+        view
+        returns (address[] memory tokens, uint256[] memory balances, uint256 lastChangeBlock)
+    {
+        MockSwapPool pool = MockSwapPool(address(uint160(uint256(poolId))));
+        tokens = new address[](2);
+        balances = new uint256[](2);
+        tokens[0] = pool.token0();
+        tokens[1] = pool.token1();
+        balances[0] = IERC20(tokens[0]).balanceOf(address(pool));
+        balances[1] = IERC20(tokens[1]).balanceOf(address(pool));
+        return (tokens, balances, block.number);
+    }
+
+    function _swap(address pool, address tokenIn, uint256 amountIn, uint256 minOut, address to)
+        internal
+        returns (uint256 amountOut)
+    {
+        require(pool != address(0), "MockSwapRouter: unknown pool");
+        IERC20(tokenIn).transferFrom(msg.sender, address(this), amountIn);
+        IERC20(tokenIn).approve(pool, amountIn);
+        amountOut = MockSwapPool(pool).swap(tokenIn, amountIn, to);
+        require(amountOut >= minOut, "MockSwapRouter: insufficient output");
+    }
+}
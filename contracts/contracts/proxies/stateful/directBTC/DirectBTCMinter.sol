@@ -114,6 +114,35 @@ contract DirectBTCMinter is Initializable, ReentrancyGuardUpgradeable, AccessCon
      * @dev approve the event
     */
     function approveEvent(bytes32 _reqHash) public onlyRole(APPROVER_ROLE) {
+        Event storage e = _accept(_reqHash);
+        _mint(e.recipient, e.amount);
+        emit Accepted(e.recipient, _reqHash, e.amount);
+    }
+
+    /**
+     * @dev approve the next _reqHashes.length events in order, with one directBTC and uniBTC mint for all of them
+    */
+    function approveEvents(bytes32[] calldata _reqHashes) public onlyRole(APPROVER_ROLE) {
+        require(_reqHashes.length > 0, "USR011");
+
+        Event[] memory accepted = new Event[](_reqHashes.length);
+        uint256 total;
+        for (uint256 i = 0; i < _reqHashes.length; i++) {
+            accepted[i] = _accept(_reqHashes[i]);
+            total += accepted[i].amount;
+        }
+
+        _mintUniBTC(total);
+        for (uint256 i = 0; i < _reqHashes.length; i++) {
+            IERC20(uniBTC).safeTransfer(accepted[i].recipient, accepted[i].amount);
+            emit Accepted(accepted[i].recipient, _reqHashes[i], accepted[i].amount);
+        }
+    }
+
+    /**
+     * @dev check that _reqHash is the event at processIdx and mark it accepted
+    */
+    function _accept(bytes32 _reqHash) internal returns (Event storage) {
         require(processIdx < eventIndexes.length, "SYS003");
 
         bytes32 _txHash = eventIndexes[processIdx];
@@ -125,8 +154,7 @@ contract DirectBTCMinter is Initializable, ReentrancyGuardUpgradeable, AccessCon
 
         e.state = EventState.Accepted;
         processIdx++;
-        _mint(e.recipient, e.amount);
-        emit Accepted(e.recipient, _txHash, e.amount);
+        return e;
     }
 
     /**
@@ -136,6 +164,14 @@ contract DirectBTCMinter is Initializable, ReentrancyGuardUpgradeable, AccessCon
      * 3. transfer uniBTC to recipient
     */
     function _mint(address _recipient, uint256 _amount) internal {
+        _mintUniBTC(_amount);
+        IERC20(uniBTC).safeTransfer(_recipient, _amount);
+    }
+
+    /**
+     * @dev mint the amount of uniBTC to this contract, with directBTC as the collateral
+    */
+    function _mintUniBTC(uint256 _amount) internal {
         uint256 prevBalance = IERC20(uniBTC).balanceOf(address(this));
 
         IMintableContract(directBTC).mint(address(this), _amount);
@@ -146,8 +182,6 @@ contract DirectBTCMinter is Initializable, ReentrancyGuardUpgradeable, AccessCon
         //make sure received the uniBTC token
         uint256 curBalance = IERC20(uniBTC).balanceOf(address(this));
         assert(curBalance == prevBalance + _amount);
-
-        IERC20(uniBTC).safeTransfer(_recipient, _amount);
     }
 
     /**
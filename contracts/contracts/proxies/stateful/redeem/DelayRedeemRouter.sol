@@ -812,6 +812,89 @@ contract DelayRedeemRouter is
         return claimableDelayedRedeems;
     }
 
+    /**
+     * @notice Getter function for retrieving a page of a user's delayed redemption records, completed ones included.
+     * @param user The account that created the delayed redemptions.
+     * @param offset The index in the user's array of the first record to return.
+     * @param limit The maximum number of records to return.
+     * @return The number of completed delayed redemptions, the length of the user's array,
+     * and up to `limit` DelayedRedeem structs starting at `offset`.
+     */
+    function userRedeemsPage(
+        address user,
+        uint256 offset,
+        uint256 limit
+    ) external view returns (uint256, uint256, DelayedRedeem[] memory) {
+        UserDelayedRedeems storage redeems = _userRedeems[user];
+        uint256 totalDelayedRedeems = redeems.delayedRedeems.length;
+        return (
+            redeems.delayedRedeemsCompleted,
+            totalDelayedRedeems,
+            _page(redeems.delayedRedeems, offset, totalDelayedRedeems, limit)
+        );
+    }
+
+    /**
+     * @notice Getter function to retrieve a page of the unclaimed delayed redemptions for a user.
+     * @param user The account that created the delayed redemption.
+     * @param offset The position of the first record to return among the unclaimed ones.
+     * @param limit The maximum number of records to return.
+     * @return Up to `limit` DelayedRedeem structs, the same records `getUserDelayedRedeems` returns from `offset`.
+     */
+    function getUserDelayedRedeemsPage(
+        address user,
+        uint256 offset,
+        uint256 limit
+    ) external view returns (DelayedRedeem[] memory) {
+        UserDelayedRedeems storage redeems = _userRedeems[user];
+        uint256 totalDelayedRedeems = redeems.delayedRedeems.length;
+        uint256 pending = totalDelayedRedeems - redeems.delayedRedeemsCompleted;
+        if (offset >= pending) {
+            return new DelayedRedeem[](0);
+        }
+        return
+            _page(
+                redeems.delayedRedeems,
+                redeems.delayedRedeemsCompleted + offset,
+                totalDelayedRedeems,
+                limit
+            );
+    }
+
+    /**
+     * @notice Getter function to retrieve a page of the currently claimable delayed redemptions for a user.
+     * @param user The account that created the delayed redemption.
+     * @param offset The position of the first record to return among the unclaimed ones.
+     * @param limit The maximum number of records to return.
+     * @return Up to `limit` DelayedRedeem structs, the same records `getClaimableUserDelayedRedeems` returns from `offset`.
+     */
+    function getClaimableUserDelayedRedeemsPage(
+        address user,
+        uint256 offset,
+        uint256 limit
+    ) external view returns (DelayedRedeem[] memory) {
+        UserDelayedRedeems storage redeems = _userRedeems[user];
+        uint256 totalDelayedRedeems = redeems.delayedRedeems.length;
+        uint256 pending = totalDelayedRedeems - redeems.delayedRedeemsCompleted;
+        if (offset >= pending) {
+            return new DelayedRedeem[](0);
+        }
+
+        // Claimable redemptions are a prefix of the unclaimed ones, so stop at the first that is not.
+        uint256 start = redeems.delayedRedeemsCompleted + offset;
+        uint256 end = start;
+        while (
+            end < totalDelayedRedeems &&
+            end - start < limit &&
+            block.timestamp >= redeems.delayedRedeems[end].createdAt + redeemDelay
+        ) {
+            unchecked {
+                ++end;
+            }
+        }
+        return _page(redeems.delayedRedeems, start, end, limit);
+    }
+
     /**
      * @notice Retrieves the current redemption cap for a specific BTC token.
      * @param token The BTC token address for which to get the current redemption cap.
@@ -1262,6 +1345,34 @@ contract DelayRedeemRouter is
         return (0, new DebtTokenAmount[](0));
     }
 
+    /**
+     * @dev Copies the records of `delayedRedeems` from `start`, up to `limit` of them and not past `end`.
+     * @param delayedRedeems The user's delayed redemption array in storage.
+     * @param start The index of the first record to copy.
+     * @param end The index at which to stop copying.
+     * @param limit The maximum number of records to copy.
+     * @return An array of at most `limit` DelayedRedeem structs.
+     */
+    function _page(
+        DelayedRedeem[] storage delayedRedeems,
+        uint256 start,
+        uint256 end,
+        uint256 limit
+    ) internal view returns (DelayedRedeem[] memory) {
+        if (start >= end) {
+            return new DelayedRedeem[](0);
+        }
+        uint256 length = end - start;
+        if (length > limit) {
+            length = limit;
+        }
+        DelayedRedeem[] memory page = new DelayedRedeem[](length);
+        for (uint256 i = 0; i < length; i++) {
+            page[i] = delayedRedeems[start + i];
+        }
+        return page;
+    }
+
     /**
      * @notice Internal function to update the fast lane status for a recipient.
      * @param recipient The address of the recipient.
@@ -0,0 +1,223 @@
+// SPDX-License-Identifier: UNLICENSED
+pragma solidity ^0.8.13;
+
+import {Test} from "forge-std/Test.sol";
+import {DelayRedeemRouter} from "../contracts/proxies/stateful/redeem/DelayRedeemRouter.sol";
+import {uniBTC} from "../contracts/uniBTC.sol";
+import {Vault} from "../contracts/Vault.sol";
+import {FBTC} from "../contracts/mocks/FBTC.sol";
+import {TransparentUpgradeableProxy} from "@openzeppelin/contracts/proxy/transparent/TransparentUpgradeableProxy.sol";
+import {ProxyAdmin} from "@openzeppelin/contracts/proxy/transparent/ProxyAdmin.sol";
+
+contract DelayRedeemRouterPageTest is Test {
+    DelayRedeemRouter public router;
+    uniBTC public uniBTCToken;
+    Vault public vault;
+    FBTC public fbtc;
+    ProxyAdmin public proxyAdmin;
+
+    address public owner;
+    address public user;
+
+    uint256 public constant REDEEM_DELAY = 7 days;
+    uint256 public constant START = 1_700_000_000;
+    uint256 public constant REDEEMS = 5;
+
+    bytes32 public constant OPERATOR_ROLE = keccak256("OPERATOR_ROLE");
+
+    function setUp() public {
+        owner = vm.addr(0x1);
+        user = vm.addr(0x2);
+        // Quotas accrue from timestamp 0, so start well after it.
+        vm.warp(START);
+
+        vm.startPrank(owner);
+        proxyAdmin = new ProxyAdmin();
+        fbtc = new FBTC();
+
+        uniBTC uniBTCImpl = new uniBTC();
+        uniBTCToken = uniBTC(
+            payable(
+                new TransparentUpgradeableProxy(
+                    address(uniBTCImpl),
+                    address(proxyAdmin),
+                    abi.encodeCall(uniBTCImpl.initialize, (owner, owner, new address[](0)))
+                )
+            )
+        );
+
+        Vault vaultImpl = new Vault();
+        vault = Vault(
+            payable(
+                new TransparentUpgradeableProxy(
+                    address(vaultImpl),
+                    address(proxyAdmin),
+                    abi.encodeCall(vaultImpl.initialize, (owner, address(uniBTCToken)))
+                )
+            )
+        );
+
+        DelayRedeemRouter routerImpl = new DelayRedeemRouter();
+        router = DelayRedeemRouter(
+            address(
+                new TransparentUpgradeableProxy(
+                    address(routerImpl),
+                    address(proxyAdmin),
+                    abi.encodeCall(
+                        routerImpl.initialize,
+                        (owner, address(uniBTCToken), address(vault), REDEEM_DELAY, false)
+                    )
+                )
+            )
+        );
+
+        address[] memory tokens = new address[](1);
+        tokens[0] = address(fbtc);
+        uint256[] memory quotas = new uint256[](1);
+        quotas[0] = 50e8;
+        router.setMaxQuotaForTokens(tokens, quotas);
+        quotas[0] = 50e8 / 1 days;
+        router.setQuotaRates(tokens, quotas);
+        router.addToBtclist(tokens);
+
+        // The router pays out of the vault and burns the claimed uniBTC through it.
+        vault.grantRole(OPERATOR_ROLE, address(router));
+        address[] memory targets = new address[](2);
+        targets[0] = address(uniBTCToken);
+        targets[1] = address(fbtc);
+        vault.allowTarget(targets);
+        fbtc.mint(address(vault), 100e8);
+        uniBTCToken.mint(user, 100e8);
+        vm.stopPrank();
+
+        // Five redeems, 100 seconds apart.
+        vm.startPrank(user);
+        uniBTCToken.approve(address(router), type(uint256).max);
+        for (uint256 i = 0; i < REDEEMS; i++) {
+            vm.warp(START + i * 100);
+            router.createDelayedRedeem(address(fbtc), (i + 1) * 1e8);
+        }
+        vm.stopPrank();
+    }
+
+    function _claimOne() internal {
+        vm.warp(START + REDEEM_DELAY);
+        vm.prank(user);
+        router.claimDelayedRedeems(1);
+    }
+
+    function _assertEq(DelayRedeemRouter.DelayedRedeem[] memory a, DelayRedeemRouter.DelayedRedeem[] memory b)
+        internal
+    {
+        assertEq(a.length, b.length);
+        for (uint256 i = 0; i < a.length; i++) {
+            assertEq(a[i].amount, b[i].amount);
+            assertEq(a[i].createdAt, b[i].createdAt);
+            assertEq(a[i].token, b[i].token);
+        }
+    }
+
+    function _concat(DelayRedeemRouter.DelayedRedeem[] memory a, DelayRedeemRouter.DelayedRedeem[] memory b)
+        internal
+        pure
+        returns (DelayRedeemRouter.DelayedRedeem[] memory out)
+    {
+        out = new DelayRedeemRouter.DelayedRedeem[](a.length + b.length);
+        for (uint256 i = 0; i < a.length; i++) {
+            out[i] = a[i];
+        }
+        for (uint256 i = 0; i < b.length; i++) {
+            out[a.length + i] = b[i];
+        }
+    }
+
+    function testPagesMatchWholeArrays() public {
+        _claimOne();
+        // Records 1 and 2 are claimable, 3 and 4 are not yet.
+        vm.warp(START + 200 + REDEEM_DELAY);
+        DelayRedeemRouter.DelayedRedeem[] memory all = router.userRedeems(user).delayedRedeems;
+
+        for (uint256 limit = 1; limit <= REDEEMS + 1; limit++) {
+            DelayRedeemRouter.DelayedRedeem[] memory history;
+            DelayRedeemRouter.DelayedRedeem[] memory unclaimed;
+            DelayRedeemRouter.DelayedRedeem[] memory claimable;
+            for (uint256 offset = 0; offset < REDEEMS; offset += limit) {
+                (uint256 completed, uint256 length, DelayRedeemRouter.DelayedRedeem[] memory page) =
+                    router.userRedeemsPage(user, offset, limit);
+                assertEq(completed, 1);
+                assertEq(length, REDEEMS);
+                history = _concat(history, page);
+                unclaimed = _concat(unclaimed, router.getUserDelayedRedeemsPage(user, offset, limit));
+                claimable = _concat(claimable, router.getClaimableUserDelayedRedeemsPage(user, offset, limit));
+            }
+            _assertEq(history, all);
+            _assertEq(unclaimed, router.getUserDelayedRedeems(user));
+            _assertEq(claimable, router.getClaimableUserDelayedRedeems(user));
+        }
+        assertEq(router.getClaimableUserDelayedRedeems(user).length, 2);
+    }
+
+    function testPageOffsetPastEnd() public {
+        _claimOne();
+        (uint256 completed, uint256 length, DelayRedeemRouter.DelayedRedeem[] memory page) =
+            router.userRedeemsPage(user, REDEEMS, 10);
+        assertEq(completed, 1);
+        assertEq(length, REDEEMS);
+        assertEq(page.length, 0);
+        (, , page) = router.userRedeemsPage(user, type(uint256).max, type(uint256).max);
+        assertEq(page.length, 0);
+
+        // Offsets of the unclaimed pages count from the first unclaimed record: 4 are left.
+        assertEq(router.getUserDelayedRedeemsPage(user, 3, 10).length, 1);
+        assertEq(router.getUserDelayedRedeemsPage(user, 4, 10).length, 0);
+        assertEq(router.getUserDelayedRedeemsPage(user, type(uint256).max, 10).length, 0);
+        vm.warp(START + 1000 + REDEEM_DELAY);
+        assertEq(router.getClaimableUserDelayedRedeemsPage(user, 3, 10).length, 1);
+        assertEq(router.getClaimableUserDelayedRedeemsPage(user, 4, 10).length, 0);
+        assertEq(router.getClaimableUserDelayedRedeemsPage(user, type(uint256).max, 10).length, 0);
+
+        // A user without redeems.
+        (completed, length, page) = router.userRedeemsPage(owner, 0, 10);
+        assertEq(completed + length + page.length, 0);
+        assertEq(router.getUserDelayedRedeemsPage(owner, 0, 10).length, 0);
+        assertEq(router.getClaimableUserDelayedRedeemsPage(owner, 0, 10).length, 0);
+    }
+
+    function testPageLimitZero() public {
+        vm.warp(START + 1000 + REDEEM_DELAY);
+        // Limit 0 returns no records, but userRedeemsPage still reports the counts.
+        (uint256 completed, uint256 length, DelayRedeemRouter.DelayedRedeem[] memory page) =
+            router.userRedeemsPage(user, 0, 0);
+        assertEq(completed, 0);
+        assertEq(length, REDEEMS);
+        assertEq(page.length, 0);
+        assertEq(router.getUserDelayedRedeemsPage(user, 0, 0).length, 0);
+        assertEq(router.getClaimableUserDelayedRedeemsPage(user, 0, 0).length, 0);
+    }
+
+    function testClaimablePageBoundary() public {
+        // Record 2 was created at START + 200: claimable from exactly createdAt + redeemDelay on.
+        vm.warp(START + 200 + REDEEM_DELAY - 1);
+        DelayRedeemRouter.DelayedRedeem[] memory page = router.getClaimableUserDelayedRedeemsPage(user, 0, 10);
+        assertEq(page.length, 2);
+        assertEq(router.getClaimableUserDelayedRedeemsPage(user, 2, 10).length, 0);
+
+        vm.warp(START + 200 + REDEEM_DELAY);
+        page = router.getClaimableUserDelayedRedeemsPage(user, 0, 10);
+        assertEq(page.length, 3);
+        assertEq(page[2].createdAt, START + 200);
+        page = router.getClaimableUserDelayedRedeemsPage(user, 2, 10);
+        assertEq(page.length, 1);
+        assertEq(page[0].createdAt, START + 200);
+        // The limit cuts the claimable prefix, and the next page starts where it stopped.
+        assertEq(router.getClaimableUserDelayedRedeemsPage(user, 0, 2).length, 2);
+        assertEq(router.getClaimableUserDelayedRedeemsPage(user, 2, 2).length, 1);
+        _assertEq(router.getClaimableUserDelayedRedeems(user), router.getClaimableUserDelayedRedeemsPage(user, 0, 10));
+
+        // Once claimed, the same records are no longer claimable.
+        vm.prank(user);
+        router.claimDelayedRedeems();
+        assertEq(router.getClaimableUserDelayedRedeemsPage(user, 0, 10).length, 0);
+        assertEq(router.getUserDelayedRedeemsPage(user, 0, 10).length, 2);
+    }
+}
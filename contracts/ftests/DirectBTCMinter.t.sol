@@ -478,4 +478,106 @@ contract DirectBTCMinterTest is Test {
         // ProcessIdx should be 2
         assertEq(minter.processIdx(), 2);
     }
+
+    function testApproveEvents() public {
+        vm.startPrank(operator);
+        minter.receiveEvent(user1, keccak256("tx1"), 1e8);
+        minter.receiveEvent(user2, keccak256("tx2"), 2e8);
+        minter.receiveEvent(user1, keccak256("tx3"), 3e8);
+        minter.receiveEvent(user2, keccak256("tx4"), 4e8);
+        vm.stopPrank();
+
+        bytes32[] memory hashes = new bytes32[](3);
+        hashes[0] = keccak256("tx1");
+        hashes[1] = keccak256("tx2");
+        hashes[2] = keccak256("tx3");
+
+        vm.prank(approver);
+        vm.expectEmit(true, true, false, true);
+        emit Accepted(user1, keccak256("tx1"), 1e8);
+        vm.expectEmit(true, true, false, true);
+        emit Accepted(user2, keccak256("tx2"), 2e8);
+        vm.expectEmit(true, true, false, true);
+        emit Accepted(user1, keccak256("tx3"), 3e8);
+        minter.approveEvents(hashes);
+
+        assertEq(minter.processIdx(), 3);
+        assertEq(uniBTCToken.balanceOf(user1), 4e8);
+        assertEq(uniBTCToken.balanceOf(user2), 2e8);
+        assertEq(uniBTCToken.balanceOf(address(minter)), 0);
+        assertEq(directBTCToken.balanceOf(address(vault)), 6e8);
+        (, , DirectBTCMinter.EventState state) = minter.receivedEvents(keccak256("tx3"));
+        assertEq(uint256(state), uint256(DirectBTCMinter.EventState.Accepted));
+        (, , state) = minter.receivedEvents(keccak256("tx4"));
+        assertEq(uint256(state), uint256(DirectBTCMinter.EventState.Pending));
+
+        // The last event is still approved on its own.
+        vm.prank(approver);
+        minter.approveEvent(keccak256("tx4"));
+        assertEq(uniBTCToken.balanceOf(user2), 6e8);
+    }
+
+    function testApproveEventsOutOfOrder() public {
+        vm.startPrank(operator);
+        minter.receiveEvent(user1, keccak256("tx1"), 1e8);
+        minter.receiveEvent(user1, keccak256("tx2"), 1e8);
+        vm.stopPrank();
+
+        bytes32[] memory hashes = new bytes32[](2);
+        hashes[0] = keccak256("tx2");
+        hashes[1] = keccak256("tx1");
+
+        vm.prank(approver);
+        vm.expectRevert("USR015");
+        minter.approveEvents(hashes);
+
+        // One event more than received.
+        hashes = new bytes32[](3);
+        hashes[0] = keccak256("tx1");
+        hashes[1] = keccak256("tx2");
+        hashes[2] = keccak256("tx3");
+
+        vm.prank(approver);
+        vm.expectRevert("SYS003");
+        minter.approveEvents(hashes);
+        assertEq(minter.processIdx(), 0);
+    }
+
+    function testApproveEventsRecipientNotWhitelisted() public {
+        address nonWhitelistedUser = vm.addr(0x99);
+
+        vm.prank(operator);
+        minter.receiveEvent(user1, keccak256("tx1"), 1e8);
+        vm.prank(operator);
+        minter.receiveEvent(nonWhitelistedUser, keccak256("tx2"), 1e8);
+
+        bytes32[] memory hashes = new bytes32[](2);
+        hashes[0] = keccak256("tx1");
+        hashes[1] = keccak256("tx2");
+
+        // The whole batch reverts, the first event included.
+        vm.prank(approver);
+        vm.expectRevert("USR012");
+        minter.approveEvents(hashes);
+        assertEq(minter.processIdx(), 0);
+        assertEq(uniBTCToken.balanceOf(user1), 0);
+    }
+
+    function testApproveEventsEmpty() public {
+        vm.prank(approver);
+        vm.expectRevert("USR011");
+        minter.approveEvents(new bytes32[](0));
+    }
+
+    function testApproveEventsOnlyApprover() public {
+        vm.prank(operator);
+        minter.receiveEvent(user1, keccak256("tx1"), 1e8);
+
+        bytes32[] memory hashes = new bytes32[](1);
+        hashes[0] = keccak256("tx1");
+
+        vm.prank(user1);
+        vm.expectRevert();
+        minter.approveEvents(hashes);
+    }
 }
@@ -0,0 +1,85 @@
+import json
+import sys
+from brownie import *
+from pathlib import Path
+from web3 import Web3
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+from registry import NATIVE_BTC  # noqa: E402
+
+# Measures the gas of claimDelayedRedeems(n) and claimPrincipals(n) on a fresh DelayRedeemRouter
+# for queues of n redeems over k distinct tokens, with and without native BTC, and writes the
+# samples that scripts/claim_planner.py fits its gas model to.
+#
+# Execution Command Format:
+# `brownie run scripts/claim_gas_samples.py main "claim_gas.json" --network=development`
+
+DELAY = 604800
+SIZES = [1, 2, 4, 8, 16, 32, 64, 128]
+
+
+def deploy(owner, deployer, user):
+    deps = project.load(Path.home() / ".brownie" / "packages" / config["dependencies"][0])
+    proxy = deps.TransparentUpgradeableProxy
+
+    fbtc = FBTC.deploy({'from': owner})
+    wbtc18 = WBTC18.deploy({'from': owner})
+
+    uni_btc_proxy = proxy.deploy(uniBTC.deploy({'from': deployer}), deployer, b'', {'from': deployer})
+    uni_btc = Contract.from_abi("uniBTC", uni_btc_proxy.address, uniBTC.abi)
+    uni_btc.initialize(owner, owner, [], {'from': owner})
+
+    vault_proxy = proxy.deploy(Vault.deploy({'from': deployer}), deployer, b'', {'from': deployer})
+    vault = Contract.from_abi("Vault", vault_proxy.address, Vault.abi)
+    vault.initialize(owner, uni_btc, {'from': owner})
+
+    router_proxy = proxy.deploy(DelayRedeemRouter.deploy({'from': deployer}), deployer, b'', {'from': deployer})
+    router = Contract.from_abi("DelayRedeemRouter", router_proxy.address, DelayRedeemRouter.abi)
+    router.initialize(owner, uni_btc, vault, DELAY, False, {'from': owner})
+    router.setRedeemPrincipalDelay(DELAY, {'from': owner})
+
+    tokens = [fbtc, wbtc18, NATIVE_BTC]
+    router.setQuotaRates(tokens, [100 * 10**8 // 86400] * 3, {'from': owner})
+    router.setMaxQuotaForTokens(tokens, [99 * 10**8] * 3, {'from': owner})
+    router.addToBtclist(tokens, {'from': owner})
+
+    uni_btc.grantRole(Web3.keccak(text='MINTER_ROLE'), vault, {'from': owner})
+    vault.grantRole(Web3.keccak(text='OPERATOR_ROLE'), router, {'from': owner})
+    vault.allowTarget([uni_btc, fbtc, wbtc18, router], {'from': owner})
+    fbtc.mint(vault, 100 * 10**8, {'from': owner})
+    wbtc18.mint(vault, 100 * 10**18, {'from': owner})
+    owner.transfer(vault, 100 * 10**18)
+
+    uni_btc.mint(user, 100 * 10**8, {'from': owner})
+    uni_btc.approve(router, 2**256 - 1, {'from': user})
+    return router, [fbtc.address, wbtc18.address, NATIVE_BTC]
+
+
+def main(output="claim_gas.json"):
+    owner, deployer, user = accounts[0], accounts[1], accounts[2]
+    router, tokens = deploy(owner, deployer, user)
+
+    # Token mixes: k tokens without native BTC, and k tokens ending with native BTC.
+    mixes = [tokens[:1], tokens[:2], [tokens[2]], [tokens[0], tokens[2]], tokens]
+    samples = []
+    for mix in mixes:
+        for n in SIZES:
+            if n < len(mix):
+                continue
+            chain.sleep(86400)
+            for i in range(n):
+                router.createDelayedRedeem(mix[i % len(mix)], 10**4, {'from': user})
+            chain.sleep(DELAY + 1)
+            chain.mine()
+            for function in ("claimDelayedRedeems", "claimPrincipals"):
+                gas = getattr(router, function)["uint256"].estimate_gas(n, {'from': user})
+                samples.append({"function": function, "n": n, "k": len(mix),
+                                "native": NATIVE_BTC in mix, "gas": gas})
+            tx = router.claimDelayedRedeems["uint256"](n, {'from': user})
+            samples[-2]["gas_used"] = tx.gas_used
+            print(f"n={n} tokens={len(mix)} native={NATIVE_BTC in mix}: "
+                  f"claimDelayedRedeems {samples[-2]['gas']} (used {tx.gas_used}), claimPrincipals {samples[-1]['gas']}")
+
+    with open(output, "w") as f:
+        json.dump(samples, f, indent=2)
+    print(f"Wrote {len(samples)} samples to {output}")
@@ -0,0 +1,46 @@
+import sys
+import time
+from brownie import *
+from brownie.exceptions import VirtualMachineError
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+from directbtc_pipeline import FixtureDepositSource, Pipeline, print_status  # noqa: E402
+from rpc import RPCClient, RPCError  # noqa: E402
+
+# Runs the DirectBTCMinter receive/approve pipeline of scripts/directbtc_pipeline.py with
+# brownie accounts: `minter_account` holds L1_MINTER_ROLE and `approver_account` APPROVER_ROLE
+# (the same account may hold both). Deposits are read from `deposits_file` (a JSON list or
+# JSON lines) every `interval` seconds; with `batch` > 1 the approvals go through approveEvents.
+#
+# Execution Command Format:
+# `brownie run scripts/directbtc_pipeline.py main "minter" "approver" "0x..." "deposits.jsonl" 5 --network=eth-mainnet`
+
+
+def main(minter_account="minter", approver_account="approver", direct_btc_minter="", deposits_file="deposits.jsonl",
+         batch=1, max_in_flight=16, interval=12, follow=True):
+    assert direct_btc_minter != "", "need the DirectBTCMinter address"
+    follow = str(follow).lower() in ("true", "1")
+    minter = Contract.from_abi("DirectBTCMinter", direct_btc_minter, DirectBTCMinter.abi)
+    l1_minter = accounts.load(minter_account)
+    approver = l1_minter if approver_account == minter_account else accounts.load(approver_account)
+    assert minter.hasRole(minter.L1_MINTER_ROLE(), l1_minter), "missing L1_MINTER_ROLE"
+    assert minter.hasRole(minter.APPROVER_ROLE(), approver), "missing APPROVER_ROLE"
+    signers = {l1_minter.address.lower(): l1_minter, approver.address.lower(): approver}
+
+    def send(tx):
+        try:
+            return signers[tx["from"]].transfer(tx["to"], 0, data=tx.get("data", "0x"), nonce=int(tx["nonce"], 16),
+                                                gas_limit=int(tx["gas"], 16), required_confs=0).txid
+        except (ValueError, VirtualMachineError) as e:
+            raise RPCError(str(e))
+
+    pipeline = Pipeline(RPCClient(web3.provider.endpoint_uri, timeout=60), direct_btc_minter, l1_minter.address,
+                        FixtureDepositSource(path=deposits_file), approver.address, int(batch),
+                        max_in_flight=int(max_in_flight), send=send)
+    while True:
+        status = pipeline.tick()
+        print_status(status)
+        if not follow and not status["in_flight"]:
+            break
+        time.sleep(float(interval))
@@ -0,0 +1,36 @@
+import json
+import sys
+from brownie import *
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+import registry  # noqa: E402
+
+# Signs and sends a whitelist/blacklist plan written by scripts/list_sync.py --output.
+# All the transactions are submitted back to back with consecutive nonces and awaited
+# together, so a plan of many chunks is mined within a few blocks.
+#
+# Execution Command Format:
+# `brownie run scripts/list_sync.py main "mainnet-deployer" "ethereum" "plan.json" --network=mainnet`
+
+
+def main(deployer_account="deployer", network_cfg="ethereum", plan_file="plan.json"):
+    chain = registry.chain(network_cfg)
+    with open(plan_file) as f:
+        plan = json.load(f)
+    deployer = accounts.load(deployer_account)
+    assert deployer.address.lower() == plan["from"].lower(), "the plan was made for another admin"
+
+    router = Contract.from_abi("DelayRedeemRouter", chain.redeem_router, DelayRedeemRouter.abi)
+    nonce = deployer.nonce
+    txs = []
+    for i, tx in enumerate(plan["transactions"]):
+        assert tx["to"].lower() == chain.redeem_router.lower()
+        txs.append(getattr(router, tx["function"])(
+            tx["accounts"], {'from': deployer, 'nonce': nonce + i, 'gas_limit': tx["gas"], 'required_confs': 0}))
+        print(tx["function"], len(tx["accounts"]), "accounts", txs[-1].txid)
+
+    for tx in txs:
+        tx.wait(1)
+        assert tx.status == 1, f"{tx.txid} reverted"
+    print("mined in blocks", min(tx.block_number for tx in txs), "-", max(tx.block_number for tx in txs))
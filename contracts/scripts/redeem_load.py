@@ -0,0 +1,68 @@
+import asyncio
+import json
+import sys
+from brownie import *
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+from redeem_load import provision, report, run  # noqa: E402
+from registry import NATIVE_BTC  # noqa: E402
+from rpc import RPCClient  # noqa: E402
+
+# Deploys uniBTC, WBTC18, FBTC, Vault and DelayRedeemRouter in the order of
+# tests/test_delayRedeemRouterSimulate.py, then drives redemption traffic from `users`
+# fresh accounts through scripts/redeem_load.py and writes the summary.
+#
+# Execution Command Format:
+# `brownie run scripts/redeem_load.py main 50 20 60 "poisson" "redeem_load.json" --network=development`
+
+ONE_DAY = 86400
+# Daily caps of 10 WBTC, 8 FBTC and 5 native BTC, free up front, as in the simulation test.
+DAY_CAPS = [10 * 10**8, 8 * 10**8, 5 * 10**8]
+
+
+def deploy(deployer, owner, delay=604800):
+    deps = project.load(Path.home() / ".brownie" / "packages" / config["dependencies"][0])
+    proxy = deps.TransparentUpgradeableProxy
+
+    uni_btc_proxy = proxy.deploy(uniBTC.deploy({"from": deployer}), deployer, b"", {"from": deployer})
+    uni_btc = Contract.from_abi("uniBTC", uni_btc_proxy, uniBTC.abi)
+    uni_btc.initialize(owner, owner, [], {"from": owner})
+    wbtc = WBTC18.deploy({"from": deployer})
+    fbtc = FBTC.deploy({"from": deployer})
+
+    vault_proxy = proxy.deploy(Vault.deploy({"from": deployer}), deployer, b"", {"from": deployer})
+    vault = Contract.from_abi("vault", vault_proxy, Vault.abi)
+    vault.initialize(owner, uni_btc_proxy, {"from": owner})
+
+    router_proxy = proxy.deploy(DelayRedeemRouter.deploy({"from": deployer}), deployer, b"", {"from": deployer})
+    router = Contract.from_abi("DelayRedeemRouter", router_proxy, DelayRedeemRouter.abi)
+    router.initialize(owner, uni_btc_proxy, vault_proxy, delay, True, {"from": owner})
+
+    tokens = [wbtc, fbtc, NATIVE_BTC]
+    router.setQuotaRates(tokens, [cap // ONE_DAY for cap in DAY_CAPS], {"from": owner})
+    router.setMaxQuotaForTokens(tokens, DAY_CAPS, {"from": owner})
+    router.addToBtclist(tokens, {"from": owner})
+
+    uni_btc.grantRole(uni_btc.MINTER_ROLE(), vault, {"from": owner})
+    vault.grantRole(vault.OPERATOR_ROLE(), router_proxy, {"from": owner})
+    vault.allowTarget([uni_btc_proxy, wbtc, fbtc, router_proxy], {"from": owner})
+    wbtc.mint(vault, 1000 * 10**18, {"from": deployer})
+    fbtc.mint(vault, 1000 * 10**8, {"from": deployer})
+    owner.transfer(vault, 100 * 10**18)
+    return router, uni_btc, [t if isinstance(t, str) else t.address for t in tokens]
+
+
+def main(users=50, rate=20, duration=60, arrivals="poisson", output="redeem_load.json", claim_ratio=0.1):
+    deployer, owner = accounts[0], accounts[1]
+    router, uni_btc, tokens = deploy(deployer, owner)
+
+    url = web3.provider.endpoint_uri
+    users = provision(RPCClient(url, timeout=60), router.address, uni_btc.address, owner.address, int(users),
+                      1000 * 10**8)
+    stats = asyncio.run(run(url, router.address, users, [t.lower() for t in tokens], float(rate), float(duration),
+                            arrivals, claim_ratio=float(claim_ratio)))
+    summary = stats.summary()
+    report(summary)
+    with open(output, "w") as f:
+        json.dump(summary, f, indent=2)
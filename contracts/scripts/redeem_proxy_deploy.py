@@ -1,7 +1,11 @@
+import sys
 import brownie
 from brownie import *
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+import registry  # noqa: E402
+
 # Execution Command Format:
 # `brownie run scripts/redeem_proxy_deploy.py main "mainnet-deployer" "ethereum" --network=mainnet`
 
@@ -9,47 +13,40 @@ from pathlib import Path
 def main(deployer_account="deployer", network_cfg="ethereum"):
     config_contact = {
         "ethereum": {
-            "uniBTC_proxy": "0x004E9C3EF86bc1ca1f0bB5C7662861Ee93350568",  # https://etherscan.io/address/0x004E9C3EF86bc1ca1f0bB5C7662861Ee93350568
-            "vault_proxy": "0x047D41F2544B7F63A8e991aF2068a363d210d6Da",  # https://etherscan.io/address/0x047D41F2544B7F63A8e991aF2068a363d210d6Da
             "redeem_owner": "0x9251fd3D79522bB2243a58FFf1dB43E25A495aaB",  # https://etherscan.io/address/0x9251fd3D79522bB2243a58FFf1dB43E25A495aaB
             "redeem_time_duration": 691201,  # 8 days time duration
             "whitelist_enabled": True,
-            "contract_deployer": "0x029E4FbDAa31DE075dD74B2238222A08233978f6",  # deployer account
         },
         "bitlayer": {
-            "uniBTC_proxy": "0x93919784C523f39CACaa98Ee0a9d96c3F32b593e",  # https://www.btrscan.com/address/0x93919784C523f39CACaa98Ee0a9d96c3F32b593e?tab=Transactions
-            "vault_proxy": "0xF9775085d726E782E83585033B58606f7731AB18",  # https://www.btrscan.com/address/0xF9775085d726E782E83585033B58606f7731AB18?tab=Transactions
             "redeem_owner": "0x9251fd3D79522bB2243a58FFf1dB43E25A495aaB",  # https://www.btrscan.com/address/0x9251fd3d79522bb2243a58fff1db43e25a495aab?tab=Transactions
             "redeem_time_duration": 691201,  # 8 days time duration
             "whitelist_enabled": True,
-            "contract_deployer": "0x0a3f2582ff649fcaf67d03483a8ed1a82745ea19",  # https://www.btrscan.com/address/0x0a3f2582ff649fcaf67d03483a8ed1a82745ea19?tab=Transactions
         },
         "zeta": {
-            "uniBTC_proxy": "0x6B2a01A5f79dEb4c2f3c0eDa7b01DF456FbD726a",  # https://zetachain.blockscout.com/address/0x6B2a01A5f79dEb4c2f3c0eDa7b01DF456FbD726a
-            "vault_proxy": "0x84E5C854A7fF9F49c888d69DECa578D406C26800",  # https://zetachain.blockscout.com/address/0x84E5C854A7fF9F49c888d69DECa578D406C26800
             "redeem_owner": "0x9251fd3D79522bB2243a58FFf1dB43E25A495aaB",  # https://zetachain.blockscout.com/address/0xb3f925B430C60bA467F7729975D5151c8DE26698?tab=Transactions
             "redeem_time_duration": 691201,  # 8 days time duration
             "whitelist_enabled": True,
-            "contract_deployer": "0xb3f925B430C60bA467F7729975D5151c8DE26698",  # https://zetachain.blockscout.com/address/0xb3f925B430C60bA467F7729975D5151c8DE26698
         },
         "merlin": {
-            "uniBTC_proxy": "0x93919784C523f39CACaa98Ee0a9d96c3F32b593e",  # https://scan.merlinchain.io/address/0x93919784C523f39CACaa98Ee0a9d96c3F32b593e
-            "vault_proxy": "0xF9775085d726E782E83585033B58606f7731AB18",  # https://scan.merlinchain.io/address/0xF9775085d726E782E83585033B58606f7731AB18
             "redeem_owner": "0x9251fd3D79522bB2243a58FFf1dB43E25A495aaB",  # https://scan.merlinchain.io/address/0x9251fd3D79522bB2243a58FFf1dB43E25A495aaB
             "redeem_time_duration": 691201,  # 8 days time duration
             "whitelist_enabled": True,
-            "contract_deployer": "0x0A3f2582FF649Fcaf67D03483a8ED1A82745Ea19",  # https://scan.merlinchain.io/address/0x0A3f2582FF649Fcaf67D03483a8ED1A82745Ea19
         },
         "base": {
-            "uniBTC_proxy": "0x93919784C523f39CACaa98Ee0a9d96c3F32b593e",  # https://basescan.org/address/0x93919784C523f39CACaa98Ee0a9d96c3F32b593e
-            "vault_proxy": "0x9f283B0401d9698e86097fdC44820BcBE5DcfeFb",  # https://basescan.org/address/0x9f283B0401d9698e86097fdC44820BcBE5DcfeFb
             "redeem_owner": "0x3eea50ba10952E5e0dFAa50EcFCc5AB19aD591Ef",  # https://basescan.org/address/0x3eea50ba10952E5e0dFAa50EcFCc5AB19aD591Ef
             "redeem_time_duration": 691201,  # 8 days time duration
             "whitelist_enabled": True,
-            "contract_deployer": "0x886eAf3D2b9dFD0A1Dd24b82d56a2f487E3616bF",  # https://basescan.org/address/0x886eAf3D2b9dFD0A1Dd24b82d56a2f487E3616bF
         },
     }
 
+    # uniBTC, Vault and ProxyAdmin addresses come from deployments/registry.json.
+    chain = registry.chain(network_cfg)
+    config_contact[network_cfg].update({
+        "uniBTC_proxy": chain.uni_btc,
+        "vault_proxy": chain.vault,
+        "contract_deployer": chain.proxy_admin,
+    })
+
     deps = project.load(
         Path.home() / ".brownie" / "packages" / config["dependencies"][0]
     )
@@ -0,0 +1,47 @@
+import sys
+import time
+from brownie import *
+from brownie.exceptions import VirtualMachineError
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+import registry  # noqa: E402
+from rpc import RPCClient, RPCError  # noqa: E402
+from swap_quoter import read  # noqa: E402
+from swap_twap import open_job, run  # noqa: E402
+
+# Swaps `amount` (whole tokens) of a SwapProxy's from token in `slices` slices, one every
+# `interval` seconds, through scripts/swap_twap.py, signing each swapToken call with the proxy
+# owner's account. The job is kept in `state_file`: run the same command again after a crash
+# and it settles the transaction in flight before going on, without sending it twice.
+#
+# Execution Command Format:
+# `brownie run scripts/swap_twap.py main "deployer" "ethereum" "0x..." "50" 10 600 "twap.json" --network=eth-mainnet`
+
+
+def main(deployer_account="deployer", network_cfg="ethereum", swap_proxy="", amount="0", slices=10, interval=600,
+         state_file="twap.json", max_slice="0", min_slice="0", max_slippage=99, grace=0):
+    assert swap_proxy != "", "need the SwapProxy address"
+    chain = registry.chain(network_cfg)
+    deployer = accounts.load(deployer_account)
+    proxy = Contract.from_abi("SwapProxy", swap_proxy, SwapProxy.abi)
+    assert proxy.owner() == deployer, "swapToken is onlyOwner"
+
+    client = RPCClient(web3.provider.endpoint_uri, timeout=60)
+    genesis = client.call("eth_getBlockByNumber", ["0x0", False])["hash"]
+    info, _ = read(client, swap_proxy, deployer.address)
+    scale = 10**info["from_decimals"]
+    job = open_job(state_file, genesis, info, deployer.address, int(Decimal(amount) * scale), int(slices),
+                   int(interval), time.time())
+
+    def send(tx):
+        try:
+            return deployer.transfer(tx["to"], 0, data=tx["data"], nonce=int(tx["nonce"], 16),
+                                     gas_limit=int(tx["gas"], 16), required_confs=0).txid
+        except (ValueError, VirtualMachineError) as e:
+            raise RPCError(str(e))
+
+    job = run(client, job, state_file, max_slice=int(Decimal(max_slice) * scale) or None,
+              min_slice=int(Decimal(min_slice) * scale), max_slippage=int(max_slippage), grace=int(grace), send=send)
+    print(f"{chain.name}: swapped {job['swapped']} of {job['amount']}, received {job['received']}")
@@ -1,7 +1,7 @@
 import pytest
 from web3 import Web3
 from pathlib import Path
-from brownie import FBTC, WBTC, WBTC18, XBTC, LockedFBTC, FBTCProxy, Vault, uniBTC, Sigma, accounts, Contract, project, config, network
+from brownie import FBTC, WBTC, WBTC18, XBTC, LockedFBTC, FBTCProxy, Vault, uniBTC, Sigma, DelayRedeemRouter, accounts, Contract, project, config, network
 
 # Web3 client
 @pytest.fixture(scope="session", autouse=True)
@@ -130,5 +130,61 @@ def contracts(w3, deps, chain_id, roles, owner, deployer, zero_address, executor
             locked_fbtc_transparent,      # index = 10
             wbtc18]                       # index = 11
 
+# DelayRedeemRouter configured as in test_delayRedeemRouterSimulate.py: a 7-day redeemDelay,
+# FBTC, WBTC18 and native BTC redeemable, alice and bob whitelisted with 1000 uniBTC each.
+@pytest.fixture()
+def redeem_router(deps, roles, operator, owner, deployer, alice, bob):
+    proxy = deps.TransparentUpgradeableProxy
+    native_btc = "0xbeDFFfFfFFfFfFfFFfFfFFFFfFFfFFffffFFFFFF"
+
+    fbtc = FBTC.deploy({'from': owner})
+    wbtc18 = WBTC18.deploy({'from': owner})
+
+    uni_btc = uniBTC.deploy({'from': deployer})
+    uni_btc_proxy = proxy.deploy(uni_btc, deployer, b'', {'from': deployer})
+    uni_btc_transparent = Contract.from_abi("uniBTC", uni_btc_proxy.address, uniBTC.abi)
+    uni_btc_transparent.initialize(owner, owner, [], {'from': owner})
+
+    vault = Vault.deploy({'from': deployer})
+    vault_proxy = proxy.deploy(vault, deployer, b'', {'from': deployer})
+    vault_transparent = Contract.from_abi("Vault", vault_proxy.address, Vault.abi)
+    vault_transparent.initialize(owner, uni_btc_transparent, {'from': owner})
+
+    router = DelayRedeemRouter.deploy({'from': deployer})
+    router_proxy = proxy.deploy(router, deployer, b'', {'from': deployer})
+    router_transparent = Contract.from_abi("DelayRedeemRouter", router_proxy.address, DelayRedeemRouter.abi)
+    router_transparent.initialize(owner, uni_btc_transparent, vault_transparent, 604800, True, {'from': owner})
+
+    # Daily caps of 8 FBTC, 10 WBTC18 and 5 native BTC, with the same amounts free up front.
+    tokens = [fbtc, wbtc18, native_btc]
+    caps = [8 * 10**8, 10 * 10**8, 5 * 10**8]
+    router_transparent.setQuotaRates(tokens, [cap // 86400 for cap in caps], {'from': owner})
+    router_transparent.setMaxQuotaForTokens(tokens, caps, {'from': owner})
+    router_transparent.addToBtclist(tokens, {'from': owner})
+    router_transparent.addToWhitelist([alice, bob], {'from': owner})
+
+    # The router burns through the vault and pays out of it.
+    uni_btc_transparent.grantRole(roles[1], vault_transparent, {'from': owner})
+    vault_transparent.grantRole(operator, router_transparent, {'from': owner})
+    vault_transparent.allowTarget([uni_btc_transparent, fbtc, wbtc18, router_transparent], {'from': owner})
+    fbtc.mint(vault_transparent, 100 * 10**8, {'from': owner})
+    wbtc18.mint(vault_transparent, 100 * 10**18, {'from': owner})
+    owner.transfer(vault_transparent, 100 * 10**18)
+
+    for user in (alice, bob):
+        uni_btc_transparent.mint(user, 1000 * 10**8, {'from': owner})
+        uni_btc_transparent.approve(router_transparent, 2**256 - 1, {'from': user})
+
+    return [router_transparent,           # index = 0
+            uni_btc_transparent,          # index = 1
+            vault_transparent,            # index = 2
+            fbtc,                         # index = 3
+            wbtc18,                       # index = 4
+            native_btc]                   # index = 5
+
 def pytest_addoption(parser):
-    parser.addoption("--case", action="store", default="default_slippage", help="case for the test")
\ No newline at end of file
+    parser.addoption("--case", action="store", default="default_slippage", help="case for the test")
+    parser.addoption("--bench-sizes", action="store", default="1,10,100", help="queue lengths swept by test_redeemGasBench.py")
+    parser.addoption("--bench-report", action="store", default="reports/redeem_gas_bench.json", help="where test_redeemGasBench.py writes its report")
+    parser.addoption("--bench-baseline", action="store", default=None, help="earlier benchmark report to check gas regressions against")
+    parser.addoption("--bench-tolerance", action="store", default="0.05", help="allowed gas increase over the baseline")
\ No newline at end of file
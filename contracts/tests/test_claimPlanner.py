@@ -0,0 +1,41 @@
+import sys
+from pathlib import Path
+
+from brownie import chain
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+from claim_planner import GasModel, claimable_tokens, plan  # noqa: E402
+from rpc import RPCClient  # noqa: E402
+
+
+# NOTE: This test designed to run on the development network
+# Command to run test: `brownie test tests/test_claimPlanner.py`
+def test_claim_plan_fits_budget(fn_isolation, redeem_router, alice):
+    router, fbtc, wbtc18, native_btc = redeem_router[0], redeem_router[3], redeem_router[4], redeem_router[5]
+    queue = [fbtc] * 10 + [wbtc18, fbtc] * 8 + [native_btc] * 4
+    for token in queue:
+        router.createDelayedRedeem(token, 10**6, {'from': alice})
+    chain.sleep(router.redeemDelay() + 1)
+    chain.mine()
+
+    tokens = claimable_tokens(RPCClient("http://localhost:8545"), router.address, alice.address)
+    assert tokens == [str(t).lower() for t in queue]
+
+    # Every prefix of the queue is one (n, k, native) sample.
+    samples, seen = [], set()
+    for n, token in enumerate(tokens, 1):
+        seen.add(token)
+        gas = router.claimDelayedRedeems["uint256"].estimate_gas(n, {'from': alice})
+        samples.append((n, len(seen), native_btc.lower() in seen, gas))
+    model = GasModel.fit(samples)
+
+    # A budget that holds about a third of the queue forces a split.
+    budget = int(samples[11][3] * 1.2)
+    steps = plan(model, tokens, budget, margin=0.05)
+    assert len(steps) >= 2
+    assert sum(bound for bound, _ in steps) == len(queue)
+
+    for bound, _ in steps:
+        tx = router.claimDelayedRedeems(bound, {'from': alice, 'gas_limit': budget})
+        assert tx.status == 1
+    assert router.userRedeems(alice)[0] == len(queue)
@@ -0,0 +1,81 @@
+import shutil
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+from brownie import Multicall3, chain
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+from debt_snapshot import snapshot  # noqa: E402
+from registry import Chain  # noqa: E402
+from rpc import RPCClient, RPCError  # noqa: E402
+
+FORK_RPC = "http://localhost:8546"
+FORK_CHAIN_ID = 31338
+
+
+def _row(router, token, block):
+    total_debts, total_cleared = router.tokenDebts(token, block_identifier=block)
+    return {"btclisted": router.isBtclisted(token, block_identifier=block), "totalDebts": total_debts, "totalCleared": total_cleared, "outstanding": total_debts - total_cleared,
+            "maxQuota": router.maxQuotas(token, block_identifier=block),
+            "quotaRate": router.quotaRates(token, block_identifier=block),
+            "lastRebaseTimestamp": router.lastRebaseTimestamps(token, block_identifier=block),
+            "quotaBase": router.quotaBases(token, block_identifier=block)}
+
+
+# NOTE: This test designed to run on the development network, with anvil installed for the second chain
+# Command to run test: `brownie test tests/test_debtSnapshot.py`
+def test_cross_chain_debt_snapshot(fn_isolation, redeem_router, owner, alice, bob, tmp_path):
+    if not shutil.which("anvil"):
+        pytest.skip("anvil is needed for the second chain")
+    router, fbtc, wbtc18, native_btc = redeem_router[0], redeem_router[3], redeem_router[4], redeem_router[5]
+    multicall = Multicall3.deploy({'from': owner})
+    router.createDelayedRedeem(fbtc, 2 * 10**8, {'from': alice})
+    router.createDelayedRedeem(wbtc18, 10**8, {'from': bob})
+    chain.mine()
+
+    # The second chain forks the development network here, then the two diverge.
+    fork = subprocess.Popen(["anvil", "--fork-url", "http://localhost:8545", "--port", "8546",
+                             "--chain-id", str(FORK_CHAIN_ID), "--silent"])
+    try:
+        for _ in range(50):
+            try:
+                RPCClient(FORK_RPC).call("eth_blockNumber")
+                break
+            except (RPCError, OSError):
+                time.sleep(0.2)
+        router.createDelayedRedeem(native_btc, 3 * 10**8, {'from': alice})
+        router.removeFromBtclist([wbtc18], {'from': owner})
+        chain.mine()
+
+        chains = [Chain("dev", chain.id, ("http://localhost:8545",), redeem_router=router.address),
+                  Chain("fork", FORK_CHAIN_ID, (FORK_RPC,), redeem_router=router.address)]
+        multicalls = {chain.id: multicall.address, FORK_CHAIN_ID: multicall.address}
+        result = snapshot(chains, str(tmp_path), confirmations=0, multicalls=multicalls)
+
+        dev = result["chains"]["dev"]
+        assert dev["block"] == chain.height
+        # wbtc18 left the btclist, but the 1 uniBTC redeemed against it is still owed.
+        assert set(dev["tokens"]) == {fbtc.address.lower(), wbtc18.address.lower(), native_btc.lower()}
+        for token, row in dev["tokens"].items():
+            assert row == _row(router, token, dev["block"])
+        assert not dev["tokens"][wbtc18.address.lower()]["btclisted"]
+        assert dev["tokens"][wbtc18.address.lower()]["outstanding"] == 10**8
+        assert dev["outstanding"] == 6 * 10**8
+
+        # The fork still has wbtc18 btclisted and none of the native redeem.
+        fork_tokens = result["chains"]["fork"]["tokens"]
+        assert set(fork_tokens) == {fbtc.address.lower(), wbtc18.address.lower(), native_btc.lower()}
+        assert fork_tokens[fbtc.address.lower()]["outstanding"] == 2 * 10**8
+        assert fork_tokens[native_btc.lower()]["outstanding"] == 0
+        assert result["outstanding"] == 6 * 10**8 + 3 * 10**8
+    finally:
+        fork.terminate()
+        fork.wait()
+
+    # Heads that have not moved are served from the cache; the fork's error stays with the fork.
+    again = snapshot(chains, str(tmp_path), confirmations=0, multicalls=multicalls)
+    assert again["chains"]["dev"] == dev
+    assert "error" in again["chains"]["fork"]
@@ -0,0 +1,87 @@
+import sys
+from pathlib import Path
+
+from brownie import Contract, DirectBTCMinter, Sigma, directBTC
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+from directbtc_pipeline import FixtureDepositSource, Pipeline, read_queue  # noqa: E402
+from rpc import RPCClient, RPCError  # noqa: E402
+
+BTC = 10**8
+
+
+def set_automine(client, on):
+    try:
+        client.call("evm_setAutomine", [on])
+    except RPCError:
+        client.call("miner_start" if on else "miner_stop", [])
+
+
+def deposit(i, recipient, amount):
+    return {"txid": f"{i:064x}", "recipient": recipient.address, "amount": amount}
+
+
+# NOTE: This test designed to run on the development network
+# Command to run test: `brownie test tests/test_directBTCPipeline.py`
+def test_directbtc_pipeline(fn_isolation, contracts, deps, owner, deployer, alice, bob, accounts):
+    uni_btc, vault = contracts[0], contracts[6]
+    carol = accounts[5]
+    proxy = deps.TransparentUpgradeableProxy
+    direct_btc_proxy = proxy.deploy(directBTC.deploy({'from': deployer}), deployer, b'', {'from': deployer})
+    direct_btc = Contract.from_abi("directBTC", direct_btc_proxy, directBTC.abi)
+    direct_btc.initialize(owner, owner, {'from': owner})
+    minter_proxy = proxy.deploy(DirectBTCMinter.deploy({'from': deployer}), deployer, b'', {'from': deployer})
+    minter = Contract.from_abi("DirectBTCMinter", minter_proxy, DirectBTCMinter.abi)
+    minter.initialize(owner, direct_btc, vault, uni_btc, {'from': owner})
+    direct_btc.grantRole(direct_btc.MINTER_ROLE(), minter, {'from': owner})
+
+    sigma = Contract.from_abi("Sigma", vault.supplyFeeder(), Sigma.abi)
+    sigma.setTokenHolders(direct_btc, [(direct_btc, [vault])], {'from': owner})
+    vault.allowToken([direct_btc], {'from': owner})
+    vault.setCap(direct_btc, 1000 * BTC, {'from': owner})
+    minter.setRecipient(alice, True, {'from': owner})
+    minter.setRecipient(bob, True, {'from': owner})
+
+    client = RPCClient("http://localhost:8545")
+    source = FixtureDepositSource([deposit(1, alice, BTC), deposit(2, bob, 2 * BTC), deposit(3, carol, 3 * BTC),
+                                   deposit(4, alice, 4 * BTC)])
+    # The owner holds both roles, so every receive and approve goes out in one tick and one block.
+    pipeline = Pipeline(client, minter.address, owner.address, source)
+    set_automine(client, False)
+    try:
+        status = pipeline.tick()
+        assert (status["receives_sent"], status["approves_sent"], status["in_flight"]) == (4, 2, 6)
+        client.call("evm_mine")
+    finally:
+        set_automine(client, True)
+
+    # Carol is not a recipient: approval stops at her deposit.
+    status = pipeline.drain(poll=0)
+    assert status["reverted"] == 0 and status["in_flight"] == 0
+    assert status["blocked"] == f"0x{3:064x}"
+    assert minter.processIdx() == 2
+    assert [minter.eventIndexes(i) for i in range(4)] == [f"0x{i:064x}" for i in range(1, 5)]
+    assert (uni_btc.balanceOf(alice), uni_btc.balanceOf(bob), uni_btc.balanceOf(carol)) == (BTC, 2 * BTC, 0)
+    # Only a read that ran into the end of eventIndexes is complete.
+    assert read_queue(client, minter.address, [])["complete"]
+    assert not read_queue(client, minter.address, [], window=1)["complete"]
+
+    # A dropped receive leaves a nonce gap; the next tick sends it again and the queue behind it goes through.
+    minter.setRecipient(carol, True, {'from': owner})
+    source.add(deposit(5, bob, 5 * BTC), deposit(6, carol, 6 * BTC))
+    dropped = []
+
+    def send(tx):
+        if not dropped and tx.get("data", "").startswith(minter.receiveEvent.signature):
+            dropped.append(tx)
+            return "0x" + "00" * 32
+        return client.call("eth_sendTransaction", [tx])
+
+    pipeline = Pipeline(client, minter.address, owner.address, source, batch=3, send=send)
+    status = pipeline.drain(poll=0)
+    assert dropped and status["gaps"] == 1 and status["reverted"] == 0 and status["blocked"] is None
+    assert minter.processIdx() == 6
+    assert uni_btc.balanceOf(alice) == 5 * BTC
+    assert uni_btc.balanceOf(bob) == 7 * BTC
+    assert uni_btc.balanceOf(carol) == 9 * BTC
+    assert direct_btc.balanceOf(vault) == 21 * BTC
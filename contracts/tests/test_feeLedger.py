@@ -0,0 +1,63 @@
+import sys
+from pathlib import Path
+
+from brownie import chain
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+from fee_ledger import FeeLedger, sync  # noqa: E402
+from rpc import RPCClient  # noqa: E402
+
+
+# NOTE: This test designed to run on the development network
+# Command to run test: `brownie test tests/test_feeLedger.py`
+def test_fee_ledger_matches_management_fee(fn_isolation, redeem_router, owner, alice, bob, tmp_path):
+    router, fbtc, wbtc18, native_btc = redeem_router[0], redeem_router[3], redeem_router[4], redeem_router[5]
+    start = chain.height + 1
+    client = RPCClient("http://localhost:8545")
+    router.setCancelFeeRate(150, {'from': owner})
+    router.setRedeemPrincipalDelay(router.redeemDelay() + 86400, {'from': owner})
+
+    router.createDelayedRedeem(fbtc, 10**8, {'from': alice})
+    router.createDelayedRedeem(wbtc18, 25 * 10**6 + 3, {'from': alice})
+    router.createDelayedRedeem(native_btc, 30 * 10**6 + 7, {'from': alice})
+    router.createDelayedRedeem(fbtc, 5 * 10**7, {'from': bob})
+    router.createDelayedRedeem(fbtc, 1234567, {'from': bob})
+
+    # alice claims her first redeem and cancels the other two; bob claims both.
+    chain.sleep(router.redeemDelay() + 1)
+    chain.mine()
+    router.claimDelayedRedeems(1, {'from': alice})
+    chain.sleep(86400)
+    chain.mine()
+    cancel_tx = router.claimPrincipals({'from': alice})
+    router.claimDelayedRedeems({'from': bob})
+    router.withdrawManagementFee(router.managementFee() // 3, owner, {'from': owner})
+
+    ledger = FeeLedger(router.address)
+    sync(client, ledger, start, confirmations=0)
+    assert ledger.management_fee() == router.managementFee()
+
+    totals = ledger.totals()
+    assert totals["created"] == sum(router.redeemFees(alice, i) for i in range(3)) + \
+        sum(router.redeemFees(bob, i) for i in range(2))
+    assert totals["refunded"] == router.redeemFees(alice, 1) + router.redeemFees(alice, 2)
+    assert totals["cancel"] == cancel_tx.events["DelayedRedeemsPrincipalCompleted"]["totalFee"]
+    tokens = ledger.by_token()
+    assert tokens[fbtc.address.lower()]["collected"] == router.redeemFees(alice, 0) + \
+        router.redeemFees(bob, 0) + router.redeemFees(bob, 1)
+    assert tokens[wbtc18.address.lower()]["cancel"] > 0 and tokens[native_btc.lower()]["cancel"] > 0
+
+    # Reloaded from its columnar file, the ledger picks up where it stopped.
+    path = str(tmp_path / "ledger.fees")
+    ledger.save(path)
+    ledger = FeeLedger.load(path, router.address)
+    assert ledger.totals() == totals
+    chain.sleep(86400)
+    tx = router.createDelayedRedeem(wbtc18, 10**7, {'from': bob})
+    assert sync(client, ledger, confirmations=0) == 1
+    assert ledger.totals()["created"] == totals["created"] + router.redeemFees(bob, 2)
+    assert ledger.management_fee() == router.managementFee()
+
+    # Totals by day only cover the requested range.
+    last_day = tx.timestamp // 86400
+    assert ledger.totals(last_day, last_day + 1)["created"] == router.redeemFees(bob, 2)
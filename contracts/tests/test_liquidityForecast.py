@@ -0,0 +1,59 @@
+import sys
+from pathlib import Path
+
+import brownie
+from brownie import chain
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+from liquidity_forecast import LiquidityForecast, forecast  # noqa: E402
+from redeem_index import sync  # noqa: E402
+from rpc import RPCClient  # noqa: E402
+
+
+# NOTE: This test designed to run on the development network
+# Command to run test: `brownie test tests/test_liquidityForecast.py`
+def test_forecast_predicts_fast_lane_revert(fn_isolation, redeem_router, owner, alice, bob, tmp_path):
+    router, vault, fbtc, wbtc18 = redeem_router[0], redeem_router[2], redeem_router[3], redeem_router[4]
+    start = chain.height + 1
+    client = RPCClient("http://localhost:8545")
+
+    # 5 FBTC of the vault's 100 are free for regular claims.
+    router.setRetainAmounts([fbtc], [95 * 10**8], {'from': owner})
+    first = router.createDelayedRedeem(fbtc, 3 * 10**8, {'from': alice})
+    chain.sleep(2 * 3600)
+    second = router.createDelayedRedeem(fbtc, 3 * 10**8, {'from': alice})
+
+    index = LiquidityForecast(router.address)
+    sync(client, index, start, confirmations=0)
+    hours = router.redeemDelay() // 3600 + 4
+    result = forecast(client, index, hours)[fbtc.address.lower()]
+    amounts = [e["amount"] for e in (first.events["DelayedRedeemCreated"], second.events["DelayedRedeemCreated"])]
+    assert (result["balance"], result["retain"]) == (fbtc.balanceOf(vault), 95 * 10**8)
+
+    curve = result["curve"]
+    now = curve[0][0]
+    for hour, due, shortfall in curve:
+        end = hour + 3600
+        expected = sum(a for a, created in zip(amounts, (first.timestamp, second.timestamp))
+                       if created + router.redeemDelay() < end)
+        assert due == expected
+        assert shortfall == max(0, expected - 5 * 10**8)
+    assert curve[0][1] == 0 and result["top_up"] == sum(amounts) - 5 * 10**8
+    assert result["first_shortfall"] > now
+
+    # The forecast shortfall is exactly what makes the claim revert, and topping up fixes it.
+    chain.sleep(router.redeemDelay() + 1)
+    chain.mine()
+    with brownie.reverts("USR015"):
+        router.claimDelayedRedeems({'from': alice})
+    fbtc.mint(vault, result["top_up"], {'from': owner})
+    router.claimDelayedRedeems({'from': alice})
+
+    # Claims and new redeems are folded in incrementally.
+    router.createDelayedRedeem(wbtc18, 10**8, {'from': bob})
+    path = str(tmp_path / "index.json")
+    assert sync(client, index, confirmations=0) == 3   # DelayedRedeemsClaimed, DelayedRedeemsCompleted, DelayedRedeemCreated
+    index.save(path)
+    index = LiquidityForecast.load(path, router.address)
+    assert index.schedule.get(fbtc.address.lower(), {}) == {}
+    assert list(index.schedule[wbtc18.address.lower()].values()) == [router.getUserDelayedRedeems(bob)[0][0]]
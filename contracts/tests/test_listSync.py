@@ -0,0 +1,46 @@
+import sys
+from pathlib import Path
+
+from brownie import chain
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+from list_sync import GAS_MARGIN, current_lists, diff, gas_model, plan, send  # noqa: E402
+from rpc import RPCClient  # noqa: E402
+
+
+# NOTE: This test designed to run on the development network
+# Command to run test: `brownie test tests/test_listSync.py`
+def test_list_sync(fn_isolation, redeem_router, owner, alice, bob):
+    router = redeem_router[0]
+    client = RPCClient("http://localhost:8545")
+    new = [f"0x{0xb0b0000 + i:040x}" for i in range(70)]
+    router.addToBlacklist([bob, new[0]], {'from': owner})
+    router.removeFromBlacklist([bob], {'from': owner})
+
+    current = current_lists(client, router.address, 0, chain.height)
+    assert current == {"whitelist": {alice.address.lower(), bob.address.lower()}, "blacklist": {new[0]}}
+
+    # bob leaves the whitelist, 70 accounts join it and 3 of them are blacklisted instead of new[0].
+    desired = {"whitelist": {alice.address.lower(), *new}, "blacklist": set(new[1:4])}
+    changes = diff(current, desired)
+    assert changes == [("addToBlacklist", sorted(new[1:4])), ("removeFromWhitelist", [bob.address.lower()]),
+                       ("addToWhitelist", sorted(new)), ("removeFromBlacklist", [new[0]])]
+
+    # A budget of 25 accounts per transaction splits the whitelist additions in three.
+    base, per = gas_model(client, router.address, owner.address, "addToWhitelist", sorted(new))
+    budget = int((base + 25 * per) * GAS_MARGIN) + 1
+    txs = plan(client, router.address, owner.address, changes, budget)
+    assert [len(tx["accounts"]) for tx in txs] == [3, 1, 25, 25, 20, 1]
+    for tx in txs:
+        assert tx["gas"] <= budget
+
+    receipts = send(client, owner.address, txs)
+    assert [int(r["status"], 16) for r in receipts] == [1] * len(txs)
+    nonces = [int(client.call("eth_getTransactionByHash", [r["transactionHash"]])["nonce"], 16) for r in receipts]
+    assert nonces == list(range(nonces[0], nonces[0] + len(txs)))
+
+    for account in new:
+        assert router.isWhitelisted(account)
+        assert router.isBlacklisted(account) == (account in new[1:4])
+    assert not router.isWhitelisted(bob) and router.isWhitelisted(alice)
+    assert diff(current_lists(client, router.address, 0, chain.height), desired) == []
@@ -0,0 +1,80 @@
+import sys
+from pathlib import Path
+
+import brownie
+from brownie import Sigma, Contract
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+from mint_capacity import CapacityCache, refresh  # noqa: E402
+from registry import NATIVE_BTC  # noqa: E402
+from rpc import RPCClient  # noqa: E402
+from sigma_holders import HolderCache  # noqa: E402
+
+
+# NOTE: This test designed to run on the development network
+# Command to run test: `brownie test tests/test_mintCapacity.py`
+def test_mint_capacity(fn_isolation, contracts, owner, alice, bob):
+    wbtc, vault, fbtc, xbtc, wbtc18 = contracts[5], contracts[6], contracts[7], contracts[8], contracts[11]
+    sigma = Contract.from_abi("Sigma", vault.supplyFeeder(), Sigma.abi)
+    vault.allowToken([wbtc, fbtc, xbtc, wbtc18, NATIVE_BTC], {'from': owner})
+    sigma.setTokenHolders(fbtc, [(fbtc, [vault, alice]), (wbtc, [vault])], {'from': owner})
+    sigma.setTokenHolders(wbtc18, [(wbtc18, [vault])], {'from': owner})
+    sigma.setTokenHolders(xbtc, [(xbtc, [vault])], {'from': owner})
+    sigma.setTokenHolders(NATIVE_BTC, [(NATIVE_BTC, [vault])], {'from': owner})
+    vault.setCap(fbtc, 10 * 10**8, {'from': owner})
+    vault.setCap(wbtc18, 3 * 10**18, {'from': owner})
+    vault.setCap(NATIVE_BTC, 3 * 10**18, {'from': owner})
+    fbtc.mint(vault, 2 * 10**8, {'from': owner})
+    fbtc.mint(alice, 10**8, {'from': owner})
+    wbtc.mint(vault, 10**8, {'from': owner})
+    wbtc18.mint(vault, 2 * 10**18 + 5, {'from': owner})
+
+    client = RPCClient("http://localhost:8545")
+    holders = HolderCache(None, 0, sigma.address)
+    cache = CapacityCache(None, 0, vault.address)
+    matrix = refresh(client, cache, holders, [wbtc.address], confirmations=0)["tokens"]
+
+    row = matrix[fbtc.address.lower()]
+    assert row["supply"] == sigma.totalSupply(fbtc) == 4 * 10**8
+    assert (row["remaining"], row["uniBTC"], row["reason"]) == (6 * 10**8, 6 * 10**8, None)
+    # 18 decimals: the remaining WBTC18 is truncated to whole uniBTC satoshis.
+    row = matrix[wbtc18.address.lower()]
+    assert (row["remaining"], row["uniBTC"], row["reason"]) == (10**18 - 5, (10**18 - 5) // 10**10, None)
+    assert matrix[xbtc.address.lower()]["reason"] == "USR010"
+    assert matrix[wbtc.address.lower()]["reason"] == "USR018"
+    # mint() is payable, so the native value is counted in the Vault's balance against the cap like any amount.
+    vault.mint({'from': alice, 'value': 10**18 + 5})
+    matrix = refresh(client, cache, holders, [wbtc.address], confirmations=0)["tokens"]
+    row = matrix[NATIVE_BTC.lower()]
+    assert row["supply"] == sigma.totalSupply(NATIVE_BTC) == 10**18 + 5
+    assert (row["remaining"], row["uniBTC"], row["reason"]) == (2 * 10**18 - 5, (2 * 10**18 - 5) // 10**10, None)
+    with brownie.reverts("USR003"):
+        vault.mint({'from': bob, 'value': row["remaining"] + 1})
+    vault.mint({'from': bob, 'value': row["remaining"]})
+    row = refresh(client, cache, holders, [wbtc.address], confirmations=0)["tokens"][NATIVE_BTC.lower()]
+    assert (row["remaining"], row["uniBTC"], row["reason"]) == (0, 0, "USR003")
+
+    # The predicted capacity is exactly what the Vault lets bob mint.
+    fbtc.mint(bob, 10 * 10**8, {'from': owner})
+    fbtc.approve(vault, 10 * 10**8, {'from': bob})
+    with brownie.reverts("USR003"):
+        vault.mint(fbtc, 6 * 10**8 + 1, {'from': bob})
+    vault.mint(fbtc, 6 * 10**8, {'from': bob})
+    wbtc18.mint(bob, 10**18, {'from': owner})
+    wbtc18.approve(vault, 10**18, {'from': bob})
+    with brownie.reverts("USR003"):
+        vault.mint(wbtc18, 10**18 - 4, {'from': bob})
+    with brownie.reverts("USR010"):
+        vault.mint(wbtc18, 10**10 - 1, {'from': bob})
+
+    # Only balances named in Transfer events are read again.
+    cache.balances[f"{wbtc.address.lower()}:{vault.address.lower()}"] += 1
+    vault.pauseToken([wbtc18], {'from': owner})
+    matrix = refresh(client, cache, holders, [wbtc.address], confirmations=0)["tokens"]
+    row = matrix[fbtc.address.lower()]
+    assert (row["supply"], row["uniBTC"], row["reason"]) == (sigma.totalSupply(fbtc) + 1, 0, "USR003")
+    assert matrix[wbtc18.address.lower()]["reason"] == "SYS002"
+
+    wbtc.mint(vault, 1, {'from': owner})
+    matrix = refresh(client, cache, holders, [wbtc.address], confirmations=0)["tokens"]
+    assert matrix[fbtc.address.lower()]["supply"] == sigma.totalSupply(fbtc)
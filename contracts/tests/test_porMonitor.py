@@ -0,0 +1,57 @@
+import sys
+from pathlib import Path
+
+import brownie
+from brownie import MockReserveFeeder, MockSupplyFeeder, chain
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+from por_monitor import monitor  # noqa: E402
+from registry import Chain  # noqa: E402
+from reserve_backends import EVMRPCBackend  # noqa: E402
+
+HEARTBEAT = 3600
+
+
+# NOTE: This test designed to run on the development network
+# Command to run test: `brownie test tests/test_porMonitor.py`
+def test_por_monitor_predicts_check_reserve(fn_isolation, contracts, roles, owner, alice):
+    vault = contracts[6]
+    native_btc = vault.NATIVE_BTC()
+    vault.setCap(native_btc, 100 * 10**18, {'from': owner})
+    vault.grantRole(roles[2], owner, {'from': owner})
+
+    dev = Chain("dev", chain.id, ("http://localhost:8545",), vault=vault.address)
+    backend = EVMRPCBackend(rpcs={chain.id: ["http://localhost:8545"]})
+    assert monitor([dev], backend)["dev"] is None
+
+    supply_feeder = MockSupplyFeeder.deploy({'from': owner})
+    for decimals, ratio in ((18, 1000), (8, 950), (6, 900)):
+        reserve_feeder = MockReserveFeeder.deploy(decimals, {'from': owner})
+        reserve_feeder.setRound(12 * 10**decimals + 7, chain.time(), {'from': owner})
+        vault.setPoRFeeder(reserve_feeder, supply_feeder, HEARTBEAT, {'from': owner})
+        vault.setAdequacyRatio(ratio, {'from': owner})
+
+        # At the predicted maximum supply mints pass, one satoshi more and they revert.
+        supply_feeder.setTotalTokenSupply(10 * 10**8, {'from': owner})
+        report = monitor([dev], backend)["dev"]
+        assert report["passes"] and report["headroom"] == report["max_supply"] - 10 * 10**8 > 0
+        assert report["stale_in"] == reserve_feeder.updatedAt() + HEARTBEAT - report["timestamp"]
+
+        supply_feeder.setTotalTokenSupply(report["max_supply"], {'from': owner})
+        assert monitor([dev], backend)["dev"]["headroom"] == 0
+        vault.mint({'from': alice, 'value': 10**18})
+
+        supply_feeder.setTotalTokenSupply(report["max_supply"] + 1, {'from': owner})
+        report = monitor([dev], backend)["dev"]
+        assert (report["passes"], report["reason"], report["headroom"]) == (False, "adequacy", -1)
+        with brownie.reverts("SYS013"):
+            vault.mint({'from': alice, 'value': 10**18})
+
+    # Past the heartbeat the feed is stale and every mint reverts.
+    supply_feeder.setTotalTokenSupply(10**8, {'from': owner})
+    chain.sleep(monitor([dev], backend)["dev"]["stale_in"] + 60)
+    chain.mine()
+    report = monitor([dev], backend)["dev"]
+    assert (report["passes"], report["reason"]) == (False, "stale") and report["stale_in"] < 0
+    with brownie.reverts("SYS013"):
+        vault.mint({'from': alice, 'value': 10**18})
@@ -0,0 +1,38 @@
+import random
+import sys
+from pathlib import Path
+
+import brownie
+from brownie import chain, history
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+from quota_sim import TokenQuota  # noqa: E402
+
+
+# NOTE: This test designed to run on the development network
+# Command to run test: `brownie test tests/test_quotaSim.py`
+def test_quota_model_matches_router(fn_isolation, redeem_router, alice):
+    router, fbtc = redeem_router[0], redeem_router[3]
+    q = TokenQuota(router.quotaRates(fbtc), router.maxQuotas(fbtc), router.redeemFeeRate(),
+                   router.quotaBases(fbtc), router.lastRebaseTimestamps(fbtc), router.tokenDebts(fbtc)[0])
+
+    rnd = random.Random(7)
+    outcomes = set()
+    for _ in range(25):
+        chain.sleep(rnd.choice([0, 600, 3600, 6 * 3600]))
+        amount = rnd.choice([0, 10**7, 5 * 10**7, 2 * 10**8, 9 * 10**8])
+        try:
+            router.createDelayedRedeem(fbtc, amount, {'from': alice})
+            accepted = True
+        except brownie.exceptions.VirtualMachineError as e:
+            assert "USR010" in str(e)
+            accepted = False
+        tx = history[-1]
+        assert q.create(tx.timestamp, amount) == accepted
+        assert q.current_cap(tx.timestamp) == router.getCurrentCap(fbtc, block_identifier=tx.block_number)
+        assert (q.base, q.last_rebase, q.total_debts) == \
+            (router.quotaBases(fbtc), router.lastRebaseTimestamps(fbtc), router.tokenDebts(fbtc)[0])
+        outcomes.add(accepted)
+
+    # The trace must have exercised both the accepted and the USR010 path.
+    assert outcomes == {True, False}
@@ -0,0 +1,127 @@
+import json
+import os
+import statistics
+import time
+
+import pytest
+from brownie import chain, network
+
+# Gas benchmark of DelayRedeemRouter as one user's delayedRedeems array grows.
+#
+# For every token mix the queue is grown through --bench-sizes (default 1,10,100; the
+# full sweep to 5000 sends 15000 transactions). At each size everything in the queue is
+# matured and the suite records:
+#   createDelayedRedeem                     gas used by the last request
+#   claimDelayedRedeems()                   estimated gas of claiming the whole queue
+#   getUserDelayedRedeems(user)             estimated gas and eth_call latency
+#   getClaimableUserDelayedRedeems(user)    estimated gas and eth_call latency
+#
+# The report (--bench-report) also gives, per mix and function, the longest queue that
+# stays under the block gas limit (transactions) or CALL_GAS_CAP (eth_call). Pass an
+# earlier report as --bench-baseline to fail on gas above it by more than --bench-tolerance.
+
+# Default eth_call gas cap of geth (--rpc.gascap); providers often use the same.
+CALL_GAS_CAP = 50_000_000
+LATENCY_CALLS = 5
+
+MIXES = {
+    "fbtc": [3],
+    "fbtc+wbtc": [3, 4],
+    "fbtc+wbtc+native": [3, 4, 5],
+}
+VIEWS = ("getUserDelayedRedeems", "getClaimableUserDelayedRedeems")
+
+
+def _latency(method, *args):
+    samples = []
+    for _ in range(LATENCY_CALLS):
+        start = time.perf_counter()
+        method.call(*args)
+        samples.append(time.perf_counter() - start)
+    return round(statistics.median(samples) * 1000, 3)
+
+
+def _estimate(function, method, *args):
+    try:
+        return {"function": function, "gas": method.estimate_gas(*args)}
+    except ValueError as e:
+        # Out of gas within the node's limit: record the failure instead of a number.
+        return {"function": function, "gas": None, "error": str(e)}
+
+
+def _safe_length(points, cap):
+    """Longest measured queue within `cap`, and a linear projection from the two longest measurements."""
+    fitting = [size for size, gas in points if gas is not None and gas <= cap]
+    measured = [(size, gas) for size, gas in points if gas is not None]
+    projected = None
+    if len(measured) >= 2:
+        (s0, g0), (s1, g1) = measured[-2], measured[-1]
+        if g1 > g0:
+            projected = int(s1 + (cap - g1) * (s1 - s0) / (g1 - g0))
+    return {"measured": max(fitting, default=0), "projected": projected}
+
+
+@pytest.fixture(scope="module")
+def bench(request):
+    config = request.config
+    baseline = {}
+    if config.getoption("--bench-baseline"):
+        with open(config.getoption("--bench-baseline")) as f:
+            baseline = {(r["mix"], r["size"], r["function"]): r["gas"] for r in json.load(f)["rows"]}
+    report = {"sizes": [int(s) for s in config.getoption("--bench-sizes").split(",")],
+              "tolerance": float(config.getoption("--bench-tolerance")),
+              "baseline": baseline, "rows": []}
+    yield report
+
+    block_gas_limit = chain.block_gas_limit
+    limits = {}
+    for mix in MIXES:
+        for function in ("claimDelayedRedeems",) + VIEWS:
+            points = [(r["size"], r["gas"]) for r in report["rows"] if r["mix"] == mix and r["function"] == function]
+            if points:
+                cap = block_gas_limit if function == "claimDelayedRedeems" else CALL_GAS_CAP
+                limits.setdefault(mix, {})[function] = _safe_length(points, cap)
+    path = config.getoption("--bench-report")
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({"network": network.show_active(), "block_gas_limit": block_gas_limit,
+                   "call_gas_cap": CALL_GAS_CAP, "rows": report["rows"], "limits": limits}, f, indent=2)
+
+
+# NOTE: This test designed to run on the development network
+# Command to run test: `brownie test tests/test_redeemGasBench.py --bench-sizes 1,10,100,1000,5000 --bench-report reports/redeem_gas.json`
+@pytest.mark.parametrize("mix", MIXES)
+def test_queue_scaling(fn_isolation, redeem_router, alice, bench, mix):
+    router = redeem_router[0]
+    tokens = [redeem_router[i] for i in MIXES[mix]]
+    delay = router.redeemDelay()
+
+    length = 0
+    for size in bench["sizes"]:
+        tx = None
+        while length < size:
+            tx = router.createDelayedRedeem(tokens[length % len(tokens)], 10**4, {'from': alice})
+            length += 1
+        chain.sleep(delay + 1)
+        chain.mine()
+
+        rows = []
+        if tx is not None:
+            rows.append({"function": "createDelayedRedeem", "gas": tx.gas_used})
+        # claimDelayedRedeems() claims with a bound of type(uint256).max.
+        rows.append(_estimate("claimDelayedRedeems", router.claimDelayedRedeems["uint256"], 2**256 - 1, {'from': alice}))
+        for view in VIEWS:
+            method = getattr(router, view)
+            row = _estimate(view, method, alice)
+            if row["gas"] is not None:
+                row["latency_ms"] = _latency(method, alice)
+            rows.append(row)
+        for row in rows:
+            row.update({"mix": mix, "size": size, "tokens": len(tokens)})
+            expected = bench["baseline"].get((mix, size, row["function"]))
+            if expected is not None and row["gas"] is not None:
+                assert row["gas"] <= expected * (1 + bench["tolerance"]), \
+                    f"{row['function']} on {size} redeems ({mix}): {row['gas']} gas, baseline {expected}"
+        bench["rows"].extend(rows)
+
+    assert router.userRedeemsLength(alice) == length
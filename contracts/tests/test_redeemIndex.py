@@ -0,0 +1,58 @@
+import sys
+from pathlib import Path
+
+from brownie import chain
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+from redeem_index import RedeemIndex, sync  # noqa: E402
+from rpc import RPCClient  # noqa: E402
+
+
+# NOTE: This test designed to run on the development network
+# Command to run test: `brownie test tests/test_redeemIndex.py`
+def test_redeem_index(fn_isolation, redeem_router, alice, bob, tmp_path):
+    router, fbtc, wbtc18, native_btc = redeem_router[0], redeem_router[3], redeem_router[4], redeem_router[5]
+    start = chain.height + 1
+    client = RPCClient("http://localhost:8545")
+    index = RedeemIndex(router.address)
+
+    router.createDelayedRedeem(fbtc, 1 * 10**8, {'from': alice})
+    router.createDelayedRedeem(wbtc18, 2 * 10**8, {'from': bob})
+    chain.sleep(3 * 86400)
+    chain.mine()
+    router.createDelayedRedeem(native_btc, 1 * 10**8, {'from': alice})
+    router.createDelayedRedeem(fbtc, 1 * 10**8, {'from': bob})
+
+    assert sync(client, index, start, confirmations=0) == 4
+    path = str(tmp_path / "index.json")
+    index.save(path)
+    index = RedeemIndex.load(path, router.address)
+
+    for user in (alice, bob):
+        assert [(i, amount, created, token.lower()) for i, amount, created, token, _ in index.pending(user.address)] == \
+            [(i, r[0], r[1], r[2].lower()) for i, r in enumerate(router.getUserDelayedRedeems(user))]
+    assert index.redeem_delay == router.redeemDelay()
+
+    # The first two redeems mature 4 days from now, the others 3 days later.
+    now = chain.time()
+    # Redeems mined in the same second mature together, so compare them as a set.
+    assert {(m[1], m[2]) for m in index.maturing(now, now + 5 * 86400)} == \
+        {(alice.address.lower(), 0), (bob.address.lower(), 0)}
+    assert index.maturing(now, now + 3600) == []
+
+    chain.sleep(4 * 86400 + 60)
+    chain.mine()
+    now = chain.time()
+    assert len(index.claimable(alice.address, now)) == len(router.getClaimableUserDelayedRedeems(alice)) == 1
+
+    router.claimDelayedRedeems({'from': alice})
+    assert sync(client, index, confirmations=0) == 2   # DelayedRedeemsClaimed + DelayedRedeemsCompleted
+    assert index.users[alice.address.lower()]["completed"] == router.userRedeems(alice)[0]
+    maturing = index.maturing(now - 86400, now + 4 * 86400)
+    assert [(m[1], m[2]) for m in maturing[:1]] == [(bob.address.lower(), 0)]
+    assert {(m[1], m[2]) for m in maturing[1:]} == {(alice.address.lower(), 1), (bob.address.lower(), 1)}
+    assert index.debts() == {
+        fbtc.address.lower(): router.tokenDebts(fbtc)[0] - router.tokenDebts(fbtc)[1],
+        wbtc18.address.lower(): router.tokenDebts(wbtc18)[0] - router.tokenDebts(wbtc18)[1],
+        native_btc.lower(): router.tokenDebts(native_btc)[0] - router.tokenDebts(native_btc)[1],
+    }
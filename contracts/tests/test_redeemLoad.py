@@ -0,0 +1,29 @@
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+from redeem_load import provision, run  # noqa: E402
+from rpc import RPCClient  # noqa: E402
+
+
+# NOTE: This test designed to run on the development network
+# Command to run test: `brownie test tests/test_redeemLoad.py`
+def test_load_until_quota_exhaustion(fn_isolation, redeem_router, owner):
+    router, uni_btc, fbtc = redeem_router[0], redeem_router[1], redeem_router[3]
+    url = "http://localhost:8545"
+    users = provision(RPCClient(url, timeout=60), router.address, uni_btc.address, owner.address, 4, 10 * 10**8)
+    for user in users:
+        assert router.isWhitelisted(user) and uni_btc.allowance(user, router) > 0
+
+    # 1 FBTC per redeem against a quota of 8 FBTC a day: the ninth and later ones revert with USR010.
+    stats = asyncio.run(run(url, router.address, users, [fbtc.address.lower()], rate=20, duration=1.5,
+                            kind="uniform", claim_ratio=0, amounts=(10**8, 10**8)))
+    summary = stats.summary()
+    failed = sum(summary["rejected"].values()) + sum(summary["reverted"].values())
+    assert summary["submitted"] == len(stats.sent) + sum(summary["rejected"].values()) >= 20
+    assert summary["mined"] == len(stats.sent) == len(stats.latencies)
+    assert sum(stats.creates_by_block.values()) == 8
+    assert failed == summary["submitted"] - 8
+    assert set(summary["revert_rate"]) == {"USR010"}
+    assert summary["latency_p50"] <= summary["latency_p99"]
@@ -0,0 +1,81 @@
+import sys
+from pathlib import Path
+
+from brownie import DelayRedeemRouter, Multicall3, Contract, accounts, chain, web3
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+from multicall import Multicall  # noqa: E402
+from redeem_pages import claimable, history  # noqa: E402
+from rpc import RPCClient  # noqa: E402
+
+
+def _records(records):
+    return [(amount, created, str(token).lower()) for amount, created, token in records]
+
+
+def _pages(getter, user, size):
+    out, offset = [], 0
+    while True:
+        page = getter(user, offset, size)
+        out.extend(page)
+        if len(page) < size:
+            return out
+        offset += size
+
+
+# NOTE: This test designed to run on the development network
+# Command to run test: `brownie test tests/test_redeemPages.py`
+def test_paginated_getters_after_upgrade(fn_isolation, redeem_router, deps, deployer, owner, alice, bob):
+    router, fbtc, wbtc18, native_btc = redeem_router[0], redeem_router[3], redeem_router[4], redeem_router[5]
+    tokens = [fbtc, wbtc18, native_btc]
+
+    # History written before the upgrade: 5 claimed, 7 claimable and 4 maturing redeems for alice.
+    for i in range(12):
+        router.createDelayedRedeem(tokens[i % 3], (i + 1) * 10**6, {'from': alice})
+    for i in range(3):
+        router.createDelayedRedeem(fbtc, 10**6, {'from': bob})
+    chain.sleep(router.redeemDelay() + 1)
+    chain.mine()
+    router.claimDelayedRedeems(5, {'from': alice})
+    for i in range(4):
+        router.createDelayedRedeem(wbtc18, 10**6, {'from': alice})
+
+    before = {user: (router.userRedeems(user), router.getUserDelayedRedeems(user),
+                     router.getClaimableUserDelayedRedeems(user)) for user in (alice, bob)}
+    slots = [web3.eth.get_storage_at(router.address, i) for i in range(256)]
+
+    # The getters add no state, so upgrading keeps every slot and the old getters' results.
+    proxy = Contract.from_abi("TransparentUpgradeableProxy", router.address, deps.TransparentUpgradeableProxy.abi)
+    proxy.upgradeTo(DelayRedeemRouter.deploy({'from': deployer}), {'from': deployer})
+    assert [web3.eth.get_storage_at(router.address, i) for i in range(256)] == slots
+
+    for user in (alice, bob):
+        (completed, records), pending, claimable_now = before[user]
+        assert (router.userRedeems(user), router.getUserDelayedRedeems(user),
+                router.getClaimableUserDelayedRedeems(user)) == before[user]
+        for size in (1, 3, 7, 100):
+            assert _records(_pages(lambda u, o, n: router.userRedeemsPage(u, o, n)[2], user, size)) == _records(records)
+            assert _records(_pages(router.getUserDelayedRedeemsPage, user, size)) == _records(pending)
+            assert _records(_pages(router.getClaimableUserDelayedRedeemsPage, user, size)) == _records(claimable_now)
+        assert router.userRedeemsPage(user, 0, 0)[:2] == (completed, len(records))
+        assert len(router.getUserDelayedRedeemsPage(user, len(pending), 10)) == 0
+        assert len(router.getClaimableUserDelayedRedeemsPage(user, 2**256 - 1, 10)) == 0
+    assert len(before[alice][2]) == 7 and len(before[alice][1]) == 11
+
+    # The client pages every user through Multicall3, all at one block.
+    multicall = Multicall(RPCClient("http://localhost:8545"), Multicall3.deploy({'from': owner}).address, chunk_size=3)
+    users = [alice.address, bob.address, accounts[4].address]
+    rows = list(history(multicall, router.address, users, page_size=4))
+    for user in (alice, bob):
+        (completed, records), pending, claimable_now = before[user]
+        mine = [r for r in rows if r[0] == user.address]
+        assert [r[1] for r in mine] == list(range(len(records)))
+        assert [(r[2], r[3], r[4].lower()) for r in mine] == _records(records)
+        assert [r[5] for r in mine] == [i < completed for i in range(len(records))]
+        assert len([r for r in history(multicall, router.address, [user.address], 4, pending=True)]) == len(pending)
+    assert not [r for r in rows if r[0] == accounts[4].address]
+
+    pages = claimable(multicall, router.address, users, page_size=2)
+    assert _records(pages[alice.address]) == _records(before[alice][2])
+    assert _records(pages[bob.address]) == _records(before[bob][2])
+    assert pages[accounts[4].address] == []
@@ -0,0 +1,60 @@
+import sys
+from pathlib import Path
+
+from brownie import Sigma, Contract, chain
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+from rpc import RPCClient  # noqa: E402
+from sigma_holders import HolderCache, plan_chain, refresh  # noqa: E402
+
+
+# NOTE: This test designed to run on the development network
+# Command to run test: `brownie test tests/test_sigmaHolders.py`
+def test_holder_diff(fn_isolation, contracts, deps, deployer, owner, alice, bob, chain_id, tmp_path):
+    fbtc, wbtc, vault, xbtc, wbtc18 = contracts[7], contracts[5], contracts[6], contracts[8], contracts[11],
+
+    ProxyAdmin = deps.ProxyAdmin
+    Proxy = deps.TransparentUpgradeableProxy
+
+    proxyAdmin = ProxyAdmin.deploy({'from': owner})
+    sigma_impl = Sigma.deploy({'from': deployer})
+    sigma_proxy = Proxy.deploy(sigma_impl, proxyAdmin, b'', {'from': deployer})
+    sigma = Contract.from_abi("Sigma", sigma_proxy, Sigma.abi)
+    sigma.initialize(owner, {'from': owner})
+    sigma.setTokenHolders(fbtc, [(fbtc, (vault, alice)), (wbtc, (vault,))], {'from': owner})
+    sigma.setTokenHolders(xbtc, [(xbtc, (vault,))], {'from': owner})
+
+    client = RPCClient("http://localhost:8545")
+    genesis = client.call("eth_getBlockByNumber", ["0x0", False])["hash"]
+    cache = HolderCache(str(tmp_path), chain_id, sigma.address, genesis)
+    assert refresh(client, cache) == sorted([fbtc.address.lower(), xbtc.address.lower()])
+    cache.save()
+
+    # Only the leading token with a TokenHoldersSet event since the cached block is read again.
+    chain.mine(20)
+    sigma.setTokenHolders(xbtc, [(xbtc, (vault, bob))], {'from': owner})
+    cache = HolderCache(str(tmp_path), chain_id, sigma.address, genesis)
+    assert refresh(client, cache, confirmations=0) == [xbtc.address.lower()]
+    assert cache.layouts[xbtc.address.lower()] == [[xbtc.address.lower(), [vault.address.lower(), bob.address.lower()]]]
+
+    desired = {
+        # same layout in another order: no transaction
+        fbtc.address: [{"token": wbtc.address, "holders": [vault.address]},
+                       {"token": fbtc.address, "holders": [alice.address, vault.address]}],
+        # one holder removed
+        xbtc.address: [{"token": xbtc.address, "holders": [vault.address]}],
+        # 18-decimal pool under an 8-decimal leading token reverts with SYS010
+        wbtc.address: [{"token": wbtc.address, "holders": [vault.address]},
+                       {"token": wbtc18.address, "holders": [vault.address]}],
+    }
+    plan = {e["leading_token"]: e for e in plan_chain(client, cache, desired)}
+    assert plan[fbtc.address.lower()]["diff"]["unchanged"]
+    assert plan[fbtc.address.lower()]["call"] is None
+
+    xbtc_entry = plan[xbtc.address.lower()]
+    assert xbtc_entry["diff"]["holders"] == {xbtc.address.lower(): {"added": [], "removed": [bob.address.lower()]}}
+    owner.transfer(to=xbtc_entry["call"]["to"], data=xbtc_entry["call"]["data"])
+    assert sigma.getTokenHolders(xbtc) == [(xbtc, (vault,))]
+
+    assert plan[wbtc.address.lower()]["error"].startswith("SYS010")
+    assert plan[wbtc.address.lower()]["call"] is None
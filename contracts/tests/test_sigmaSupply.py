@@ -0,0 +1,47 @@
+import sys
+from pathlib import Path
+
+from brownie import Sigma, Multicall3, Contract, accounts, web3
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+from multicall import Multicall  # noqa: E402
+from registry import NATIVE_BTC  # noqa: E402
+from rpc import RPCClient  # noqa: E402
+from sigma_supply import check, offchain_total_supply, token_holders  # noqa: E402
+
+
+# NOTE: This test designed to run on the development network
+# Command to run test: `brownie test tests/test_sigmaSupply.py`
+def test_offchain_totalSupply(fn_isolation, contracts, deps, deployer, owner):
+    fbtc, wbtc, vault = contracts[7], contracts[5], contracts[6],
+
+    ProxyAdmin = deps.ProxyAdmin
+    Proxy = deps.TransparentUpgradeableProxy
+
+    proxyAdmin = ProxyAdmin.deploy({'from': owner})
+    sigma_impl = Sigma.deploy({'from': deployer})
+    sigma_proxy = Proxy.deploy(sigma_impl, proxyAdmin, b'', {'from': deployer})
+    sigma = Contract.from_abi("Sigma", sigma_proxy, Sigma.abi)
+    sigma.initialize(owner, {'from': owner})
+    multicall3 = Multicall3.deploy({'from': owner})
+
+    holders = [vault.address] + [a.address for a in accounts[4:9]]
+    sigma.setTokenHolders(fbtc, [(fbtc, holders), (wbtc, holders[:3])], {'from': owner})
+    sigma.setTokenHolders(NATIVE_BTC, [(NATIVE_BTC, holders[1:])], {'from': owner})
+    for i, holder in enumerate(holders):
+        fbtc.mint(holder, (i + 1) * 1e8, {'from': owner})
+        wbtc.mint(holder, (i + 1) * 3e7, {'from': owner})
+
+    client = RPCClient("http://localhost:8545")
+    # A chunk size that does not divide the holder count, to cover a partial last chunk.
+    multicall = Multicall(client, multicall3.address, chunk_size=4)
+    pools = token_holders(client, sigma.address, fbtc.address)
+    assert [(t, [h.lower() for h in hs]) for t, hs in pools] == \
+        [(fbtc.address.lower(), [h.lower() for h in holders]), (wbtc.address.lower(), [h.lower() for h in holders[:3]])]
+    assert offchain_total_supply(multicall, pools) == sigma.totalSupply(fbtc)
+
+    block, rows = check(client, sigma.address, multicall)
+    assert [r["leading_token"] for r in rows] == [fbtc.address.lower(), NATIVE_BTC.lower()]
+    assert all(r["match"] for r in rows)
+    assert rows[0]["offchain"] == sum((i + 1) * 10**8 for i in range(6)) + sum((i + 1) * 3 * 10**7 for i in range(3))
+    assert rows[1]["offchain"] == sum(web3.eth.get_balance(h) for h in holders[1:])
@@ -0,0 +1,81 @@
+import sys
+from pathlib import Path
+
+import brownie
+from brownie import (MockBalancerPool, MockCurvePool, MockDODOV2Pool, MockSwapRouter, MockUniswapV2Pair,
+                     MockUniswapV3Pool, Multicall3, SwapProxy)
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+from rpc import RPCClient  # noqa: E402
+from swap_quoter import quote, quote_route, read  # noqa: E402
+
+BTC = 10**8
+
+
+# NOTE: This test designed to run on the development network
+# Command to run test: `brownie test tests/test_swapQuoter.py`
+def test_swap_quoter(fn_isolation, contracts, operator, owner):
+    wbtc, vault, fbtc = contracts[5], contracts[6], contracts[7]
+    multicall = Multicall3.deploy({'from': owner})
+    router = MockSwapRouter.deploy({'from': owner})
+
+    # WBTC -> FBTC through one pool of every protocol, with different depths and curves.
+    disabled = MockUniswapV2Pair.deploy(wbtc, fbtc, {'from': owner})
+    pools = {
+        "UNISWAP_V2": MockUniswapV2Pair.deploy(fbtc, wbtc, {'from': owner}),
+        "UNISWAP_V3": MockUniswapV3Pool.deploy(wbtc, fbtc, 500, 2**96, 20 * BTC, {'from': owner}),
+        "CURVE": MockCurvePool.deploy(wbtc, fbtc, 100, 4 * 10**6, {'from': owner}),
+        "DODO": MockDODOV2Pool.deploy(fbtc, wbtc, 10**18, 10**17, 10**15, {'from': owner}),
+        "BALANCER": MockBalancerPool.deploy(wbtc, fbtc, 3 * 10**15, {'from': owner}),
+    }
+    for pool, depth in ((disabled, 100), (pools["UNISWAP_V2"], 50), (pools["UNISWAP_V3"], 20),
+                        (pools["CURVE"], 3), (pools["DODO"], 20), (pools["BALANCER"], 30)):
+        wbtc.mint(pool, depth * BTC, {'from': owner})
+        fbtc.mint(pool, depth * BTC, {'from': owner})
+    router.setUniswapV2Pair(pools["UNISWAP_V2"], {'from': owner})
+    router.setUniswapV3Pool(pools["UNISWAP_V3"], {'from': owner})
+
+    swap_proxy = SwapProxy.deploy(vault, wbtc, fbtc, {'from': owner})
+    swap_proxy.addPool(disabled, swap_proxy.UNISWAP_V2_PROTOCOL(), {'from': owner})
+    swap_proxy.setPoolValid(disabled, swap_proxy.UNISWAP_V2_PROTOCOL(), False, {'from': owner})
+    for protocol, pool in pools.items():
+        protocol_id = getattr(swap_proxy, f"{protocol}_PROTOCOL")()
+        swap_proxy.addRouter(router, protocol_id, {'from': owner})
+        swap_proxy.addPool(pool, protocol_id, {'from': owner})
+    vault.grantRole(operator, swap_proxy, {'from': owner})
+    vault.allowTarget([wbtc, router], {'from': owner})
+    wbtc.mint(vault, 10 * BTC, {'from': owner})
+
+    client = RPCClient("http://localhost:8545")
+    info, states = read(client, swap_proxy.address, multicall_address=multicall.address)
+    assert info["pools"] == {pool.address.lower(): protocol for protocol, pool in pools.items()}
+    assert info["vault_balance"] == 10 * BTC
+
+    # The off-chain math gives exactly what each pool pays.
+    for pool in pools.values():
+        for amount in (10**4, BTC, 3 * BTC):
+            assert quote(states[pool.address.lower()], amount) == pool.quote(wbtc, amount)
+
+    # 3 WBTC through any single pool loses more than 1%, split over three pools every leg passes.
+    result = quote_route(client, info, states, 3 * BTC, slippage=99, forward=True, simulated=True)
+    best = result["best"][0]
+    assert not best["passes"] and best["slippage_needed"] is None
+    assert best["amount_out"] == max(result["quotes"].values())
+    assert result["passes"] and len(result["legs"]) == 3 and result["amount_out"] > best["amount_out"]
+    assert sum(leg["amount_in"] for leg in result["legs"]) == 3 * BTC
+    assert all(leg["simulation"] == "ok" for leg in result["legs"])
+    with brownie.reverts("MockSwapRouter: insufficient output"):
+        swap_proxy.swapToken(3 * BTC, best["pool"], 99, True, {'from': owner})
+
+    before = fbtc.balanceOf(vault)
+    for leg in result["legs"]:
+        swap_proxy.swapToken(leg["amount_in"], leg["pool"], 99, True, {'from': owner})
+    assert fbtc.balanceOf(vault) - before == result["amount_out"]
+
+    # Not forward, amountOutMin is above par, which no pool pays.
+    info, states = read(client, swap_proxy.address, multicall_address=multicall.address)
+    result = quote_route(client, info, states, BTC, slippage=0, forward=False, simulated=True)
+    leg = result["legs"][0]
+    assert not result["passes"] and leg["amount_out_min"] == BTC and leg["simulation"] != "ok"
+    with brownie.reverts("MockSwapRouter: insufficient output"):
+        swap_proxy.swapToken(BTC, leg["pool"], 0, False, {'from': owner})
@@ -0,0 +1,139 @@
+import sys
+from pathlib import Path
+
+import pytest
+from brownie import (MockBalancerPool, MockCurvePool, MockDODOV2Pool, MockSwapRouter, MockUniswapV2Pair, Multicall3,
+                     SwapProxy, web3)
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+from rpc import RPCClient  # noqa: E402
+from swap_quoter import read  # noqa: E402
+from swap_twap import SWAP_SUCCESSFUL, load_job, open_job, run  # noqa: E402
+
+BTC = 10**8
+
+
+class Crash(Exception):
+    pass
+
+
+# NOTE: This test designed to run on the development network
+# Command to run test: `brownie test tests/test_swapTWAP.py`
+def test_swap_twap(fn_isolation, contracts, operator, owner, alice, tmp_path):
+    wbtc, vault, fbtc = contracts[5], contracts[6], contracts[7]
+    multicall = Multicall3.deploy({'from': owner})
+    router = MockSwapRouter.deploy({'from': owner})
+    pools = {
+        "UNISWAP_V2": MockUniswapV2Pair.deploy(wbtc, fbtc, {'from': owner}),
+        "CURVE": MockCurvePool.deploy(wbtc, fbtc, 100, 4 * 10**6, {'from': owner}),
+        "BALANCER": MockBalancerPool.deploy(wbtc, fbtc, 3 * 10**15, {'from': owner}),
+    }
+    for pool, depth in ((pools["UNISWAP_V2"], 50), (pools["CURVE"], 10), (pools["BALANCER"], 20)):
+        wbtc.mint(pool, depth * BTC, {'from': owner})
+        fbtc.mint(pool, depth * BTC, {'from': owner})
+    router.setUniswapV2Pair(pools["UNISWAP_V2"], {'from': owner})
+
+    swap_proxy = SwapProxy.deploy(vault, wbtc, fbtc, {'from': owner})
+    for protocol, pool in pools.items():
+        protocol_id = getattr(swap_proxy, f"{protocol}_PROTOCOL")()
+        swap_proxy.addRouter(router, protocol_id, {'from': owner})
+        swap_proxy.addPool(pool, protocol_id, {'from': owner})
+    vault.grantRole(operator, swap_proxy, {'from': owner})
+    vault.allowTarget([wbtc, router], {'from': owner})
+    wbtc.mint(vault, 10 * BTC, {'from': owner})
+    fbtc_before = fbtc.balanceOf(vault)
+
+    # Price path: alice dumps WBTC into every pool during slot 1, then swaps the FBTC back
+    # in slot 2 while the pools are topped up to even balances again.
+    dumps = {pools["UNISWAP_V2"]: 5 * BTC, pools["CURVE"]: 8 * BTC, pools["BALANCER"]: 4 * BTC}
+    received = {}
+
+    def dump():
+        for pool, amount in dumps.items():
+            wbtc.mint(alice, amount, {'from': owner})
+            wbtc.approve(pool, amount, {'from': alice})
+            received[pool] = pool.swap(wbtc, amount, alice, {'from': alice}).return_value
+
+    def recover():
+        for pool, amount in received.items():
+            fbtc.approve(pool, amount, {'from': alice})
+            pool.swap(fbtc, amount, alice, {'from': alice})
+            fbtc.mint(pool, max(wbtc.balanceOf(pool) - fbtc.balanceOf(pool), 0), {'from': owner})
+
+    now = [0]
+    path = {1: dump, 2: recover}
+
+    def clock():
+        return now[0]
+
+    def sleep(seconds):
+        slot = now[0] // 60
+        now[0] += seconds
+        if now[0] // 60 != slot and now[0] // 60 in path:
+            path.pop(now[0] // 60)()
+
+    client = RPCClient("http://localhost:8545")
+    state = str(tmp_path / "twap.json")
+    genesis = client.call("eth_getBlockByNumber", ["0x0", False])["hash"]
+    info, _ = read(client, swap_proxy.address, owner.address, multicall.address)
+    job = open_job(state, genesis, info, owner.address, 6 * BTC, 3, 60, 0)
+    limits = dict(max_slice=4 * BTC, min_slice=BTC // 10, grace=3, multicall_address=multicall.address,
+                  clock=clock, sleep=sleep)
+
+    # The first swap is mined, but the run dies before it saves the hash.
+    def crashing_send(tx):
+        client.call("eth_sendTransaction", [tx])
+        raise Crash()
+
+    with pytest.raises(Crash):
+        run(client, job, state, send=crashing_send, **limits)
+    job = load_job(state)
+    assert job["pending"]["hash"] is None and job["swapped"] == 0
+
+    # Resumed, the swap is found by its nonce and not sent again.
+    job = run(client, job, state, **limits)
+    assert job == load_job(state)
+    assert job["swapped"] == 6 * BTC and not job["failures"] and job["pending"] is None
+    assert job["received"] == fbtc.balanceOf(vault) - fbtc_before
+    assert sum(fill["amount_out"] for fill in job["fills"]) == job["received"]
+    assert [s["slot"] for s in job["skipped"]] == [1]
+    # Slot 0 swaps the first third, slot 2 catches up on the skipped one.
+    assert sum(f["amount_in"] for f in job["fills"] if f["slot"] == 0) == 2 * BTC
+    assert sum(f["amount_in"] for f in job["fills"] if f["slot"] == 2) == 4 * BTC
+    logs = web3.eth.get_logs({"address": swap_proxy.address, "topics": [SWAP_SUCCESSFUL], "fromBlock": 0})
+    assert len(logs) == len(job["fills"])
+
+
+# NOTE: This test designed to run on the development network
+# Command to run test: `brownie test tests/test_swapTWAP.py`
+def test_swap_twap_fractional_interval(fn_isolation, contracts, operator, owner, tmp_path):
+    wbtc, vault, fbtc = contracts[5], contracts[6], contracts[7]
+    multicall = Multicall3.deploy({'from': owner})
+    router = MockSwapRouter.deploy({'from': owner})
+    pool = MockDODOV2Pool.deploy(fbtc, wbtc, 10**18, 10**17, 10**15, {'from': owner})
+    wbtc.mint(pool, 20 * BTC, {'from': owner})
+    fbtc.mint(pool, 20 * BTC, {'from': owner})
+
+    swap_proxy = SwapProxy.deploy(vault, wbtc, fbtc, {'from': owner})
+    swap_proxy.addRouter(router, swap_proxy.DODO_PROTOCOL(), {'from': owner})
+    swap_proxy.addPool(pool, swap_proxy.DODO_PROTOCOL(), {'from': owner})
+    vault.grantRole(operator, swap_proxy, {'from': owner})
+    vault.allowTarget([wbtc, router], {'from': owner})
+    wbtc.mint(vault, 10 * BTC, {'from': owner})
+
+    now = [1000.25]
+
+    def sleep(seconds):
+        now[0] += seconds
+
+    client = RPCClient("http://localhost:8545")
+    state = str(tmp_path / "twap.json")
+    genesis = client.call("eth_getBlockByNumber", ["0x0", False])["hash"]
+    info, _ = read(client, swap_proxy.address, owner.address, multicall.address)
+    # A job written with a float interval still gets integer slots and integer amounts through the DODO math.
+    job = open_job(state, genesis, info, owner.address, 2 * BTC, 4, 0.5, now[0])
+    job = run(client, job, state, multicall_address=multicall.address, clock=lambda: now[0], sleep=sleep)
+    assert job == load_job(state)
+    assert job["swapped"] == 2 * BTC and isinstance(job["swapped"], int) and not job["failures"]
+    assert [f["slot"] for f in job["fills"]] == [0, 1, 2, 3]
+    assert all(isinstance(f["slot"], int) and f["amount_in"] == BTC // 2 for f in job["fills"])
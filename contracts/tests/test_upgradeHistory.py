@@ -0,0 +1,67 @@
+import sys
+from pathlib import Path
+
+from brownie import uniBTC, Vault, Contract, chain
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+from check_initialized import upgrade_timeline  # noqa: E402
+
+# NOTE: This test designed to run on the development network
+# Command to run test: `brownie test tests/test_upgradeHistory.py`
+def test_upgrade_timeline(fn_isolation, deps, owner, deployer, chain_id):
+    ProxyAdmin = deps.ProxyAdmin
+    Proxy = deps.TransparentUpgradeableProxy
+
+    proxyAdmin = ProxyAdmin.deploy({'from': owner})
+    impl_v1 = uniBTC.deploy({'from': deployer})
+    impl_v2 = uniBTC.deploy({'from': deployer})
+    impl_v3 = Vault.deploy({'from': deployer})
+    start = chain.height
+
+    proxy = Proxy.deploy(impl_v1, proxyAdmin, b'', {'from': deployer})
+    uni_btc = Contract.from_abi("uniBTC", proxy.address, uniBTC.abi)
+    init_tx = uni_btc.initialize(owner, owner, [], {'from': owner})
+    upgrade_tx_1 = proxyAdmin.upgrade(proxy, impl_v2, {'from': owner})
+    chain.mine(37)
+    upgrade_tx_2 = proxyAdmin.upgrade(proxy, impl_v3, {'from': owner})
+    chain.mine(5)
+
+    t = upgrade_timeline(("dev", chain_id, "http://localhost:8545", proxy.address),
+                         start=start, end=chain.height, history_dir=None)
+
+    assert [(e["block"], e["initialized"], e["implementation"].lower() if e["implementation"] else None)
+            for e in t["timeline"]] == [
+        (start, 0, None),
+        (proxy.tx.block_number, 0, impl_v1.address.lower()),
+        (init_tx.block_number, 2, impl_v1.address.lower()),
+        (upgrade_tx_1.block_number, 2, impl_v2.address.lower()),
+        (upgrade_tx_2.block_number, 2, impl_v3.address.lower()),
+    ]
+    assert [e.get("changed") for e in t["timeline"][1:]] == [
+        ["implementation"], ["initialized"], ["implementation"], ["implementation"],
+    ]
+
+
+def test_upgrade_timeline_memo(fn_isolation, deps, owner, deployer, chain_id, tmp_path):
+    ProxyAdmin = deps.ProxyAdmin
+    Proxy = deps.TransparentUpgradeableProxy
+
+    proxyAdmin = ProxyAdmin.deploy({'from': owner})
+    impl_v1 = uniBTC.deploy({'from': deployer})
+    impl_v2 = uniBTC.deploy({'from': deployer})
+    proxy = Proxy.deploy(impl_v1, proxyAdmin, b'', {'from': deployer})
+    start = proxy.tx.block_number
+    chain.mine(20)
+    upgrade_tx = proxyAdmin.upgrade(proxy, impl_v2, {'from': owner})
+    chain.mine(20)
+    end = chain.height
+
+    chain_info = ("dev", chain_id, "http://localhost:8545", proxy.address)
+    first = upgrade_timeline(chain_info, start=start, end=end, history_dir=str(tmp_path), confirmations=0)
+    assert (tmp_path / f"{chain_id}.json").exists()
+
+    # A later sweep over the same range is answered from the memo, with the same result.
+    chain.mine(10)
+    second = upgrade_timeline(chain_info, start=start, end=end, history_dir=str(tmp_path), confirmations=0)
+    assert second["timeline"] == first["timeline"]
+    assert [e["block"] for e in second["timeline"]] == [start, upgrade_tx.block_number]
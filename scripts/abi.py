@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Just enough of the Solidity ABI to build eth_call payloads and decode their
+results from the scripts in this directory, without web3.
+
+    encode_call("balanceOf(address)", vault)   -> "0x70a08231000...<vault>"
+    decode_uint(result)                        -> int of the first word
+    decode_words(result)                       -> [int, ...] of every word
+    decode(["(address,address[])[]"], result)  -> [[(token, [holder, ...]), ...]]
+
+Supported types: address, bool, uintN, intN, bytes32, bytes, string, tuples
+"(T1,T2,...)" and dynamic arrays "T[]" of any of them. Addresses decode to
+lowercase 0x-prefixed strings, bytes to bytes, tuples to tuples.
+
+Requires: python3 (standard library only)
+"""
+
+from keccak import selector
+
+
+def split_types(types):
+    """Split a comma-separated type list at the top level: "a,(b,c)[],d" -> ["a", "(b,c)[]", "d"]."""
+    parts, depth, start = [], 0, 0
+    for i, ch in enumerate(types):
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        elif ch == "," and depth == 0:
+            parts.append(types[start:i])
+            start = i + 1
+    if types[start:]:
+        parts.append(types[start:])
+    return parts
+
+
+def _is_dynamic(typ):
+    if typ.endswith("[]") or typ in ("bytes", "string"):
+        return True
+    if typ.startswith("("):
+        return any(_is_dynamic(t) for t in split_types(typ[1:-1]))
+    return False
+
+
+def _encode_static(typ, value):
+    if typ == "address":
+        return int(value, 16).to_bytes(32, "big")
+    if typ == "bool":
+        return int(bool(value)).to_bytes(32, "big")
+    if typ.startswith("uint"):
+        return int(value).to_bytes(32, "big")
+    if typ.startswith("int"):
+        return int(value).to_bytes(32, "big", signed=True)
+    if typ == "bytes32":
+        raw = bytes.fromhex(value[2:]) if isinstance(value, str) else bytes(value)
+        return raw.ljust(32, b"\x00")
+    raise ValueError(f"unsupported ABI type: {typ}")
+
+
+def _encode_one(typ, value):
+    if typ.endswith("[]"):
+        return len(value).to_bytes(32, "big") + encode([typ[:-2]] * len(value), value)
+    if typ.startswith("("):
+        return encode(split_types(typ[1:-1]), value)
+    if typ in ("bytes", "string"):
+        raw = value.encode() if typ == "string" else (bytes.fromhex(value[2:]) if isinstance(value, str) else value)
+        return len(raw).to_bytes(32, "big") + raw.ljust((len(raw) + 31) // 32 * 32, b"\x00")
+    return _encode_static(typ, value)
+
+
+def encode(types, values):
+    """ABI-encode `values` as the tuple of `types` (head/tail layout)."""
+    heads, tails = [], []
+    head_size = sum(32 if _is_dynamic(t) else len(_encode_one(t, v)) for t, v in zip(types, values))
+    for typ, value in zip(types, values):
+        encoded = _encode_one(typ, value)
+        if _is_dynamic(typ):
+            heads.append((head_size + sum(len(t) for t in tails)).to_bytes(32, "big"))
+            tails.append(encoded)
+        else:
+            heads.append(encoded)
+    return b"".join(heads) + b"".join(tails)
+
+
+def encode_call(signature, *args):
+    """Calldata (0x-prefixed hex) for `signature`, e.g. "caps(address)", applied to `args`."""
+    types = split_types(signature[signature.index("(") + 1:-1])
+    if len(types) != len(args):
+        raise ValueError(f"{signature} takes {len(types)} arguments, got {len(args)}")
+    return "0x" + (selector(signature) + encode(types, args)).hex()
+
+
+def _decode_one(typ, raw, offset):
+    """Decode `typ` whose head is at `offset` of `raw`."""
+    if _is_dynamic(typ):
+        offset = int.from_bytes(raw[offset:offset + 32], "big")
+        if typ.endswith("[]"):
+            length = int.from_bytes(raw[offset:offset + 32], "big")
+            return _decode_tuple([typ[:-2]] * length, raw[offset + 32:])
+        if typ in ("bytes", "string"):
+            length = int.from_bytes(raw[offset:offset + 32], "big")
+            data = raw[offset + 32:offset + 32 + length]
+            return data.decode() if typ == "string" else data
+        return tuple(_decode_tuple(split_types(typ[1:-1]), raw[offset:]))
+    if typ.startswith("("):
+        return tuple(_decode_tuple(split_types(typ[1:-1]), raw[offset:]))
+    word = int.from_bytes(raw[offset:offset + 32], "big")
+    if typ == "address":
+        return decode_address(word)
+    if typ == "bool":
+        return bool(word)
+    if typ.startswith("int"):
+        return decode_int(word)
+    if typ == "bytes32":
+        return raw[offset:offset + 32]
+    return word
+
+
+def _static_size(typ):
+    if typ.startswith("(") and not _is_dynamic(typ):
+        return sum(_static_size(t) for t in split_types(typ[1:-1]))
+    return 32
+
+
+def _decode_tuple(types, raw):
+    out, offset = [], 0
+    for typ in types:
+        out.append(_decode_one(typ, raw, offset))
+        offset += _static_size(typ)
+    return out
+
+
+def decode(types, data):
+    """Decode ABI-encoded return data (hex or bytes) as the tuple of `types`; returns a list."""
+    raw = bytes.fromhex(data[2:] if data.startswith("0x") else data) if isinstance(data, str) else data
+    if len(raw) < sum(_static_size(t) for t in types):
+        raise ValueError("return data too short")
+    return _decode_tuple(types, raw)
+
+
+def decode_words(data):
+    """Split ABI-encoded return data into 32-byte unsigned words."""
+    raw = bytes.fromhex(data[2:] if data.startswith("0x") else data)
+    return [int.from_bytes(raw[i:i + 32], "big") for i in range(0, len(raw) - len(raw) % 32, 32)]
+
+
+def decode_uint(data):
+    """First word of `data` as an unsigned integer; ValueError if `data` is empty."""
+    words = decode_words(data)
+    if not words:
+        raise ValueError("empty return data")
+    return words[0]
+
+
+def decode_int(word):
+    """Reinterpret an unsigned 256-bit word as two's-complement int256."""
+    return word - (1 << 256) if word >> 255 else word
+
+
+def decode_address(word):
+    return f"0x{word & ((1 << 160) - 1):040x}"
@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+"""
+Crash-safe writes for the caches and state files of the scripts in this
+directory.
+
+atomic_write() writes the data to a temporary file next to the target and
+renames it over the target, so a reader (or a run restarted after a crash)
+sees either the old file or the new one, never a partial write.
+
+Requires: python3 (standard library only)
+"""
+
+import os
+import tempfile
+
+
+def atomic_write(path, data):
+    """Replace the file at `path` with the bytes `data` in one rename."""
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
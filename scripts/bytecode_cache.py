@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Persistent, content-addressed cache of implementation bytecode and of what
+the monitoring scripts extract from it.
+
+Layout under the cache directory:
+
+    code/<keccak256>.bin   raw runtime bytecode, stored once per distinct code
+    index.json             {"impls":    {"<chain_id>:<impl>": "<keccak256>"},
+                            "proxies":  {"<chain_id>:<proxy>": "<impl>"},
+                            "analysis": {"<keccak256>": {...}}}
+
+An implementation address maps to the hash of its code, so the same uniBTC
+implementation deployed on a dozen chains is stored and analyzed once. A
+proxy remembers the implementation last seen in its EIP-1967 slot; when the
+slot changes the old mapping is dropped and the new implementation's code is
+fetched on the next sweep. Analysis results carry the analyzer version and
+are recomputed from the stored code, without any RPC, when it changes.
+
+Requires: python3 (standard library only)
+"""
+
+import json
+import os
+import threading
+
+from atomic_file import atomic_write
+from keccak import keccak_hex
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "uniBTC", "bytecode")
+
+
+class BytecodeCache:
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.code_dir = os.path.join(cache_dir, "code")
+        self.index_path = os.path.join(cache_dir, "index.json")
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.impls, self.proxies, self.analysis = {}, {}, {}
+        try:
+            with open(self.index_path) as f:
+                index = json.load(f)
+            self.impls = index.get("impls", {})
+            self.proxies = index.get("proxies", {})
+            self.analysis = index.get("analysis", {})
+        except (OSError, ValueError):
+            pass
+
+    @staticmethod
+    def _key(chain_id, address):
+        return f"{chain_id}:{address.lower()}"
+
+    def code_hash(self, chain_id, impl):
+        """Hash of the cached code of `impl`, or None if it was never fetched."""
+        with self._lock:
+            return self.impls.get(self._key(chain_id, impl))
+
+    def load_code(self, code_hash):
+        try:
+            with open(os.path.join(self.code_dir, code_hash[2:] + ".bin"), "rb") as f:
+                return "0x" + f.read().hex()
+        except OSError:
+            return None
+
+    def observe(self, chain_id, proxy, impl):
+        """
+        Record that `proxy` currently points at `impl`. If it pointed at a
+        different implementation before, that implementation's mapping is
+        dropped unless another proxy still references it.
+        """
+        pkey, new = self._key(chain_id, proxy), impl.lower()
+        with self._lock:
+            old = self.proxies.get(pkey)
+            if old == new:
+                return
+            self.proxies[pkey] = new
+            self._dirty = True
+            if old and not any(v == old and k.split(":")[0] == str(chain_id) for k, v in self.proxies.items()):
+                self.impls.pop(self._key(chain_id, old), None)
+
+    def store(self, chain_id, impl, code):
+        """Store the bytecode of `impl` and return its keccak256 hash."""
+        raw = bytes.fromhex(code[2:] if code.startswith("0x") else code)
+        code_hash = keccak_hex(raw)
+        path = os.path.join(self.code_dir, code_hash[2:] + ".bin")
+        with self._lock:
+            if not os.path.exists(path):
+                os.makedirs(self.code_dir, exist_ok=True)
+                atomic_write(path, raw)
+            self.impls[self._key(chain_id, impl)] = code_hash
+            self._dirty = True
+        return code_hash
+
+    def analyze(self, code_hash, analyzer, version):
+        """
+        Return `analyzer(code)` for the stored code `code_hash`, computing it
+        at most once per (code hash, analyzer version).
+        """
+        with self._lock:
+            entry = self.analysis.get(code_hash)
+            if entry is not None and entry.get("analyzer") == version:
+                return entry["result"]
+        code = self.load_code(code_hash)
+        if code is None:
+            return None
+        result = analyzer(code)
+        with self._lock:
+            self.analysis[code_hash] = {"analyzer": version, "result": result}
+            self._dirty = True
+        return result
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            os.makedirs(self.cache_dir, exist_ok=True)
+            index = {"impls": self.impls, "proxies": self.proxies, "analysis": self.analysis}
+            atomic_write(self.index_path, json.dumps(index, indent=1, sort_keys=True).encode())
+            self._dirty = False
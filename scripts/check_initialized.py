@@ -5,77 +5,62 @@ compiled into the implementation bytecode for all deployed uniBTC proxy
 contracts across chains.
 
 The reinitializer version is extracted by disassembling the implementation
-bytecode and looking for the OZ Initializable pattern:
+bytecode (evm_disasm.py) and looking for the OZ Initializable pattern:
     PUSH1 0x00 / SLOAD / PUSH1 <N>
 
-No block-explorer API or source code is needed.
+No block-explorer API or source code is needed. Chains, endpoints and proxy
+addresses come from the deployment registry (registry.py).
 
-Requires: cast (Foundry), python3
-Usage: python3 scripts/check_initialized.py
+By default every chain is checked concurrently on asyncio: the reads for a
+chain go out as batched JSON-RPC requests over keep-alive connections (see
+rpc.py), slot 0 and the EIP-1967 slot in one batch, then eth_getCode for the
+implementation. Each request has its own deadline, requests per host are
+capped by a semaphore, and a slow or failing primary endpoint is hedged with
+the chain's fallback endpoints. Rows are printed as chains complete.
+Chains whose endpoints all fail fall back to the `cast` path when Foundry is
+installed.
+
+Implementation bytecode is kept in a content-addressed cache on disk (see
+bytecode_cache.py), so once an implementation has been seen a sweep only
+transfers the two storage words per chain until the EIP-1967 slot changes.
+
+`--engine rpc` runs the same batched reads on a thread pool, `--engine cast`
+uses one cast subprocess per read.
+
+`--history` audits a block range instead of the latest block: slot 0 and the
+EIP-1967 slot of every proxy are bisected over historical blocks (see
+slot_history.py) and the blocks where either changed are written to a
+per-chain upgrade timeline, <timeline-dir>/<chain>.json. Probes are memoized
+on disk, so re-running with a later --to-block only searches the new blocks.
+This needs archive RPC endpoints. `--rpc URL --proxy ADDRESS` audits a single
+proxy on any endpoint instead of CHAINS, e.g. a local anvil/ganache chain.
+
+Requires: python3 (cast from Foundry is optional, used as fallback)
+Usage: python3 scripts/check_initialized.py [--engine async|rpc|cast] [--deadline SECONDS]
+       python3 scripts/check_initialized.py --history [--from-block N] [--to-block N] [--chain NAME]
 """
 
+import argparse
+import asyncio
+import json
+import os
+import shutil
 import subprocess
-import re
 import sys
 from typing import Optional
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
-CHAINS = [
-    ("BOB",       60808,    "https://rpc.gobob.xyz",
-     "0x236f8c0a61dA474dB21B693fB2ea7AAB0c803894"),
-    ("Mode",      34443,    "https://mainnet.mode.network",
-     "0x6B2a01A5f79dEb4c2f3c0eDa7b01DF456FbD726a"),
-    ("Zeta",      7000,     "https://zetachain-evm.blockpi.network/v1/rpc/public",
-     "0x6B2a01A5f79dEb4c2f3c0eDa7b01DF456FbD726a"),
-    ("Rootstock", 30,       "https://public-node.rsk.co",
-     "0xd3C8Da379d71A33BFEe8875F87AC2748beb1D58d"),
-    ("Hemi",      43111,    "https://rpc.hemi.network/rpc",
-     "0xF9775085d726E782E83585033B58606f7731AB18"),
-    ("Ink",       57073,    "https://rpc-gel.inkonchain.com",
-     "0xd3c8dA379d71a33BfEE8875F87Ac2748bEB1d58d"),
-    ("Unichain",  130,      "https://mainnet.unichain.org",
-     "0xd3c8dA379d71a33BfEE8875F87Ac2748bEB1d58d"),
-    ("IoTeX",     4689,     "https://babel-api.mainnet.iotex.io",
-     "0x93919784c523f39cacaa98ee0a9d96c3f32b593e"),
-    ("Ethereum",  1,        "https://eth.llamarpc.com",
-     "0x004e9c3ef86bc1ca1f0bb5c7662861ee93350568"),
-    ("Arbitrum",  42161,    "https://arb1.arbitrum.io/rpc",
-     "0x6B2a01A5f79dEb4c2f3c0eDa7b01DF456FbD726a"),
-    ("Optimism",  10,       "https://mainnet.optimism.io",
-     "0x93919784C523f39CACaa98Ee0a9d96c3F32b593e"),
-    ("Base",      8453,     "https://mainnet.base.org",
-     "0x93919784C523f39CACaa98Ee0a9d96c3F32b593e"),
-    ("Mantle",    5000,     "https://rpc.mantle.xyz",
-     "0x93919784C523f39CACaa98Ee0a9d96c3F32b593e"),
-    ("Bitlayer",  200901,   "https://rpc.bitlayer.org",
-     "0x93919784C523f39CACaa98Ee0a9d96c3F32b593e"),
-    ("Bera",      80094,    "https://rpc.berachain.com",
-     "0xC3827A4BC8224ee2D116637023b124CED6db6e90"),
-    ("Corn",      21000000, "https://mainnet.corn-rpc.com",
-     "0x93919784c523f39cacaa98ee0a9d96c3f32b593e"),
-    ("TAC",       2390,     "https://rpc.tac.build",
-     "0xF9775085d726E782E83585033B58606f7731AB18"),
-    ("BSC",       56,       "https://bsc-dataseed.binance.org",
-     "0x6B2a01A5f79dEb4c2f3c0eDa7b01DF456FbD726a"),
-    ("Sonic",     146,      "https://rpc.soniclabs.com",
-     "0xC3827A4BC8224ee2D116637023b124CED6db6e90"),
-    ("Taiko",     167000,   "https://rpc.mainnet.taiko.xyz",
-     "0x93919784c523f39cacaa98ee0a9d96c3f32b593e"),
-    ("HyperEVM",  999,      "https://rpc.hyperliquid.xyz/evm",
-     "0xF9775085d726E782E83585033B58606f7731AB18"),
-    ("Merlin",    4200,     "https://rpc.merlinchain.io",
-     "0x93919784C523f39CACaa98Ee0a9d96c3F32b593e"),
-    ("B2",        223,      "https://rpc.bsquared.network",
-     "0x93919784C523f39CACaa98Ee0a9d96c3F32b593e"),
-    ("Sei",       1329,     "https://evm-rpc.sei-apis.com",
-     "0xDfc7D2d003A053b2E0490531e9317A59962b511E"),
-    ("XLayer",    196,      "https://xlayerrpc.okx.com",
-     "0xd3c8dA379d71a33BfEE8875F87Ac2748bEB1d58d"),
-    ("Taker",     2524,     "https://rpc-mainnet.taker.xyz",
-     "0x93919784C523f39CACaa98Ee0a9d96c3F32b593e"),
-    ("DuckChain", 5545,     "https://rpc.duckchain.io",
-     "0x93919784C523f39CACaa98Ee0a9d96c3F32b593e"),
-]
+from bytecode_cache import DEFAULT_CACHE_DIR, BytecodeCache
+from evm_disasm import index_for
+import registry
+from rpc import AsyncConnectionPool, AsyncRPCClient, RPCClient, RPCError, hedged_batch
+from slot_history import DEFAULT_HISTORY_DIR, ProbeStore, block_timestamps, find_transitions
+
+# (name, chain id, primary RPC, uniBTC proxy) of every chain in the deployment registry.
+CHAINS = [(c.name, c.chain_id, c.rpc, c.uni_btc) for c in registry.chains() if c.uni_btc]
+
+# Fallback endpoints raced against the primary RPC of CHAINS by the async engine.
+SECONDARY_RPCS = {c.name: list(c.rpcs[1:]) for c in registry.chains() if len(c.rpcs) > 1}
 
 
 def run_cmd(args, timeout=15):
@@ -92,9 +77,8 @@ def run_cmd(args, timeout=15):
 IMPL_SLOT = "0x360894a13ba1a3210667c828492db98dca3e2076cc3735a920a3ca505d382bbc"
 
 
-def get_initialized_version(proxy, rpc):
-    """Read slot 0 (_initialized) at the latest block."""
-    raw = run_cmd(["cast", "storage", proxy, "0", "--rpc-url", rpc, "--block", "latest"])
+def parse_initialized(raw):
+    """Decode a slot 0 word into the _initialized version string."""
     if raw is None:
         return "RPC_ERR"
     try:
@@ -103,9 +87,8 @@ def get_initialized_version(proxy, rpc):
         return "PARSE_ERR"
 
 
-def get_implementation(proxy, rpc):
-    """Read the EIP-1967 implementation slot at the latest block."""
-    raw = run_cmd(["cast", "storage", proxy, IMPL_SLOT, "--rpc-url", rpc, "--block", "latest"])
+def parse_implementation(raw):
+    """Decode an EIP-1967 slot word into the implementation address."""
     if raw is None:
         return None
     try:
@@ -117,44 +100,91 @@ def get_implementation(proxy, rpc):
         return None
 
 
-def extract_version_from_bytecode(address, rpc):
+def get_initialized_version(proxy, rpc):
+    """Read slot 0 (_initialized) at the latest block."""
+    return parse_initialized(run_cmd(["cast", "storage", proxy, "0", "--rpc-url", rpc, "--block", "latest"]))
+
+
+def get_implementation(proxy, rpc):
+    """Read the EIP-1967 implementation slot at the latest block."""
+    return parse_implementation(run_cmd(["cast", "storage", proxy, IMPL_SLOT, "--rpc-url", rpc, "--block", "latest"]))
+
+
+def extract_version_from_code(bytecode):
     """
-    Extract reinitializer(N) by searching the raw bytecode hex for the
-    OZ Initializable modifier's compiled opcode pattern:
-
-        PUSH1 0x00   (6000)   ; storage slot of _initialized / _initializing
-        SLOAD        (54)     ; load packed slot value
-        PUSH1 <N>    (60NN)   ; version literal from reinitializer(N)
-        SWAP1        (90)     ; reorder stack
-        PUSH2 0x0100 (610100) ; 256 — to extract _initializing (byte 1)
-        SWAP1        (90)     ;
-        DIV          (04)     ; slot_val / 256 → _initializing
-        PUSH1 0xFF   (60ff)   ; mask
-        AND          (16)     ; & 0xFF
-        ISZERO       (15)     ; !_initializing
-
-    Full hex pattern: 600054 60<NN> 90 610100 90 04 60ff 16 15
+    Extract reinitializer(N) from the implementation bytecode by decoding it
+    (see evm_disasm.py) and locating the OZ Initializable modifier's compiled
+    sequence:
+
+        PUSH1 0x00   ; storage slot of _initialized / _initializing
+        SLOAD        ; load packed slot value
+        PUSH1 <N>    ; version literal from reinitializer(N)
+        SWAP1        ; reorder stack
+        PUSH2 0x0100 ; 256 — to extract _initializing (byte 1)
+        SWAP1        ;
+        DIV          ; slot_val / 256 → _initializing
+        PUSH1 0xFF   ; mask
+        AND          ; & 0xFF
+        ISZERO       ; !_initializing
+
+    Matching happens on decoded instructions, so the sequence cannot be
+    found inside PUSH data and PUSH widths do not matter. When several
+    reinitializers are compiled in, the highest version is returned.
     """
-    bytecode = run_cmd(["cast", "code", address, "--rpc-url", rpc, "--block", "latest"], timeout=20)
     if not bytecode or bytecode == "0x":
         return "N/A"
-    h = bytecode[2:] if bytecode.startswith("0x") else bytecode
-    # Strict pattern: PUSH1 0x00 + SLOAD + PUSH1 <N> + SWAP1 + PUSH2 0x0100 + SWAP1 + DIV + PUSH1 0xFF + AND + ISZERO
-    for m in re.finditer(r"60005460([0-9a-fA-F]{2})90610100900460ff1615", h):
-        ver = int(m.group(1), 16)
-        if 1 <= ver <= 255 and ver != 0xFF:
-            return str(ver)
-    return "N/A"
+    versions = index_for(bytecode).reinitializer_versions()
+    return str(versions[-1]) if versions else "N/A"
 
 
-def check_chain(chain_info):
-    name, chain_id, rpc, proxy = chain_info
-    storage_ver = get_initialized_version(proxy, rpc)
-    impl = get_implementation(proxy, rpc)
-    disasm_ver = "N/A"
-    if impl:
-        disasm_ver = extract_version_from_bytecode(impl, rpc)
+# Bump whenever analyze_code() changes so cached analysis results are recomputed.
+ANALYZER_VERSION = 2
+
+# AccessControl roles used across the uniBTC contracts.
+KNOWN_ROLES = ("MINTER_ROLE", "PAUSER_ROLE", "MANAGER_ROLE", "OPERATOR_ROLE", "FREEZER_ROLE",
+               "APPROVER_ROLE", "L1_MINTER_ROLE", "BITLAYER_ROLE")
+
+
+def analyze_code(bytecode):
+    """Everything this script extracts from an implementation's bytecode."""
+    index = index_for(bytecode)
+    versions = index.reinitializer_versions()
+    return {
+        "reinitializer": str(versions[-1]) if versions else "N/A",
+        "reinitializers": versions,
+        "selectors": index.selectors(),
+        "roles": index.roles(KNOWN_ROLES),
+        "jumpdests": len(index.jumpdests),
+        "sload_sites": len(index.sloads),
+        "sstore_sites": len(index.sstores),
+        "size": len(index.code),
+    }
+
+
+def cached_version(cache, chain_id, proxy, impl):
+    """
+    reinitializer(N) of `impl` from the bytecode cache, or None when its code
+    has not been fetched yet (or the proxy was just upgraded to it).
+    """
+    if cache is None:
+        return None
+    cache.observe(chain_id, proxy, impl)
+    code_hash = cache.code_hash(chain_id, impl)
+    if code_hash is None:
+        return None
+    analysis = cache.analyze(code_hash, analyze_code, ANALYZER_VERSION)
+    return None if analysis is None else analysis["reinitializer"]
+
 
+def version_from_code(cache, chain_id, impl, bytecode):
+    """Extract reinitializer(N) from freshly fetched code, storing it in the cache."""
+    if cache is None or not bytecode or bytecode == "0x":
+        return extract_version_from_code(bytecode)
+    code_hash = cache.store(chain_id, impl, bytecode)
+    return cache.analyze(code_hash, analyze_code, ANALYZER_VERSION)["reinitializer"]
+
+
+def make_result(name, proxy, storage_ver, impl, disasm_ver):
     if storage_ver in ("RPC_ERR", "PARSE_ERR") or disasm_ver == "N/A":
         match = "warn"
     elif storage_ver == disasm_ver:
@@ -168,31 +198,320 @@ def check_chain(chain_info):
     }
 
 
-def main():
-    n = len(CHAINS)
-    print(f"Checking _initialized vs bytecode reinitializer(N) for {n} chains ...\n")
+def check_chain(chain_info, cache=None):
+    """Check one chain through `cast`, one subprocess per read."""
+    name, chain_id, rpc, proxy = chain_info
+    storage_ver = get_initialized_version(proxy, rpc)
+    impl = get_implementation(proxy, rpc)
+    disasm_ver = "N/A"
+    if impl:
+        disasm_ver = cached_version(cache, chain_id, proxy, impl)
+        if disasm_ver is None:
+            bytecode = run_cmd(["cast", "code", impl, "--rpc-url", rpc, "--block", "latest"], timeout=20)
+            disasm_ver = version_from_code(cache, chain_id, impl, bytecode)
+    return make_result(name, proxy, storage_ver, impl, disasm_ver)
+
+
+def _result_or_none(value):
+    return None if isinstance(value, RPCError) else value
+
+
+def check_endpoint(rpc, chains, timeout=15, cache=None):
+    """
+    Check every chain served by the same RPC endpoint with two batched
+    requests: slot 0 and the EIP-1967 slot of every proxy, then eth_getCode
+    for every distinct implementation that is not in the bytecode cache.
+    """
+    client = RPCClient(rpc, timeout=timeout)
+    calls = []
+    for _, _, _, proxy in chains:
+        calls.append(("eth_getStorageAt", [proxy, "0x0", "latest"]))
+        calls.append(("eth_getStorageAt", [proxy, IMPL_SLOT, "latest"]))
+    try:
+        slots = client.batch(calls)
+    except RPCError:
+        slots = [None] * len(calls)
+    slots = [_result_or_none(v) for v in slots]
+
+    impls = [parse_implementation(slots[2 * i + 1]) for i in range(len(chains))]
+    versions = [cached_version(cache, chain_id, proxy, impl) if impl else "N/A"
+                for (_, chain_id, _, proxy), impl in zip(chains, impls)]
+    missing = sorted({(c[1], impl.lower()) for c, impl, v in zip(chains, impls, versions) if impl and v is None})
+    codes = {}
+    if missing:
+        try:
+            fetched = client.batch([("eth_getCode", [impl, "latest"]) for _, impl in missing])
+        except RPCError:
+            fetched = [None] * len(missing)
+        codes = {key: _result_or_none(code) for key, code in zip(missing, fetched)}
+
     results = []
+    for i, (name, chain_id, _, proxy) in enumerate(chains):
+        impl, disasm_ver = impls[i], versions[i]
+        if disasm_ver is None:
+            disasm_ver = version_from_code(cache, chain_id, impl, codes.get((chain_id, impl.lower())))
+        results.append(make_result(name, proxy, parse_initialized(slots[2 * i]), impl, disasm_ver))
+    return results
+
+
+def check_chains_rpc(chains, timeout=15, fallback=True, cache=None):
+    """
+    Yield (chain, result) pairs for `chains`, one batched round trip pair per
+    RPC endpoint. Chains whose reads failed are re-checked through `cast` when
+    `fallback` is set and cast is installed.
+    """
+    by_endpoint = {}
+    for c in chains:
+        by_endpoint.setdefault(c[2], []).append(c)
+    use_cast = fallback and shutil.which("cast") is not None
+
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        future_to_group = {executor.submit(check_endpoint, rpc, group, timeout, cache): group
+                           for rpc, group in by_endpoint.items()}
+        for future in as_completed(future_to_group):
+            group = future_to_group[future]
+            try:
+                group_results = future.result()
+            except Exception as e:
+                for chain in group:
+                    yield chain, e
+                continue
+            for chain, r in zip(group, group_results):
+                if use_cast and (r["storage_ver"] == "RPC_ERR" or r["impl"] == "N/A" or r["disasm_ver"] == "N/A"):
+                    r = check_chain(chain, cache)
+                yield chain, r
+
+
+def check_chains_cast(chains, cache=None):
+    """Yield (chain, result) pairs for `chains` using the `cast` subprocess path."""
     with ThreadPoolExecutor(max_workers=5) as executor:
-        future_to_chain = {executor.submit(check_chain, c): c for c in CHAINS}
+        future_to_chain = {executor.submit(check_chain, c, cache): c for c in chains}
         for future in as_completed(future_to_chain):
-            chain = future_to_chain[future]
             try:
-                r = future.result()
-                results.append(r)
-                icon = {"ok": "\u2705", "MISMATCH": "\u274c", "warn": "\u26a0\ufe0f "}[r["match"]]
-                sys.stderr.write(f"  {icon} {r['name']:<12s} storage={r['storage_ver']:<4s} disasm={r['disasm_ver']:<4s}\n")
+                yield future_to_chain[future], future.result()
             except Exception as e:
-                sys.stderr.write(f"  \U0001f4a5 {chain[0]:<12s} {e}\n")
+                yield future_to_chain[future], e
 
-    chain_order = {c[0]: i for i, c in enumerate(CHAINS)}
-    results.sort(key=lambda r: chain_order.get(r["name"], 999))
+
+async def check_chain_async(chain_info, pool, deadline=10, hedge_after=2.0, fallback=True, cache=None):
+    """
+    Check one chain with hedged, batched JSON-RPC reads. The implementation
+    code is only fetched when it is not in the bytecode cache. Falls back to
+    the cast path (on a worker thread) when every endpoint failed.
+    """
+    name, chain_id, rpc, proxy = chain_info
+    urls = [rpc] + SECONDARY_RPCS.get(name, [])
+    clients = [AsyncRPCClient(u, pool, deadline=deadline) for u in urls]
+
+    try:
+        slots, winner = await hedged_batch(clients, [
+            ("eth_getStorageAt", [proxy, "0x0", "latest"]),
+            ("eth_getStorageAt", [proxy, IMPL_SLOT, "latest"]),
+        ], hedge_after)
+        # Ask the endpoint that answered first for the code, then the others.
+        clients.remove(winner)
+        clients.insert(0, winner)
+    except RPCError:
+        slots = [None, None]
+    storage_raw, impl_raw = (_result_or_none(v) for v in slots)
+    impl = parse_implementation(impl_raw)
+
+    disasm_ver, code_failed = "N/A", False
+    if impl:
+        disasm_ver = cached_version(cache, chain_id, proxy, impl)
+        if disasm_ver is None:
+            code = None
+            try:
+                codes, _ = await hedged_batch(clients, [("eth_getCode", [impl, "latest"])], hedge_after)
+                code = _result_or_none(codes[0])
+            except RPCError:
+                pass
+            code_failed = code is None
+            disasm_ver = version_from_code(cache, chain_id, impl, code)
+
+    r = make_result(name, proxy, parse_initialized(storage_raw), impl, disasm_ver)
+    if fallback and (storage_raw is None or impl_raw is None or code_failed) and shutil.which("cast"):
+        r = await asyncio.to_thread(check_chain, chain_info, cache)
+    return r
+
+
+async def check_chains_async(chains, report, deadline=10, hedge_after=2.0, per_host=4, fallback=True, cache=None):
+    """
+    Check every chain at once and call `report(chain, result)` as soon as
+    each one completes; `result` is an Exception if the check itself crashed.
+    """
+    pool = AsyncConnectionPool(per_host=per_host)
+
+    async def run(chain):
+        try:
+            r = await check_chain_async(chain, pool, deadline, hedge_after, fallback, cache)
+        except Exception as e:
+            r = e
+        report(chain, r)
+
+    try:
+        await asyncio.gather(*(run(c) for c in chains))
+    finally:
+        pool.close()
+
+
+def upgrade_timeline(chain_info, start=0, end=None, history_dir=DEFAULT_HISTORY_DIR, confirmations=64, timeout=15):
+    """
+    Bisect [start, end] (end defaults to the latest block) for the blocks at
+    which the proxy's _initialized version or implementation changed. The
+    first entry is the state at `start`; a proxy deployed inside the range
+    shows up as a change from version 0 and no implementation.
+    """
+    name, chain_id, rpc, proxy = chain_info
+    client = RPCClient(rpc, timeout=timeout)
+    head = int(client.call("eth_blockNumber"), 16)
+    end = head if end is None else min(end, head)
+    if start > end:
+        raise ValueError(f"--from-block {start} is past block {end}")
+
+    store = None
+    if history_dir:
+        genesis = client.call("eth_getBlockByNumber", ["0x0", False])["hash"]
+        store = ProbeStore(history_dir, chain_id, genesis)
+    try:
+        states = find_transitions(client, [proxy], ["0x0", IMPL_SLOT], start, end,
+                                  store=store, confirmations=confirmations, head=head)[proxy]
+    finally:
+        if store is not None:
+            store.save()
+    stamps = block_timestamps(client, [block for block, _ in states])
+
+    timeline, prev = [], None
+    for block, (initialized, impl_word) in states:
+        entry = {
+            "block": block,
+            "timestamp": stamps.get(block),
+            "initialized": int(initialized, 16),
+            "implementation": parse_implementation(impl_word),
+        }
+        if prev is not None:
+            entry["changed"] = [k for k in ("initialized", "implementation") if entry[k] != prev[k]]
+        timeline.append(entry)
+        prev = entry
+    return {"chain": name, "chain_id": chain_id, "proxy": proxy,
+            "from_block": start, "to_block": end, "timeline": timeline}
+
+
+def _history_start(chain_info, from_block):
+    if from_block is not None:
+        return from_block
+    try:
+        return registry.chain(chain_info[1]).start_block
+    except KeyError:
+        return 0
+
+
+def run_history(chains, args):
+    """Build and write the upgrade timeline of every chain, printing each as it completes."""
+    os.makedirs(args.timeline_dir, exist_ok=True)
+    history_dir = None if args.no_cache else args.history_dir
+    failed = 0
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        future_to_chain = {executor.submit(upgrade_timeline, c, _history_start(c, args.from_block), args.to_block,
+                                           history_dir, args.confirmations, args.deadline): c for c in chains}
+        for future in as_completed(future_to_chain):
+            name = future_to_chain[future][0]
+            try:
+                t = future.result()
+            except (RPCError, ValueError) as e:
+                sys.stderr.write(f"  \U0001f4a5 {name:<12s} {e}\n")
+                failed += 1
+                continue
+            path = os.path.join(args.timeline_dir, f"{name}.json")
+            with open(path, "w") as f:
+                json.dump(t, f, indent=2)
+            print(f"{name} (blocks {t['from_block']}..{t['to_block']}) -> {path}")
+            for e in t["timeline"]:
+                what = ", ".join(e.get("changed", ["initial state"]))
+                print(f"   {e['block']:>10}  {e['timestamp'] or '':>10}  initialized={e['initialized']:<3} "
+                      f"impl={e['implementation'] or 'N/A':<42}  {what}")
+    print(f"\n{len(chains) - failed} timelines written to {args.timeline_dir}, {failed} chains failed")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--engine", choices=("async", "rpc", "cast"), default="async",
+                        help="concurrent asyncio JSON-RPC (default), threaded batched JSON-RPC, or one cast subprocess per read")
+    parser.add_argument("--deadline", type=float, default=10, help="deadline in seconds for each RPC request")
+    parser.add_argument("--hedge-after", type=float, default=2.0,
+                        help="seconds to wait on the primary RPC before also asking the secondary one")
+    parser.add_argument("--per-host", type=int, default=4, help="maximum concurrent requests per RPC host")
+    parser.add_argument("--no-fallback", action="store_true", help="do not retry failed chains through cast")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="bytecode cache directory")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="always download implementation bytecode and re-probe historical blocks")
+    parser.add_argument("--chain", action="append", help="only check this chain, by name or chain id (repeatable)")
+    parser.add_argument("--rpc", help="check a single proxy on this endpoint instead of CHAINS (needs --proxy)")
+    parser.add_argument("--proxy", help="proxy address to check with --rpc")
+    parser.add_argument("--history", action="store_true",
+                        help="bisect a block range for upgrades and write per-chain timelines")
+    parser.add_argument("--from-block", type=int,
+                        help="first block of the --history range (default: the chain's registry start_block)")
+    parser.add_argument("--to-block", type=int, help="last block of the --history range (default: latest)")
+    parser.add_argument("--timeline-dir", default="upgrade_timelines", help="output directory of --history")
+    parser.add_argument("--history-dir", default=DEFAULT_HISTORY_DIR, help="memo of historical storage probes")
+    parser.add_argument("--confirmations", type=int, default=64,
+                        help="probes this close to the head are not memoized")
+    args = parser.parse_args()
+    cache = None if args.no_cache else BytecodeCache(args.cache_dir)
+
+    chains = CHAINS
+    if args.rpc:
+        if not args.proxy:
+            parser.error("--rpc needs --proxy")
+        try:
+            chain_id = int(RPCClient(args.rpc, timeout=args.deadline).call("eth_chainId"), 16)
+        except RPCError as e:
+            parser.error(f"cannot reach --rpc: {e}")
+        chains = [(args.chain[0] if args.chain else f"chain-{chain_id}", chain_id, args.rpc, args.proxy)]
+    elif args.chain:
+        try:
+            wanted = {registry.chain(c).chain_id for c in args.chain}
+        except KeyError as e:
+            parser.error(f"unknown chain {e}")
+        chains = [c for c in CHAINS if c[1] in wanted]
+
+    if args.history:
+        run_history(chains, args)
+        return
+
+    n = len(chains)
+    print(f"Checking _initialized vs bytecode reinitializer(N) for {n} chains ...\n")
 
     hdr = ("Chain", "Implementation", "Storage", "Disasm")
     print(f"{hdr[0]:<12} {hdr[1]:<44} {hdr[2]:>8} {hdr[3]:>8} Match")
     print(f"{'-'*12} {'-'*44} {'-'*8} {'-'*8} {'-'*5}")
-    for r in results:
+
+    results = []
+
+    def report(chain, r):
+        if isinstance(r, Exception):
+            sys.stderr.write(f"  \U0001f4a5 {chain[0]:<12s} {r}\n")
+            return
+        results.append(r)
         icon = {"ok": "\u2705", "MISMATCH": "\u274c", "warn": "\u26a0\ufe0f "}[r["match"]]
-        print(f"{r['name']:<12} {r['impl']:<44} {r['storage_ver']:>8} {r['disasm_ver']:>8} {icon}")
+        print(f"{r['name']:<12} {r['impl']:<44} {r['storage_ver']:>8} {r['disasm_ver']:>8} {icon}", flush=True)
+
+    if args.engine == "async":
+        asyncio.run(check_chains_async(chains, report, deadline=args.deadline, hedge_after=args.hedge_after,
+                                       per_host=args.per_host, fallback=not args.no_fallback, cache=cache))
+    else:
+        if args.engine == "rpc":
+            checks = check_chains_rpc(chains, timeout=args.deadline, fallback=not args.no_fallback, cache=cache)
+        else:
+            checks = check_chains_cast(chains, cache)
+        for chain, r in checks:
+            report(chain, r)
+    if cache is not None:
+        cache.save()
+
+    chain_order = {c[0]: i for i, c in enumerate(CHAINS)}
+    results.sort(key=lambda r: chain_order.get(r["name"], 999))
 
     mismatches = [r for r in results if r["match"] == "MISMATCH"]
     warnings = [r for r in results if r["match"] == "warn"]
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Claim-batching planner for DelayRedeemRouter.
+
+claimDelayedRedeems(uint256) and claimPrincipals(uint256) claim the matured
+prefix of the caller's queue, up to the given bound. Their cost grows with
+both the number of redeems claimed (n) and the number of distinct tokens
+among them (k): _getDebtTokenAmount merges the n redeems into k per-token
+debts with an O(n*k) inner loop, and claimDelayedRedeems then runs one
+Vault.execute transfer per token. The planner models the gas of a claim as
+
+    gas(n, k) = c0 + c1*n + c2*n*k + c3*k + c4*native
+
+where native is 1 when native BTC is among the k tokens, fits c0..c4 by
+least squares to eth_estimateGas samples from a local chain (collected by
+contracts/scripts/claim_gas_samples.py), and then, for each user:
+
+  - reads the queue (getUserDelayedRedeems) and keeps the prefix that is
+    claimable at --at (default: the latest block),
+  - picks the largest bound whose estimate, plus a safety margin, fits the
+    --budget,
+  - splits the whole claimable prefix into a sequence of claim
+    transactions. The greedy split (take the largest bound that fits, then
+    continue after it) needs the fewest transactions as long as the
+    estimate does not decrease as a claim grows, which holds for any fit
+    with non-negative coefficients.
+
+The margin is the larger of --margin and the worst underestimate of the
+fitted model over its own samples.
+
+Requires: python3 (standard library only)
+Usage: python3 scripts/claim_planner.py --chain <name|chain id> --samples claim_gas.json --budget 3000000 --user 0x...
+       python3 scripts/claim_planner.py --rpc http://127.0.0.1:8545 --router 0x... --samples claim_gas.json --user 0x... --principal
+"""
+
+import argparse
+import json
+import sys
+
+import registry
+from abi import decode, decode_uint, encode_call
+from multicall import block_tag
+from registry import NATIVE_BTC
+from rpc import RPCClient, RPCError
+
+FUNCTIONS = ("claimDelayedRedeems", "claimPrincipals")
+
+
+def features(n, k, native):
+    return [1.0, float(n), float(n * k), float(k), 1.0 if native else 0.0]
+
+
+def _solve(a, b):
+    """Solve the square system a x = b by Gaussian elimination with partial pivoting."""
+    size = len(b)
+    m = [row[:] + [b[i]] for i, row in enumerate(a)]
+    for col in range(size):
+        pivot = max(range(col, size), key=lambda r: abs(m[r][col]))
+        m[col], m[pivot] = m[pivot], m[col]
+        if m[col][col] == 0:
+            raise ValueError("the gas samples do not determine the model")
+        for r in range(col + 1, size):
+            f = m[r][col] / m[col][col]
+            for c in range(col, size + 1):
+                m[r][c] -= f * m[col][c]
+    x = [0.0] * size
+    for r in reversed(range(size)):
+        x[r] = (m[r][size] - sum(m[r][c] * x[c] for c in range(r + 1, size))) / m[r][r]
+    return x
+
+
+class GasModel:
+    """Fitted gas(n, k, native) of one claim function."""
+
+    def __init__(self, coefficients, slack=0.0):
+        self.coefficients = coefficients
+        self.slack = slack             # worst (measured - estimate) / estimate over the samples
+
+    @classmethod
+    def fit(cls, samples):
+        """
+        Least-squares fit to [(n, k, native, gas)]. A small ridge term keeps
+        the fit defined when the samples never vary a feature (e.g. no
+        native BTC), whose coefficient then stays near zero.
+        """
+        if len(samples) < 2:
+            raise ValueError("need at least two gas samples")
+        rows = [features(n, k, native) for n, k, native, _ in samples]
+        width = len(rows[0])
+        ata = [[sum(r[i] * r[j] for r in rows) for j in range(width)] for i in range(width)]
+        atb = [sum(r[i] * s[3] for r, s in zip(rows, samples)) for i in range(width)]
+        for i in range(width):
+            ata[i][i] += 1e-6 * (1 + ata[i][i])
+        model = cls(_solve(ata, atb))
+        model.slack = max(0.0, max((gas - model.estimate(n, k, native)) / model.estimate(n, k, native)
+                                   for n, k, native, gas in samples))
+        return model
+
+    def estimate(self, n, k, native=False):
+        return sum(c * f for c, f in zip(self.coefficients, features(n, k, native)))
+
+
+def load_models(path):
+    """{function: GasModel} fitted to a claim_gas_samples.py output file."""
+    with open(path) as f:
+        samples = json.load(f)
+    grouped = {}
+    for s in samples:
+        grouped.setdefault(s["function"], []).append((s["n"], s["k"], s["native"], s["gas"]))
+    return {function: GasModel.fit(rows) for function, rows in grouped.items()}
+
+
+def prefix_costs(model, tokens):
+    """Estimated gas of claiming the first 1..len(tokens) redeems, whose tokens are `tokens`, in one call."""
+    costs, seen = [], set()
+    for n, token in enumerate(tokens, 1):
+        seen.add(token.lower())
+        costs.append(model.estimate(n, len(seen), NATIVE_BTC in seen))
+    return costs
+
+
+def max_bound(model, tokens, budget, margin=0.0):
+    """
+    The largest maxNumberOfDelayedRedeemsToClaim whose claim of the first
+    redeems of `tokens` fits in `budget` gas with `margin`; 0 if not even
+    one redeem fits.
+    """
+    factor = 1 + max(margin, model.slack)
+    bound = 0
+    for cost in prefix_costs(model, tokens):
+        if cost * factor > budget:
+            break
+        bound += 1
+    return bound
+
+
+def plan(model, tokens, budget, margin=0.0):
+    """
+    [(bound, estimated gas)] of the claim transactions that clear the
+    claimable redeems of `tokens` in queue order, fewest transactions first.
+    """
+    out, start = [], 0
+    while start < len(tokens):
+        bound = max_bound(model, tokens[start:], budget, margin)
+        if bound == 0:
+            raise ValueError(f"claiming even one redeem is estimated above the {budget} gas budget")
+        out.append((bound, round(prefix_costs(model, tokens[start:start + bound])[-1])))
+        start += bound
+    return out
+
+
+def claimable_tokens(client, router, user, at=None, principal=False, block="latest"):
+    """Tokens of `user`'s redeems claimable at timestamp `at` (default: `block`'s), in queue order."""
+    sig = "redeemPrincipalDelay()" if principal else "redeemDelay()"
+    tag = block_tag(block)
+    calls = [("eth_call", [{"to": router, "data": encode_call("getUserDelayedRedeems(address)", user)}, tag]),
+             ("eth_call", [{"to": router, "data": encode_call(sig)}, tag]),
+             ("eth_getBlockByNumber", [tag, False])]
+    redeems, delay, head = client.batch(calls)
+    for result in (redeems, delay, head):
+        if isinstance(result, RPCError):
+            raise RPCError(f"reading the queue of {user}: {result}")
+    now = at if at is not None else int(head["timestamp"], 16)
+    delay = decode_uint(delay)
+    tokens = []
+    for _, created, token in decode(["(uint224,uint32,address)[]"], redeems)[0]:
+        if now < created + delay:
+            break
+        tokens.append(token.lower())
+    return tokens
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chain", help="registry chain (name or chain id) to read the router and RPC from")
+    parser.add_argument("--rpc", help="RPC URL (overrides the registry)")
+    parser.add_argument("--router", help="DelayRedeemRouter address (overrides the registry)")
+    parser.add_argument("--samples", required=True, help="gas samples written by contracts/scripts/claim_gas_samples.py")
+    parser.add_argument("--budget", type=int, default=3_000_000, help="gas limit of one claim transaction")
+    parser.add_argument("--margin", type=float, default=0.1, help="minimum safety margin over the estimate")
+    parser.add_argument("--principal", action="store_true", help="plan claimPrincipals instead of claimDelayedRedeems")
+    parser.add_argument("--at", type=int, help="plan for this timestamp instead of the latest block's")
+    parser.add_argument("--user", action="append", required=True, help="user to plan for (repeatable)")
+    parser.add_argument("--output", help="write the plans, with calldata, to this JSON file")
+    args = parser.parse_args()
+
+    chain = None
+    if args.chain:
+        try:
+            chain = registry.chain(args.chain)
+        except KeyError:
+            parser.error(f"unknown chain {args.chain}")
+    rpc = args.rpc or (chain.rpc if chain else None)
+    router = args.router or (chain.redeem_router if chain else None)
+    if not rpc or not router:
+        parser.error("need --chain with a redeem router in the registry, or --rpc and --router")
+
+    function = FUNCTIONS[1] if args.principal else FUNCTIONS[0]
+    try:
+        models = load_models(args.samples)
+    except (OSError, ValueError, KeyError) as e:
+        sys.exit(f"❌ {args.samples}: {e}")
+    if function not in models:
+        sys.exit(f"❌ {args.samples} has no {function} samples")
+    model = models[function]
+    c = model.coefficients
+    print(f"{function}: gas ≈ {c[0]:.0f} + {c[1]:.0f}·n + {c[2]:.0f}·n·k + {c[3]:.0f}·k + {c[4]:.0f}·native "
+          f"(worst underestimate {model.slack:.1%})")
+
+    client = RPCClient(rpc, timeout=60)
+    plans = []
+    for user in args.user:
+        try:
+            tokens = claimable_tokens(client, router, user, args.at, args.principal)
+            steps = plan(model, tokens, args.budget, args.margin)
+        except (RPCError, ValueError) as e:
+            sys.exit(f"❌ {user}: {e}")
+        print(f"\n{user}: {len(tokens)} claimable, {len(set(tokens))} tokens, {len(steps)} transactions")
+        for bound, gas in steps:
+            print(f"   {function}({bound})  ~{gas} gas")
+        plans.append({"user": user, "claimable": len(tokens), "transactions": [
+            {"bound": bound, "estimated_gas": gas, "to": router,
+             "data": encode_call(f"{function}(uint256)", bound)} for bound, gas in steps]})
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"function": function, "budget": args.budget, "plans": plans}, f, indent=2)
+        print(f"\nWrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Cross-chain snapshot of DelayRedeemRouter debts and quotas.
+
+For every chain with a redeem router in the registry, and every token ever
+btclisted on it, one Multicall3 aggregate3 call reads
+
+    isBtclisted, tokenDebts (totalDebts, totalCleared), maxQuotas,
+    quotaRates, lastRebaseTimestamps, quotaBases
+
+at the chain's latest block. Chains are read concurrently, so a snapshot
+costs about one round trip to the slowest chain. The result is one JSON
+document for dashboards, with outstanding debt (totalDebts - totalCleared,
+in uniBTC) per token, per chain and overall. A token removed from the
+btclist still owes what was redeemed against it before, so it stays in the
+snapshot (with "btclisted": false) until that debt is cleared.
+
+btclist is a mapping, so the tokens are discovered from BtclistAdded logs
+and checked against isBtclisted in the same batch.
+
+Each chain has a cache (<cache-dir>/<chain id>-<router>.json) holding the
+tokens seen as of --confirmations blocks below the last head seen, and the
+last snapshots keyed by block number. A chain whose head has not moved is
+answered from the cache without an eth_call; otherwise only the logs since
+the cached block are scanned. A restarted dev chain (different genesis
+hash) starts over.
+
+Requires: python3 (standard library only)
+Usage: python3 scripts/debt_snapshot.py [--chain ethereum --chain bsc ...] [--output debts.json]
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import registry
+from abi import decode, decode_uint, encode_call
+from atomic_file import atomic_write
+from keccak import keccak_hex
+from multicall import MULTICALL3, Multicall
+from redeem_index import fetch_logs
+from rpc import RPCClient, RPCError
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "uniBTC", "debt_snapshot")
+KEEP_SNAPSHOTS = 32
+
+# Removals do not matter: a delisted token is read until its debt is cleared.
+BTCLIST_EVENTS = {
+    keccak_hex("BtclistAdded(address[])"): ("BtclistAdded", ["address[]"]),
+}
+READS = ("isBtclisted", "tokenDebts", "maxQuotas", "quotaRates", "lastRebaseTimestamps", "quotaBases")
+
+
+class DebtCache:
+    """
+    On-disk state of one chain's router:
+
+        {"genesis": "<block 0 hash>", "router": "<address>", "block": N, "seen": [ever btclisted as of N],
+         "snapshots": {"<block>": {snapshot}}}
+    """
+
+    def __init__(self, cache_dir, chain_id, router, genesis=None):
+        self.path = os.path.join(cache_dir, f"{chain_id}-{router.lower()}.json") if cache_dir else None
+        self.router = router.lower()
+        self.genesis = genesis
+        self.block = None
+        self.seen = []
+        self.snapshots = {}
+        try:
+            with open(self.path) as f:
+                saved = json.load(f)
+        except (TypeError, OSError, ValueError):
+            return
+        # A cache without "seen" dropped delisted tokens and is read again from scratch.
+        if saved.get("genesis") not in (None, genesis) or saved.get("router") != self.router or "seen" not in saved:
+            return
+        self.block = saved.get("block")
+        self.seen = saved["seen"]
+        self.snapshots = saved.get("snapshots", {})
+
+    def remember(self, block, snapshot):
+        self.snapshots[str(block)] = snapshot
+        for old in sorted(self.snapshots, key=int)[:-KEEP_SNAPSHOTS]:
+            del self.snapshots[old]
+
+    def save(self):
+        if self.path is None:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        state = {"genesis": self.genesis, "router": self.router, "block": self.block,
+                 "seen": self.seen, "snapshots": self.snapshots}
+        atomic_write(self.path, json.dumps(state, separators=(",", ":")).encode())
+
+
+def _fold(tokens, logs):
+    tokens = list(tokens)
+    for log in logs:
+        _, types = BTCLIST_EVENTS[log["topics"][0]]
+        for token in decode(types, log["data"])[0]:
+            if token not in tokens:
+                tokens.append(token)
+    return tokens
+
+
+def seen_tokens(client, cache, start, head, confirmations=12):
+    """Tokens btclisted at some block up to `head`; the cache keeps the set as of head - confirmations."""
+    first = start if cache.block is None else cache.block + 1
+    if head < first:
+        return cache.seen
+    logs = fetch_logs(client, cache.router, first, head, events=BTCLIST_EVENTS)
+    safe = head - confirmations
+    settled = [log for log in logs if int(log["blockNumber"], 16) <= safe]
+    if safe >= first:
+        cache.seen = _fold(cache.seen, settled)
+        cache.block = safe
+    return _fold(cache.seen, logs[len(settled):])
+
+
+def read_debts(multicall, router, tokens, block):
+    """{token: {...}} of the `tokens` btclisted or still in debt at `block`, in one aggregate3 call."""
+    calls = [(router, encode_call(f"{read}(address)", token)) for token in tokens for read in READS]
+    results = multicall.aggregate(calls, block)
+    out = {}
+    for i, token in enumerate(tokens):
+        row = []
+        for read, (success, data) in zip(READS, results[i * len(READS):(i + 1) * len(READS)]):
+            if not success:
+                raise RPCError(f"{read}({token}) reverted on {router}")
+            row.append("0x" + data.hex())
+        listed = bool(decode_uint(row[0]))
+        total_debts, total_cleared = decode(["uint256", "uint256"], row[1])
+        if not listed and total_debts == total_cleared:
+            continue
+        out[token] = {"btclisted": listed, "totalDebts": total_debts, "totalCleared": total_cleared,
+                      "outstanding": total_debts - total_cleared,
+                      "maxQuota": decode_uint(row[2]), "quotaRate": decode_uint(row[3]),
+                      "lastRebaseTimestamp": decode_uint(row[4]), "quotaBase": decode_uint(row[5])}
+    return out
+
+
+def chain_snapshot(client, chain, cache, multicall_address=MULTICALL3, confirmations=12):
+    """Snapshot of one chain at its latest block, from the cache when that block was read before."""
+    head = client.call("eth_getBlockByNumber", ["latest", False])
+    block = int(head["number"], 16)
+    if str(block) in cache.snapshots:
+        return cache.snapshots[str(block)]
+    tokens = seen_tokens(client, cache, chain.start_block, block, confirmations)
+    # One aggregate3 call for the whole chain.
+    multicall = Multicall(client, multicall_address, chunk_size=max(1, len(tokens) * len(READS)))
+    debts = read_debts(multicall, chain.redeem_router, tokens, block) if tokens else {}
+    snapshot = {"chain_id": chain.chain_id, "router": cache.router, "block": block,
+                "timestamp": int(head["timestamp"], 16), "tokens": debts,
+                "outstanding": sum(d["outstanding"] for d in debts.values())}
+    cache.remember(block, snapshot)
+    return snapshot
+
+
+def snapshot(chains, cache_dir=DEFAULT_CACHE_DIR, confirmations=12, workers=8, timeout=30, rpcs=None, multicalls=None):
+    """
+    {"chains": {name: snapshot or {"error": str}}, "outstanding": total} over
+    `chains` (registry.Chain with a redeem router), read concurrently.
+    `rpcs` and `multicalls` override the endpoint and Multicall3 address by chain id.
+    """
+    lock = threading.Lock()
+    report = {}
+
+    def run(chain):
+        try:
+            client = RPCClient((rpcs or {}).get(chain.chain_id) or chain.rpc, timeout=timeout)
+            genesis = client.call("eth_getBlockByNumber", ["0x0", False])["hash"]
+            cache = DebtCache(cache_dir, chain.chain_id, chain.redeem_router, genesis)
+            result = chain_snapshot(client, chain, cache, (multicalls or {}).get(chain.chain_id, MULTICALL3),
+                                    confirmations)
+            cache.save()
+        except (RPCError, ValueError, TypeError) as e:
+            result = {"error": str(e)}
+        with lock:
+            report[chain.name] = result
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(run, chains))
+    return {"chains": dict(sorted(report.items())),
+            "outstanding": sum(r.get("outstanding", 0) for r in report.values())}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chain", action="append", help="only this chain (repeatable; default: every chain with a redeem router)")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help=f"cache directory (default {DEFAULT_CACHE_DIR})")
+    parser.add_argument("--confirmations", type=int, default=12, help="blocks below the head before btclist changes are cached")
+    parser.add_argument("--workers", type=int, default=8, help="chains read concurrently")
+    parser.add_argument("--output", help="write the snapshot to this JSON file instead of stdout")
+    args = parser.parse_args()
+
+    try:
+        chains = [registry.chain(c) for c in args.chain] if args.chain else registry.chains()
+    except KeyError as e:
+        parser.error(f"unknown chain {e}")
+    chains = [c for c in chains if c.redeem_router]
+    if not chains:
+        sys.exit("❌ no chain with a redeem router in the registry")
+
+    result = snapshot(chains, args.cache_dir, args.confirmations, args.workers)
+    for name, r in result["chains"].items():
+        if "error" in r:
+            sys.stderr.write(f"❌ {name}: {r['error']}\n")
+    text = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
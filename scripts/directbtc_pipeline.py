@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Pipelined receive/approve service for DirectBTCMinter.
+
+The minter takes BTC deposits one event at a time: receiveEvent(recipient,
+txHash, amount) (L1_MINTER_ROLE) appends txHash to eventIndexes, and
+approveEvent(txHash) (APPROVER_ROLE) only accepts eventIndexes[processIdx],
+so a bot that reads nextPendingEvent(), sends, and waits for the receipt
+approves one deposit per round trip. This service instead keeps up to
+--max-in-flight transactions per account in the mempool, with local nonces:
+
+    receive   every deposit of the source that has no receivedEvents entry
+              yet, in source order
+    approve   the approval order, precomputed from eventIndexes[processIdx:]
+              (--window events read per tick); when the L1 minter is also
+              the approver and the whole queue was read, the deposits it is
+              receiving are appended, because its own nonces put each
+              approve after its receive.
+              With --batch k, k events go in one approveEvents() call.
+
+The approval order stops before the first event whose recipient is not in
+`recipients` (approveEvent would revert USR012 there); the event is
+reported as blocked until the recipient is allowed or the event rejected.
+
+Each tick first settles what is in flight. Nonces below the account's
+mined count are done (reverted receipts are counted); a transaction the
+node no longer has (the pending count stops at its nonce) is a gap that
+holds back every later nonce, so it is sent again, or, if the node rejects
+it, replaced by a 0-value transfer to self so the later ones can go. The
+state is read again each tick, so an approve that reverted because the
+order changed (USR015) is simply recomputed.
+
+Deposit sources have a poll() method returning every known deposit as
+{"txid", "recipient", "amount"}, with the 32-byte BTC txid used as the
+event's txHash and the amount in satoshis. FixtureDepositSource replays a
+JSON list, or re-reads a JSON-lines file another process appends to.
+
+Transactions are sent with eth_sendTransaction from accounts the node
+signs for (a local chain); contracts/scripts/directbtc_pipeline.py runs the
+service with brownie accounts.
+
+Requires: python3 (standard library only)
+Usage: python3 scripts/directbtc_pipeline.py --rpc http://127.0.0.1:8545 --minter 0x... --l1-minter 0x... [--approver 0x...] --deposits deposits.jsonl [--batch 5] [--follow]
+"""
+
+import argparse
+import json
+import sys
+import time
+
+from abi import decode, decode_uint, encode_call
+from multicall import eth_call
+from rpc import RPCClient, RPCError, check_batch
+
+RECEIVE_GAS = 200_000
+APPROVE_GAS = 300_000
+APPROVE_GAS_PER_EVENT = 100_000
+FILLER_GAS = 21_000
+PENDING = 1
+
+
+class FixtureDepositSource:
+    """
+    Deposits from a list, or from `path`: a JSON list, or JSON lines (one
+    deposit per line) re-read on every poll so a watcher can append to it.
+    """
+
+    def __init__(self, deposits=(), path=None):
+        self.deposits = list(deposits)
+        self.path = path
+
+    def add(self, *deposits):
+        self.deposits.extend(deposits)
+
+    def poll(self):
+        if self.path is None:
+            return list(self.deposits)
+        with open(self.path) as f:
+            text = f.read()
+        if text.lstrip().startswith("["):
+            return json.loads(text)
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def event_hash(txid):
+    """The bytes32 txHash of a BTC txid (64 hex digits, as displayed)."""
+    digits = txid[2:] if txid.startswith("0x") else txid
+    if len(digits) != 64 or int(digits, 16) == 0:
+        raise ValueError(f"bad txid {txid}")
+    return "0x" + digits.lower()
+
+
+def read_queue(client, minter, hashes, recipients=(), window=100):
+    """
+    {"block", "process_idx", "events": [{"index", "hash", "recipient", "amount"}]
+    from processIdx on (at most `window`), "complete": whether "events" runs
+    to the end of eventIndexes, "received": the `hashes` with an event,
+    "recipients": {recipient: allowed}} of the minter at the head, for the
+    recipients of those events and `recipients`.
+    """
+    block = int(client.call("eth_blockNumber"), 16)
+    results = check_batch(client.batch([eth_call(minter, "processIdx()", block)]
+                                       + [eth_call(minter, "receivedEvents(bytes32)", block, h) for h in hashes]),
+                          f"reading DirectBTCMinter {minter}")
+    process_idx = decode_uint(results[0])
+    received = {h for h, r in zip(hashes, results[1:]) if decode_uint("0x" + r[2:66])}
+    known = {h: decode(["address", "uint256", "uint8"], r) for h, r in zip(hashes, results[1:])}
+
+    # eventIndexes has no length getter: the first index that reverts is the end.
+    indexes = client.batch([eth_call(minter, "eventIndexes(uint256)", block, process_idx + k) for k in range(window)])
+    end = next((k for k, r in enumerate(indexes) if isinstance(r, RPCError) and "revert" in str(r).lower()), None)
+    queue = ["0x" + r[2:66] for r in check_batch(indexes[:end], "eventIndexes")]
+    missing = [h for h in queue if h not in known]
+    results = check_batch(client.batch([eth_call(minter, "receivedEvents(bytes32)", block, h) for h in missing]),
+                          "receivedEvents")
+    known.update((h, decode(["address", "uint256", "uint8"], r)) for h, r in zip(missing, results))
+
+    events = []
+    for k, h in enumerate(queue):
+        recipient, amount, state = known[h]
+        if state != PENDING:
+            break
+        events.append({"index": process_idx + k, "hash": h, "recipient": recipient, "amount": amount})
+    recipients = sorted({e["recipient"] for e in events} | {r.lower() for r in recipients})
+    allowed = check_batch(client.batch([eth_call(minter, "recipients(address)", block, r) for r in recipients]),
+                          "recipients")
+    return {"block": block, "process_idx": process_idx, "events": events,
+            "complete": end is not None and len(events) == len(queue), "received": received,
+            "recipients": {r: bool(decode_uint(a)) for r, a in zip(recipients, allowed)}}
+
+
+class Pipeline:
+    """
+    In-flight transactions of the L1 minter and approver accounts, as
+    {account: {nonce: {"kind", "hashes", "tx", "hash"}}}, "kind" being
+    "receive", "approve" or "filler". `send(tx)` submits a transaction and
+    returns its hash (default: eth_sendTransaction).
+    """
+
+    def __init__(self, client, minter, l1_minter, source, approver=None, batch=1, window=100, max_in_flight=16,
+                 send=None, log=print):
+        self.client = client
+        self.minter = minter.lower()
+        self.l1_minter = l1_minter.lower()
+        self.approver = (approver or l1_minter).lower()
+        self.source = source
+        self.batch = batch
+        self.window = window
+        self.max_in_flight = max_in_flight
+        self.send = send or (lambda tx: client.call("eth_sendTransaction", [tx]))
+        self.log = log
+        self.in_flight = {self.l1_minter: {}, self.approver: {}}
+        self.received = set()
+        self.stats = {"receives_sent": 0, "approves_sent": 0, "reverted": 0, "gaps": 0}
+
+    def _submit(self, account, nonce, kind, hashes, tx):
+        tx = {**tx, "from": account, "nonce": hex(nonce)}
+        entry = {"kind": kind, "hashes": hashes, "tx": tx, "hash": None}
+        self.in_flight[account][nonce] = entry
+        try:
+            entry["hash"] = self.send(tx)
+        except RPCError as e:
+            # The node may still have it; settle() sends it again if not.
+            self.log(f"{kind} with nonce {nonce} from {account}: {e}")
+        return entry
+
+    def _filler(self, account, nonce):
+        tx = {"to": account, "value": "0x0", "gas": hex(FILLER_GAS)}
+        return self._submit(account, nonce, "filler", [], tx)
+
+    def settle(self):
+        """Drop what is mined and fill the nonce gaps of every account; returns the next nonce of each."""
+        accounts = list(self.in_flight)
+        counts = check_batch(self.client.batch([("eth_getTransactionCount", [a, tag])
+                                                for a in accounts for tag in ("latest", "pending")]), "nonces")
+        next_nonce = {}
+        for k, account in enumerate(accounts):
+            mined, pending = int(counts[2 * k], 16), int(counts[2 * k + 1], 16)
+            flight = self.in_flight[account]
+            done = [n for n in flight if n < mined]
+            hashes = [flight[n]["hash"] for n in done if flight[n]["hash"]]
+            for receipt in self.client.batch([("eth_getTransactionReceipt", [h]) for h in hashes]):
+                if isinstance(receipt, dict) and int(receipt["status"], 16) != 1:
+                    self.stats["reverted"] += 1
+            for n in done:
+                del flight[n]
+            # The node holds the nonces below `pending`; a missing one blocks the rest.
+            while flight and pending <= max(flight):
+                self.stats["gaps"] += 1
+                entry = flight.get(pending)
+                try:
+                    if entry is None:
+                        raise RPCError("not sent by this pipeline")
+                    entry["hash"] = self.send(entry["tx"])
+                    self.log(f"gap at nonce {pending} of {account}: {entry['kind']} sent again")
+                except RPCError as e:
+                    self.log(f"gap at nonce {pending} of {account}: {e}, filled")
+                    del flight[pending]
+                    entry = self._filler(account, pending)
+                    if entry["hash"] is None:
+                        raise RPCError(f"cannot fill nonce {pending} of {account}")
+                pending = int(self.client.call("eth_getTransactionCount", [account, "pending"]), 16)
+            next_nonce[account] = max([pending] + [n + 1 for n in flight])
+        return next_nonce
+
+    def tick(self):
+        """Settle, read the queue and send what can go now; returns a status dict."""
+        next_nonce = self.settle()
+        deposits = []
+        for d in self.source.poll():
+            try:
+                h = event_hash(d["txid"])
+            except (KeyError, ValueError) as e:
+                self.log(f"skipping deposit {d}: {e}")
+                continue
+            if int(d["amount"]) <= 0 or int(d["recipient"], 16) == 0:
+                self.log(f"skipping deposit {d}: zero amount or recipient (USR011)")
+                continue
+            deposits.append({"hash": h, "recipient": d["recipient"].lower(), "amount": int(d["amount"])})
+        unknown = [d["hash"] for d in deposits if d["hash"] not in self.received]
+        queue = read_queue(self.client, self.minter, unknown, [d["recipient"] for d in deposits], self.window)
+        self.received |= queue["received"]
+
+        # Receives, in source order.
+        receiving = {h for e in self.in_flight[self.l1_minter].values() if e["kind"] == "receive" for h in e["hashes"]}
+        for d in deposits:
+            if len(self.in_flight[self.l1_minter]) >= self.max_in_flight:
+                break
+            if d["hash"] in self.received or d["hash"] in receiving:
+                continue
+            self._submit(self.l1_minter, next_nonce[self.l1_minter], "receive", [d["hash"]],
+                         {"to": self.minter, "gas": hex(RECEIVE_GAS),
+                          "data": encode_call("receiveEvent(address,bytes32,uint256)", d["recipient"], d["hash"],
+                                              d["amount"])})
+            next_nonce[self.l1_minter] += 1
+            receiving.add(d["hash"])
+            self.stats["receives_sent"] += 1
+
+        # The approval order: the queue on chain, then our own receives when the same account approves
+        # and nothing on chain beyond the window comes before them.
+        order = [(e["hash"], e["recipient"]) for e in queue["events"]]
+        if self.approver == self.l1_minter and queue["complete"]:
+            on_chain = {h for h, _ in order}
+            by_hash = {d["hash"]: d["recipient"] for d in deposits}
+            for n in sorted(self.in_flight[self.l1_minter]):
+                entry = self.in_flight[self.l1_minter][n]
+                if entry["kind"] == "receive" and entry["hashes"][0] not in on_chain:
+                    order.append((entry["hashes"][0], by_hash.get(entry["hashes"][0], "")))
+        approving = {h for e in self.in_flight[self.approver].values() if e["kind"] == "approve" for h in e["hashes"]}
+        ready, blocked = [], None
+        for h, recipient in order:
+            if h in approving:
+                continue
+            if not queue["recipients"].get(recipient):
+                blocked = h
+                break
+            ready.append(h)
+        for k in range(0, len(ready), self.batch):
+            if len(self.in_flight[self.approver]) >= self.max_in_flight:
+                break
+            hashes = ready[k:k + self.batch]
+            data = (encode_call("approveEvent(bytes32)", hashes[0]) if self.batch == 1
+                    else encode_call("approveEvents(bytes32[])", hashes))
+            self._submit(self.approver, next_nonce[self.approver], "approve", hashes,
+                         {"to": self.minter, "gas": hex(APPROVE_GAS + APPROVE_GAS_PER_EVENT * (len(hashes) - 1)),
+                          "data": data})
+            next_nonce[self.approver] += 1
+            self.stats["approves_sent"] += len(hashes)
+
+        waiting = sum(1 for d in deposits if d["hash"] not in self.received) + len(queue["events"])
+        return {"block": queue["block"], "process_idx": queue["process_idx"], "waiting": waiting,
+                "blocked": blocked, "in_flight": sum(len(f) for f in self.in_flight.values()), **self.stats}
+
+    def drain(self, max_ticks=100, poll=1.0, sleep=time.sleep):
+        """Tick until nothing is in flight and nothing more can be sent; returns the last status."""
+        for _ in range(max_ticks):
+            status = self.tick()
+            if not status["in_flight"]:
+                return status
+            sleep(poll)
+        return status
+
+
+def print_status(status):
+    blocked = f", blocked at {status['blocked']} (recipient not allowed)" if status["blocked"] else ""
+    print(f"block {status['block']}: processIdx {status['process_idx']}, {status['waiting']} deposits waiting, "
+          f"{status['in_flight']} in flight, sent {status['receives_sent']} receives and {status['approves_sent']} "
+          f"approvals, {status['reverted']} reverted, {status['gaps']} gaps{blocked}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rpc", required=True, help="RPC endpoint")
+    parser.add_argument("--minter", required=True, help="DirectBTCMinter address")
+    parser.add_argument("--l1-minter", required=True, help="L1_MINTER_ROLE account (unlocked on the node)")
+    parser.add_argument("--approver", help="APPROVER_ROLE account (default: the L1 minter)")
+    parser.add_argument("--deposits", required=True, help="deposits as a JSON list or JSON lines, re-read every tick")
+    parser.add_argument("--batch", type=int, default=1, help="events per approveEvents() call (1: approveEvent)")
+    parser.add_argument("--window", type=int, default=100, help="events of eventIndexes read per tick")
+    parser.add_argument("--max-in-flight", type=int, default=16, help="transactions in flight per account")
+    parser.add_argument("--follow", action="store_true", help="keep watching the deposits")
+    parser.add_argument("--interval", type=float, default=2, help="seconds between ticks")
+    parser.add_argument("--timeout", type=float, default=30, help="timeout in seconds for each request")
+    args = parser.parse_args()
+    if args.batch < 1 or args.max_in_flight < 1:
+        parser.error("--batch and --max-in-flight must be positive")
+
+    pipeline = Pipeline(RPCClient(args.rpc, timeout=args.timeout), args.minter, args.l1_minter,
+                        FixtureDepositSource(path=args.deposits), args.approver, args.batch, args.window,
+                        args.max_in_flight)
+    try:
+        while True:
+            status = pipeline.tick()
+            print_status(status)
+            if not args.follow and not status["in_flight"]:
+                break
+            time.sleep(args.interval)
+    except (RPCError, OSError, ValueError) as e:
+        sys.exit(f"❌ {e}")
+    if status["blocked"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
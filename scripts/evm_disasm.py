@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Linear-time EVM bytecode decoder and index, used instead of hex regexes to
+find known compiler output in implementation bytecode.
+
+decode() walks the code once and yields one Instruction per opcode, skipping
+PUSH immediates, so a pattern can never match inside PUSH data. CodeIndex
+builds on a single decode() pass: jump destinations, PUSH immediates by
+value, SLOAD/SSTORE sites, and a pattern query (find()) on top of them.
+Patterns match PUSH instructions by value regardless of their width, so the
+queries keep working when optimizer settings change how a constant is
+pushed.
+
+Queries:
+    reinitializer_versions()  N of every OZ Initializable reinitializer(N)
+    selectors()               function selectors of the dispatcher
+    roles(names)              AccessControl role ids pushed as constants
+    disables_initializers()   _disableInitializers() (creation code only)
+
+index_for() memoizes one CodeIndex per code hash, so every check on the same
+implementation reuses one parse.
+
+Requires: python3 (standard library only)
+"""
+
+from typing import NamedTuple, Optional
+
+from keccak import keccak256
+
+OPCODES = {
+    0x00: "STOP", 0x01: "ADD", 0x02: "MUL", 0x03: "SUB", 0x04: "DIV", 0x05: "SDIV",
+    0x06: "MOD", 0x07: "SMOD", 0x08: "ADDMOD", 0x09: "MULMOD", 0x0A: "EXP", 0x0B: "SIGNEXTEND",
+    0x10: "LT", 0x11: "GT", 0x12: "SLT", 0x13: "SGT", 0x14: "EQ", 0x15: "ISZERO",
+    0x16: "AND", 0x17: "OR", 0x18: "XOR", 0x19: "NOT", 0x1A: "BYTE", 0x1B: "SHL",
+    0x1C: "SHR", 0x1D: "SAR", 0x20: "KECCAK256",
+    0x30: "ADDRESS", 0x31: "BALANCE", 0x32: "ORIGIN", 0x33: "CALLER", 0x34: "CALLVALUE",
+    0x35: "CALLDATALOAD", 0x36: "CALLDATASIZE", 0x37: "CALLDATACOPY", 0x38: "CODESIZE",
+    0x39: "CODECOPY", 0x3A: "GASPRICE", 0x3B: "EXTCODESIZE", 0x3C: "EXTCODECOPY",
+    0x3D: "RETURNDATASIZE", 0x3E: "RETURNDATACOPY", 0x3F: "EXTCODEHASH",
+    0x40: "BLOCKHASH", 0x41: "COINBASE", 0x42: "TIMESTAMP", 0x43: "NUMBER",
+    0x44: "PREVRANDAO", 0x45: "GASLIMIT", 0x46: "CHAINID", 0x47: "SELFBALANCE",
+    0x48: "BASEFEE", 0x49: "BLOBHASH", 0x4A: "BLOBBASEFEE",
+    0x50: "POP", 0x51: "MLOAD", 0x52: "MSTORE", 0x53: "MSTORE8", 0x54: "SLOAD",
+    0x55: "SSTORE", 0x56: "JUMP", 0x57: "JUMPI", 0x58: "PC", 0x59: "MSIZE", 0x5A: "GAS",
+    0x5B: "JUMPDEST", 0x5C: "TLOAD", 0x5D: "TSTORE", 0x5E: "MCOPY", 0x5F: "PUSH0",
+    0xF0: "CREATE", 0xF1: "CALL", 0xF2: "CALLCODE", 0xF3: "RETURN", 0xF4: "DELEGATECALL",
+    0xF5: "CREATE2", 0xFA: "STATICCALL", 0xFD: "REVERT", 0xFE: "INVALID", 0xFF: "SELFDESTRUCT",
+}
+OPCODES.update({0x60 + i: f"PUSH{i + 1}" for i in range(32)})
+OPCODES.update({0x80 + i: f"DUP{i + 1}" for i in range(16)})
+OPCODES.update({0x90 + i: f"SWAP{i + 1}" for i in range(16)})
+OPCODES.update({0xA0 + i: f"LOG{i}" for i in range(5)})
+
+
+class Instruction(NamedTuple):
+    pc: int
+    op: int
+    name: str
+    arg: Optional[int]  # PUSH immediate (0 for PUSH0), None otherwise
+
+    @property
+    def is_push(self):
+        return self.op == 0x5F or 0x60 <= self.op <= 0x7F
+
+
+def decode(code, start=0, end=None):
+    """Yield the instructions of `code` (bytes) in order, in a single pass."""
+    end = len(code) if end is None else end
+    pc = start
+    while pc < end:
+        op = code[pc]
+        if 0x60 <= op <= 0x7F:
+            width = op - 0x5F
+            # A PUSH cut off by the end of the code reads the missing bytes as zeros, as the EVM does.
+            data = code[pc + 1:pc + 1 + width].ljust(width, b"\0")
+            yield Instruction(pc, op, OPCODES[op], int.from_bytes(data, "big"))
+            pc += 1 + width
+        else:
+            yield Instruction(pc, op, OPCODES.get(op, f"UNKNOWN_0x{op:02x}"), 0 if op == 0x5F else None)
+            pc += 1
+
+
+def code_end(code):
+    """
+    Offset where executable code ends: solc appends CBOR metadata whose
+    length is stored in the last two bytes. Returns len(code) when there is
+    no plausible metadata trailer.
+    """
+    if len(code) < 2:
+        return len(code)
+    meta_len = int.from_bytes(code[-2:], "big")
+    start = len(code) - 2 - meta_len
+    # The trailer is a CBOR map (0xa1..0xa5) right after the code.
+    if 0 < start and 0xA1 <= code[start] <= 0xA5:
+        return start
+    return len(code)
+
+
+# Pattern elements for CodeIndex.find():
+#   "SLOAD"          an instruction with that name
+#   ("PUSH", value)  a PUSH of any width (or PUSH0) of `value`
+#   ("PUSH", CAPTURE)  any PUSH; its value is returned in the captures
+CAPTURE = object()
+
+
+def _matches(ins, element):
+    if isinstance(element, str):
+        return ins.name == element
+    _, value = element
+    return ins.is_push and (value is CAPTURE or ins.arg == value)
+
+
+class CodeIndex:
+    """Index of one contract's bytecode, built in one pass."""
+
+    def __init__(self, code):
+        if isinstance(code, str):
+            code = bytes.fromhex(code[2:] if code.startswith("0x") else code)
+        self.code = code
+        self.end = code_end(code)
+        self.instructions = []
+        self.jumpdests = set()
+        self.pushes = {}  # value -> [instruction index]
+        self.sloads = []
+        self.sstores = []
+
+        for idx, ins in enumerate(decode(code, 0, self.end)):
+            self.instructions.append(ins)
+            if ins.is_push:
+                self.pushes.setdefault(ins.arg, []).append(idx)
+            elif ins.op == 0x5B:
+                self.jumpdests.add(ins.pc)
+            elif ins.op == 0x54:
+                self.sloads.append(idx)
+            elif ins.op == 0x55:
+                self.sstores.append(idx)
+
+    def find(self, pattern):
+        """
+        Yield (instruction index, captures) for every position where the
+        consecutive instructions match `pattern`. The scan is anchored on the
+        most selective indexed element instead of walking every instruction.
+        """
+        anchor, candidates = None, None
+        for pos, element in enumerate(pattern):
+            if element == "SLOAD":
+                hits = self.sloads
+            elif element == "SSTORE":
+                hits = self.sstores
+            elif isinstance(element, tuple) and element[1] is not CAPTURE:
+                hits = self.pushes.get(element[1], [])
+            else:
+                continue
+            if candidates is None or len(hits) < len(candidates):
+                anchor, candidates = pos, hits
+        if candidates is None:
+            anchor, candidates = 0, range(len(self.instructions))
+
+        for hit in candidates:
+            start = hit - anchor
+            if start < 0 or start + len(pattern) > len(self.instructions):
+                continue
+            window = self.instructions[start:start + len(pattern)]
+            if all(_matches(ins, el) for ins, el in zip(window, pattern)):
+                yield start, [ins.arg for ins, el in zip(window, pattern)
+                              if isinstance(el, tuple) and el[1] is CAPTURE]
+
+    def reinitializer_versions(self):
+        """
+        Versions N of every OZ Initializable `reinitializer(N)` modifier,
+        which compiles to a load of the packed slot 0 followed by the version
+        literal and the extraction of `_initializing` (byte 1):
+
+            PUSH 0x00 / SLOAD / PUSH <N> / SWAP1 / PUSH 0x0100 / SWAP1 / DIV / PUSH 0xff / AND / ISZERO
+
+        or, with shift opcodes, `PUSH 0x08 / SHR` in place of `PUSH 0x0100 / SWAP1 / DIV`.
+        """
+        patterns = [
+            [("PUSH", 0), "SLOAD", ("PUSH", CAPTURE), "SWAP1", ("PUSH", 0x100), "SWAP1", "DIV",
+             ("PUSH", 0xFF), "AND", "ISZERO"],
+            [("PUSH", 0), "SLOAD", ("PUSH", CAPTURE), "SWAP1", ("PUSH", 8), "SHR",
+             ("PUSH", 0xFF), "AND", "ISZERO"],
+        ]
+        versions = set()
+        for pattern in patterns:
+            for _, (ver,) in self.find(pattern):
+                if 1 <= ver < 0xFF:
+                    versions.add(ver)
+        return sorted(versions)
+
+    def selectors(self):
+        """4-byte selectors compared against calldata by the function dispatcher."""
+        return sorted({f"0x{sel:08x}" for _, (sel,) in self.find(["DUP1", ("PUSH", CAPTURE), "EQ"])
+                       if sel <= 0xFFFFFFFF})
+
+    def roles(self, names):
+        """The subset of AccessControl role `names` whose id is pushed as a constant."""
+        return [n for n in names if int.from_bytes(keccak256(n), "big") in self.pushes]
+
+    def disables_initializers(self):
+        """
+        True if the code contains OZ `_disableInitializers()`, recognized by
+        the first word of its revert reason, which no other Initializable
+        function uses. Constructors are not part of runtime code, so this
+        only answers for creation bytecode.
+        """
+        return int.from_bytes(b"Initializable: contract is initi", "big") in self.pushes
+
+
+_INDEXES = {}
+
+
+def index_for(code):
+    """CodeIndex for `code` (hex string or bytes), parsed once per code hash."""
+    if isinstance(code, str):
+        code = bytes.fromhex(code[2:] if code.startswith("0x") else code)
+    code_hash = keccak256(code)
+    if code_hash not in _INDEXES:
+        _INDEXES[code_hash] = CodeIndex(code)
+    return _INDEXES[code_hash]
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Incremental fee ledger of a DelayRedeemRouter, folded from its events into
+per-token, per-day (UTC) aggregates.
+
+    DelayedRedeemCreated(recipient, token, amount, index, redeemFee)
+        created    redeemFee is charged; the redeem joins the recipient's
+                   pending list
+    DelayedRedeemsCompleted(recipient, burned, completed, totalFee)
+        collected  the fees of the redeems claimed, which claimDelayedRedeems
+                   adds to managementFee
+    DelayedRedeemsPrincipalCompleted(recipient, principal, completed, cancelFee)
+        refunded   the fees of the redeems whose principal was claimed back
+        cancel     cancelFee, which _claimPrincipals adds to managementFee. It
+                   is charged on the total principal of the claim; it is
+                   split over the tokens in proportion to their principal,
+                   the remainder going to the token with the largest share
+    ManagementFeeWithdrawn(recipient, amount)
+        withdrawn  router-wide, recorded under the token ""
+
+so that, at the ledger's block,
+
+    managementFee == sum(collected) + sum(cancel) - sum(withdrawn)
+
+which --check compares with the on-chain value. The completion events only
+carry the new delayedRedeemsCompleted cursor, so the ledger keeps the
+(token, amount, fee) of every unclaimed redeem per user, and must be built
+from the router's first block.
+
+The ledger is one file, <state-dir>/<chain id>-<router>.fees: a JSON header
+line (block, tokens, per-user pending redeems, column names, row count)
+followed by the rows as little-endian columns, day uint32, token uint16
+(an index into the header's tokens) and one int64 per aggregate, sorted by
+(day, token). Totals over a time range bisect the day column instead of
+reading logs again.
+
+Requires: python3 (standard library only)
+Usage: python3 scripts/fee_ledger.py --chain <name|chain id> [--from-day 2024-11-01] [--to-day 2024-12-01] [--check]
+       python3 scripts/fee_ledger.py --rpc http://127.0.0.1:8545 --router 0x... --from-block 0 --check
+"""
+
+import argparse
+import bisect
+import datetime
+import json
+import os
+import sys
+from array import array
+
+import registry
+from abi import decode, decode_uint, encode_call
+from atomic_file import atomic_write
+from keccak import keccak_hex
+from multicall import block_tag
+from redeem_index import fetch_logs, fetch_timestamps
+from rpc import RPCClient, RPCError
+
+DEFAULT_STATE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "uniBTC", "fee_ledger")
+MAGIC = b"uniBTC-fees/1\n"
+SECONDS_IN_A_DAY = 86400
+REDEEM_FEE_RATE_RANGE = 10000
+
+COLUMNS = ("created", "collected", "refunded", "cancel", "withdrawn")
+EVENTS = {
+    keccak_hex("DelayedRedeemCreated(address,address,uint256,uint256,uint256)"):
+        ("DelayedRedeemCreated", ["address", "address", "uint256", "uint256", "uint256"]),
+    keccak_hex("DelayedRedeemsCompleted(address,uint256,uint256,uint256)"):
+        ("DelayedRedeemsCompleted", ["address", "uint256", "uint256", "uint256"]),
+    keccak_hex("DelayedRedeemsPrincipalCompleted(address,uint256,uint256,uint256)"):
+        ("DelayedRedeemsPrincipalCompleted", ["address", "uint256", "uint256", "uint256"]),
+    keccak_hex("ManagementFeeWithdrawn(address,uint256)"):
+        ("ManagementFeeWithdrawn", ["address", "uint256"]),
+}
+
+
+def _split(total, weights):
+    """`total` split in proportion to `weights`, rounding down; the remainder goes to the largest weight."""
+    whole = sum(weights.values())
+    shares = {key: total * w // whole for key, w in weights.items()} if whole else {}
+    if shares:
+        shares[max(weights, key=weights.get)] += total - sum(shares.values())
+    return shares
+
+
+class FeeLedger:
+    """Per-(day, token) fee aggregates of one router, plus the pending redeems needed to attribute claims."""
+
+    def __init__(self, router):
+        self.router = router.lower()
+        self.block = None              # last block applied
+        self.rows = {}                 # (day, token) -> [created, collected, refunded, cancel, withdrawn]
+        self.users = {}                # user -> {"completed": cursor, "pending": [[token, amount, fee], ...]}
+        self._keys = None              # sorted self.rows keys, rebuilt after changes
+
+    # --- ingestion --------------------------------------------------------
+
+    def _add(self, day, token, column, value):
+        if value:
+            self.rows.setdefault((day, token), [0] * len(COLUMNS))[COLUMNS.index(column)] += value
+            self._keys = None
+
+    def _pop(self, user, completed):
+        queue = self.users.setdefault(user, {"completed": 0, "pending": []})
+        count = completed - queue["completed"]
+        if count < 0 or count > len(queue["pending"]):
+            raise ValueError(f"{user} completed up to {completed}, but the ledger has "
+                             f"{queue['completed']} + {len(queue['pending'])} redeems; was it built from the first block?")
+        claimed, queue["pending"] = queue["pending"][:count], queue["pending"][count:]
+        queue["completed"] = completed
+        return claimed
+
+    def apply(self, name, args, timestamp):
+        """Apply one decoded event, in log order."""
+        day = timestamp // SECONDS_IN_A_DAY
+        if name == "ManagementFeeWithdrawn":
+            self._add(day, "", "withdrawn", args[1])
+            return
+        user = args[0]
+        if name == "DelayedRedeemCreated":
+            _, token, amount, index, fee = args
+            queue = self.users.setdefault(user, {"completed": 0, "pending": []})
+            if index != queue["completed"] + len(queue["pending"]):
+                raise ValueError(f"DelayedRedeemCreated index {index} of {user}, expected "
+                                 f"{queue['completed'] + len(queue['pending'])}")
+            queue["pending"].append([token, amount, fee])
+            self._add(day, token, "created", fee)
+        elif name == "DelayedRedeemsCompleted":
+            claimed = self._pop(user, args[2])
+            if sum(fee for _, _, fee in claimed) != args[3]:
+                raise ValueError(f"DelayedRedeemsCompleted of {user}: totalFee {args[3]} does not match the ledger")
+            for token, _, fee in claimed:
+                self._add(day, token, "collected", fee)
+        else:
+            principal = {}
+            for token, amount, fee in self._pop(user, args[2]):
+                self._add(day, token, "refunded", fee)
+                principal[token] = principal.get(token, 0) + amount + fee
+            for token, share in _split(args[3], principal).items():
+                self._add(day, token, "cancel", share)
+
+    # --- queries ----------------------------------------------------------
+
+    def keys(self):
+        if self._keys is None:
+            self._keys = sorted(self.rows)
+        return self._keys
+
+    def totals(self, start_day=None, end_day=None, token=None):
+        """{column: total} over the days in [start_day, end_day), for one token or all of them."""
+        keys = self.keys()
+        lo = 0 if start_day is None else bisect.bisect_left(keys, (start_day, ""))
+        hi = len(keys) if end_day is None else bisect.bisect_left(keys, (end_day, ""))
+        out = dict.fromkeys(COLUMNS, 0)
+        for key in keys[lo:hi]:
+            if token is None or key[1] == token:
+                for column, value in zip(COLUMNS, self.rows[key]):
+                    out[column] += value
+        return out
+
+    def by_token(self, start_day=None, end_day=None):
+        """{token: {column: total}} over the days in [start_day, end_day)."""
+        return {token: self.totals(start_day, end_day, token) for token in sorted({t for _, t in self.rows})}
+
+    def management_fee(self):
+        """managementFee as the events so far leave it."""
+        t = self.totals()
+        return t["collected"] + t["cancel"] - t["withdrawn"]
+
+    # --- persistence ------------------------------------------------------
+
+    def save(self, path):
+        keys = self.keys()
+        tokens = sorted({token for _, token in keys})
+        index = {token: i for i, token in enumerate(tokens)}
+        header = {"router": self.router, "block": self.block, "tokens": tokens, "users": self.users,
+                  "columns": ["day", "token", *COLUMNS], "rows": len(keys)}
+        columns = [array("I", [day for day, _ in keys]), array("H", [index[token] for _, token in keys])]
+        columns += [array("q", [self.rows[key][i] for key in keys]) for i in range(len(COLUMNS))]
+        if sys.byteorder != "little":
+            for column in columns:
+                column.byteswap()
+        body = b"".join(column.tobytes() for column in columns)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        atomic_write(path, MAGIC + json.dumps(header, separators=(",", ":")).encode() + b"\n" + body)
+
+    @classmethod
+    def load(cls, path, router):
+        """The saved ledger of `router`, or a fresh one if there is none."""
+        try:
+            with open(path, "rb") as f:
+                if f.readline() != MAGIC:
+                    return cls(router)
+                header = json.loads(f.readline())
+                body = f.read()
+        except (OSError, ValueError):
+            return cls(router)
+        if header.get("router") != router.lower():
+            return cls(router)
+
+        count, columns, offset = header["rows"], [], 0
+        for typecode in ["I", "H"] + ["q"] * len(COLUMNS):
+            column = array(typecode)
+            size = column.itemsize * count
+            column.frombytes(body[offset:offset + size])
+            if sys.byteorder != "little":
+                column.byteswap()
+            columns.append(column)
+            offset += size
+
+        ledger = cls(router)
+        ledger.block = header["block"]
+        ledger.users = header["users"]
+        tokens = header["tokens"]
+        for i in range(count):
+            ledger.rows[(columns[0][i], tokens[columns[1][i]])] = [c[i] for c in columns[2:]]
+        return ledger
+
+
+def sync(client, ledger, start=0, confirmations=12, max_range=5000):
+    """Apply every fee event from the last applied block (or `start`) to head - confirmations."""
+    end = int(client.call("eth_blockNumber"), 16) - confirmations
+    first = start if ledger.block is None else ledger.block + 1
+    if end < first:
+        return 0
+    logs = fetch_logs(client, ledger.router, first, end, max_range, EVENTS)
+    timestamps = fetch_timestamps(client, {int(log["blockNumber"], 16) for log in logs}) if logs else {}
+    for log in logs:
+        name, types = EVENTS[log["topics"][0]]
+        ledger.apply(name, decode(types, log["data"]), timestamps[int(log["blockNumber"], 16)])
+    ledger.block = end
+    return len(logs)
+
+
+def onchain_management_fee(client, router, block):
+    return decode_uint(client.call("eth_call", [{"to": router, "data": encode_call("managementFee()")}, block_tag(block)]))
+
+
+def _day(text):
+    return int(datetime.datetime.strptime(text, "%Y-%m-%d").replace(tzinfo=datetime.timezone.utc).timestamp()) \
+        // SECONDS_IN_A_DAY
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chain", help="registry chain (name or chain id) to read the router and RPC from")
+    parser.add_argument("--rpc", help="RPC URL (overrides the registry)")
+    parser.add_argument("--router", help="DelayRedeemRouter address (overrides the registry)")
+    parser.add_argument("--from-block", type=int, help="the router's first block (default: the registry start block)")
+    parser.add_argument("--state-dir", default=DEFAULT_STATE_DIR, help=f"ledger directory (default {DEFAULT_STATE_DIR})")
+    parser.add_argument("--confirmations", type=int, default=12, help="blocks below the head left unapplied")
+    parser.add_argument("--range", type=int, default=5000, help="blocks per eth_getLogs request")
+    parser.add_argument("--from-day", type=_day, help="first UTC day (YYYY-MM-DD) of the totals")
+    parser.add_argument("--to-day", type=_day, help="UTC day (YYYY-MM-DD) the totals stop before")
+    parser.add_argument("--check", action="store_true", help="compare the ledger with managementFee() at its block")
+    args = parser.parse_args()
+
+    chain = None
+    if args.chain:
+        try:
+            chain = registry.chain(args.chain)
+        except KeyError:
+            parser.error(f"unknown chain {args.chain}")
+    rpc = args.rpc or (chain.rpc if chain else None)
+    router = args.router or (chain.redeem_router if chain else None)
+    if not rpc or not router:
+        parser.error("need --chain with a redeem router in the registry, or --rpc and --router")
+    start = args.from_block if args.from_block is not None else (chain.start_block if chain else 0)
+
+    client = RPCClient(rpc, timeout=60)
+    try:
+        chain_id = int(client.call("eth_chainId"), 16)
+        path = os.path.join(args.state_dir, f"{chain_id}-{router.lower()}.fees")
+        ledger = FeeLedger.load(path, router)
+        count = sync(client, ledger, start, args.confirmations, args.range)
+        onchain = onchain_management_fee(client, router, ledger.block) if args.check else None
+    except (RPCError, ValueError) as e:
+        sys.exit(f"❌ {e}")
+    ledger.save(path)
+
+    print(f"Applied {count} new events up to block {ledger.block}; {len(ledger.rows)} (day, token) rows in {path}")
+    print(f"\n{'token':<44}" + "".join(f"{c:>16}" for c in COLUMNS))
+    for token, totals in ledger.by_token(args.from_day, args.to_day).items():
+        print(f"{token or '(router)':<44}" + "".join(f"{totals[c]:>16}" for c in COLUMNS))
+    if args.check:
+        expected = ledger.management_fee()
+        if expected != onchain:
+            sys.exit(f"❌ managementFee at block {ledger.block} is {onchain}, the ledger gives {expected}")
+        print(f"\n✅ managementFee at block {ledger.block} matches the ledger: {onchain}")
+
+
+if __name__ == "__main__":
+    main()
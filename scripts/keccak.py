@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Pure-Python Keccak-256 (the pre-NIST padding used by Ethereum, which differs
+from hashlib.sha3_256), so the scripts in this directory can hash bytecode,
+derive selectors, event topics and role ids without third-party packages.
+
+Requires: python3 (standard library only)
+"""
+
+_RC = [
+    0x0000000000000001, 0x0000000000008082, 0x800000000000808A, 0x8000000080008000,
+    0x000000000000808B, 0x0000000080000001, 0x8000000080008081, 0x8000000000008009,
+    0x000000000000008A, 0x0000000000000088, 0x0000000080008009, 0x000000008000000A,
+    0x000000008000808B, 0x800000000000008B, 0x8000000000008089, 0x8000000000008003,
+    0x8000000000008002, 0x8000000000000080, 0x000000000000800A, 0x800000008000000A,
+    0x8000000080008081, 0x8000000000008080, 0x0000000080000001, 0x8000000080008008,
+]
+
+_ROT = [
+    [0, 36, 3, 41, 18],
+    [1, 44, 10, 45, 2],
+    [62, 6, 43, 15, 61],
+    [28, 55, 25, 21, 56],
+    [27, 20, 39, 8, 14],
+]
+
+_MASK = (1 << 64) - 1
+_RATE = 136  # bytes, for a 256-bit output
+
+
+def _rol(v, n):
+    return ((v << n) | (v >> (64 - n))) & _MASK if n else v
+
+
+def _permute(a):
+    for rc in _RC:
+        # theta
+        c = [a[x][0] ^ a[x][1] ^ a[x][2] ^ a[x][3] ^ a[x][4] for x in range(5)]
+        d = [c[(x - 1) % 5] ^ _rol(c[(x + 1) % 5], 1) for x in range(5)]
+        a = [[a[x][y] ^ d[x] for y in range(5)] for x in range(5)]
+        # rho + pi
+        b = [[0] * 5 for _ in range(5)]
+        for x in range(5):
+            for y in range(5):
+                b[y][(2 * x + 3 * y) % 5] = _rol(a[x][y], _ROT[x][y])
+        # chi
+        a = [[b[x][y] ^ ((~b[(x + 1) % 5][y]) & b[(x + 2) % 5][y]) for y in range(5)] for x in range(5)]
+        # iota
+        a[0][0] ^= rc
+    return a
+
+
+def keccak256(data):
+    """Return the 32-byte Keccak-256 digest of `data` (bytes or str)."""
+    if isinstance(data, str):
+        data = data.encode()
+    padded = bytearray(data)
+    padded.append(0x01)
+    padded.extend(b"\x00" * (-len(padded) % _RATE))
+    padded[-1] |= 0x80
+
+    state = [[0] * 5 for _ in range(5)]
+    for off in range(0, len(padded), _RATE):
+        block = padded[off:off + _RATE]
+        for i in range(_RATE // 8):
+            state[i % 5][i // 5] ^= int.from_bytes(block[8 * i:8 * i + 8], "little")
+        state = _permute(state)
+
+    out = b"".join(state[i % 5][i // 5].to_bytes(8, "little") for i in range(4))
+    return out
+
+
+def keccak_hex(data):
+    """Keccak-256 of `data` as a 0x-prefixed hex string."""
+    return "0x" + keccak256(data).hex()
+
+
+def selector(signature):
+    """4-byte function selector for a canonical signature, e.g. 'balanceOf(address)'."""
+    return keccak256(signature)[:4]
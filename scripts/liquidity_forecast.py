@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Hourly liquidity forecast of the Vault against maturing DelayRedeemRouter
+redemptions.
+
+A claim pays every token out of the Vault, and _useFastLane reverts it
+(USR015 / USR027) for anyone but a fast-lane user when
+
+    vaultBalance < retainAmounts[token] + amountToSend
+
+so the Vault can pay regular claims out of balance - retainAmounts only.
+For every token the forecast assumes each redeem is claimed the moment it
+matures (createdAt + redeemDelay; already matured ones at once) and reports,
+hour by hour over --hours,
+
+    due        payouts maturing by the end of the hour, cumulative, in the
+               token's own units (amountToSend, as _amounts converts it)
+    shortfall  max(0, due - (vault balance - retainAmounts))
+
+i.e. how much the Vault needs topping up by then.
+
+The pending redeems come from the redeem_index.py index (shared state file,
+synced incrementally). On top of it the forecast keeps, per token, the sum
+of pending amounts per createdAt, updated by every event the index applies,
+so each refresh only folds in new logs and reads the balances again.
+
+Requires: python3 (standard library only)
+Usage: python3 scripts/liquidity_forecast.py --chain <name|chain id> [--hours 168] [--follow]
+       python3 scripts/liquidity_forecast.py --rpc http://127.0.0.1:8545 --router 0x... --from-block 0 --output curve.json
+"""
+
+import argparse
+import bisect
+import json
+import os
+import sys
+import time
+
+import registry
+from abi import decode_address, decode_uint, encode_call
+from multicall import block_tag, eth_call
+from redeem_index import DEFAULT_STATE_DIR, RedeemIndex, sync
+from registry import NATIVE_BTC
+from rpc import RPCClient, RPCError
+
+EXCHANGE_RATE_BASE = 10**10
+SECONDS_IN_AN_HOUR = 3600
+
+
+def payout(amount, decimals):
+    """amountToSend for `amount` uniBTC, as DelayRedeemRouter._amounts computes it."""
+    if decimals == 8:
+        return amount
+    if decimals == 18:
+        return amount * EXCHANGE_RATE_BASE
+    return 0
+
+
+class LiquidityForecast(RedeemIndex):
+    """A RedeemIndex that also keeps {token: {createdAt: pending amount}}."""
+
+    def __init__(self, router, redeem_delay=0, principal_delay=0):
+        super().__init__(router, redeem_delay, principal_delay)
+        self.schedule = {}
+
+    def _move(self, token, created, amount):
+        slots = self.schedule.setdefault(token, {})
+        slots[created] = slots.get(created, 0) + amount
+        if not slots[created]:
+            del slots[created]
+
+    def apply(self, name, args, timestamp):
+        user = args[0]
+        before = self.users.get(user, {}).get("completed", 0)
+        super().apply(name, args, timestamp)
+        queue = self.users[user]
+        if name == "DelayedRedeemCreated":
+            amount, created, token, _ = queue["redeems"][-1]
+            self._move(token, created, amount)
+        elif name != "DelayedRedeemsClaimed":
+            for amount, created, token, _ in queue["redeems"][before:queue["completed"]]:
+                self._move(token, created, -amount)
+
+    @classmethod
+    def load(cls, path, router):
+        index = super().load(path, router)
+        for queue in index.users.values():
+            for amount, created, token, _ in queue["redeems"][queue["completed"]:]:
+                index._move(token, created, amount)
+        return index
+
+    def curve(self, token, now, hours, available, decimals):
+        """[(hour start, due, shortfall)] of `token` for `hours` hours from `now`."""
+        slots = self.schedule.get(token, {})
+        created = sorted(slots)
+        prefix = [0]
+        for t in created:
+            prefix.append(prefix[-1] + slots[t])
+        out = []
+        for h in range(hours):
+            end = now + (h + 1) * SECONDS_IN_AN_HOUR
+            # Redeems with createdAt + redeemDelay < end have matured by the end of the hour.
+            due = payout(prefix[bisect.bisect_left(created, end - self.redeem_delay)], decimals)
+            out.append((now + h * SECONDS_IN_AN_HOUR, due, max(0, due - available)))
+        return out
+
+
+def liquidity(client, router, tokens, block):
+    """(vault, {token: (decimals, vault balance, retainAmounts)}) at `block`."""
+    vault = decode_address(decode_uint(client.call("eth_call", [{"to": router, "data": encode_call("vault()")},
+                                                                 block_tag(block)])))
+    # Only NATIVE_BTC is the Vault's native balance: the router and Vault treat the zero address as an ERC20.
+    native = {t for t in tokens if t.lower() == NATIVE_BTC}
+    calls = []
+    for token in tokens:
+        calls.append(eth_call(router, "retainAmounts(address)", block, token))
+        if token in native:
+            calls.append(("eth_getBalance", [vault, block_tag(block)]))
+        else:
+            calls.append(eth_call(token, "balanceOf(address)", block, vault))
+            calls.append(eth_call(token, "decimals()", block))
+    results = iter(client.batch(calls))
+    out = {}
+    for token in tokens:
+        values = [next(results) for _ in range(2 if token in native else 3)]
+        for r in values:
+            if isinstance(r, RPCError):
+                raise RPCError(f"reading the liquidity of {token}: {r}")
+        retain, balance = decode_uint(values[0]), int(values[1], 16)
+        out[token] = (18 if token in native else decode_uint(values[2]), balance, retain)
+    return vault, out
+
+
+def forecast(client, index, hours):
+    """{token: {"balance", "retain", "curve", "first_shortfall", "top_up"}} from the latest indexed block."""
+    now = int(client.call("eth_getBlockByNumber", [block_tag(index.block), False])["timestamp"], 16)
+    tokens = sorted(t for t, slots in index.schedule.items() if slots)
+    _, balances = liquidity(client, index.router, tokens, index.block) if tokens else (None, {})
+    out = {}
+    for token in tokens:
+        decimals, balance, retain = balances[token]
+        curve = index.curve(token, now, hours, balance - retain, decimals)
+        short = [h for h, _, s in curve if s]
+        out[token] = {"balance": balance, "retain": retain, "decimals": decimals, "curve": curve,
+                      "first_shortfall": short[0] if short else None, "top_up": curve[-1][2] if curve else 0}
+    return out
+
+
+def report(block, result, hours):
+    print(f"Block {block}:")
+    for token, f in result.items():
+        when = time.strftime("%Y-%m-%d %H:00", time.gmtime(f["first_shortfall"])) \
+            if f["first_shortfall"] is not None else "none"
+        print(f"   {token}  balance {f['balance']}  retain {f['retain']}  "
+              f"due within {hours}h {f['curve'][-1][1]}  first shortfall {when}  top up {f['top_up']}", flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chain", help="registry chain (name or chain id) to read the router and RPC from")
+    parser.add_argument("--rpc", help="RPC URL (overrides the registry)")
+    parser.add_argument("--router", help="DelayRedeemRouter address (overrides the registry)")
+    parser.add_argument("--from-block", type=int, help="first block to index (default: the registry start block)")
+    parser.add_argument("--state-dir", default=DEFAULT_STATE_DIR, help=f"index directory (default {DEFAULT_STATE_DIR})")
+    parser.add_argument("--confirmations", type=int, default=12, help="blocks below the head left unindexed")
+    parser.add_argument("--range", type=int, default=5000, help="blocks per eth_getLogs request")
+    parser.add_argument("--hours", type=int, default=168, help="forecast horizon in hours")
+    parser.add_argument("--output", help="write the per-token hourly curves to this JSON file")
+    parser.add_argument("--follow", action="store_true", help="keep refreshing as new blocks arrive")
+    parser.add_argument("--interval", type=float, default=60, help="seconds between refreshes with --follow")
+    args = parser.parse_args()
+
+    chain = None
+    if args.chain:
+        try:
+            chain = registry.chain(args.chain)
+        except KeyError:
+            parser.error(f"unknown chain {args.chain}")
+    rpc = args.rpc or (chain.rpc if chain else None)
+    router = args.router or (chain.redeem_router if chain else None)
+    if not rpc or not router:
+        parser.error("need --chain with a redeem router in the registry, or --rpc and --router")
+    if args.hours < 1:
+        parser.error("--hours must be at least 1")
+    start = args.from_block if args.from_block is not None else (chain.start_block if chain else 0)
+
+    client = RPCClient(rpc, timeout=60)
+    try:
+        chain_id = int(client.call("eth_chainId"), 16)
+    except RPCError as e:
+        sys.exit(f"❌ {e}")
+    path = os.path.join(args.state_dir, f"{chain_id}-{router.lower()}.json")
+    index = LiquidityForecast.load(path, router)
+
+    while True:
+        try:
+            sync(client, index, start, args.confirmations, args.range)
+            result = forecast(client, index, args.hours) if index.block is not None else None
+        except (RPCError, ValueError) as e:
+            if not args.follow:
+                sys.exit(f"❌ {e}")
+            sys.stderr.write(f"RPC error: {e}\n")
+        else:
+            if result is not None:
+                index.save(path)
+                report(index.block, result, args.hours)
+                if args.output:
+                    with open(args.output, "w") as out:
+                        json.dump({"block": index.block, "tokens": result}, out, indent=2)
+        if not args.follow:
+            break
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Sync the DelayRedeemRouter whitelist and blacklist to address lists kept
+off-chain.
+
+whitelist and blacklist are mappings without enumeration, so the current
+sets are rebuilt by replaying the router's WhitelistAdded / WhitelistRemoved
+/ BlacklistAdded / BlacklistRemoved logs. The desired lists (one address per
+line) are diffed against them and only the difference is sent, as
+
+    addToBlacklist, removeFromWhitelist, addToWhitelist, removeFromBlacklist
+
+in that order, so no account is ever allowed more than either list permits.
+Every call is split into chunks whose gas limit, safety margin included,
+fits --budget: the gas of one call is fitted as base + per-account cost from
+two eth_estimateGas probes.
+
+With --send every transaction is signed by the node (eth_sendTransaction,
+so the sender must be unlocked, as on a dev node or anvil) and all of them
+are submitted in one batch with consecutive nonces, then their receipts are
+awaited together: the sync takes a few blocks however many chunks it needs.
+Without --send the plan is only printed, or written with --output as
+(to, data, gas) transactions for a multisig or for
+contracts/scripts/list_sync.py to sign.
+
+Requires: python3 (standard library only)
+Usage: python3 scripts/list_sync.py --chain <name|chain id> --admin 0x... --whitelist wl.txt [--blacklist bl.txt] [--output plan.json]
+       python3 scripts/list_sync.py --rpc http://127.0.0.1:8545 --router 0x... --admin 0x... --whitelist wl.txt --send
+"""
+
+import argparse
+import json
+import sys
+import time
+
+import registry
+from abi import decode, encode_call
+from keccak import keccak_hex
+from redeem_index import fetch_logs
+from rpc import RPCClient, RPCError
+
+LIST_EVENTS = {
+    keccak_hex("WhitelistAdded(address[])"): ("whitelist", True),
+    keccak_hex("WhitelistRemoved(address[])"): ("whitelist", False),
+    keccak_hex("BlacklistAdded(address[])"): ("blacklist", True),
+    keccak_hex("BlacklistRemoved(address[])"): ("blacklist", False),
+}
+# Restrictive changes go first.
+ORDER = (("blacklist", True, "addToBlacklist"), ("whitelist", False, "removeFromWhitelist"),
+         ("whitelist", True, "addToWhitelist"), ("blacklist", False, "removeFromBlacklist"))
+PROBE = 32
+GAS_MARGIN = 1.2
+
+
+def read_list(path):
+    with open(path) as f:
+        return {line.strip().lower() for line in f if line.strip() and not line.startswith("#")}
+
+
+def current_lists(client, router, start, end, max_range=5000):
+    """{"whitelist": set, "blacklist": set} of the router at block `end`."""
+    lists = {"whitelist": set(), "blacklist": set()}
+    for log in fetch_logs(client, router, start, end, max_range, events=LIST_EVENTS):
+        name, added = LIST_EVENTS[log["topics"][0]]
+        accounts = decode(["address[]"], log["data"])[0]
+        if added:
+            lists[name].update(accounts)
+        else:
+            lists[name].difference_update(accounts)
+    return lists
+
+
+def diff(current, desired):
+    """[(function, sorted accounts)] taking `current` to `desired`, lists missing from `desired` left alone."""
+    out = []
+    for name, add, function in ORDER:
+        if name not in desired:
+            continue
+        accounts = desired[name] - current[name] if add else current[name] - desired[name]
+        if accounts:
+            out.append((function, sorted(accounts)))
+    return out
+
+
+def _estimate(client, router, admin, function, accounts):
+    tx = {"from": admin, "to": router, "data": encode_call(f"{function}(address[])", accounts)}
+    return int(client.call("eth_estimateGas", [tx]), 16)
+
+
+def gas_model(client, router, admin, function, accounts):
+    """(base, per account) gas of `function`, fitted on the first accounts to be sent."""
+    probe = accounts[:PROBE]
+    one = _estimate(client, router, admin, function, probe[:1])
+    if len(probe) == 1:
+        return one, 0
+    many = _estimate(client, router, admin, function, probe)
+    per = -(-(many - one) // (len(probe) - 1))
+    return one - per, per
+
+
+def plan(client, router, admin, changes, budget):
+    """[{"function", "accounts", "to", "data", "gas"}] sending `changes` in chunks with a gas limit of at most `budget`."""
+    txs = []
+    for function, accounts in changes:
+        base, per = gas_model(client, router, admin, function, accounts)
+        # The gas limit sent is the estimate times GAS_MARGIN, so that is what must fit the budget.
+        size = max(1, (int(budget / GAS_MARGIN) - base) // per) if per else len(accounts)
+        for i in range(0, len(accounts), size):
+            chunk = accounts[i:i + size]
+            txs.append({"function": function, "accounts": chunk, "to": router,
+                        "data": encode_call(f"{function}(address[])", chunk),
+                        "gas": int((base + per * len(chunk)) * GAS_MARGIN)})
+    return txs
+
+
+def send(client, sender, txs, timeout=300, poll=1.0):
+    """
+    Submit `txs` from the unlocked `sender` with consecutive nonces in one
+    batch, then wait for all the receipts. Returns them in order; raises
+    RPCError if a submission fails or a transaction reverts.
+    """
+    nonce = int(client.call("eth_getTransactionCount", [sender, "pending"]), 16)
+    calls = [("eth_sendTransaction", [{"from": sender, "to": tx["to"], "data": tx["data"],
+                                       "gas": hex(tx["gas"]), "nonce": hex(nonce + i)}])
+             for i, tx in enumerate(txs)]
+    hashes = client.batch(calls)
+    for tx, h in zip(txs, hashes):
+        if isinstance(h, RPCError):
+            raise RPCError(f"{tx['function']} of {len(tx['accounts'])} accounts: {h}")
+    receipts = [None] * len(hashes)
+    deadline = time.time() + timeout
+    while True:
+        waiting = [i for i, r in enumerate(receipts) if r is None]
+        if not waiting:
+            break
+        if time.time() > deadline:
+            raise RPCError(f"{len(waiting)} transactions still pending after {timeout}s")
+        for i, r in zip(waiting, client.batch([("eth_getTransactionReceipt", [hashes[i]]) for i in waiting])):
+            if not isinstance(r, RPCError):
+                receipts[i] = r
+        if any(r is None for r in receipts):
+            time.sleep(poll)
+    for tx, r in zip(txs, receipts):
+        if int(r["status"], 16) != 1:
+            raise RPCError(f"{tx['function']} reverted in {r['transactionHash']}")
+    return receipts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chain", help="registry chain (name or chain id) to read the router and RPC from")
+    parser.add_argument("--rpc", help="RPC URL (overrides the registry)")
+    parser.add_argument("--router", help="DelayRedeemRouter address (overrides the registry)")
+    parser.add_argument("--from-block", type=int, help="first block to read list events from (default: the registry start block)")
+    parser.add_argument("--admin", required=True, help="DEFAULT_ADMIN_ROLE holder the transactions are sent from")
+    parser.add_argument("--whitelist", help="desired whitelist, one address per line")
+    parser.add_argument("--blacklist", help="desired blacklist, one address per line")
+    parser.add_argument("--budget", type=int, default=5_000_000, help="gas per transaction")
+    parser.add_argument("--range", type=int, default=5000, help="blocks per eth_getLogs request")
+    parser.add_argument("--output", help="write the planned transactions to this JSON file")
+    parser.add_argument("--send", action="store_true", help="send the transactions from --admin (must be unlocked on the node)")
+    args = parser.parse_args()
+
+    chain = None
+    if args.chain:
+        try:
+            chain = registry.chain(args.chain)
+        except KeyError:
+            parser.error(f"unknown chain {args.chain}")
+    rpc = args.rpc or (chain.rpc if chain else None)
+    router = args.router or (chain.redeem_router if chain else None)
+    if not rpc or not router:
+        parser.error("need --chain with a redeem router in the registry, or --rpc and --router")
+    if not args.whitelist and not args.blacklist:
+        parser.error("need --whitelist or --blacklist")
+    start = args.from_block if args.from_block is not None else (chain.start_block if chain else 0)
+    desired = {name: read_list(path) for name, path in (("whitelist", args.whitelist), ("blacklist", args.blacklist)) if path}
+
+    client = RPCClient(rpc, timeout=60)
+    try:
+        block = int(client.call("eth_blockNumber"), 16)
+        current = current_lists(client, router, start, block, args.range)
+        txs = plan(client, router, args.admin, diff(current, desired), args.budget)
+    except (RPCError, ValueError) as e:
+        sys.exit(f"❌ {e}")
+
+    print(f"Block {block}: whitelist {len(current['whitelist'])}, blacklist {len(current['blacklist'])}")
+    for tx in txs:
+        print(f"   {tx['function']}  {len(tx['accounts'])} accounts  gas {tx['gas']}")
+    if not txs:
+        print("✅ lists already in sync")
+        return
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"block": block, "from": args.admin, "transactions": txs}, f, indent=2)
+    if args.send:
+        try:
+            receipts = send(client, args.admin, txs)
+        except RPCError as e:
+            sys.exit(f"❌ {e}")
+        blocks = sorted({int(r["blockNumber"], 16) for r in receipts})
+        print(f"✅ {len(receipts)} transactions mined in blocks {blocks[0]}-{blocks[-1]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+How much more uniBTC each Vault can mint, per chain and token.
+
+Vault.mint(token, amount) passes, apart from the PoR check (see
+por_monitor.py), when
+
+    !outOfService                                             SYS011
+    allowedTokenList[token] && !paused[token]                 SYS002
+    _amounts(token, amount) gives uniBTC > 0                  USR010
+    Sigma.totalSupply(token) + amount <= caps[token] != 0     USR003
+
+where Sigma (the Vault's supplyFeeder) sums the balances of every holder of
+every pool of the leading token, and reverts (USR018) for a token that leads
+no pools. _amounts keeps 8-decimal amounts as they are, truncates 18-decimal
+ones to uniBTC's 8 decimals and gives 0 for any other decimals. Native BTC
+is checked as totalSupply <= caps, but mint() is payable: msg.value is
+already in the Vault's balance when Sigma reads it, so the check is the same
+totalSupply + amount <= caps.
+
+The remaining capacity of a token is caps - totalSupply in the token's own
+units, and the uniBTC it mints (_amounts replicated exactly). The matrix
+covers every leading token of the chain's Sigma plus --token.
+
+Pool balances are cached per chain (<cache-dir>/<chain id>-<vault>.json,
+with the Sigma layout in sigma_holders.py's cache). A refresh re-reads only
+the balances touched by Transfer events of the pool tokens since the cached
+block (rescanning --confirmations blocks for reorgs), the pools of leading
+tokens whose layout changed, and native BTC balances (no events), together
+with the Vault configuration (setCap emits no event) in one batch.
+
+Requires: python3 (standard library only)
+Usage: python3 scripts/mint_capacity.py [--chain bsc ...] [--token 0x...] [--follow] [--output capacity.json]
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import registry
+import sigma_holders
+from abi import decode_address, decode_uint
+from atomic_file import atomic_write
+from keccak import keccak_hex
+from multicall import eth_call, get_logs
+from registry import NATIVE_BTC
+from rpc import RPCClient, RPCError, check_batch
+from sigma_holders import HolderCache, token_decimals
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "uniBTC", "mint_capacity")
+TRANSFER = keccak_hex("Transfer(address,address,uint256)")
+EXCHANGE_RATE_BASE = 10**10
+
+
+def amounts(decimals, amount):
+    """(token amount used, uniBTC minted) of Vault._amounts; decimals is 18 for native BTC."""
+    if decimals == 8:
+        return amount, amount
+    if decimals == 18:
+        uni_btc = amount // EXCHANGE_RATE_BASE
+        return uni_btc * EXCHANGE_RATE_BASE, uni_btc
+    return 0, 0
+
+
+def capacity(decimals, allowed, paused, cap, supply, out_of_service=False):
+    """
+    {"allowed", "paused", "cap", "supply", "remaining", "uniBTC", "reason"}
+    of one token; `supply` is None when Sigma has no pools for it. "reason"
+    is the error code every mint reverts with, or None.
+    """
+    remaining = max(0, cap - supply) if supply is not None else 0
+    minted = amounts(decimals, remaining)[1]
+    reason = None
+    if out_of_service:
+        reason = "SYS011"
+    elif not allowed or paused:
+        reason = "SYS002"
+    elif decimals not in (8, 18):
+        reason = "USR010"
+    elif supply is None:
+        reason = "USR018"
+    elif cap == 0 or supply > cap or minted == 0:
+        reason = "USR003"
+    return {"allowed": allowed, "paused": paused, "cap": cap, "supply": supply, "remaining": remaining,
+            "uniBTC": minted if reason is None else 0, "reason": reason}
+
+
+class CapacityCache:
+    """
+    Pool balances of one chain's Vault:
+
+        {"genesis": "<block 0 hash>", "vault": "<address>", "block": N,
+         "balances": {"<token>:<holder>": raw balance}}
+    """
+
+    def __init__(self, cache_dir, chain_id, vault, genesis=None):
+        self.path = os.path.join(cache_dir, f"{chain_id}-{vault.lower()}.json") if cache_dir else None
+        self.vault = vault.lower()
+        self.genesis = genesis
+        self.block = None
+        self.balances = {}
+        try:
+            with open(self.path) as f:
+                saved = json.load(f)
+        except (TypeError, OSError, ValueError):
+            return
+        if saved.get("genesis") not in (None, genesis) or saved.get("vault") != self.vault:
+            return
+        self.block = saved.get("block")
+        self.balances = saved.get("balances", {})
+
+    def save(self):
+        if self.path is None:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        state = {"genesis": self.genesis, "vault": self.vault, "block": self.block, "balances": self.balances}
+        atomic_write(self.path, json.dumps(state, separators=(",", ":")).encode())
+
+
+def transfer_parties(client, tokens, start, end, max_range=5000):
+    """{(token, address)} of the senders and recipients of Transfer events of `tokens` in [start, end]."""
+    parties = set()
+    for log in get_logs(client, tokens, [TRANSFER], start, end, max_range):
+        for topic in log["topics"][1:3]:
+            parties.add((log["address"].lower(), decode_address(int(topic, 16))))
+    return parties
+
+
+def refresh(client, cache, holders, tokens=(), confirmations=12, max_range=5000):
+    """
+    Bring `cache` and the Sigma layout in `holders` up to the head and
+    return {"block", "sigma", "out_of_service", "tokens": {token: capacity()}}.
+    """
+    head = int(client.call("eth_blockNumber"), 16)
+    changed = set(sigma_holders.refresh(client, holders, confirmations, max_range))
+    pairs = {f"{t}:{h}": (t, h) for layout in holders.layouts.values() for t, hs in layout for h in hs}
+
+    if cache.block is None or cache.block > head:
+        dirty = set(pairs)
+    else:
+        erc20 = sorted({t for t, _ in pairs.values() if t != NATIVE_BTC})
+        start = max(cache.block - confirmations, 0)
+        touched = transfer_parties(client, erc20, start, head, max_range) if erc20 else set()
+        relaid = {f"{t}:{h}" for lead in changed for t, hs in holders.layouts.get(lead, []) for h in hs}
+        dirty = {k for k, (t, h) in pairs.items()
+                 if (t, h) in touched or t == NATIVE_BTC or k not in cache.balances or k in relaid}
+    dirty = sorted(dirty)
+
+    tokens = sorted({t.lower() for t in tokens} | set(holders.layouts))
+    calls = [eth_call(cache.vault, "outOfService()", head)]
+    for token in tokens:
+        calls += [eth_call(cache.vault, "allowedTokenList(address)", head, token),
+                  eth_call(cache.vault, "paused(address)", head, token),
+                  eth_call(cache.vault, "caps(address)", head, token)]
+    for key in dirty:
+        token, holder = pairs[key]
+        calls.append(("eth_getBalance", [holder, hex(head)]) if token == NATIVE_BTC
+                     else eth_call(token, "balanceOf(address)", head, holder))
+    results = check_batch(client.batch(calls), f"reading vault {cache.vault}")
+
+    balances = results[1 + 3 * len(tokens):]
+    for key, result in zip(dirty, balances):
+        cache.balances[key] = int(result, 16) if pairs[key][0] == NATIVE_BTC else decode_uint(result)
+    for key in set(cache.balances) - set(pairs):
+        del cache.balances[key]
+    cache.block = head
+
+    decimals = token_decimals(client, holders, tokens)
+    out_of_service = bool(decode_uint(results[0]))
+    matrix = {}
+    for i, token in enumerate(tokens):
+        allowed, paused, cap = (decode_uint(r) for r in results[1 + 3 * i:4 + 3 * i])
+        layout = holders.layouts.get(token)
+        # Sigma adds up every listed holder, duplicates included.
+        supply = sum(cache.balances[f"{t}:{h}"] for t, hs in layout for h in hs) if layout else None
+        matrix[token] = capacity(decimals[token], bool(allowed), bool(paused), cap, supply, out_of_service)
+    return {"block": head, "sigma": holders.sigma, "out_of_service": out_of_service, "tokens": matrix}
+
+
+def sweep(chains, tokens=(), cache_dir=DEFAULT_CACHE_DIR, holder_cache_dir=sigma_holders.DEFAULT_CACHE_DIR,
+          confirmations=12, workers=8, timeout=30, rpcs=None):
+    """{chain name: refresh() result or {"error": str}} over the `chains` with a Vault, read concurrently."""
+    lock = threading.Lock()
+    report = {}
+
+    def run(chain):
+        try:
+            client = RPCClient((rpcs or {}).get(chain.chain_id) or chain.rpc, timeout=timeout)
+            genesis = client.call("eth_getBlockByNumber", ["0x0", False])["hash"]
+            sigma = decode_address(decode_uint(client.call(*eth_call(chain.vault, "supplyFeeder()", "latest"))))
+            if int(sigma, 16) == 0:
+                raise RPCError(f"vault {chain.vault} has no supplyFeeder")
+            holders = HolderCache(holder_cache_dir, chain.chain_id, sigma, genesis)
+            cache = CapacityCache(cache_dir, chain.chain_id, chain.vault, genesis)
+            result = refresh(client, cache, holders, tokens, confirmations)
+            holders.save()
+            cache.save()
+        except (RPCError, ValueError, TypeError) as e:
+            result = {"error": str(e)}
+        with lock:
+            report[chain.name] = result
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(run, [c for c in chains if c.vault]))
+    return dict(sorted(report.items()))
+
+
+def print_report(report):
+    for name, result in report.items():
+        if "error" in result:
+            print(f"❌ {name}: {result['error']}")
+            continue
+        print(f"{name} (block {result['block']}{', OUT OF SERVICE' if result['out_of_service'] else ''})")
+        for token, c in result["tokens"].items():
+            status = c["reason"] or "ok"
+            print(f"   {token}  cap {c['cap']}  supply {c['supply']}  mintable {c['uniBTC'] / 1e8:,.8f} uniBTC  {status}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chain", action="append", help="only this chain (repeatable; default: every chain with a Vault)")
+    parser.add_argument("--token", action="append", default=[], help="also report this token (repeatable)")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help=f"balance cache (default {DEFAULT_CACHE_DIR})")
+    parser.add_argument("--confirmations", type=int, default=12, help="blocks re-scanned for Transfer events")
+    parser.add_argument("--workers", type=int, default=8, help="chains read concurrently")
+    parser.add_argument("--timeout", type=float, default=30, help="timeout in seconds for each request")
+    parser.add_argument("--follow", action="store_true", help="keep refreshing")
+    parser.add_argument("--interval", type=float, default=60, help="seconds between refreshes with --follow")
+    parser.add_argument("--output", help="write the capacity matrix as JSON to this file")
+    args = parser.parse_args()
+
+    try:
+        chains = [registry.chain(c) for c in args.chain] if args.chain else registry.chains()
+    except KeyError as e:
+        parser.error(f"unknown chain {e}")
+    chains = [c for c in chains if c.vault]
+    if not chains:
+        sys.exit("❌ no chain with a Vault in the registry")
+
+    while True:
+        report = sweep(chains, args.token, args.cache_dir, confirmations=args.confirmations,
+                       workers=args.workers, timeout=args.timeout)
+        print_report(report)
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(report, f, indent=2)
+        if not args.follow:
+            break
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Multicall3 batching for the read-only scripts in this directory.
+
+Many view calls are packed into aggregate3() calls of at most `chunk_size`
+subcalls each, and every chunk goes out in one JSON-RPC batch, so N reads
+cost ceil(N / chunk_size) eth_calls in a single round trip. Endpoints that
+reject a chunk (gas cap, response size, timeouts) get it again split in
+half, down to single subcalls.
+
+    mc = Multicall(RPCClient(url), chunk_size=200)
+    results = mc.aggregate([(token, encode_call("balanceOf(address)", holder)), ...], block=19_000_000)
+    # -> [(success, return data bytes), ...]
+
+Multicall3 is deployed at MULTICALL3 on nearly every EVM chain; on a
+development chain deploy contracts/contracts/mocks/Multicall3.sol and pass
+its address.
+
+eth_call() builds a plain eth_call request for RPCClient.batch(), and
+get_logs() reads the logs of a block range in --range sized eth_getLogs
+windows, all sent in one JSON-RPC batch.
+
+Requires: python3 (standard library only)
+"""
+
+from abi import decode, encode_call
+from rpc import RPCError, check_batch
+
+MULTICALL3 = "0xcA11bde05977b3631167028862bE2a173976CA11"
+
+
+def block_tag(block):
+    """JSON-RPC block parameter for a block number, or a tag such as "latest"."""
+    return hex(block) if isinstance(block, int) else block
+
+
+def eth_call(to, signature, block, *args):
+    """The ("eth_call", params) request calling `signature` with `args` on `to` at `block`."""
+    return "eth_call", [{"to": to, "data": encode_call(signature, *args)}, block_tag(block)]
+
+
+def get_logs(client, address, topics, start, end, max_range=5000):
+    """
+    Logs of `address` (one address or a list) matching `topics` in blocks
+    [start, end], in chain order. Every max_range-block window is one
+    eth_getLogs call, and all of them go out in one batch.
+    """
+    calls = [("eth_getLogs", [{"address": address, "topics": topics,
+                               "fromBlock": hex(lo), "toBlock": hex(min(lo + max_range - 1, end))}])
+             for lo in range(start, end + 1, max_range)]
+    logs = [log for window in check_batch(client.batch(calls), "eth_getLogs") for log in window]
+    logs.sort(key=lambda log: (int(log["blockNumber"], 16), int(log["logIndex"], 16)))
+    return logs
+
+
+class Multicall:
+    def __init__(self, client, address=MULTICALL3, chunk_size=500):
+        self.client = client
+        self.address = address
+        self.chunk_size = chunk_size
+
+    def check(self, block="latest"):
+        """Raise RPCError unless Multicall3 has code at self.address."""
+        if self.client.call("eth_getCode", [self.address, block_tag(block)]) in ("0x", "0x0", None):
+            raise RPCError(f"Multicall3 is not deployed at {self.address}")
+
+    def eth_balance(self, holder):
+        """The subcall reading `holder`'s native balance through Multicall3.getEthBalance."""
+        return self.address, encode_call("getEthBalance(address)", holder)
+
+    def _request(self, calls, block):
+        data = encode_call("aggregate3((address,bool,bytes)[])", [(t, True, d) for t, d in calls])
+        return "eth_call", [{"to": self.address, "data": data}, block_tag(block)]
+
+    def _run(self, chunks, block):
+        replies = self.client.batch([self._request(c, block) for c in chunks])
+        results = []
+        for chunk, reply in zip(chunks, replies):
+            if isinstance(reply, RPCError):
+                if len(chunk) == 1:
+                    raise RPCError(f"eth_call to {chunk[0][0]} through Multicall3 failed: {reply}")
+                half = len(chunk) // 2
+                results.extend(self._run([chunk[:half], chunk[half:]], block))
+                continue
+            results.extend(decode(["(bool,bytes)[]"], reply)[0])
+        return results
+
+    def aggregate(self, calls, block="latest"):
+        """
+        [(success, return data)] of the (target, calldata) `calls`, all read
+        at `block`. A reverting subcall yields success False instead of
+        failing the whole batch.
+        """
+        chunks = [calls[i:i + self.chunk_size] for i in range(0, len(calls), self.chunk_size)]
+        return self._run(chunks, block)
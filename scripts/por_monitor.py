@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Pre-flight proof-of-reserve monitor: predicts when Vault.checkReserve starts
+reverting mints with SYS013.
+
+For every chain's Vault the inputs of checkReserve (reserve_backends.py
+por_inputs: latestRoundData and decimals of chainlinkReserveFeeder,
+uniBTCSupplyFeeder.totalTokenSupply, adequacyRatio and feederHeartbeat)
+are read in one batched pass, all chains concurrently, and the modifier is
+replayed offline with its exact uint256 arithmetic:
+
+    require(updatedAt >= block.timestamp - feederHeartbeat, "SYS013")
+    supply (8 decimals) and reserves brought to the larger of the decimals
+    require(supply * adequacyRatio / 1000 <= reserves, "SYS013")
+
+Per vault the report gives
+
+    passes     whether a mint at the read block passes checkReserve
+    headroom   how much more uniBTC supply (in BTC) the current reserve
+               answer covers; negative when mints already revert
+    stale_in   seconds until the feed is older than feederHeartbeat and
+               every mint reverts until the next round
+
+The check is skipped by the Vault (and reported as disabled) when a feeder
+or adequacyRatio is not set. Exits with status 1 when a vault fails, or is
+within --min-headroom BTC or --min-seconds of failing, so it can drive an
+alert from cron.
+
+Requires: python3 (standard library only)
+Usage: python3 scripts/por_monitor.py [--chain ethereum ...] [--min-headroom 5] [--min-seconds 3600] [--output por.json]
+       python3 scripts/por_monitor.py --mock snapshot.json
+"""
+
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import registry
+from reserve_backends import EVMRPCBackend, MockBackend
+from rpc import RPCError
+
+UINT256 = 2**256
+SUPPLY_DECIMALS = 8
+
+
+class Panic(ArithmeticError):
+    """The replayed arithmetic over- or underflows, which reverts the mint with a panic instead of SYS013."""
+
+
+def _checked(value):
+    if not 0 <= value < UINT256:
+        raise Panic(value)
+    return value
+
+
+def check_reserve(inputs, timestamp):
+    """
+    Replay Vault.checkReserve on `inputs` (por_inputs()) at block.timestamp
+    `timestamp`. Returns {"enabled", "passes", "reason", "supply", "reserves",
+    "max_supply", "headroom", "stale_in"}; amounts in satoshis.
+    """
+    ratio, heartbeat = inputs["adequacy_ratio"], inputs["heartbeat"]
+    out = {"enabled": ratio > 0, "passes": True, "reason": None, "supply": inputs["supply"],
+           "reserves": None, "max_supply": None, "headroom": None,
+           "stale_in": inputs["updated_at"] + heartbeat - timestamp}
+    if not ratio:
+        return out
+    try:
+        if inputs["updated_at"] < _checked(timestamp - heartbeat):
+            out.update(passes=False, reason="stale")
+        # uint256(answer): a negative answer wraps around.
+        reserves, supply = inputs["answer"] % UINT256, inputs["supply"]
+        decimals = inputs["reserve_decimals"]
+        scale = 1
+        if SUPPLY_DECIMALS < decimals:
+            scale = 10**(decimals - SUPPLY_DECIMALS)
+            supply = _checked(supply * scale)
+        elif SUPPLY_DECIMALS > decimals:
+            reserves = _checked(reserves * 10**(SUPPLY_DECIMALS - decimals))
+        if _checked(supply * ratio) // 1000 > reserves and out["passes"]:
+            out.update(passes=False, reason="adequacy")
+    except Panic:
+        if out["passes"]:
+            out.update(passes=False, reason="panic")
+        return out
+    # The largest supply s with s * scale * ratio // 1000 <= reserves.
+    max_supply = (1000 * (reserves + 1) - 1) // (scale * ratio)
+    out.update(reserves=reserves // scale, max_supply=max_supply, headroom=max_supply - inputs["supply"])
+    return out
+
+
+def monitor(chains, backend, workers=16, now=None):
+    """{chain name: por_inputs() plus check_reserve(), None without feeders, or {"error": str}}."""
+    def read(chain):
+        try:
+            inputs = backend.por_inputs(chain.chain_id, chain.vault)
+        except (RPCError, KeyError, ValueError) as e:
+            return {"error": str(e)}
+        if inputs is None:
+            return None
+        timestamp = inputs.get("timestamp") or now or int(time.time())
+        return {**inputs, **check_reserve(inputs, timestamp)}
+
+    chains = [c for c in chains if c.vault]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return dict(zip((c.name for c in chains), executor.map(read, chains)))
+
+
+def alerts(report, min_headroom=0, min_seconds=0):
+    """[(chain, message)] of the vaults that fail checkReserve or are within the margins of failing."""
+    out = []
+    for chain, r in sorted(report.items()):
+        if r is None or not r.get("enabled", True):
+            continue
+        if "error" in r:
+            out.append((chain, f"not read: {r['error']}"))
+        elif not r["passes"]:
+            out.append((chain, f"mints revert ({r['reason']})"))
+        else:
+            if r["headroom"] < min_headroom:
+                out.append((chain, f"headroom {r['headroom'] / 1e8:,.8f} BTC"))
+            if r["stale_in"] < min_seconds:
+                out.append((chain, f"feed stale in {r['stale_in']}s"))
+    return out
+
+
+def print_report(report):
+    print(f"{'Vault PoR':<12} {'supply':>18} {'max supply':>18} {'headroom':>18} {'stale in':>10}  status")
+    for chain, r in sorted(report.items()):
+        if r is None:
+            print(f"{chain:<12} {'no PoR feeders':>18}")
+        elif "error" in r:
+            print(f"{chain:<12} error: {r['error']}")
+        elif not r["enabled"]:
+            print(f"{chain:<12} {'adequacyRatio not set':>18}")
+        else:
+            fmt = (lambda v: f"{v / 1e8:,.8f}" if v is not None else "-")
+            print(f"{chain:<12} {fmt(r['supply']):>18} {fmt(r['max_supply']):>18} {fmt(r['headroom']):>18} "
+                  f"{r['stale_in']:>9}s  {'ok' if r['passes'] else r['reason']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chain", action="append", help="only this chain (repeatable)")
+    parser.add_argument("--mock", help="read the PoR inputs from a reserve_backends.py snapshot instead of RPC")
+    parser.add_argument("--min-headroom", type=float, default=0, help="alert below this headroom, in BTC")
+    parser.add_argument("--min-seconds", type=int, default=0, help="alert this many seconds before the feed goes stale")
+    parser.add_argument("--workers", type=int, default=16, help="chains read concurrently")
+    parser.add_argument("--timeout", type=float, default=15, help="timeout in seconds for each request")
+    parser.add_argument("--output", help="also write the report as JSON to this file")
+    args = parser.parse_args()
+
+    try:
+        chains = [registry.chain(c) for c in args.chain] if args.chain else registry.chains()
+    except KeyError as e:
+        parser.error(f"unknown chain {e}")
+    backend = MockBackend(args.mock) if args.mock else EVMRPCBackend(timeout=args.timeout)
+
+    report = monitor(chains, backend, args.workers)
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    problems = alerts(report, int(args.min_headroom * 10**8), args.min_seconds)
+    for chain, message in problems:
+        sys.stderr.write(f"❌ {chain}: {message}\n")
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
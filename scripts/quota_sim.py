@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Offline simulator of the DelayRedeemRouter redemption quota.
+
+Replays a trace of redemption requests against the integer semantics of
+DelayRedeemRouter, per token:
+
+    _getQuota(t)     min(quotaBases + (t - lastRebaseTimestamps) * quotaRates,
+                         tokenDebts.totalDebts + maxQuotas)
+    createDelayedRedeem(amount) at t
+                     reverts with USR010 unless _getQuota(t) >= amount + totalDebts;
+                     otherwise _rebase (quotaBases = _getQuota(t), lastRebase = t)
+                     and totalDebts += amount * (10000 - redeemFeeRate) / 10000
+    getCurrentCap(t) _getQuota(t) - totalDebts
+
+and sweeps grids of (quotaRates, maxQuotas) to report, for every pair, the
+share of requests that would revert with USR010 and, when rejected
+requests are retried in order as soon as the quota allows (--policy retry),
+how long they wait to be filled. Tokens are independent, so a trace with
+several tokens is simulated per token, and the grid is spread over worker
+processes.
+
+Traces (amounts in uniBTC satoshis, as passed to createDelayedRedeem):
+
+    --trace FILE       CSV with columns timestamp,token,amount
+    --index FILE       a redeem_index.py state file; its DelayedRedeemCreated
+                       history (amount + fee) becomes the trace. It only holds
+                       requests that were accepted at the time.
+    --synthetic N,BTC  N requests per day with an exponential size of mean
+                       BTC, over --days days (seeded by --seed)
+
+Requires: python3 (standard library only)
+Usage: python3 scripts/quota_sim.py --synthetic 40,0.5 --days 30 --daily-caps 10,20,50,100 --max-quotas 5,10,50
+       python3 scripts/quota_sim.py --index ~/.cache/uniBTC/redeem_index/1-0x....json --rates 10000:1157407:50
+"""
+
+import argparse
+import csv
+import json
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+REDEEM_FEE_RATE_RANGE = 10000
+DEFAULT_REDEEM_FEE_RATE = 200
+SECONDS_IN_A_DAY = 86400
+MAX_DAILY_REDEEM_CAP = 100 * 10**8
+MAX_QUOTA_PER_SECOND = MAX_DAILY_REDEEM_CAP // SECONDS_IN_A_DAY
+
+
+class TokenQuota:
+    """Quota state of one token, as stored by DelayRedeemRouter."""
+
+    __slots__ = ("rate", "max_quota", "fee_rate", "base", "last_rebase", "total_debts")
+
+    def __init__(self, rate, max_quota, fee_rate=DEFAULT_REDEEM_FEE_RATE, base=0, last_rebase=0, total_debts=0):
+        self.rate = rate
+        self.max_quota = max_quota
+        self.fee_rate = fee_rate
+        self.base = base
+        self.last_rebase = last_rebase
+        self.total_debts = total_debts
+
+    def quota(self, t):
+        """_getQuota(token) at timestamp `t`."""
+        return min(self.base + (t - self.last_rebase) * self.rate, self.total_debts + self.max_quota)
+
+    def current_cap(self, t):
+        """getCurrentCap(token) at timestamp `t`."""
+        return self.quota(t) - self.total_debts
+
+    def create(self, t, amount):
+        """createDelayedRedeem(token, amount) at `t`; False where the contract reverts with USR010."""
+        quota = self.quota(t)
+        if quota < amount + self.total_debts:
+            return False
+        self.base, self.last_rebase = quota, t
+        if amount:
+            self.total_debts += amount * (REDEEM_FEE_RATE_RANGE - self.fee_rate) // REDEEM_FEE_RATE_RANGE
+        return True
+
+    def earliest(self, t, amount):
+        """First timestamp >= t at which create(amount) succeeds, or None if it never will."""
+        if amount > self.max_quota:
+            return None
+        missing = amount + self.total_debts - self.quota(t)
+        if missing <= 0:
+            return t
+        if self.rate == 0:
+            return None
+        # quota(t') grows by `rate` per second until the maxQuota cap, which amount fits under.
+        return self.last_rebase + -(-(amount + self.total_debts - self.base) // self.rate)
+
+
+def simulate(requests, rate, max_quota, fee_rate=DEFAULT_REDEEM_FEE_RATE, policy="drop", state=None):
+    """
+    Replay `requests` ([(timestamp, amount)], sorted) for one token.
+
+    Every request is sent when it arrives. policy "drop": a rejected
+    request is gone. policy "retry": rejected requests wait in a FIFO queue
+    and the head is sent again at the first second the quota allows it.
+
+    Returns {"requests", "rejected", "unfillable", "filled", "volume", "waits"}:
+    `rejected` counts first attempts that would revert with USR010,
+    `unfillable` requests larger than maxQuota (never accepted), `waits` the
+    seconds each retried request waited (policy "retry").
+    """
+    q = TokenQuota(rate, max_quota, fee_rate, *(state or ()))
+    rejected = unfillable = filled = volume = 0
+    waits = []
+    queue = []
+    head = 0
+
+    def drain(until):
+        nonlocal head, filled, volume
+        while head < len(queue):
+            created, amount = queue[head]
+            at = q.earliest(max(created, q.last_rebase), amount)
+            if at is None or at > until:
+                return
+            q.create(at, amount)
+            waits.append(at - created)
+            filled += 1
+            volume += amount
+            head += 1
+
+    for t, amount in requests:
+        drain(t)
+        if q.create(t, amount):
+            filled += 1
+            volume += amount
+            continue
+        rejected += 1
+        if amount > max_quota:
+            unfillable += 1
+        elif policy == "retry":
+            queue.append((t, amount))
+    if policy == "retry":
+        drain(math.inf)
+    return {"requests": len(requests), "rejected": rejected, "unfillable": unfillable,
+            "filled": filled, "volume": volume, "waits": waits}
+
+
+def _percentile(values, p):
+    if not values:
+        return 0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(p * len(values)))]
+
+
+def summarize(result):
+    waits = result["waits"]
+    n = result["requests"] or 1
+    return {"rejection_rate": result["rejected"] / n, "unfillable": result["unfillable"],
+            "filled": result["filled"], "volume": result["volume"],
+            "wait_mean": sum(waits) / len(waits) if waits else 0,
+            "wait_p50": _percentile(waits, 0.5), "wait_p95": _percentile(waits, 0.95),
+            "wait_max": max(waits) if waits else 0}
+
+
+def _run_grid(job):
+    requests, combos, fee_rate, policy = job
+    return [(rate, max_quota, summarize(simulate(requests, rate, max_quota, fee_rate, policy)))
+            for rate, max_quota in combos]
+
+
+def sweep(requests, rates, max_quotas, fee_rate=DEFAULT_REDEEM_FEE_RATE, policy="drop", workers=None):
+    """
+    summarize(simulate(...)) of `requests` for every (rate, max quota) pair,
+    as [(rate, max_quota, summary)], the grid split across worker processes.
+    """
+    combos = [(r, m) for r in rates for m in max_quotas]
+    workers = workers or 1
+    size = max(1, -(-len(combos) // (workers * 4)))
+    jobs = [(requests, combos[i:i + size], fee_rate, policy) for i in range(0, len(combos), size)]
+    if workers == 1:
+        return [row for job in jobs for row in _run_grid(job)]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return [row for rows in executor.map(_run_grid, jobs) for row in rows]
+
+
+# --- traces ---------------------------------------------------------------
+
+def load_csv(path):
+    """{token: [(timestamp, amount)]} from a timestamp,token,amount CSV."""
+    trace = {}
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            trace.setdefault(row["token"].lower(), []).append((int(row["timestamp"]), int(row["amount"])))
+    return {token: sorted(requests) for token, requests in trace.items()}
+
+
+def load_index(path):
+    """{token: [(createdAt, amount + fee)]} of every redeem in a redeem_index.py state file."""
+    with open(path) as f:
+        state = json.load(f)
+    trace = {}
+    for queue in state["users"].values():
+        for amount, created, token, fee in queue["redeems"]:
+            trace.setdefault(token, []).append((created, amount + fee))
+    return {token: sorted(requests) for token, requests in trace.items()}
+
+
+def synthetic(per_day, mean_amount, days, start=0, seed=0):
+    """Poisson arrivals of `per_day` requests a day with exponential sizes of mean `mean_amount`."""
+    rnd = random.Random(seed)
+    requests, t, end = [], start, start + days * SECONDS_IN_A_DAY
+    while True:
+        t += rnd.expovariate(per_day / SECONDS_IN_A_DAY)
+        if t >= end:
+            return requests
+        requests.append((int(t), max(1, int(rnd.expovariate(1 / mean_amount)))))
+
+
+def _grid(spec, scale=1):
+    """Values from "a,b,c" or "start:stop:count" (inclusive, evenly spaced), times `scale`."""
+    if ":" in spec:
+        lo, hi, n = spec.split(":")
+        lo, hi, n = float(lo), float(hi), int(n)
+        return sorted({int((lo + (hi - lo) * i / max(n - 1, 1)) * scale) for i in range(n)})
+    return [int(float(v) * scale) for v in spec.split(",")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    trace = parser.add_mutually_exclusive_group(required=True)
+    trace.add_argument("--trace", help="CSV trace (timestamp,token,amount)")
+    trace.add_argument("--index", help="redeem_index.py state file")
+    trace.add_argument("--synthetic", help="N,BTC: N requests a day of mean size BTC")
+    parser.add_argument("--days", type=float, default=30, help="length of the synthetic trace")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the synthetic trace")
+    parser.add_argument("--token", action="append", help="only simulate this token (repeatable)")
+    rates = parser.add_mutually_exclusive_group(required=True)
+    rates.add_argument("--rates", help="quotaRates in satoshi/second: a,b,c or start:stop:count")
+    rates.add_argument("--daily-caps", help="daily caps in BTC (rate = cap * 10^8 / 86400): a,b,c or start:stop:count")
+    parser.add_argument("--max-quotas", required=True, help="maxQuotas in BTC: a,b,c or start:stop:count")
+    parser.add_argument("--fee-rate", type=int, default=DEFAULT_REDEEM_FEE_RATE, help="redeemFeeRate (10000 = 100%%)")
+    parser.add_argument("--policy", choices=("drop", "retry"), default="retry")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per CPU)")
+    parser.add_argument("--top", type=int, default=20, help="rows to print per token")
+    parser.add_argument("--output", help="write every row as CSV to this file")
+    args = parser.parse_args()
+
+    if args.trace:
+        traces = load_csv(args.trace)
+    elif args.index:
+        traces = load_index(args.index)
+    else:
+        per_day, mean = args.synthetic.split(",")
+        traces = {"synthetic": synthetic(float(per_day), float(mean) * 10**8, args.days, seed=args.seed)}
+    if args.token:
+        traces = {t: r for t, r in traces.items() if t in {x.lower() for x in args.token}}
+    if not traces:
+        parser.error("the trace has no requests")
+
+    rate_grid = _grid(args.rates) if args.rates else [c // SECONDS_IN_A_DAY for c in _grid(args.daily_caps, 10**8)]
+    quota_grid = _grid(args.max_quotas, 10**8)
+    too_fast = [r for r in rate_grid if r > MAX_QUOTA_PER_SECOND]
+    too_big = [m for m in quota_grid if m >= MAX_DAILY_REDEEM_CAP]
+    if too_fast or too_big:
+        parser.error("setQuotaRates / setMaxQuotaForTokens would revert with USR013 for "
+                     f"rates {too_fast} / max quotas {too_big}")
+
+    workers = args.workers or os.cpu_count() or 1
+    rows = []
+    for token, requests in sorted(traces.items()):
+        started = time.monotonic()
+        results = sweep(requests, rate_grid, quota_grid, args.fee_rate, args.policy, workers)
+        elapsed = time.monotonic() - started
+        span = (requests[-1][0] - requests[0][0]) / SECONDS_IN_A_DAY if requests else 0
+        print(f"\n{token}: {len(requests)} requests over {span:.1f} days, "
+              f"{len(results)} parameter sets in {elapsed:.2f}s")
+        print(f"{'daily cap':>10} {'max quota':>10} {'USR010':>8} {'unfill':>6} "
+              f"{'wait mean':>10} {'wait p95':>10} {'wait max':>10}")
+        results.sort(key=lambda r: (r[2]["rejection_rate"], r[2]["wait_p95"], r[0], r[1]))
+        for rate, max_quota, s in results[:args.top]:
+            print(f"{rate * SECONDS_IN_A_DAY / 1e8:>10.2f} {max_quota / 1e8:>10.2f} {s['rejection_rate']:>8.2%} "
+                  f"{s['unfillable']:>6} {s['wait_mean'] / 3600:>9.1f}h {s['wait_p95'] / 3600:>9.1f}h "
+                  f"{s['wait_max'] / 3600:>9.1f}h")
+        rows.extend({"token": token, "rate": rate, "max_quota": max_quota, **s} for rate, max_quota, s in results)
+
+    if args.output:
+        with open(args.output, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+
+
+if __name__ == "__main__":
+    main()
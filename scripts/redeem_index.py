@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Event-sourced index of DelayRedeemRouter redemption queues.
+
+getClaimableUserDelayedRedeems(user) walks one user's delayedRedeems array
+per call. This indexer rebuilds every queue from the router's logs instead:
+
+    DelayedRedeemCreated               appends (amount, createdAt, token, fee)
+                                       to the recipient's queue; createdAt is
+                                       the timestamp of the block it was mined in
+    DelayedRedeemsCompleted            moves the recipient's
+    DelayedRedeemsPrincipalCompleted   delayedRedeemsCompleted cursor
+    DelayedRedeemsClaimed              adds to the recipient's claimed totals
+
+Logs are fetched in --range block windows, all windows of a sync in one
+JSON-RPC batch, up to --confirmations blocks below the head.
+
+Every pending redemption also sits in one global min-heap keyed by
+createdAt. redeemDelay and redeemPrincipalDelay are global, so ordering by
+createdAt is ordering by maturity (createdAt + delay), and the heap stays
+valid when the delays change. Completed entries are dropped lazily when
+they reach the top, and maturing(start, end) walks only the heap nodes
+that mature before `end`, so "everything maturing in the next hour" costs
+O(k + log n) for k results instead of one eth_call per user.
+
+The index is saved to <state-dir>/<chain id>-<router>.json after each sync.
+
+Requires: python3 (standard library only)
+Usage: python3 scripts/redeem_index.py --chain <name|chain id> [--within 3600] [--user 0x...]
+       python3 scripts/redeem_index.py --rpc http://127.0.0.1:8545 --router 0x... --from-block 0
+"""
+
+import argparse
+import heapq
+import json
+import os
+import sys
+import time
+
+import registry
+from abi import decode, decode_uint, encode_call
+from atomic_file import atomic_write
+from keccak import keccak_hex
+from multicall import block_tag, get_logs
+from rpc import RPCClient, RPCError, check_batch
+
+DEFAULT_STATE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "uniBTC", "redeem_index")
+
+EVENTS = {
+    keccak_hex("DelayedRedeemCreated(address,address,uint256,uint256,uint256)"):
+        ("DelayedRedeemCreated", ["address", "address", "uint256", "uint256", "uint256"]),
+    keccak_hex("DelayedRedeemsClaimed(address,address,uint256)"):
+        ("DelayedRedeemsClaimed", ["address", "address", "uint256"]),
+    keccak_hex("DelayedRedeemsCompleted(address,uint256,uint256,uint256)"):
+        ("DelayedRedeemsCompleted", ["address", "uint256", "uint256", "uint256"]),
+    keccak_hex("DelayedRedeemsPrincipalCompleted(address,uint256,uint256,uint256)"):
+        ("DelayedRedeemsPrincipalCompleted", ["address", "uint256", "uint256", "uint256"]),
+}
+
+
+class RedeemIndex:
+    """
+    Queues of one router. A queue is {"redeems": [[amount, createdAt, token,
+    fee], ...], "completed": delayedRedeemsCompleted, "claimed": {token:
+    amount sent}}, exactly the on-chain delayedRedeems array plus cursor.
+    """
+
+    def __init__(self, router, redeem_delay=0, principal_delay=0):
+        self.router = router.lower()
+        self.block = None              # last block applied
+        self.redeem_delay = redeem_delay
+        self.principal_delay = principal_delay
+        self.users = {}
+        self.heap = []                 # (createdAt, user, index) of pending redeems
+
+    # --- ingestion --------------------------------------------------------
+
+    def _queue(self, user):
+        return self.users.setdefault(user, {"redeems": [], "completed": 0, "claimed": {}})
+
+    def apply(self, name, args, timestamp):
+        """Apply one decoded event, in log order."""
+        user = args[0]
+        queue = self._queue(user)
+        if name == "DelayedRedeemCreated":
+            _, token, amount, index, fee = args
+            if index != len(queue["redeems"]):
+                raise ValueError(f"DelayedRedeemCreated index {index} of {user}, expected {len(queue['redeems'])}")
+            queue["redeems"].append([amount, timestamp, token, fee])
+            heapq.heappush(self.heap, (timestamp, user, index))
+        elif name == "DelayedRedeemsClaimed":
+            queue["claimed"][args[1]] = queue["claimed"].get(args[1], 0) + args[2]
+        else:
+            # Both completion events carry the new delayedRedeemsCompleted.
+            queue["completed"] = args[2]
+        self._drop_completed()
+
+    def _drop_completed(self):
+        while self.heap:
+            _, user, index = self.heap[0]
+            if index >= self.users[user]["completed"]:
+                break
+            heapq.heappop(self.heap)
+
+    def _rebuild_heap(self):
+        self.heap = [(r[1], user, i) for user, q in self.users.items()
+                     for i, r in enumerate(q["redeems"]) if i >= q["completed"]]
+        heapq.heapify(self.heap)
+
+    # --- queries ----------------------------------------------------------
+
+    def pending(self, user):
+        """[(index, amount, createdAt, token, fee)] of `user`'s unclaimed redeems (getUserDelayedRedeems)."""
+        queue = self.users.get(user.lower())
+        if queue is None:
+            return []
+        return [(i, *r) for i, r in enumerate(queue["redeems"]) if i >= queue["completed"]]
+
+    def claimable(self, user, now, principal=False):
+        """
+        The redeems claimDelayedRedeems() (or claimPrincipals() with
+        principal=True) would pay out at `now`: the matured prefix of the
+        pending queue, as getClaimableUserDelayedRedeems returns it.
+        """
+        delay = self.principal_delay if principal else self.redeem_delay
+        out = []
+        for entry in self.pending(user):
+            if now < entry[2] + delay:
+                break
+            out.append(entry)
+        return out
+
+    def maturing(self, start, end, principal=False):
+        """
+        [(maturity, user, index, amount, token)] of every pending redeem whose
+        maturity (createdAt + delay) is in [start, end), soonest first.
+        """
+        delay = self.principal_delay if principal else self.redeem_delay
+        out, stack = [], [0] if self.heap else []
+        while stack:
+            i = stack.pop()
+            created, user, index = self.heap[i]
+            if created + delay >= end:
+                continue  # the whole subtree matures later
+            queue = self.users[user]
+            if index >= queue["completed"] and created + delay >= start:
+                amount, _, token, _ = queue["redeems"][index]
+                out.append((created + delay, user, index, amount, token))
+            stack.extend(c for c in (2 * i + 1, 2 * i + 2) if c < len(self.heap))
+        return sorted(out)
+
+    def debts(self):
+        """{token: amount} still owed to users, i.e. the sum of pending redeem amounts."""
+        out = {}
+        for q in self.users.values():
+            for amount, _, token, _ in q["redeems"][q["completed"]:]:
+                out[token] = out.get(token, 0) + amount
+        return out
+
+    # --- persistence ------------------------------------------------------
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        state = {"router": self.router, "block": self.block, "redeem_delay": self.redeem_delay,
+                 "principal_delay": self.principal_delay, "users": self.users}
+        atomic_write(path, json.dumps(state, separators=(",", ":")).encode())
+
+    @classmethod
+    def load(cls, path, router):
+        """The saved index of `router`, or a fresh one if there is none."""
+        try:
+            with open(path) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return cls(router)
+        if state.get("router") != router.lower():
+            return cls(router)
+        index = cls(router, state["redeem_delay"], state["principal_delay"])
+        index.block = state["block"]
+        index.users = state["users"]
+        index._rebuild_heap()
+        return index
+
+
+def fetch_logs(client, router, start, end, max_range=5000, events=EVENTS):
+    """Router logs of `events` (default: the indexed ones) in [start, end], in chain order."""
+    return get_logs(client, router, [list(events)], start, end, max_range)
+
+
+def fetch_timestamps(client, blocks):
+    """{block: timestamp} of `blocks`, in one batch; raises RPCError if any header cannot be read."""
+    blocks = sorted(blocks)
+    results = client.batch([("eth_getBlockByNumber", [hex(b), False]) for b in blocks])
+    out = {}
+    for block, result in zip(blocks, results):
+        if isinstance(result, RPCError) or result is None:
+            raise RPCError(f"block {block}: {result}")
+        out[block] = int(result["timestamp"], 16)
+    return out
+
+
+def sync(client, index, start=0, confirmations=12, max_range=5000):
+    """Apply every indexed log from the last applied block (or `start`) to head - confirmations."""
+    end = int(client.call("eth_blockNumber"), 16) - confirmations
+    first = start if index.block is None else index.block + 1
+    if end < first:
+        return 0
+    logs = fetch_logs(client, index.router, first, end, max_range)
+    created = [int(log["blockNumber"], 16) for log in logs if EVENTS[log["topics"][0]][0] == "DelayedRedeemCreated"]
+    timestamps = fetch_timestamps(client, set(created)) if created else {}
+    for log in logs:
+        name, types = EVENTS[log["topics"][0]]
+        args = decode(types, log["data"])
+        index.apply(name, args, timestamps.get(int(log["blockNumber"], 16)))
+
+    delays = check_batch(client.batch([("eth_call", [{"to": index.router, "data": encode_call(sig)}, block_tag(end)])
+                                       for sig in ("redeemDelay()", "redeemPrincipalDelay()")]),
+                         f"reading the delays of {index.router}")
+    index.redeem_delay, index.principal_delay = (decode_uint(r) for r in delays)
+    index.block = end
+    return len(logs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chain", help="registry chain (name or chain id) to read the router and RPC from")
+    parser.add_argument("--rpc", help="RPC URL (overrides the registry)")
+    parser.add_argument("--router", help="DelayRedeemRouter address (overrides the registry)")
+    parser.add_argument("--from-block", type=int, help="first block to index (default: the registry start block)")
+    parser.add_argument("--state-dir", default=DEFAULT_STATE_DIR, help=f"index directory (default {DEFAULT_STATE_DIR})")
+    parser.add_argument("--confirmations", type=int, default=12, help="blocks below the head left unindexed")
+    parser.add_argument("--range", type=int, default=5000, help="blocks per eth_getLogs request")
+    parser.add_argument("--within", type=int, default=3600, help="list redeems maturing in the next N seconds")
+    parser.add_argument("--principal", action="store_true", help="use redeemPrincipalDelay instead of redeemDelay")
+    parser.add_argument("--user", action="append", help="print the pending and claimable redeems of this user")
+    args = parser.parse_args()
+
+    chain = None
+    if args.chain:
+        try:
+            chain = registry.chain(args.chain)
+        except KeyError:
+            parser.error(f"unknown chain {args.chain}")
+    rpc = args.rpc or (chain.rpc if chain else None)
+    router = args.router or (chain.redeem_router if chain else None)
+    if not rpc or not router:
+        parser.error("need --chain with a redeem router in the registry, or --rpc and --router")
+    start = args.from_block if args.from_block is not None else (chain.start_block if chain else 0)
+
+    client = RPCClient(rpc, timeout=60)
+    try:
+        chain_id = int(client.call("eth_chainId"), 16)
+        path = os.path.join(args.state_dir, f"{chain_id}-{router.lower()}.json")
+        index = RedeemIndex.load(path, router)
+        count = sync(client, index, start, args.confirmations, args.range)
+        now = int(client.call("eth_getBlockByNumber", ["latest", False])["timestamp"], 16)
+    except (RPCError, ValueError) as e:
+        sys.exit(f"❌ {e}")
+    index.save(path)
+
+    pending = sum(len(q["redeems"]) - q["completed"] for q in index.users.values())
+    print(f"Indexed {count} new events up to block {index.block}: {len(index.users)} users, {pending} pending redeems")
+    for token, amount in sorted(index.debts().items()):
+        print(f"   owed {token}: {amount}")
+    soon = index.maturing(now, now + args.within, args.principal)
+    print(f"\n{len(soon)} redeems mature in the next {args.within}s:")
+    for maturity, user, i, amount, token in soon:
+        print(f"   {time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(maturity))}  {user} #{i}  {amount} {token}")
+    for user in args.user or []:
+        claimable = index.claimable(user, now, args.principal)
+        print(f"\n{user}: {len(index.pending(user))} pending, {len(claimable)} claimable now")
+        for i, amount, created, token, fee in claimable:
+            print(f"   #{i}  {amount} {token} (fee {fee})")
+
+
+if __name__ == "__main__":
+    main()
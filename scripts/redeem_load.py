@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Load generator and throughput benchmark for DelayRedeemRouter on a local
+chain (anvil or ganache).
+
+provision() makes --users accounts the node signs for (anvil_impersonateAccount,
+or evm_addAccount + personal_unlockAccount on ganache), gives them gas money
+and uniBTC, has each approve the router and whitelists them all in one call.
+Every setup step is a single JSON-RPC batch of eth_sendTransaction.
+
+run() then fires traffic at --rate transactions per second for --duration
+seconds, with arrivals drawn from
+
+    poisson   exponential gaps (independent users)
+    uniform   a fixed gap of 1 / rate
+    burst     --burst transactions at once, every --burst / rate seconds
+
+Each arrival picks a random user and, with probability --claim-ratio, sends
+claimDelayedRedeems(), otherwise createDelayedRedeem() of a random
+btclisted token and amount. Submissions are asynchronous; every user has a
+local nonce counter, so a user's transactions are pipelined without waiting
+for receipts. Gas limits are fixed so the node does not estimate (and
+reject) transactions against a state that is about to change.
+
+The report gives the achieved (mined) tx/s, the share of transactions
+reverted or rejected per error code (USR010 quota exceeded, SYS003 token
+not redeemable, USR015 vault short of liquidity, ...), p50/p99 confirmation
+latency (measured to the receipt poll, so --poll bounds its resolution),
+and how many createDelayedRedeem calls were mined per block before the
+first USR010. The code of a reverted receipt is found by replaying the call
+at the block before, which can differ from the mined outcome when earlier
+transactions of the same block changed the state.
+
+contracts/scripts/redeem_load.py deploys a fresh router stack and runs this
+against it.
+
+Requires: python3 (standard library only)
+Usage: python3 scripts/redeem_load.py --rpc http://127.0.0.1:8545 --router 0x... --uni-btc 0x... --admin 0x... --token 0x... [--users 50] [--rate 20] [--duration 60]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import sys
+import time
+
+from abi import decode_address, decode_uint, encode_call
+from keccak import keccak_hex
+from rpc import AsyncConnectionPool, AsyncRPCClient, RPCClient, RPCError
+
+ERROR_CODE = re.compile(r"\b([A-Z]{3}\d{3})\b")
+CREATE_GAS = 400_000
+CLAIM_GAS = 3_000_000
+SETUP_GAS = 1_000_000
+GAS_MONEY = 10**20
+
+
+def error_code(message):
+    """The router's error code (USR010, SYS003, ...) in a revert message, or "other"."""
+    match = ERROR_CODE.search(str(message))
+    return match.group(1) if match else "other"
+
+
+def user_addresses(count, seed="uniBTC-load"):
+    return [f"0x{keccak_hex(f'{seed}-{i}'.encode())[-40:]}" for i in range(count)]
+
+
+def _unlock(client, address):
+    """Let the node sign for `address`: anvil impersonation, else a ganache account without passphrase."""
+    try:
+        client.call("anvil_impersonateAccount", [address])
+        client.call("anvil_setBalance", [address, hex(GAS_MONEY)])
+        return
+    except RPCError:
+        pass
+    client.call("evm_addAccount", [address, ""])
+    client.call("personal_unlockAccount", [address, "", 0])
+    client.call("evm_setAccountBalance", [address, hex(GAS_MONEY)])
+
+
+def submit(client, txs, timeout=120, poll=0.2):
+    """Send the (from, to, data) `txs` in one batch with per-sender consecutive nonces; wait for all receipts."""
+    nonces = {}
+    for sender in {tx[0] for tx in txs}:
+        nonces[sender] = int(client.call("eth_getTransactionCount", [sender, "pending"]), 16)
+    calls = []
+    for sender, to, data in txs:
+        calls.append(("eth_sendTransaction", [{"from": sender, "to": to, "data": data, "gas": hex(SETUP_GAS),
+                                               "nonce": hex(nonces[sender])}]))
+        nonces[sender] += 1
+    hashes = client.batch(calls)
+    for h in hashes:
+        if isinstance(h, RPCError):
+            raise RPCError(f"setup transaction rejected: {h}")
+    deadline = time.time() + timeout
+    while True:
+        receipts = client.batch([("eth_getTransactionReceipt", [h]) for h in hashes])
+        if all(isinstance(r, dict) for r in receipts):
+            break
+        if time.time() > deadline:
+            raise RPCError(f"setup transactions still pending after {timeout}s")
+        time.sleep(poll)
+    for r in receipts:
+        if int(r["status"], 16) != 1:
+            raise RPCError(f"setup transaction {r['transactionHash']} reverted")
+    return receipts
+
+
+def provision(client, router, uni_btc, admin, count, balance, seed="uniBTC-load"):
+    """`count` unlocked, whitelisted users holding `balance` uniBTC each and approved for the router."""
+    users = user_addresses(count, seed)
+    for user in users:
+        _unlock(client, user)
+    submit(client, [(admin, uni_btc, encode_call("mint(address,uint256)", user, balance)) for user in users])
+    submit(client, [(user, uni_btc, encode_call("approve(address,uint256)", router, 2**256 - 1)) for user in users]
+           + [(admin, router, encode_call("addToWhitelist(address[])", users))])
+    return users
+
+
+def arrivals(kind, rate, burst=10, rng=random):
+    """Endless gaps in seconds before each arrival."""
+    while True:
+        if kind == "poisson":
+            yield rng.expovariate(rate)
+        elif kind == "uniform":
+            yield 1 / rate
+        else:
+            yield burst / rate
+            for _ in range(burst - 1):
+                yield 0
+
+
+class LoadStats:
+    """What run() observed; summary() turns it into the report."""
+
+    def __init__(self):
+        self.sent = []          # (kind, submitted at, hash, transaction)
+        self.rejected = {}      # code: count, refused at submission
+        self.reverted = {}      # code: count, mined with status 0
+        self.latencies = []
+        self.creates_by_block = {}
+        self.first_quota_block = None
+        self.mined = 0
+        self.started = self.finished = None
+
+    def summary(self):
+        elapsed = (self.finished - self.started) or 1
+        total = len(self.sent) + sum(self.rejected.values())
+        latencies = sorted(self.latencies)
+
+        def pct(p):
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))] if latencies else None
+
+        before = [n for b, n in sorted(self.creates_by_block.items())
+                  if self.first_quota_block is None or b < self.first_quota_block]
+        codes = set(self.rejected) | set(self.reverted)
+        return {"submitted": total, "mined": self.mined, "elapsed": elapsed, "tx_per_s": self.mined / elapsed,
+                "revert_rate": {c: (self.rejected.get(c, 0) + self.reverted.get(c, 0)) / (total or 1)
+                                for c in sorted(codes)},
+                "rejected": self.rejected, "reverted": self.reverted,
+                "latency_p50": pct(0.5), "latency_p99": pct(0.99),
+                "creates_per_block_max": max(before, default=0),
+                "creates_per_block_mean": sum(before) / len(before) if before else 0,
+                "first_quota_block": self.first_quota_block}
+
+
+async def _send(client, stats, lock, nonces, user, kind, to, data, gas):
+    # The lock keeps a user's nonces in submission order. A rejected transaction usually does not
+    # use its nonce, but a timed out one may have reached the pool, so the node is asked again.
+    async with lock:
+        tx = {"from": user, "to": to, "data": data, "gas": hex(gas), "nonce": hex(nonces[user])}
+        submitted = time.monotonic()
+        try:
+            h = await client.call("eth_sendTransaction", [tx])
+        except RPCError as e:
+            code = error_code(e)
+            stats.rejected[code] = stats.rejected.get(code, 0) + 1
+            try:
+                nonces[user] = int(await client.call("eth_getTransactionCount", [user, "pending"]), 16)
+            except RPCError:
+                pass
+            return
+        nonces[user] += 1
+    stats.sent.append((kind, submitted, h, tx))
+
+
+async def _watch(client, stats, done, poll):
+    pending = {}
+    seen = 0
+    while True:
+        for kind, submitted, h, tx in stats.sent[seen:]:
+            pending[h] = (kind, submitted, tx)
+        seen = len(stats.sent)
+        if not pending and done.is_set():
+            return
+        hashes = list(pending)
+        receipts = await client.batch([("eth_getTransactionReceipt", [h]) for h in hashes])
+        now = time.monotonic()
+        failed = []
+        for h, r in zip(hashes, receipts):
+            if not isinstance(r, dict):
+                continue
+            kind, submitted, tx = pending.pop(h)
+            stats.latencies.append(now - submitted)
+            stats.mined += 1
+            block = int(r["blockNumber"], 16)
+            if int(r["status"], 16) == 1:
+                if kind == "create":
+                    stats.creates_by_block[block] = stats.creates_by_block.get(block, 0) + 1
+            else:
+                failed.append((kind, block, tx))
+        if failed:
+            replays = await client.batch([("eth_call", [{k: tx[k] for k in ("from", "to", "data", "gas")},
+                                                        hex(block - 1)]) for _, block, tx in failed])
+            for (kind, block, _), result in zip(failed, replays):
+                code = error_code(result) if isinstance(result, RPCError) else "other"
+                stats.reverted[code] = stats.reverted.get(code, 0) + 1
+                if kind == "create" and code == "USR010" and \
+                        (stats.first_quota_block is None or block < stats.first_quota_block):
+                    stats.first_quota_block = block
+        await asyncio.sleep(poll)
+
+
+async def run(url, router, users, tokens, rate, duration, kind="poisson", burst=10, claim_ratio=0.1,
+              amounts=(10**5, 5 * 10**6), seed=0, poll=0.2, in_flight=64):
+    """Drive the traffic described in the module docstring and return its LoadStats."""
+    rng = random.Random(seed)
+    pool = AsyncConnectionPool(per_host=in_flight)
+    client = AsyncRPCClient(url, pool, deadline=60)
+    counts = await client.batch([("eth_getTransactionCount", [u, "pending"]) for u in users])
+    nonces = {u: int(c, 16) for u, c in zip(users, counts)}
+    locks = {u: asyncio.Lock() for u in users}
+    stats, done = LoadStats(), asyncio.Event()
+    watcher = asyncio.create_task(_watch(client, stats, done, poll))
+
+    tasks = []
+    stats.started = time.monotonic()
+    gaps = arrivals(kind, rate, burst, rng)
+    next_at = stats.started
+    while True:
+        next_at += next(gaps)
+        if next_at - stats.started >= duration:
+            break
+        await asyncio.sleep(max(0, next_at - time.monotonic()))
+        user = rng.choice(users)
+        if rng.random() < claim_ratio:
+            call = ("claim", router, encode_call("claimDelayedRedeems()"), CLAIM_GAS)
+        else:
+            amount = rng.randint(*amounts)
+            call = ("create", router, encode_call("createDelayedRedeem(address,uint256)", rng.choice(tokens), amount),
+                    CREATE_GAS)
+        tasks.append(asyncio.create_task(_send(client, stats, locks[user], nonces, user, *call)))
+    await asyncio.gather(*tasks)
+    done.set()
+    await watcher
+    stats.finished = time.monotonic()
+    pool.close()
+    return stats
+
+
+def report(summary):
+    print(f"{summary['submitted']} submitted, {summary['mined']} mined in {summary['elapsed']:.1f}s: "
+          f"{summary['tx_per_s']:.1f} tx/s")
+    for code, share in summary["revert_rate"].items():
+        print(f"   {code}  {share:.1%}  (rejected {summary['rejected'].get(code, 0)}, "
+              f"reverted {summary['reverted'].get(code, 0)})")
+    if summary["latency_p50"] is not None:
+        print(f"   confirmation latency p50 {summary['latency_p50']:.2f}s  p99 {summary['latency_p99']:.2f}s")
+    print(f"   createDelayedRedeem per block before quota exhaustion: max {summary['creates_per_block_max']}, "
+          f"mean {summary['creates_per_block_mean']:.1f} (first USR010 in block {summary['first_quota_block']})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rpc", default="http://127.0.0.1:8545", help="local node RPC URL")
+    parser.add_argument("--router", required=True, help="DelayRedeemRouter address")
+    parser.add_argument("--uni-btc", help="uniBTC address (default: read from the router)")
+    parser.add_argument("--admin", required=True, help="unlocked account holding the router admin and uniBTC minter roles")
+    parser.add_argument("--token", action="append", required=True, help="btclisted token to redeem (repeatable)")
+    parser.add_argument("--users", type=int, default=50, help="accounts to provision")
+    parser.add_argument("--balance", type=int, default=1000 * 10**8, help="uniBTC minted to each account")
+    parser.add_argument("--rate", type=float, default=20, help="transactions per second")
+    parser.add_argument("--duration", type=float, default=60, help="seconds of traffic")
+    parser.add_argument("--arrivals", choices=("poisson", "uniform", "burst"), default="poisson")
+    parser.add_argument("--burst", type=int, default=10, help="transactions per burst with --arrivals burst")
+    parser.add_argument("--claim-ratio", type=float, default=0.1, help="share of arrivals that claim")
+    parser.add_argument("--min-amount", type=int, default=10**5, help="smallest redeem, in uniBTC units")
+    parser.add_argument("--max-amount", type=int, default=5 * 10**6, help="largest redeem, in uniBTC units")
+    parser.add_argument("--seed", type=int, default=0, help="random seed of the traffic")
+    parser.add_argument("--poll", type=float, default=0.2, help="seconds between receipt polls")
+    parser.add_argument("--output", help="write the summary to this JSON file")
+    args = parser.parse_args()
+    if args.rate <= 0 or args.duration <= 0:
+        parser.error("--rate and --duration must be positive")
+
+    client = RPCClient(args.rpc, timeout=60)
+    try:
+        uni_btc = args.uni_btc or decode_address(decode_uint(
+            client.call("eth_call", [{"to": args.router, "data": encode_call("uniBTC()")}, "latest"])))
+        users = provision(client, args.router, uni_btc, args.admin, args.users, args.balance)
+        stats = asyncio.run(run(args.rpc, args.router, users, [t.lower() for t in args.token], args.rate,
+                                args.duration, args.arrivals, args.burst, args.claim_ratio,
+                                (args.min_amount, args.max_amount), args.seed, args.poll))
+    except (RPCError, OSError) as e:
+        sys.exit(f"❌ {e}")
+    summary = stats.summary()
+    report(summary)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
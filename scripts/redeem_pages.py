@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Page-by-page reader of DelayRedeemRouter redemption queues.
+
+userRedeems, getUserDelayedRedeems and getClaimableUserDelayedRedeems return
+whole arrays, so one eth_call per user grows with the user's history until
+it hits the endpoint's gas cap or response size limit. This client reads
+the bounded variants instead:
+
+    userRedeemsPage(user, offset, limit)
+        -> (delayedRedeemsCompleted, length, records[offset:offset + limit])
+    getUserDelayedRedeemsPage(user, offset, limit)
+    getClaimableUserDelayedRedeemsPage(user, offset, limit)
+
+Every page of every user is one subcall of a Multicall3 aggregate3, all
+read at one block so the pages form a consistent snapshot:
+
+  - history(): one round of userRedeemsPage(user, 0, 0) learns every
+    user's length, then all pages of all users are requested together and
+    yielded in waves of `wave` pages, so memory stays bounded by a wave.
+  - claimable(): the claimable prefix has no length to read up front, so
+    each round asks every unfinished user for their next page; a short page
+    ends that user.
+
+Requires: python3 (standard library only)
+Usage: python3 scripts/redeem_pages.py --chain <name|chain id> --user 0x... [--user 0x...] [--pending | --claimable]
+       python3 scripts/redeem_pages.py --rpc http://127.0.0.1:8545 --router 0x... --multicall 0x... --users users.txt
+"""
+
+import argparse
+import sys
+
+import registry
+from abi import decode, encode_call
+from multicall import MULTICALL3, Multicall
+from rpc import RPCClient, RPCError
+
+RECORD = "(uint224,uint32,address)"
+HISTORY_PAGE = "userRedeemsPage(address,uint256,uint256)"
+CLAIMABLE_PAGE = "getClaimableUserDelayedRedeemsPage(address,uint256,uint256)"
+
+
+def _pinned(multicall, block):
+    if isinstance(block, int):
+        return block
+    return int(multicall.client.call("eth_getBlockByNumber", [block, False])["number"], 16)
+
+
+def _aggregate(multicall, router, signature, calls, block):
+    """Return data of `signature` called with each argument tuple of `calls` on `router` at `block`."""
+    results = multicall.aggregate([(router, encode_call(signature, *args)) for args in calls], block)
+    for args, (success, data) in zip(calls, results):
+        if not success:
+            raise RPCError(f"{signature.split('(')[0]} reverted for {args[0]}")
+        yield data
+
+
+def lengths(multicall, router, users, block):
+    """{user: (delayedRedeemsCompleted, length of delayedRedeems)} at `block`."""
+    out = {}
+    replies = _aggregate(multicall, router, HISTORY_PAGE, [(user, 0, 0) for user in users], block)
+    for user, data in zip(users, replies):
+        completed, total, _ = decode(["uint256", "uint256", RECORD + "[]"], data)
+        out[user] = (completed, total)
+    return out
+
+
+def history(multicall, router, users, page_size=500, pending=False, block="latest", wave=2000):
+    """
+    Yield (user, index, amount, createdAt, token, completed) for every
+    redeem of `users` at `block`, each user's in index order. completed
+    tells whether the redeem was already claimed; pending=True skips those.
+    """
+    block = _pinned(multicall, block)
+    pages = []
+    for user, (completed, total) in lengths(multicall, router, users, block).items():
+        first = completed if pending else 0
+        pages.extend((user, offset, completed) for offset in range(first, total, page_size))
+    for i in range(0, len(pages), wave):
+        batch = pages[i:i + wave]
+        replies = _aggregate(multicall, router, HISTORY_PAGE, [(u, offset, page_size) for u, offset, _ in batch], block)
+        for (user, offset, completed), data in zip(batch, replies):
+            for j, (amount, created, token) in enumerate(decode(["uint256", "uint256", RECORD + "[]"], data)[2]):
+                yield user, offset + j, amount, created, token, offset + j < completed
+
+
+def claimable(multicall, router, users, page_size=500, block="latest"):
+    """{user: [(amount, createdAt, token)]} of the redeems each user could claim at `block`."""
+    block = _pinned(multicall, block)
+    out = {user: [] for user in users}
+    active = list(users)
+    while active:
+        replies = _aggregate(multicall, router, CLAIMABLE_PAGE,
+                             [(user, len(out[user]), page_size) for user in active], block)
+        unfinished = []
+        for user, data in zip(active, replies):
+            page = decode([RECORD + "[]"], data)[0]
+            out[user].extend(page)
+            if len(page) == page_size:
+                unfinished.append(user)
+        active = unfinished
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chain", help="registry chain (name or chain id) to read the router and RPC from")
+    parser.add_argument("--rpc", help="RPC URL (overrides the registry)")
+    parser.add_argument("--router", help="DelayRedeemRouter address (overrides the registry)")
+    parser.add_argument("--multicall", default=MULTICALL3, help=f"Multicall3 address (default {MULTICALL3})")
+    parser.add_argument("--user", action="append", default=[], help="user to read (repeatable)")
+    parser.add_argument("--users", help="file with one user address per line")
+    parser.add_argument("--page-size", type=int, default=500, help="records per page")
+    parser.add_argument("--chunk-size", type=int, default=100, help="pages per aggregate3 call")
+    parser.add_argument("--block", type=int, help="block to read at (default: latest)")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--pending", action="store_true", help="only the unclaimed redeems")
+    mode.add_argument("--claimable", action="store_true", help="only the redeems claimable at the block")
+    args = parser.parse_args()
+
+    chain = None
+    if args.chain:
+        try:
+            chain = registry.chain(args.chain)
+        except KeyError:
+            parser.error(f"unknown chain {args.chain}")
+    rpc = args.rpc or (chain.rpc if chain else None)
+    router = args.router or (chain.redeem_router if chain else None)
+    if not rpc or not router:
+        parser.error("need --chain with a redeem router in the registry, or --rpc and --router")
+    users = list(args.user)
+    if args.users:
+        with open(args.users) as f:
+            users.extend(line.strip() for line in f if line.strip())
+    if not users:
+        parser.error("need --user or --users")
+
+    multicall = Multicall(RPCClient(rpc, timeout=60), args.multicall, args.chunk_size)
+    block = args.block if args.block is not None else "latest"
+    try:
+        multicall.check(block)
+        if args.claimable:
+            for user, records in claimable(multicall, router, users, args.page_size, block).items():
+                for amount, created, token in records:
+                    print(f"{user}\t{amount}\t{created}\t{token}")
+        else:
+            for user, index, amount, created, token, completed in history(
+                    multicall, router, users, args.page_size, args.pending, block):
+                print(f"{user}\t{index}\t{amount}\t{created}\t{token}\t{'claimed' if completed else 'pending'}")
+    except (RPCError, ValueError) as e:
+        sys.exit(f"❌ {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Registry of uniBTC deployments, shared by the scripts in this repository
+instead of per-script address tables.
+
+The data lives in deployments/registry.json, one chain per line:
+
+    {"name": "Ethereum", "chain_id": 1, "aliases": [...], "rpcs": [primary, fallback, ...],
+     "explorer": "https://etherscan.io", "proxy_admin": "0x...", "uni_btc": "0x...",
+     "vault": "0x...", "sigma": "0x...", "redeem_router": "0x...", "start_block": 19645532}
+
+Only name, chain_id and rpcs are required; a chain without a Vault, Sigma or
+redeem router simply omits the key. start_block is the first block worth
+scanning for uniBTC activity on that chain.
+
+The file is read on first use and indexed by chain id, by every name and
+alias, and by every contract address, so each lookup is a dict access:
+
+    import registry
+    registry.chain(1).vault                      # by chain id
+    registry.chain("bsc-mainnet").rpcs           # by name, alias or brownie network
+    registry.lookup("0x93919784c523f39...")      # -> [(Chain, "uni_btc"), ...]
+
+UNIBTC_REGISTRY overrides the path of the registry file.
+
+Requires: python3 (standard library only)
+"""
+
+import json
+import os
+from typing import NamedTuple, Optional, Tuple
+
+REGISTRY_PATH = os.environ.get(
+    "UNIBTC_REGISTRY",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "deployments", "registry.json"))
+
+# Contract roles held in the registry, in the order they are reported by lookup().
+CONTRACTS = ("proxy_admin", "uni_btc", "vault", "sigma", "redeem_router")
+
+# The token address Vault, Sigma and DelayRedeemRouter use for the chain's native BTC.
+# The zero address is not special to them: it is read as an ERC20 like any other token.
+NATIVE_BTC = "0xbedfffffffffffffffffffffffffffffffffffff"
+
+
+class Chain(NamedTuple):
+    name: str
+    chain_id: int
+    rpcs: Tuple[str, ...]
+    explorer: Optional[str] = None
+    proxy_admin: Optional[str] = None
+    uni_btc: Optional[str] = None
+    vault: Optional[str] = None
+    sigma: Optional[str] = None
+    redeem_router: Optional[str] = None
+    start_block: int = 0
+    aliases: Tuple[str, ...] = ()
+
+    @property
+    def rpc(self):
+        """Primary RPC endpoint; the rest of `rpcs` are fallbacks."""
+        return self.rpcs[0]
+
+    def contracts(self):
+        """{role: address} of the contracts deployed on this chain."""
+        return {role: getattr(self, role) for role in CONTRACTS if getattr(self, role)}
+
+    def address_url(self, address):
+        return f"{self.explorer}/address/{address}" if self.explorer else None
+
+
+def normalize(name):
+    """Lookup key of a chain name: case-insensitive, brownie's "-mainnet" suffix dropped."""
+    key = name.strip().lower()
+    for suffix in ("-mainnet-fork", "-mainnet", "-fork"):
+        if key.endswith(suffix):
+            return key[:-len(suffix)]
+    return key
+
+
+class Registry:
+    def __init__(self, chains):
+        self.chains = list(chains)
+        self._by_id, self._by_name, self._by_address = {}, {}, {}
+        for c in self.chains:
+            if c.chain_id in self._by_id:
+                raise ValueError(f"duplicate chain id {c.chain_id} in registry")
+            self._by_id[c.chain_id] = c
+            for name in (c.name,) + c.aliases:
+                if self._by_name.setdefault(normalize(name), c) is not c:
+                    raise ValueError(f"chain name {name!r} is used twice in registry")
+            for role, address in c.contracts().items():
+                self._by_address.setdefault(address.lower(), []).append((c, role))
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path) as f:
+            data = json.load(f)
+        chains = []
+        for entry in data["chains"]:
+            entry = dict(entry)
+            entry["rpcs"] = tuple(entry["rpcs"])
+            entry["aliases"] = tuple(entry.get("aliases", ()))
+            chains.append(Chain(**entry))
+        return cls(chains)
+
+    def __iter__(self):
+        return iter(self.chains)
+
+    def __len__(self):
+        return len(self.chains)
+
+    def chain(self, key):
+        """
+        The chain for a chain id (int or decimal string) or a name, alias or
+        brownie network name. Raises KeyError for unknown chains.
+        """
+        if isinstance(key, int):
+            return self._by_id[key]
+        if key.isdigit():
+            return self._by_id[int(key)]
+        return self._by_name[normalize(key)]
+
+    def lookup(self, address):
+        """[(chain, role)] of every registry entry for `address`, in any case."""
+        return list(self._by_address.get(address.lower(), ()))
+
+
+_REGISTRIES = {}
+
+
+def load(path=None):
+    """The Registry in `path` (default REGISTRY_PATH), parsed once per process."""
+    path = os.path.normpath(path or REGISTRY_PATH)
+    if path not in _REGISTRIES:
+        _REGISTRIES[path] = Registry.from_file(path)
+    return _REGISTRIES[path]
+
+
+def chains():
+    return load().chains
+
+
+def chain(key):
+    return load().chain(key)
+
+
+def lookup(address):
+    return load().lookup(address)
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Diff Sigma holder layouts against a desired configuration.
+
+Sigma.setTokenHolders(leadingToken, pools) replaces the whole Pool[] array of
+a leading token, so a change to one holder means re-sending the full layout.
+This tool keeps the current getTokenHolders() layout of every leading token
+in a per-chain cache, compares it with a desired config and prints, per
+leading token, whether it is unchanged (no transaction needed) or which
+pools and holders are added and removed, together with the calldata of the
+setTokenHolders() call that applies it. Pool and holder order does not
+affect Sigma.totalSupply, so layouts are compared as sets.
+
+Before anything is proposed, the decimals of every pool token are checked
+against the leading token the way Sigma._haveSameDecimals does (NATIVE_BTC
+counts as 18), so a layout that would revert with SYS010 is reported
+instead.
+
+The cache (<cache-dir>/<chain id>.json) records the block it was read at.
+On the next run only the leading tokens named in TokenHoldersSet events
+since that block are read again; the event scan starts --confirmations
+blocks early to cover reorgs. A restarted dev chain (different genesis
+hash, or a head below the cached block) is read in full.
+
+Desired config (JSON), keyed by registry chain name or chain id:
+
+    {"bsc": {"<leading token>": [{"token": "<token>", "holders": ["<holder>", ...]}, ...]}}
+
+Requires: python3 (standard library only)
+Usage: python3 scripts/sigma_holders.py [--chain bsc ...] [--desired sigma.json] [--output calls.json]
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import registry
+from abi import decode, decode_uint, encode_call
+from atomic_file import atomic_write
+from keccak import keccak_hex
+from multicall import eth_call, get_logs
+from registry import NATIVE_BTC
+from rpc import RPCClient, RPCError, check_batch
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "uniBTC", "sigma")
+TOKEN_HOLDERS_SET = keccak_hex("TokenHoldersSet(address,(address,address[])[])")
+SET_TOKEN_HOLDERS = "setTokenHolders(address,(address,address[])[])"
+L2_BTC_DECIMAL = 18
+
+
+def _layout(pools):
+    """Canonical layout: [[token, [holder, ...]], ...] with lowercase addresses."""
+    return [[token.lower(), [h.lower() for h in holders]] for token, holders in pools]
+
+
+class HolderCache:
+    """
+    On-disk layouts of one chain's Sigma:
+
+        <cache_dir>/<chain_id>.json   {"genesis": "<block 0 hash>", "sigma": "<address>", "block": N,
+                                       "layouts": {"<leading token>": [[token, [holder, ...]], ...]},
+                                       "decimals": {"<token>": decimals}}
+
+    Token decimals never change, so they are kept across refreshes.
+    """
+
+    def __init__(self, cache_dir, chain_id, sigma, genesis=None):
+        self.path = os.path.join(cache_dir, f"{chain_id}.json") if cache_dir else None
+        self.sigma = sigma.lower()
+        self.genesis = genesis
+        self.block = None
+        self.layouts = {}
+        self.decimals = {}
+        try:
+            with open(self.path) as f:
+                saved = json.load(f)
+        except (TypeError, OSError, ValueError):
+            return
+        if saved.get("genesis") not in (None, genesis):
+            return
+        self.decimals = saved.get("decimals", {})
+        if saved.get("sigma") == self.sigma:
+            self.block = saved.get("block")
+            self.layouts = saved.get("layouts", {})
+
+    def save(self):
+        if self.path is None:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        state = {"genesis": self.genesis, "sigma": self.sigma, "block": self.block,
+                 "layouts": self.layouts, "decimals": self.decimals}
+        atomic_write(self.path, json.dumps(state, indent=1, sort_keys=True).encode())
+
+
+def changed_leading_tokens(client, sigma, start, end, max_range=5000):
+    """Leading tokens of every TokenHoldersSet event of `sigma` in [start, end]."""
+    # Event parameters are not indexed: the leading token is the first data word.
+    return {decode(["address"], log["data"])[0]
+            for log in get_logs(client, sigma, [TOKEN_HOLDERS_SET], start, end, max_range)}
+
+
+def refresh(client, cache, confirmations=12, max_range=5000):
+    """
+    Bring `cache` up to the current head. Returns the leading tokens that
+    were read again (every one of them on a cold or invalidated cache).
+    """
+    head = int(client.call("eth_blockNumber"), 16)
+    if cache.block is None or cache.block > head:
+        tokens = set(decode(["address[]"], client.call(*eth_call(cache.sigma, "ListLeadingTokens()", head)))[0])
+        cache.layouts = {}
+    else:
+        start = max(cache.block - confirmations, 0)
+        tokens = changed_leading_tokens(client, cache.sigma, start, head, max_range) if start <= head else set()
+
+    tokens = sorted(tokens)
+    results = check_batch(client.batch([eth_call(cache.sigma, "getTokenHolders(address)", head, t) for t in tokens]),
+                          "getTokenHolders")
+    for token, result in zip(tokens, results):
+        cache.layouts[token] = _layout(decode(["(address,address[])[]"], result)[0])
+    cache.block = head
+    return tokens
+
+
+def token_decimals(client, cache, tokens):
+    """{token: decimals} as Sigma sees them: NATIVE_BTC has L2_BTC_DECIMAL; cached in `cache`."""
+    unknown = sorted({t.lower() for t in tokens if t.lower() != NATIVE_BTC} - set(cache.decimals))
+    results = client.batch([eth_call(t, "decimals()", "latest") for t in unknown]) if unknown else []
+    for token, result in zip(unknown, results):
+        if isinstance(result, RPCError):
+            raise RPCError(f"decimals() of {token}: {result}")
+        cache.decimals[token] = decode_uint(result)
+    return {t: L2_BTC_DECIMAL if t.lower() == NATIVE_BTC else cache.decimals[t.lower()] for t in tokens}
+
+
+def _as_sets(layout):
+    return {token: frozenset(holders) for token, holders in layout}
+
+
+def diff_layout(current, desired):
+    """
+    Compare two layouts ([[token, [holders]]], lowercase) as sets:
+
+        {"unchanged": bool, "added_pools": [token], "removed_pools": [token],
+         "holders": {token: {"added": [holder], "removed": [holder]}}}
+    """
+    cur, new = _as_sets(current or []), _as_sets(desired)
+    holders = {}
+    for token in sorted(cur.keys() & new.keys()):
+        added, removed = sorted(new[token] - cur[token]), sorted(cur[token] - new[token])
+        if added or removed:
+            holders[token] = {"added": added, "removed": removed}
+    # Duplicate pools of a token or duplicate holders count twice on chain.
+    duplicated = len(_as_sets(desired)) != len(desired) or \
+        any(len(set(h)) != len(h) for _, h in desired)
+    added_pools, removed_pools = sorted(new.keys() - cur.keys()), sorted(cur.keys() - new.keys())
+    return {"unchanged": current is not None and not (added_pools or removed_pools or holders or duplicated),
+            "added_pools": added_pools, "removed_pools": removed_pools, "holders": holders,
+            "duplicates": duplicated}
+
+
+def plan_chain(client, cache, desired):
+    """
+    Diff every leading token of `desired` ({leading: [{"token", "holders"}]})
+    against the cached layouts. Returns [{"leading_token", "diff", "error",
+    "call"}]; "call" is {"to", "data"} for leading tokens that need a
+    setTokenHolders() transaction.
+    """
+    plan = []
+    for leading, pools in sorted(desired.items()):
+        leading = leading.lower()
+        layout = _layout((p["token"], p["holders"]) for p in pools)
+        diff = diff_layout(cache.layouts.get(leading), layout)
+        entry = {"leading_token": leading, "diff": diff, "error": None, "call": None}
+        if not diff["unchanged"]:
+            decimals = token_decimals(client, cache, [leading] + [t for t, _ in layout])
+            mismatched = sorted({t for t, _ in layout if decimals[t] != decimals[leading]})
+            if mismatched:
+                entry["error"] = f"SYS010: decimals of {', '.join(mismatched)} differ from {decimals[leading]}"
+            elif diff["duplicates"]:
+                entry["error"] = "duplicate pools or holders would be counted twice"
+            else:
+                entry["call"] = {"to": cache.sigma, "data": encode_call(SET_TOKEN_HOLDERS, leading,
+                                                                        [(t, h) for t, h in layout])}
+        plan.append(entry)
+    return plan
+
+
+def sweep(chains, desired, cache_dir=DEFAULT_CACHE_DIR, confirmations=12, workers=8, timeout=30, rpcs=None):
+    """
+    Refresh the cache of every chain in `chains` (registry.Chain with a
+    Sigma) concurrently and plan the desired layouts of each. Returns
+    {chain name: {"refreshed": [leading], "layouts": {...}, "plan": [...]}}
+    or {"error": str} for chains that could not be read.
+    """
+    lock = threading.Lock()
+    report = {}
+
+    def run(chain):
+        try:
+            client = RPCClient((rpcs or {}).get(chain.chain_id) or chain.rpc, timeout=timeout)
+            genesis = client.call("eth_getBlockByNumber", ["0x0", False])["hash"]
+            cache = HolderCache(cache_dir, chain.chain_id, chain.sigma, genesis)
+            refreshed = refresh(client, cache, confirmations)
+            want = desired.get(chain.name) or desired.get(str(chain.chain_id)) or {}
+            plan = plan_chain(client, cache, want)
+            cache.save()
+            result = {"refreshed": refreshed, "block": cache.block, "layouts": cache.layouts, "plan": plan}
+        except (RPCError, ValueError, TypeError) as e:
+            result = {"error": str(e)}
+        with lock:
+            report[chain.name] = result
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(run, chains))
+    return report
+
+
+def _desired_by_chain(path):
+    """Desired config keyed by registry chain name (names, aliases and chain ids are accepted)."""
+    with open(path) as f:
+        data = json.load(f)
+    return {registry.chain(key).name: layouts for key, layouts in data.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chain", action="append", help="only sweep this chain (repeatable; default: every chain with a Sigma)")
+    parser.add_argument("--desired", help="desired layouts (see above); without it the cached layouts are printed")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help=f"layout cache (default {DEFAULT_CACHE_DIR})")
+    parser.add_argument("--confirmations", type=int, default=12, help="blocks re-scanned for TokenHoldersSet events")
+    parser.add_argument("--workers", type=int, default=8, help="chains read concurrently")
+    parser.add_argument("--timeout", type=float, default=30, help="timeout in seconds for each request")
+    parser.add_argument("--output", help="write the setTokenHolders() calls to send as JSON to this file")
+    args = parser.parse_args()
+
+    try:
+        chains = [registry.chain(c) for c in args.chain] if args.chain else registry.chains()
+        desired = _desired_by_chain(args.desired) if args.desired else {}
+    except KeyError as e:
+        parser.error(f"unknown chain {e}")
+    chains = [c for c in chains if c.sigma]
+
+    report = sweep(chains, desired, args.cache_dir, args.confirmations, args.workers, args.timeout)
+    calls, failed = [], False
+    for name in sorted(report):
+        result = report[name]
+        if "error" in result:
+            print(f"❌ {name}: {result['error']}")
+            failed = True
+            continue
+        print(f"{name} (block {result['block']}, re-read {len(result['refreshed'])} leading tokens)")
+        if not args.desired:
+            for leading, layout in sorted(result["layouts"].items()):
+                print(f"   {leading}: " + ", ".join(f"{t} x{len(h)}" for t, h in layout))
+        for entry in result["plan"]:
+            diff = entry["diff"]
+            if diff["unchanged"]:
+                print(f"   ✅ {entry['leading_token']} unchanged")
+                continue
+            mark = "❌" if entry["error"] else "✏️ "
+            print(f"   {mark} {entry['leading_token']}")
+            for token in diff["added_pools"]:
+                print(f"      + pool {token}")
+            for token in diff["removed_pools"]:
+                print(f"      - pool {token}")
+            for token, change in diff["holders"].items():
+                for h in change["added"]:
+                    print(f"      + {token} holder {h}")
+                for h in change["removed"]:
+                    print(f"      - {token} holder {h}")
+            if entry["error"]:
+                print(f"      {entry['error']}")
+                failed = True
+            else:
+                calls.append({"chain": name, "leading_token": entry["leading_token"], **entry["call"]})
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(calls, f, indent=2)
+    print(f"\n{len(calls)} setTokenHolders() transactions needed")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Compute Sigma.totalSupply(leadingToken) off chain.
+
+Sigma._totalSupply() walks every Pool of a leading token and calls
+balanceOf (or reads .balance for NATIVE_BTC) once per holder inside a single
+eth_call, so its gas and latency grow with pools x holders and some RPCs
+reject it. This script reads the same configuration with
+ListLeadingTokens() and getTokenHolders(), then reads the balances through
+Multicall3 in chunks of --chunk-size subcalls, and cross-checks the sum with
+the on-chain totalSupply() at the same block.
+
+Requires: python3 (standard library only)
+Usage: python3 scripts/sigma_supply.py --chain <name|chain id> [--chunk-size 200] [--block N]
+       python3 scripts/sigma_supply.py --rpc http://127.0.0.1:8545 --sigma 0x... --multicall 0x...
+"""
+
+import argparse
+import sys
+
+import registry
+from abi import decode, decode_uint, encode_call
+from multicall import MULTICALL3, Multicall, block_tag
+from registry import NATIVE_BTC
+from rpc import RPCClient, RPCError
+
+
+def _view(client, to, signature, types, block, *args):
+    result = client.call("eth_call", [{"to": to, "data": encode_call(signature, *args)}, block_tag(block)])
+    return decode(types, result)
+
+
+def leading_tokens(client, sigma, block="latest"):
+    return _view(client, sigma, "ListLeadingTokens()", ["address[]"], block)[0]
+
+
+def token_holders(client, sigma, leading_token, block="latest"):
+    """[(token, [holder, ...])] of Sigma.getTokenHolders(leading_token)."""
+    return _view(client, sigma, "getTokenHolders(address)", ["(address,address[])[]"], block, leading_token)[0]
+
+
+def onchain_total_supply(client, sigma, leading_token, block="latest"):
+    return _view(client, sigma, "totalSupply(address)", ["uint256"], block, leading_token)[0]
+
+
+def offchain_total_supply(multicall, pools, block="latest"):
+    """Sum of the balances of every (token, holders) pool, read through Multicall3 at `block`."""
+    calls = []
+    for token, holders in pools:
+        for holder in holders:
+            calls.append(multicall.eth_balance(holder) if token.lower() == NATIVE_BTC
+                         else (token, encode_call("balanceOf(address)", holder)))
+    total = 0
+    for (target, _), (success, data) in zip(calls, multicall.aggregate(calls, block)):
+        if not success:
+            raise RPCError(f"balance read from {target} reverted")
+        total += decode_uint("0x" + data.hex())
+    return total
+
+
+def check(client, sigma, multicall, block=None):
+    """
+    [{"leading_token", "pools", "holders", "offchain", "onchain", "match"}]
+    for every leading token of `sigma`, all read at one block.
+    """
+    if block is None:
+        block = int(client.call("eth_blockNumber"), 16)
+    rows = []
+    for leading in leading_tokens(client, sigma, block):
+        pools = token_holders(client, sigma, leading, block)
+        offchain = offchain_total_supply(multicall, pools, block)
+        try:
+            onchain = onchain_total_supply(client, sigma, leading, block)
+        except RPCError as e:
+            onchain = e
+        rows.append({"leading_token": leading, "pools": len(pools), "holders": sum(len(h) for _, h in pools),
+                     "offchain": offchain, "onchain": onchain, "match": offchain == onchain})
+    return block, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chain", help="registry chain (name or chain id) to read Sigma and the RPC from")
+    parser.add_argument("--rpc", help="RPC URL (overrides the registry)")
+    parser.add_argument("--sigma", help="Sigma address (overrides the registry)")
+    parser.add_argument("--multicall", default=MULTICALL3, help=f"Multicall3 address (default {MULTICALL3})")
+    parser.add_argument("--chunk-size", type=int, default=200, help="balance reads per aggregate3 call")
+    parser.add_argument("--block", type=int, help="block to read at (default: the latest block)")
+    parser.add_argument("--timeout", type=float, default=30, help="timeout in seconds for each request")
+    args = parser.parse_args()
+
+    chain = None
+    if args.chain:
+        try:
+            chain = registry.chain(args.chain)
+        except KeyError:
+            parser.error(f"unknown chain {args.chain}")
+    rpc = args.rpc or (chain.rpc if chain else None)
+    sigma = args.sigma or (chain.sigma if chain else None)
+    if not rpc or not sigma:
+        parser.error("need --chain with a Sigma in the registry, or --rpc and --sigma")
+
+    client = RPCClient(rpc, timeout=args.timeout)
+    multicall = Multicall(client, args.multicall, args.chunk_size)
+    try:
+        multicall.check(args.block if args.block is not None else "latest")
+        block, rows = check(client, sigma, multicall, args.block)
+    except (RPCError, ValueError) as e:
+        sys.exit(f"❌ {e}")
+
+    print(f"Sigma {sigma} at block {block}")
+    print(f"{'leading token':<44} {'pools':>5} {'holders':>7} {'off-chain':>24} {'on-chain':>24}")
+    for r in rows:
+        onchain = r["onchain"] if not isinstance(r["onchain"], RPCError) else "error"
+        mark = "✅" if r["match"] else "❌"
+        print(f"{r['leading_token']:<44} {r['pools']:>5} {r['holders']:>7} {r['offchain']:>24} {onchain:>24} {mark}")
+        if isinstance(r["onchain"], RPCError):
+            print(f"   on-chain totalSupply failed: {r['onchain']}")
+    sys.exit(0 if all(r["match"] for r in rows) else 1)
+
+
+if __name__ == "__main__":
+    main()
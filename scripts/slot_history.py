@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Find the blocks at which storage slots of a set of contracts changed, with a
+bisection over historical eth_getStorageAt reads instead of a block-by-block
+scan.
+
+For every contract the slots are read at both ends of the block range; an
+interval whose ends hold different values is split at its midpoint until the
+change is pinned to a single block. Each change costs O(log N) probes for a
+range of N blocks, and every bisection round of every contract goes out as one
+JSON-RPC batch (see rpc.py), so a round is a single round trip however many
+contracts are being searched.
+
+Probed values are memoized per chain on disk (ProbeStore). Known probes split
+the range before the search starts, so extending a previous sweep only
+searches the new blocks. Probes within `confirmations` blocks of the head are
+not memoized, as they could still be reorganized.
+
+Bisection only sees changes between probes whose values differ: a slot that
+changes and changes back between two probes is not reported. uniBTC's
+`_initialized` only ever increases, so every reinitialization is found;
+an implementation slot that is rolled back to the very same implementation
+within one interval is the case that can be missed.
+
+Requires: python3 (standard library only), an archive node for old blocks
+"""
+
+import json
+import os
+import threading
+
+from atomic_file import atomic_write
+from rpc import RPCError
+
+DEFAULT_HISTORY_DIR = os.path.join(os.path.expanduser("~"), ".cache", "uniBTC", "history")
+
+
+def _word(raw):
+    """Normalize a storage word to 32 bytes, as some endpoints strip leading zeros."""
+    return f"0x{int(raw, 16):064x}"
+
+
+class ProbeStore:
+    """
+    On-disk memo of storage probes for one chain:
+
+        <history_dir>/<chain_id>.json   {"genesis": "<block 0 hash>",
+                                         "probes": {"<address>": {"<block>": ["<slot value>", ...]}}}
+
+    Values are stored in the order of the slots they were probed with, so a
+    store should always be used with the same slot list. When `genesis` is
+    given and differs from the recorded one (a local dev chain that was
+    restarted under the same chain id), the memoized probes are discarded.
+    """
+
+    def __init__(self, history_dir, chain_id, genesis=None):
+        self.path = os.path.join(history_dir, f"{chain_id}.json")
+        self.genesis = genesis
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.probes = {}
+        try:
+            with open(self.path) as f:
+                saved = json.load(f)
+            if genesis is None or saved.get("genesis") in (None, genesis):
+                self.probes = saved.get("probes", {})
+                self.genesis = genesis or saved.get("genesis")
+        except (OSError, ValueError, AttributeError):
+            pass
+
+    def known(self, address, start, end):
+        """{block: values} of every memoized probe of `address` in [start, end]."""
+        with self._lock:
+            entries = self.probes.get(address.lower(), {})
+            return {int(b): tuple(v) for b, v in entries.items() if start <= int(b) <= end}
+
+    def put(self, address, block, values):
+        with self._lock:
+            self.probes.setdefault(address.lower(), {})[str(block)] = list(values)
+            self._dirty = True
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            state = {"genesis": self.genesis, "probes": self.probes}
+            atomic_write(self.path, json.dumps(state, separators=(",", ":"), sort_keys=True).encode())
+            self._dirty = False
+
+
+def probe(client, requests, slots):
+    """
+    Read `slots` of every (address, block) in `requests` in one batch and
+    return {(address, block): values}. Raises RPCError if any read failed,
+    typically because the endpoint does not keep state that old.
+    """
+    calls = [("eth_getStorageAt", [address, slot, hex(block)]) for address, block in requests for slot in slots]
+    results = client.batch(calls)
+    for (method, params), r in zip(calls, results):
+        if isinstance(r, RPCError):
+            raise RPCError(f"{params[0]} slot {params[1]} at block {int(params[2], 16)}: {r}")
+    n = len(slots)
+    return {req: tuple(_word(v) for v in results[i * n:(i + 1) * n]) for i, req in enumerate(requests)}
+
+
+def find_transitions(client, addresses, slots, start, end, store=None, confirmations=64, head=None):
+    """
+    Bisect [start, end] for changes of `slots` in every contract of `addresses`.
+
+    Returns {address: [(block, values), ...]}: the values at `start`, then one
+    entry per block whose values differ from those of the block before it,
+    in block order. `head` (the chain height) bounds which probes are memoized
+    in `store`; it defaults to `end`.
+    """
+    head = end if head is None else head
+    values = {a: store.known(a, start, end) if store is not None else {} for a in addresses}
+
+    def read(requests):
+        fresh = probe(client, requests, slots)
+        for (address, block), v in fresh.items():
+            values[address][block] = v
+            if store is not None and block <= head - confirmations:
+                store.put(address, block, v)
+
+    read([(a, b) for a in addresses for b in (start, end) if b not in values[a]])
+
+    # Every pair of adjacent known probes whose values differ holds at least one change.
+    pending = []
+    for a in addresses:
+        blocks = sorted(values[a])
+        pending.extend((a, lo, hi) for lo, hi in zip(blocks, blocks[1:]) if values[a][lo] != values[a][hi])
+
+    changes = {a: [] for a in addresses}
+    while pending:
+        split = [(a, lo, hi) for a, lo, hi in pending if hi - lo > 1]
+        for a, lo, hi in pending:
+            if hi - lo == 1:
+                changes[a].append(hi)
+        if split:
+            read([(a, (lo + hi) // 2) for a, lo, hi in split])
+        pending = []
+        for a, lo, hi in split:
+            mid = (lo + hi) // 2
+            pending.extend((a, x, y) for x, y in ((lo, mid), (mid, hi)) if values[a][x] != values[a][y])
+
+    return {a: [(start, values[a][start])] + [(b, values[a][b]) for b in sorted(changes[a])]
+            for a in addresses}
+
+
+def block_timestamps(client, blocks):
+    """{block: unix timestamp} for `blocks`, fetched in one batch."""
+    blocks = sorted(set(blocks))
+    headers = client.batch([("eth_getBlockByNumber", [hex(b), False]) for b in blocks])
+    return {b: int(h["timestamp"], 16) for b, h in zip(blocks, headers) if isinstance(h, dict)}
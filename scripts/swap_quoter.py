@@ -0,0 +1,696 @@
+#!/usr/bin/env python3
+"""
+Route quoter for a SwapProxy: expected output of every registered pool,
+the best pool, and a split of the amount across pools.
+
+SwapProxy.swapToken(amountIn, pool, slippage, forward) swaps through one
+pool and reverts unless the Vault receives at least
+
+    par          = _amounts(amountIn)            (fromToken amount in toToken decimals)
+    amountOutMin = par * (SLIPPAGE_RANGE - slippage) / SLIPPAGE_RANGE    forward
+                   par * (SLIPPAGE_RANGE + slippage) / SLIPPAGE_RANGE    not forward
+
+with SLIPPAGE_RANGE = 10000 and slippage < MAX_SLIPPAGE (100); the overload
+without slippage uses DEFAULT_SLIPPAGE (50). The minimum is against par,
+not against a quote, so what matters is each pool's actual output.
+
+The pool states are read at one block, through Multicall3: the proxy's
+pool list, then the pool validity and protocol (PoolInfo is not exposed,
+so it is read from storage; getPoolsDepth drops valid pools listed after
+an invalid one), then the AMM state of every pool in one aggregate3 call,
+and the Balancer vault balances. Outputs are then computed offline with
+each protocol's own integer math:
+
+    UNISWAP_V2   constant product with the 0.3% fee (getReserves)
+    UNISWAP_V3   SqrtPriceMath within the active liquidity (slot0,
+                 liquidity); exact until the swap crosses an initialized
+                 tick, an overestimate past it
+    CURVE        stableswap get_D/get_y with the dynamic fee of
+                 stableswap-ng pools (A_precise, balances, fee)
+    DODO         PMM pricing of DODO V2 pools (getPMMStateForCall,
+                 getUserFeeRate of --trader, tx.origin of the swap)
+    BALANCER     weighted pool calcOutGivenIn (getNormalizedWeights,
+                 getSwapFeePercentage, Vault.getPoolTokens); pow is exact
+                 for 50/50 pools and within 1e-14 otherwise
+
+The split is a greedy marginal allocation: the amount goes out in --steps
+chunks, each to the pool whose output grows most, and is kept to
+--max-legs pools. Every leg is a separate swapToken call and has to pass
+its own amountOutMin. With --simulate every chosen leg is also run as an
+eth_call of swapToken from the proxy owner at the same block.
+
+Requires: python3 (standard library only)
+Usage: python3 scripts/swap_quoter.py --chain ethereum --proxy 0x... --amount 2.5 [--slippage 50] [--no-forward] [--simulate]
+"""
+
+import argparse
+import decimal
+import json
+import math
+import sys
+
+import registry
+from abi import decode, decode_address, decode_uint, encode, encode_call
+from keccak import keccak256, keccak_hex
+from multicall import MULTICALL3, Multicall, block_tag, eth_call
+from rpc import RPCClient, RPCError, check_batch
+
+SLIPPAGE_RANGE = 10000
+DEFAULT_SLIPPAGE = 50
+MAX_SLIPPAGE = 100
+DECIMAL_8_TO_18 = 10**10
+
+PROTOCOLS = {
+    keccak_hex("UNISWAP_V2_PROTOCOL"): "UNISWAP_V2",
+    keccak_hex("UNISWAP_V3_PROTOCOL"): "UNISWAP_V3",
+    keccak_hex("CURVE_PROTOCOL"): "CURVE",
+    keccak_hex("DODO_PROTOCOL"): "DODO",
+    keccak_hex("BALANCER_PROTOCOL"): "BALANCER",
+}
+# Storage slot of SwapProxy._poolInfos, after Ownable._owner, _routers and _pools.
+POOL_INFOS_SLOT = 3
+MAX_CURVE_COINS = 8
+
+
+def to_token_amount(amount_in, from_decimals, to_decimals):
+    """SwapProxy._amounts: `amount_in` of fromToken in toToken decimals."""
+    if from_decimals == to_decimals:
+        return amount_in
+    if to_decimals == 8:
+        return amount_in // DECIMAL_8_TO_18
+    return amount_in * DECIMAL_8_TO_18
+
+
+def amount_out_min(amount_in, from_decimals, to_decimals, slippage, forward):
+    par = to_token_amount(amount_in, from_decimals, to_decimals)
+    if forward:
+        return par * (SLIPPAGE_RANGE - slippage) // SLIPPAGE_RANGE
+    return par * (SLIPPAGE_RANGE + slippage) // SLIPPAGE_RANGE
+
+
+def slippage_needed(amount_in, amount_out, from_decimals, to_decimals, forward):
+    """
+    The slippage to pass for a swap of `amount_in` giving `amount_out`: the
+    smallest that passes when `forward`, the largest otherwise; None when
+    no slippage below MAX_SLIPPAGE passes.
+    """
+    if to_token_amount(amount_in, from_decimals, to_decimals) == 0:
+        return None
+    passing = [s for s in range(MAX_SLIPPAGE)
+               if amount_out >= amount_out_min(amount_in, from_decimals, to_decimals, s, forward)]
+    if not passing:
+        return None
+    return passing[0] if forward else passing[-1]
+
+
+# --------------------------------------------------------------------------------
+# Uniswap V2 and V3
+# --------------------------------------------------------------------------------
+
+def uniswap_v2_out(state, amount_in):
+    """UniswapV2Library.getAmountOut."""
+    amount_in_with_fee = amount_in * 997
+    return amount_in_with_fee * state["reserve_out"] // (state["reserve_in"] * 1000 + amount_in_with_fee)
+
+
+def uniswap_v3_out(state, amount_in):
+    """One SwapMath.computeSwapStep of an exact-input swap that stays within the active liquidity."""
+    liquidity, price = state["liquidity"], state["sqrt_price_x96"]
+    if liquidity == 0 or price == 0:
+        return 0
+    less_fee = amount_in * (10**6 - state["fee"]) // 10**6
+    numerator = liquidity << 96
+    if state["zero_for_one"]:
+        # getNextSqrtPriceFromAmount0RoundingUp, then getAmount1Delta rounded down.
+        denominator = numerator + less_fee * price
+        next_price = -(-numerator * price // denominator)
+        return liquidity * (price - next_price) >> 96
+    # getNextSqrtPriceFromAmount1RoundingDown, then getAmount0Delta rounded down.
+    next_price = price + (less_fee << 96) // liquidity
+    return numerator * (next_price - price) // next_price // price
+
+
+# --------------------------------------------------------------------------------
+# Curve stableswap
+# --------------------------------------------------------------------------------
+
+CURVE_PRECISION = 10**18
+CURVE_FEE_DENOMINATOR = 10**10
+CURVE_A_PRECISION = 100
+
+
+def _curve_d(xp, amp):
+    n, s = len(xp), sum(xp)
+    if s == 0:
+        return 0
+    d, ann = s, amp * n
+    for _ in range(255):
+        d_p = d
+        for x in xp:
+            d_p = d_p * d // (x * n)
+        previous = d
+        d = ((ann * s // CURVE_A_PRECISION + d_p * n) * d
+             // ((ann - CURVE_A_PRECISION) * d // CURVE_A_PRECISION + (n + 1) * d_p))
+        if abs(d - previous) <= 1:
+            return d
+    raise ValueError("get_D did not converge")
+
+
+def _curve_y(i, j, x, xp, amp):
+    n = len(xp)
+    d = _curve_d(xp, amp)
+    ann = amp * n
+    c, s = d, 0
+    for k, xk in enumerate(xp):
+        if k == j:
+            continue
+        if k == i:
+            xk = x
+        s += xk
+        c = c * d // (xk * n)
+    c = c * d * CURVE_A_PRECISION // (ann * n)
+    b = s + d * CURVE_A_PRECISION // ann
+    y = d
+    for _ in range(255):
+        previous = y
+        y = (y * y + c) // (2 * y + b - d)
+        if abs(y - previous) <= 1:
+            return y
+    raise ValueError("get_y did not converge")
+
+
+def _curve_fee(xpi, xpj, fee, offpeg_fee_multiplier):
+    """stableswap-ng _dynamic_fee; the plain fee for pools without an off-peg multiplier."""
+    if offpeg_fee_multiplier <= CURVE_FEE_DENOMINATOR:
+        return fee
+    xps2 = (xpi + xpj) ** 2
+    return (offpeg_fee_multiplier * fee
+            // ((offpeg_fee_multiplier - CURVE_FEE_DENOMINATOR) * 4 * xpi * xpj // xps2 + CURVE_FEE_DENOMINATOR))
+
+
+def curve_out(state, amount_in):
+    """Curve pool get_dy(i, j, amount_in)."""
+    i, j, rates = state["i"], state["j"], state["rates"]
+    xp = [b * r // CURVE_PRECISION for b, r in zip(state["balances"], rates)]
+    x = xp[i] + amount_in * rates[i] // CURVE_PRECISION
+    y = _curve_y(i, j, x, xp, state["amp"])
+    dy = xp[j] - y - 1
+    if dy <= 0:
+        return 0
+    fee = _curve_fee((xp[i] + x) // 2, (xp[j] + y) // 2, state["fee"], state["offpeg_fee_multiplier"])
+    return (dy - fee * dy // CURVE_FEE_DENOMINATOR) * CURVE_PRECISION // rates[j]
+
+
+# --------------------------------------------------------------------------------
+# DODO V2 PMM
+# --------------------------------------------------------------------------------
+
+ONE = 10**18
+R_ONE, R_ABOVE_ONE, R_BELOW_ONE = 0, 1, 2
+
+
+def _mul_floor(target, d):
+    return target * d // ONE
+
+
+def _div_floor(target, d):
+    return target * ONE // d
+
+
+def _div_ceil(target, d):
+    return -(-target * ONE // d)
+
+
+def _reciprocal_floor(target):
+    return ONE * ONE // target
+
+
+def _general_integrate(v0, v1, v2, i, k):
+    """DODOMath._GeneralIntegrate."""
+    if v0 == 0:
+        raise ValueError("TARGET_IS_ZERO")
+    fair_amount = i * (v1 - v2)
+    if k == 0:
+        return fair_amount // ONE
+    penalty = _mul_floor(k, _div_floor(v0 * v0 // v1, v2))
+    return (ONE - k + penalty) * fair_amount // (ONE * ONE)
+
+
+def _solve_quadratic_for_trade(v0, v1, delta, i, k):
+    """DODOMath._SolveQuadraticFunctionForTrade."""
+    if v0 == 0:
+        raise ValueError("TARGET_IS_ZERO")
+    if delta == 0:
+        return 0
+    if k == 0:
+        return min(_mul_floor(i, delta), v1)
+    if k == ONE:
+        i_delta = i * delta
+        if i_delta * v1 < 2**256:
+            temp = i_delta * v1 // (v0 * v0)
+        else:
+            temp = delta * v1 // v0 * i // v0
+        return v1 * temp // (temp + ONE)
+    part2 = k * v0 // v1 * v0 + i * delta
+    b_abs = (ONE - k) * v1
+    b_sig = b_abs < part2
+    b_abs = (part2 - b_abs if b_sig else b_abs - part2) // ONE
+    square_root = math.isqrt(b_abs * b_abs + _mul_floor((ONE - k) * 4, _mul_floor(k, v0) * v0))
+    numerator = square_root - b_abs if b_sig else b_abs + square_root
+    v2 = _div_ceil(numerator, (ONE - k) * 2)
+    return 0 if v2 > v1 else v1 - v2
+
+
+def _sell_base(s, pay_base):
+    """PMMPricing.sellBaseToken: quote received."""
+    if s["R"] == R_ONE:
+        return _solve_quadratic_for_trade(s["Q0"], s["Q0"], pay_base, s["i"], s["K"])
+    if s["R"] == R_ABOVE_ONE:
+        back_to_one_pay = s["B0"] - s["B"]
+        back_to_one_receive = s["Q"] - s["Q0"]
+        if pay_base < back_to_one_pay:
+            receive = _general_integrate(s["B0"], s["B"] + pay_base, s["B"], s["i"], s["K"])
+            return min(receive, back_to_one_receive)
+        if pay_base == back_to_one_pay:
+            return back_to_one_receive
+        return back_to_one_receive + _solve_quadratic_for_trade(
+            s["Q0"], s["Q0"], pay_base - back_to_one_pay, s["i"], s["K"])
+    return _solve_quadratic_for_trade(s["Q0"], s["Q"], pay_base, s["i"], s["K"])
+
+
+def _sell_quote(s, pay_quote):
+    """PMMPricing.sellQuoteToken: base received."""
+    reciprocal = _reciprocal_floor(s["i"])
+    if s["R"] == R_ONE:
+        return _solve_quadratic_for_trade(s["B0"], s["B0"], pay_quote, reciprocal, s["K"])
+    if s["R"] == R_ABOVE_ONE:
+        return _solve_quadratic_for_trade(s["B0"], s["B"], pay_quote, reciprocal, s["K"])
+    back_to_one_pay = s["Q0"] - s["Q"]
+    back_to_one_receive = s["B"] - s["B0"]
+    if pay_quote < back_to_one_pay:
+        receive = _general_integrate(s["Q0"], s["Q"] + pay_quote, s["Q"], reciprocal, s["K"])
+        return min(receive, back_to_one_receive)
+    if pay_quote == back_to_one_pay:
+        return back_to_one_receive
+    return back_to_one_receive + _solve_quadratic_for_trade(
+        s["B0"], s["B0"], pay_quote - back_to_one_pay, reciprocal, s["K"])
+
+
+def dodo_out(state, amount_in):
+    """DODO V2 pool querySellBase / querySellQuote, less the LP and maintainer fees."""
+    receive = _sell_base(state, amount_in) if state["sell_base"] else _sell_quote(state, amount_in)
+    return receive - _mul_floor(receive, state["lp_fee_rate"]) - _mul_floor(receive, state["mt_fee_rate"])
+
+
+# --------------------------------------------------------------------------------
+# Balancer V2 weighted pools
+# --------------------------------------------------------------------------------
+
+BALANCER_MAX_IN_RATIO = 3 * 10**17
+BALANCER_MAX_POW_RELATIVE_ERROR = 10000
+
+
+def _mul_up(a, b):
+    product = a * b
+    return 0 if product == 0 else (product - 1) // ONE + 1
+
+
+def _div_up(a, b):
+    return 0 if a == 0 else (a * ONE - 1) // b + 1
+
+
+def _pow_up(x, y):
+    """FixedPoint.powUp, with LogExpMath.pow evaluated to 40 digits."""
+    if y == ONE:
+        return x
+    if y == 2 * ONE:
+        return _mul_up(x, x)
+    if y == 4 * ONE:
+        square = _mul_up(x, x)
+        return _mul_up(square, square)
+    with decimal.localcontext() as ctx:
+        ctx.prec = 40
+        raw = int((decimal.Decimal(x) / ONE) ** (decimal.Decimal(y) / ONE) * ONE)
+    return raw + _mul_up(raw, BALANCER_MAX_POW_RELATIVE_ERROR) + 1
+
+
+def balancer_out(state, amount_in):
+    """Weighted pool onSwap, GIVEN_IN: fee off the amount in, then WeightedMath._calcOutGivenIn."""
+    amount_in = (amount_in - _mul_up(amount_in, state["fee"])) * state["scale_in"]
+    balance_in = state["balance_in"] * state["scale_in"]
+    if balance_in == 0 or amount_in > balance_in * BALANCER_MAX_IN_RATIO // ONE:
+        return 0  # BAL#304
+    base = _div_up(balance_in, balance_in + amount_in)
+    power = _pow_up(base, state["weight_in"] * ONE // state["weight_out"])
+    complement = ONE - power if power < ONE else 0
+    return state["balance_out"] * state["scale_out"] * complement // ONE // state["scale_out"]
+
+
+QUOTERS = {
+    "UNISWAP_V2": uniswap_v2_out,
+    "UNISWAP_V3": uniswap_v3_out,
+    "CURVE": curve_out,
+    "DODO": dodo_out,
+    "BALANCER": balancer_out,
+}
+
+
+def quote(state, amount_in):
+    """Output of one pool for `amount_in`; 0 when the swap would revert or the state is unusable."""
+    if amount_in <= 0 or "error" in state:
+        return 0
+    try:
+        return max(0, QUOTERS[state["protocol"]](state, amount_in))
+    except (ValueError, ZeroDivisionError):
+        return 0
+
+
+# --------------------------------------------------------------------------------
+# Reading the proxy and its pools
+# --------------------------------------------------------------------------------
+
+def _pool_info_slot(pool):
+    return hex(int.from_bytes(keccak256(encode(["address", "uint256"], [pool, POOL_INFOS_SLOT])), "big"))
+
+
+def _aggregate(multicall, calls, block):
+    """multicall.aggregate() with the return data as 0x-prefixed hex."""
+    return [(success, "0x" + data.hex()) for success, data in multicall.aggregate(calls, block)]
+
+
+def read_proxy(client, multicall, proxy, block):
+    """
+    {"proxy", "block", "vault", "from_token", "to_token", "from_decimals",
+    "to_decimals", "vault_balance", "vault_to_balance", "owner", "routers": {protocol: router},
+    "pools": {pool: protocol}} with only the pools _swap accepts (isValid).
+    """
+    names = list(PROTOCOLS.values())
+    calls = [(proxy, encode_call(sig)) for sig in ("getPools()", "vault()", "fromToken()", "toToken()", "owner()")]
+    calls += [(proxy, encode_call("getRouter(bytes32)", p)) for p in PROTOCOLS]
+    results = _aggregate(multicall, calls, block)
+    if not all(success for success, _ in results):
+        raise RPCError(f"{proxy} is not a SwapProxy")
+    pools = decode(["address[]"], results[0][1])[0]
+    vault, from_token, to_token, owner = (decode_address(decode_uint(data)) for _, data in results[1:5])
+    routers = {name: decode_address(decode_uint(data)) for name, (_, data) in zip(names, results[5:])}
+
+    calls = [eth_call(from_token, "decimals()", block), eth_call(to_token, "decimals()", block),
+             eth_call(from_token, "balanceOf(address)", block, vault),
+             eth_call(to_token, "balanceOf(address)", block, vault)]
+    for pool in pools:
+        slot = int(_pool_info_slot(pool), 16)
+        calls += [("eth_getStorageAt", [proxy, hex(slot + word), block_tag(block)]) for word in (0, 1)]
+    results = check_batch(client.batch(calls), f"reading SwapProxy {proxy}")
+    valid = {}
+    for k, pool in enumerate(pools):
+        protocol, flags = results[4 + 2 * k], int(results[5 + 2 * k], 16)
+        if flags & 0xff:
+            valid[pool] = PROTOCOLS.get("0x" + protocol[2:].rjust(64, "0"), "UNKNOWN")
+    return {"proxy": proxy.lower(), "block": block, "vault": vault, "from_token": from_token, "to_token": to_token,
+            "from_decimals": decode_uint(results[0]), "to_decimals": decode_uint(results[1]),
+            "vault_balance": decode_uint(results[2]), "vault_to_balance": decode_uint(results[3]), "owner": owner,
+            "routers": routers, "pools": valid}
+
+
+def _pool_reads(protocol, pool, trader):
+    if protocol == "UNISWAP_V2":
+        sigs = ["token0()", "getReserves()"]
+    elif protocol == "UNISWAP_V3":
+        sigs = ["token0()", "fee()", "slot0()", "liquidity()"]
+    elif protocol == "CURVE":
+        sigs = ["N_COINS()", "A_precise()", "A()", "fee()", "offpeg_fee_multiplier()"]
+        return ([(pool, encode_call(s)) for s in sigs]
+                + [(pool, encode_call("coins(uint256)", k)) for k in range(MAX_CURVE_COINS)]
+                + [(pool, encode_call("balances(uint256)", k)) for k in range(MAX_CURVE_COINS)])
+    elif protocol == "DODO":
+        return [(pool, encode_call("_BASE_TOKEN_()")), (pool, encode_call("getPMMStateForCall()")),
+                (pool, encode_call("getUserFeeRate(address)", trader))]
+    elif protocol == "BALANCER":
+        sigs = ["getPoolId()", "getNormalizedWeights()", "getSwapFeePercentage()"]
+    else:
+        return []
+    return [(pool, encode_call(s)) for s in sigs]
+
+
+def _required(results, pool, what):
+    for success, _ in results:
+        if not success:
+            raise ValueError(f"{what} reverted on {pool}")
+    return [data for _, data in results]
+
+
+def read_pools(multicall, info, trader=None):
+    """
+    {pool: state} of every valid pool of read_proxy() `info` at its block:
+    one aggregate3 call for the AMM states, one more for the Balancer vault
+    balances and the decimals of other Curve coins. A pool that cannot be
+    read gets {"protocol", "error"}.
+    """
+    block, from_token, to_token = info["block"], info["from_token"], info["to_token"]
+    trader = trader or info["owner"]
+    reads = {pool: _pool_reads(protocol, pool, trader) for pool, protocol in info["pools"].items()}
+    results = _aggregate(multicall, [call for calls in reads.values() for call in calls], block)
+
+    raw, offset = {}, 0
+    for pool, calls in reads.items():
+        raw[pool] = results[offset:offset + len(calls)]
+        offset += len(calls)
+
+    states, second = {}, []
+    decimals = {from_token: info["from_decimals"], to_token: info["to_decimals"]}
+    for pool, protocol in info["pools"].items():
+        state = {"protocol": protocol}
+        try:
+            if protocol == "UNISWAP_V2":
+                token0, reserves = _required(raw[pool], pool, "getReserves")
+                r0, r1, _ = decode(["uint112", "uint112", "uint32"], reserves)
+                forward = decode_address(decode_uint(token0)) == from_token
+                state.update(reserve_in=r0 if forward else r1, reserve_out=r1 if forward else r0)
+            elif protocol == "UNISWAP_V3":
+                token0, fee, slot0, liquidity = _required(raw[pool], pool, "slot0")
+                state.update(zero_for_one=decode_address(decode_uint(token0)) == from_token, fee=decode_uint(fee),
+                             sqrt_price_x96=decode_uint(slot0), liquidity=decode_uint(liquidity))
+            elif protocol == "CURVE":
+                head, coins, balances = raw[pool][:5], raw[pool][5:5 + MAX_CURVE_COINS], raw[pool][5 + MAX_CURVE_COINS:]
+                n = decode_uint(_required(head[:1], pool, "N_COINS")[0])
+                coins = [decode_address(decode_uint(d)) for d in _required(coins[:n], pool, "coins")]
+                if from_token not in coins or to_token not in coins:
+                    raise ValueError(f"{pool} does not hold both tokens")
+                amp = (decode_uint(head[1][1]) if head[1][0]
+                       else decode_uint(_required(head[2:3], pool, "A")[0]) * CURVE_A_PRECISION)
+                state.update(i=coins.index(from_token), j=coins.index(to_token), coins=coins, amp=amp,
+                             fee=decode_uint(_required(head[3:4], pool, "fee")[0]),
+                             offpeg_fee_multiplier=decode_uint(head[4][1]) if head[4][0] else 0,
+                             balances=[decode_uint(d) for d in _required(balances[:n], pool, "balances")])
+                second += [(pool, (c, encode_call("decimals()"))) for c in coins if c not in decimals]
+            elif protocol == "DODO":
+                base, pmm, fees = _required(raw[pool], pool, "getPMMStateForCall")
+                i, k, b, q, b0, q0, r = decode(["uint256"] * 7, pmm)
+                lp_fee_rate, mt_fee_rate = decode(["uint256", "uint256"], fees)
+                state.update(sell_base=decode_address(decode_uint(base)) == from_token, i=i, K=k, B=b, Q=q,
+                             B0=b0, Q0=q0, R=r, lp_fee_rate=lp_fee_rate, mt_fee_rate=mt_fee_rate)
+            elif protocol == "BALANCER":
+                pool_id, weights, fee = _required(raw[pool], pool, "getNormalizedWeights")
+                state.update(pool_id="0x" + pool_id[2:66], weights=decode(["uint256[]"], weights)[0],
+                             fee=decode_uint(fee))
+                second.append((pool, (info["routers"]["BALANCER"],
+                                      encode_call("getPoolTokens(bytes32)", state["pool_id"]))))
+            else:
+                raise ValueError(f"unknown protocol of {pool}")
+        except ValueError as e:
+            state = {"protocol": protocol, "error": str(e)}
+        states[pool] = state
+
+    replies = _aggregate(multicall, [call for _, call in second], block) if second else []
+    for (pool, (target, _)), (success, data) in zip(second, replies):
+        state = states[pool]
+        if "error" in state:
+            continue
+        if not success:
+            states[pool] = {"protocol": state["protocol"], "error": f"reading {target} reverted"}
+        elif state["protocol"] == "CURVE":
+            decimals[target] = decode_uint(data)
+        else:
+            tokens, balances, _ = decode(["address[]", "uint256[]", "uint256"], data)
+            if from_token not in tokens or to_token not in tokens:
+                states[pool] = {"protocol": "BALANCER", "error": f"{pool} does not hold both tokens"}
+                continue
+            i, j = tokens.index(from_token), tokens.index(to_token)
+            state.update(balance_in=balances[i], balance_out=balances[j],
+                         weight_in=state["weights"][i], weight_out=state["weights"][j],
+                         scale_in=10**(18 - decimals[from_token]), scale_out=10**(18 - decimals[to_token]))
+    for state in states.values():
+        if state["protocol"] == "CURVE" and "error" not in state:
+            state["rates"] = [10**(36 - decimals[c]) for c in state.pop("coins")]
+    return states
+
+
+# --------------------------------------------------------------------------------
+# Routing
+# --------------------------------------------------------------------------------
+
+def _allocate(states, amount_in, steps):
+    """Greedy marginal allocation of `amount_in` over `states` in `steps` chunks."""
+    allocation = dict.fromkeys(states, 0)
+    outputs = dict.fromkeys(states, 0)
+    chunk, left = max(amount_in // steps, 1), amount_in
+    while left:
+        step = min(chunk, left)
+        gains = {pool: quote(states[pool], allocation[pool] + step) - outputs[pool] for pool in states}
+        pool = max(gains, key=gains.get)
+        allocation[pool] += step
+        outputs[pool] += gains[pool]
+        left -= step
+    return {pool: amount for pool, amount in allocation.items() if amount}
+
+
+def split(states, amount_in, max_legs=3, steps=100):
+    """{pool: amount} splitting `amount_in` over at most `max_legs` of the usable pools."""
+    usable = {pool: s for pool, s in states.items() if "error" not in s}
+    if not usable or amount_in <= 0:
+        return {}
+    while True:
+        legs = _allocate(usable, amount_in, steps)
+        if len(legs) <= max_legs:
+            return legs
+        # Drop the smallest legs and allocate again among the rest.
+        usable = {pool: usable[pool] for pool in sorted(legs, key=legs.get, reverse=True)[:max_legs]}
+
+
+def legs_report(info, states, legs, slippage, forward):
+    """Per-leg outputs and the amountOutMin check of _swap for the {pool: amount} `legs`."""
+    from_decimals, to_decimals = info["from_decimals"], info["to_decimals"]
+    out = []
+    for pool, amount in legs.items():
+        amount_out = quote(states[pool], amount)
+        minimum = amount_out_min(amount, from_decimals, to_decimals, slippage, forward)
+        out.append({"pool": pool, "protocol": states[pool]["protocol"], "amount_in": amount,
+                    "amount_out": amount_out, "amount_out_min": minimum,
+                    "passes": amount_out >= minimum and to_token_amount(amount, from_decimals, to_decimals) > 0,
+                    "slippage_needed": slippage_needed(amount, amount_out, from_decimals, to_decimals, forward)})
+    return out
+
+
+def plan(info, states, amount_in, slippage=DEFAULT_SLIPPAGE, forward=True, max_legs=3, steps=100):
+    """
+    {"quotes": {pool: output of the whole amount}, "best": [leg], "split": [legs],
+    "legs": the recommended legs, "amount_out", "passes", "enough_balance"}.
+    The recommendation is the split when every one of its legs passes and it
+    gives more than the best single pool, which is recommended otherwise.
+    """
+    quotes = {pool: quote(s, amount_in) for pool, s in states.items() if "error" not in s}
+    best = max(quotes, key=quotes.get) if quotes else None
+    best_legs = legs_report(info, states, {best: amount_in}, slippage, forward) if best else []
+    split_legs = legs_report(info, states, split(states, amount_in, max_legs, steps), slippage, forward)
+
+    def total(legs):
+        return sum(leg["amount_out"] for leg in legs)
+
+    def passes(legs):
+        return bool(legs) and all(leg["passes"] for leg in legs)
+
+    use_split = passes(split_legs) and (not passes(best_legs) or total(split_legs) > total(best_legs))
+    legs = split_legs if use_split else best_legs
+    return {"quotes": quotes, "best": best_legs, "split": split_legs, "legs": legs,
+            "amount_out": total(legs), "passes": passes(legs), "enough_balance": info["vault_balance"] >= amount_in}
+
+
+def simulate(client, info, legs, slippage, forward):
+    """Run every leg as an eth_call of swapToken from the proxy owner; [None or the revert message]."""
+    calls = [("eth_call", [{"from": info["owner"], "to": info["proxy"],
+                            "data": encode_call("swapToken(uint256,address,uint256,bool)",
+                                                leg["amount_in"], leg["pool"], slippage, forward)},
+                           block_tag(info["block"])]) for leg in legs]
+    return [str(r) if isinstance(r, RPCError) else None for r in client.batch(calls)]
+
+
+def read(client, proxy, trader=None, multicall_address=MULTICALL3, block=None):
+    """(read_proxy(), read_pools()) of `proxy` at `block` (default: the head)."""
+    if block is None:
+        block = int(client.call("eth_blockNumber"), 16)
+    multicall = Multicall(client, multicall_address)
+    info = read_proxy(client, multicall, proxy, block)
+    return info, read_pools(multicall, info, trader)
+
+
+def quote_route(client, info, states, amount_in, slippage=DEFAULT_SLIPPAGE, forward=True, max_legs=3, steps=100,
+                simulated=False):
+    """plan() of a swap of `amount_in` over read() `info` and `states`, with the legs simulated if asked."""
+    result = {**info, "amount_in": amount_in, "slippage": slippage, "forward": forward, "states": states,
+              **plan(info, states, amount_in, slippage, forward, max_legs, steps)}
+    if simulated:
+        for leg, error in zip(result["legs"], simulate(client, info, result["legs"], slippage, forward)):
+            leg["simulation"] = error or "ok"
+    return result
+
+
+def print_report(result):
+    scale_in, scale_out = 10**result["from_decimals"], 10**result["to_decimals"]
+    print(f"SwapProxy {result['proxy']} at block {result['block']}: {result['amount_in'] / scale_in:,.8f} "
+          f"{result['from_token']} -> {result['to_token']}, slippage {result['slippage']}"
+          f"{'' if result['forward'] else ' (not forward)'}")
+    for pool, state in result["states"].items():
+        if "error" in state:
+            print(f"   {pool}  {state['protocol']:<10}  unusable: {state['error']}")
+        else:
+            print(f"   {pool}  {state['protocol']:<10}  {result['quotes'][pool] / scale_out:,.8f}")
+    print("route:")
+    for leg in result["legs"]:
+        status = "ok" if leg["passes"] else f"below amountOutMin (slippage needed: {leg['slippage_needed']})"
+        if "simulation" in leg:
+            status += f", simulation: {leg['simulation']}"
+        print(f"   swapToken({leg['amount_in']}, {leg['pool']}, ...)  {leg['protocol']:<10}  "
+              f"out {leg['amount_out'] / scale_out:,.8f}  min {leg['amount_out_min'] / scale_out:,.8f}  {status}")
+    print(f"total out {result['amount_out'] / scale_out:,.8f}")
+    if not result["enough_balance"]:
+        print(f"❌ the vault holds only {result['vault_balance'] / scale_in:,.8f} of the from token (USR010)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chain", help="chain of the proxy, for its RPC endpoint")
+    parser.add_argument("--rpc", help="RPC endpoint (default: the chain's from the registry)")
+    parser.add_argument("--proxy", required=True, help="SwapProxy address")
+    parser.add_argument("--amount", required=True, type=decimal.Decimal, help="amount of the from token to swap")
+    parser.add_argument("--slippage", type=int, default=DEFAULT_SLIPPAGE,
+                        help=f"slippage in 1/{SLIPPAGE_RANGE} (default {DEFAULT_SLIPPAGE}, below {MAX_SLIPPAGE})")
+    parser.add_argument("--forward", action=argparse.BooleanOptionalAction, default=True,
+                        help="the forward argument of swapToken: amountOutMin below par, or above it with --no-forward")
+    parser.add_argument("--max-legs", type=int, default=3, help="most pools to split the amount over")
+    parser.add_argument("--steps", type=int, default=100, help="chunks of the greedy split")
+    parser.add_argument("--trader", help="tx.origin of the swap, for DODO fee rates (default: the proxy owner)")
+    parser.add_argument("--block", type=int, help="read at this block (default: the head)")
+    parser.add_argument("--multicall", default=MULTICALL3, help="Multicall3 address")
+    parser.add_argument("--simulate", action="store_true", help="also eth_call swapToken for every leg of the route")
+    parser.add_argument("--timeout", type=float, default=30, help="timeout in seconds for each request")
+    parser.add_argument("--output", help="also write the result as JSON to this file")
+    args = parser.parse_args()
+
+    if not 0 <= args.slippage < MAX_SLIPPAGE:
+        parser.error(f"--slippage must be below {MAX_SLIPPAGE} (USR011)")
+    rpc = args.rpc
+    if not rpc and args.chain:
+        try:
+            rpc = registry.chain(args.chain).rpc
+        except KeyError as e:
+            parser.error(f"unknown chain {e}")
+    if not rpc:
+        parser.error("need --chain or --rpc")
+
+    client = RPCClient(rpc, timeout=args.timeout)
+    try:
+        info, states = read(client, args.proxy, args.trader, args.multicall, args.block)
+        result = quote_route(client, info, states, int(args.amount * 10**info["from_decimals"]), args.slippage,
+                             args.forward, args.max_legs, args.steps, args.simulate)
+    except (RPCError, ValueError) as e:
+        sys.exit(f"❌ {e}")
+    print_report(result)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+    if not result["passes"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
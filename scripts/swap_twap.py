@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+TWAP execution of a large SwapProxy swap: --amount of the from token is
+swapped in --slices slices, one every --interval seconds, instead of one
+swapToken call that pays the whole price impact (and reverts with USR003
+once the output falls below amountOutMin, see swap_quoter.py).
+
+Slot n (n = (now - start) // interval) is due to have swapped
+amount * (n + 1) / slices in total. At each slot the pools are quoted
+again at the head, with swap_quoter.read(), and the slice is
+
+    want  = due(n) - swapped, capped by --max-slice and the Vault's balance
+    size  = the largest amount up to `want` (bisected down to --min-slice)
+            whose best route passes amountOutMin at --max-slippage
+
+so a slice shrinks when the pools are thin and grows again to catch up
+once they recover; a slot where not even --min-slice passes is skipped.
+Every leg of the route is a swapToken(amount, pool, slippage, true) call
+with the slippage it needs plus --slippage-buffer (at most --max-slippage),
+so a leg does not fill far below its quote. Slots past the last slice, up
+to --grace more, only catch up on what is still missing.
+
+Fills are the amounts of the proxy's SwapSuccessful events, and progress
+is reported against the Vault's to-token balance since the start.
+
+The job is saved to --state (written atomically) before and after every
+transaction: the nonce and the block it is sent at go to "pending" before
+it is submitted, so a restarted run first settles that transaction by its
+hash, or, if the crash came before the hash was saved, by the sender's
+SwapSuccessful transaction with that nonce, and never sends it again. A
+nonce that was used by no swap, or never reached the node, settles as a
+failure whose amount is due again at the next slot. A resumed job keeps
+its amount and schedule; --amount, --slices and --interval only apply to
+a new one.
+
+Transactions are sent with eth_sendTransaction from --sender, which must
+be the proxy owner and unlocked on the node (a local chain);
+contracts/scripts/swap_twap.py runs the same job from a brownie account.
+
+Requires: python3 (standard library only)
+Usage: python3 scripts/swap_twap.py --rpc http://127.0.0.1:8545 --proxy 0x... --sender 0x... --amount 50 --slices 10 --interval 600 --state twap.json
+"""
+
+import argparse
+import decimal
+import json
+import os
+import sys
+import time
+
+import registry
+from abi import decode, encode_call
+from atomic_file import atomic_write
+from keccak import keccak_hex
+from multicall import MULTICALL3
+from rpc import RPCClient, RPCError, check_batch
+from swap_quoter import MAX_SLIPPAGE, plan, read
+
+SWAP_SUCCESSFUL = keccak_hex("SwapSuccessful(address,uint256)")
+SWAP_GAS = 1_000_000
+
+
+def load_job(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (TypeError, OSError, ValueError):
+        return None
+
+
+def save_job(path, job):
+    if path is None:
+        return
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    atomic_write(path, json.dumps(job, indent=2).encode())
+
+
+def new_job(genesis, info, sender, amount, slices, interval, start):
+    """
+    {"genesis", "proxy", "vault", "from_token", "to_token", "sender", "amount",
+     "slices", "interval", "start", "start_balance", "last_slot", "swapped",
+     "received", "pending", "fills", "failures", "skipped"}
+    with amounts in raw units and `start` in seconds.
+    """
+    return {"genesis": genesis, "proxy": info["proxy"], "vault": info["vault"], "from_token": info["from_token"],
+            "to_token": info["to_token"], "sender": sender.lower(), "amount": amount, "slices": slices,
+            "interval": interval, "start": start, "start_balance": info["vault_to_balance"], "last_slot": -1,
+            "swapped": 0, "received": 0, "pending": None, "fills": [], "failures": [], "skipped": []}
+
+
+def open_job(path, genesis, info, sender, amount, slices, interval, start):
+    """The job saved at `path`, or a new one (saved); raises ValueError if the saved one is another swap's."""
+    job = load_job(path)
+    if job is None:
+        job = new_job(genesis, info, sender, amount, slices, interval, start)
+        save_job(path, job)
+    elif (job["genesis"], job["proxy"], job["sender"]) != (genesis, info["proxy"], sender.lower()):
+        raise ValueError(f"{path} is a job of another chain, proxy or sender")
+    return job
+
+
+def due(job, slot):
+    """Total amount due to be swapped by the end of `slot`."""
+    return job["amount"] * min(slot + 1, job["slices"]) // job["slices"]
+
+
+# --------------------------------------------------------------------------------
+# Slice sizing
+# --------------------------------------------------------------------------------
+
+def size_slice(info, states, want, min_slice=0, max_slippage=MAX_SLIPPAGE - 1, max_legs=3, steps=100):
+    """
+    (size, plan()) of the largest amount up to `want`, and at least
+    min(`min_slice`, `want`), whose route passes at `max_slippage`, found to
+    within 0.1% of `want`; (0, None) when none does.
+    """
+    def passing(amount):
+        result = plan(info, states, amount, max_slippage, True, max_legs, steps)
+        return result if result["passes"] else None
+
+    if want <= 0:
+        return 0, None
+    result = passing(want)
+    if result:
+        return want, result
+    lo, hi = max(min(min_slice, want), 1), want
+    result = passing(lo)
+    if not result:
+        return 0, None
+    tolerance = max(want // 1000, 1)
+    while hi - lo > tolerance:
+        mid = (lo + hi) // 2
+        found = passing(mid)
+        if found:
+            lo, result = mid, found
+        else:
+            hi = mid
+    return lo, result
+
+
+def next_slice(client, job, now, max_slice=None, min_slice=0, max_slippage=MAX_SLIPPAGE - 1, buffer=5, max_legs=3,
+               steps=100, multicall_address=MULTICALL3):
+    """
+    {"slot", "info", "want", "size", "legs"} of the slot at `now`, with the
+    pools read at the head and the slippage to send on every leg.
+    """
+    slot = int((now - job["start"]) // job["interval"])
+    info, states = read(client, job["proxy"], job["sender"], multicall_address)
+    want = min(due(job, slot) - job["swapped"], info["vault_balance"], max_slice or job["amount"])
+    size, result = size_slice(info, states, want, min_slice, max_slippage, max_legs, steps)
+    legs = []
+    for leg in result["legs"] if result else []:
+        legs.append({**leg, "slippage": min(leg["slippage_needed"] + buffer, max_slippage)})
+    return {"slot": slot, "info": info, "want": want, "size": size, "legs": legs}
+
+
+# --------------------------------------------------------------------------------
+# Execution
+# --------------------------------------------------------------------------------
+
+def _swap_amount(receipt, proxy):
+    """The amount of the proxy's SwapSuccessful event in a successful `receipt`, or None."""
+    if int(receipt["status"], 16) != 1:
+        return None
+    for log in receipt["logs"]:
+        if log["address"].lower() == proxy and log["topics"][0] == SWAP_SUCCESSFUL:
+            return decode(["address", "uint256"], log["data"])[1]
+    return None
+
+
+def _find_swap(client, job, pending):
+    """Receipt of the sender's swap with the pending nonce among the SwapSuccessful events since it was sent."""
+    logs = client.call("eth_getLogs", [{"address": job["proxy"], "topics": [SWAP_SUCCESSFUL],
+                                        "fromBlock": hex(pending["from_block"]), "toBlock": "latest"}])
+    hashes = list(dict.fromkeys(log["transactionHash"] for log in logs))
+    txs = check_batch(client.batch([("eth_getTransactionByHash", [h]) for h in hashes]),
+                      "eth_getTransactionByHash")
+    for tx in txs:
+        if tx["from"].lower() == job["sender"] and int(tx["nonce"], 16) == pending["nonce"]:
+            return client.call("eth_getTransactionReceipt", [tx["hash"]])
+    return None
+
+
+def _settle(job, receipt, reason=None):
+    pending, job["pending"] = job["pending"], None
+    amount = _swap_amount(receipt, job["proxy"]) if receipt else None
+    if amount is None:
+        reason = pending.pop("error", None) or reason or "reverted"
+        job["failures"].append({**pending, "hash": receipt["transactionHash"] if receipt else pending["hash"],
+                                "reason": reason})
+        return
+    job["swapped"] += pending["amount_in"]
+    job["received"] += amount
+    job["fills"].append({**pending, "hash": receipt["transactionHash"], "block": int(receipt["blockNumber"], 16),
+                         "amount_out": amount})
+
+
+def reconcile(client, job, path, timeout=300, poll=1.0, clock=time.time, sleep=time.sleep):
+    """Wait for the pending transaction of `job`, if any, and record its fill or failure."""
+    deadline = clock() + timeout
+    while job["pending"]:
+        pending = job["pending"]
+        receipt = client.call("eth_getTransactionReceipt", [pending["hash"]]) if pending["hash"] else None
+        if receipt is None:
+            mined = int(client.call("eth_getTransactionCount", [job["sender"], "latest"]), 16)
+            if mined > pending["nonce"]:
+                receipt = _find_swap(client, job, pending)
+                if receipt is None:
+                    _settle(job, None, "nonce used without a SwapSuccessful event")
+            elif int(client.call("eth_getTransactionCount", [job["sender"], "pending"]), 16) <= pending["nonce"]:
+                _settle(job, None, "not in the mempool")
+            elif clock() > deadline:
+                raise RPCError(f"swap with nonce {pending['nonce']} still pending after {timeout}s")
+            else:
+                sleep(poll)
+                continue
+        if receipt is not None:
+            _settle(job, receipt)
+        save_job(path, job)
+
+
+def execute(client, job, path, slot, leg, send, timeout=300, poll=1.0, clock=time.time, sleep=time.sleep):
+    """
+    Send one leg as swapToken from the job's sender and settle it; returns
+    its entry of "fills", or of "failures" when it did not fill.
+    """
+    filled = len(job["fills"])
+    nonce = int(client.call("eth_getTransactionCount", [job["sender"], "pending"]), 16)
+    job["pending"] = {"slot": slot, "nonce": nonce, "from_block": int(client.call("eth_blockNumber"), 16),
+                      "pool": leg["pool"], "protocol": leg["protocol"], "amount_in": leg["amount_in"],
+                      "quoted": leg["amount_out"], "slippage": leg["slippage"], "hash": None}
+    save_job(path, job)
+    tx = {"from": job["sender"], "to": job["proxy"], "gas": hex(SWAP_GAS), "nonce": hex(nonce),
+          "data": encode_call("swapToken(uint256,address,uint256,bool)", leg["amount_in"], leg["pool"],
+                              leg["slippage"], True)}
+    try:
+        job["pending"]["hash"] = send(tx)
+    except RPCError as e:
+        job["pending"]["error"] = str(e)
+    save_job(path, job)
+    reconcile(client, job, path, timeout, poll, clock, sleep)
+    return job["fills"][-1] if len(job["fills"]) > filled else job["failures"][-1]
+
+
+def run(client, job, path, max_slice=None, min_slice=0, max_slippage=MAX_SLIPPAGE - 1, buffer=5, max_legs=3,
+        steps=100, grace=0, multicall_address=MULTICALL3, send=None, timeout=300, poll=1.0, clock=time.time,
+        sleep=time.sleep, log=print):
+    """
+    Swap what is due at every slot until the whole amount is swapped or
+    the slots (with `grace`) run out; returns the job. `send(tx)` submits a
+    transaction and returns its hash (default: eth_sendTransaction).
+    """
+    if send is None:
+        def send(tx):
+            return client.call("eth_sendTransaction", [tx])
+
+    reconcile(client, job, path, timeout, poll, clock, sleep)
+    while job["swapped"] < job["amount"]:
+        now = clock()
+        slot = int((now - job["start"]) // job["interval"])
+        if slot >= job["slices"] + grace:
+            break
+        if slot <= job["last_slot"]:
+            sleep(max(job["start"] + (job["last_slot"] + 1) * job["interval"] - now, 0))
+            continue
+        step = next_slice(client, job, now, max_slice, min_slice, max_slippage, buffer, max_legs, steps,
+                          multicall_address)
+        if not step["size"]:
+            job["skipped"].append({"slot": slot, "block": step["info"]["block"], "want": step["want"]})
+            log(f"slot {slot}: no route for {step['want']} passes at slippage {max_slippage}, skipped")
+        for leg in step["legs"]:
+            entry = execute(client, job, path, slot, leg, send, timeout, poll, clock, sleep)
+            outcome = f"filled {entry['amount_out']}" if "amount_out" in entry else f"failed: {entry['reason']}"
+            log(f"slot {slot}: swapToken({leg['amount_in']}, {leg['pool']}, {leg['slippage']}, true)  "
+                f"{leg['protocol']}  quoted {leg['amount_out']}  {outcome}")
+        job["last_slot"] = slot
+        save_job(path, job)
+        log(progress(client, job))
+    return job
+
+
+def progress(client, job):
+    """One line of fill progress, with the Vault's to-token balance change since the start."""
+    balance = client.call("eth_call", [{"to": job["to_token"], "data": encode_call("balanceOf(address)", job["vault"])},
+                                       "latest"])
+    delta = decode(["uint256"], balance)[0] - job["start_balance"]
+    return (f"swapped {job['swapped']}/{job['amount']} ({job['swapped'] * 100 / job['amount']:.1f}%), "
+            f"received {job['received']}, vault to-token balance {delta:+d} since the start, "
+            f"{len(job['fills'])} fills, {len(job['failures'])} failures, {len(job['skipped'])} skipped slots")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chain", help="chain of the proxy, for its RPC endpoint")
+    parser.add_argument("--rpc", help="RPC endpoint (default: the chain's from the registry)")
+    parser.add_argument("--proxy", required=True, help="SwapProxy address")
+    parser.add_argument("--sender", required=True, help="proxy owner the swaps are sent from (unlocked on the node)")
+    parser.add_argument("--amount", required=True, type=decimal.Decimal, help="total amount of the from token to swap")
+    parser.add_argument("--slices", type=int, default=10, help="number of slices")
+    parser.add_argument("--interval", type=int, default=600, help="seconds between slices")
+    parser.add_argument("--state", required=True, help="job file, resumed if it exists")
+    parser.add_argument("--min-slice", type=decimal.Decimal, default=0, help="smallest slice worth sending")
+    parser.add_argument("--max-slice", type=decimal.Decimal, help="largest slice, also when catching up")
+    parser.add_argument("--max-slippage", type=int, default=MAX_SLIPPAGE - 1,
+                        help=f"highest slippage sent, in 1/10000 (default {MAX_SLIPPAGE - 1})")
+    parser.add_argument("--slippage-buffer", type=int, default=5,
+                        help="slippage added to what each leg needs at the quote (default 5)")
+    parser.add_argument("--max-legs", type=int, default=3, help="most pools to split a slice over")
+    parser.add_argument("--grace", type=int, default=0, help="extra slots to catch up after the last slice")
+    parser.add_argument("--multicall", default=MULTICALL3, help="Multicall3 address")
+    parser.add_argument("--timeout", type=float, default=300, help="seconds to wait for each transaction")
+    parser.add_argument("--dry-run", action="store_true", help="only print the slice due now")
+    args = parser.parse_args()
+
+    if not 0 <= args.max_slippage < MAX_SLIPPAGE:
+        parser.error(f"--max-slippage must be below {MAX_SLIPPAGE} (USR011)")
+    if args.slices <= 0 or args.interval <= 0:
+        parser.error("--slices and --interval must be positive")
+    rpc = args.rpc
+    if not rpc and args.chain:
+        try:
+            rpc = registry.chain(args.chain).rpc
+        except KeyError as e:
+            parser.error(f"unknown chain {e}")
+    if not rpc:
+        parser.error("need --chain or --rpc")
+
+    client = RPCClient(rpc, timeout=60)
+    try:
+        genesis = client.call("eth_getBlockByNumber", ["0x0", False])["hash"]
+        info, _ = read(client, args.proxy, args.sender, args.multicall)
+        scale = 10**info["from_decimals"]
+        new = (genesis, info, args.sender, int(args.amount * scale), args.slices, args.interval, time.time())
+        job = (load_job(args.state) or new_job(*new)) if args.dry_run else open_job(args.state, *new)
+        limits = dict(max_slice=int(args.max_slice * scale) if args.max_slice else None,
+                      min_slice=int(args.min_slice * scale), max_slippage=args.max_slippage,
+                      buffer=args.slippage_buffer, max_legs=args.max_legs, multicall_address=args.multicall)
+        if args.dry_run:
+            step = next_slice(client, job, max(time.time(), job["start"]), **limits)
+            print(f"slot {step['slot']}: want {step['want']}, size {step['size']}")
+            for leg in step["legs"]:
+                print(f"   swapToken({leg['amount_in']}, {leg['pool']}, {leg['slippage']}, true)  "
+                      f"{leg['protocol']}  quoted {leg['amount_out']}")
+            return
+        job = run(client, job, args.state, grace=args.grace, timeout=args.timeout, **limits)
+    except (RPCError, ValueError) as e:
+        sys.exit(f"❌ {e}")
+    if job["swapped"] < job["amount"]:
+        sys.exit(f"❌ swapped {job['swapped']} of {job['amount']} when the slots ran out")
+    print(f"✅ swapped {job['amount']}, received {job['received']}")
+
+
+if __name__ == "__main__":
+    main()
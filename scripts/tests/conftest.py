@@ -0,0 +1,7 @@
+import sys
+from pathlib import Path
+
+# Unit tests of the standard-library scripts in scripts/, run with plain pytest
+# (no brownie, no chain): `python3 -m pytest scripts/tests`. The scripts import
+# each other by bare module name, so their directory goes on the path.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
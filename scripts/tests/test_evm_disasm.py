@@ -0,0 +1,51 @@
+from evm_disasm import CodeIndex, code_end, decode
+
+# solc's CBOR trailer: {"ipfs": <34 bytes>, "solc": 0.8.20}, then its length (0x33).
+METADATA = (bytes.fromhex("a264697066735822") + bytes(range(34)) + bytes.fromhex("64736f6c6343000814")
+            + bytes.fromhex("0033"))
+
+
+def _ops(code):
+    return [(ins.pc, ins.name, ins.arg) for ins in decode(code)]
+
+
+# Command to run test: `python3 -m pytest scripts/tests/test_evm_disasm.py`
+def test_push_immediates():
+    word = bytes(range(1, 33))
+    code = bytes.fromhex("6001" "610102" "5f") + b"\x7f" + word + bytes.fromhex("00")
+    assert _ops(code) == [(0, "PUSH1", 1), (2, "PUSH2", 0x0102), (5, "PUSH0", 0),
+                          (6, "PUSH32", int.from_bytes(word, "big")), (39, "STOP", None)]
+    assert CodeIndex(code).pushes == {1: [0], 0x0102: [1], 0: [2], int.from_bytes(word, "big"): [3]}
+
+
+def test_push_data_is_not_code():
+    # PUSH8 of "DUP1 PUSH4 aabbccdd EQ JUMPDEST": a dispatcher entry and a jump
+    # destination inside the data, neither of which is executable.
+    code = bytes.fromhex("67" "8063aabbccdd145b" "5b" "80" "6311223344" "14")
+    index = CodeIndex(code)
+    assert [ins.name for ins in index.instructions] == ["PUSH8", "JUMPDEST", "DUP1", "PUSH4", "EQ"]
+    assert index.jumpdests == {9}
+    assert index.selectors() == ["0x11223344"]
+
+
+def test_truncated_push_at_end():
+    # The missing immediate bytes read as zeros, as the EVM pads them.
+    assert _ops(bytes.fromhex("6001" "61ff")) == [(0, "PUSH1", 1), (2, "PUSH2", 0xFF00)]
+    assert _ops(bytes.fromhex("00" "7f")) == [(0, "STOP", None), (1, "PUSH32", 0)]
+    assert _ops(bytes.fromhex("63abcd")) == [(0, "PUSH4", 0xABCD0000)]
+
+
+def test_metadata_trailer():
+    code = bytes.fromhex("6080604052" "5b" "00")
+    assert code_end(code + METADATA) == len(code)
+    index = CodeIndex(code + METADATA)
+    assert index.end == len(code)
+    assert [ins.name for ins in index.instructions] == ["PUSH1", "PUSH1", "MSTORE", "JUMPDEST", "STOP"]
+    # Nothing of the trailer is decoded, e.g. the 0x64 before "ipfs" as a PUSH5.
+    assert set(index.pushes) == {0x80, 0x40}
+
+    # No trailer: a length that points outside the code, or at something that is not a CBOR map.
+    assert code_end(code) == len(code)
+    assert code_end(code + bytes.fromhex("ffff")) == len(code) + 2
+    assert code_end(code + bytes.fromhex("0003")) == len(code) + 2
+    assert code_end(b"\x00") == 1
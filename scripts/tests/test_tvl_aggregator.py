@@ -0,0 +1,107 @@
+import json
+
+import pytest
+
+from registry import Chain
+from reserve_backends import MockBackend
+from rpc import RPCError
+from tvl_aggregator import UNTAGGED, aggregate, load_reserves, to_sats
+
+NATIVE = "0x0000000000000000000000000000000000000000"
+VAULT = "0x" + "ab" * 20
+UNI_BTC = "0x" + "22" * 20
+FBTC = "0x" + "33" * 20
+WBTC18 = "0x" + "44" * 20
+XBTC = "0x" + "55" * 20
+BTC = 10**8
+
+
+@pytest.fixture
+def mock_backend(tmp_path):
+    snapshot = {
+        "btc": {"bc1qnative": 3 * BTC, "bc1qfbtc": str(BTC), "1bare": 50_000},
+        "evm": {"1001": {
+            # Checksummed and lowercase addresses are the same.
+            "balances": {"0x" + VAULT[2:].upper(): {FBTC: 2 * BTC, NATIVE: str(15 * 10**17 + 123),
+                                                    WBTC18: 10**18, XBTC: BTC}},
+            "decimals": {WBTC18: "18"},
+            "supply": {UNI_BTC: 7 * BTC},
+            "por": {VAULT: {"reserve_feeder": "0x" + "66" * 20, "supply_feeder": "0x" + "77" * 20,
+                            "heartbeat": 86400, "adequacy_ratio": 1000, "answer": str(8 * BTC),
+                            "reserve_decimals": 8, "updated_at": 0, "supply": 7 * BTC, "block": 1, "timestamp": 0}},
+        }},
+    }
+    path = tmp_path / "snapshot.json"
+    path.write_text(json.dumps(snapshot))
+    return MockBackend(str(path))
+
+
+@pytest.fixture
+def reserves(tmp_path):
+    data = {
+        "btc": [{"addr": "bc1qnative", "type": "balance", "bridge_source": "NativeBTC"},
+                {"addr": "bc1qfbtc", "type": "balance", "bridge_source": "FBTC"},
+                "1bare", "1missing"],
+        "evm": {
+            "dev": {"chain_id": 1001, "vault": VAULT,
+                    "tokens": [["FBTC", FBTC, "8"], ["BTC", NATIVE, "18"], WBTC18, XBTC]},
+            "gone": {"chain_id": 1002, "vault": VAULT, "tokens": [["FBTC", FBTC, "8"]]},
+        },
+    }
+    path = tmp_path / "reserves.json"
+    path.write_text(json.dumps(data))
+    return load_reserves(str(path))
+
+
+# Command to run test: `python3 -m pytest scripts/tests/test_tvl_aggregator.py`
+def test_aggregate(mock_backend, reserves):
+    assert reserves["btc"][2] == {"addr": "1bare", "type": "balance", "bridge_source": UNTAGGED}
+    assert reserves["evm"][0]["tokens"][2] == {"symbol": WBTC18, "address": WBTC18, "decimals": None}
+
+    chains = [Chain("dev", 1001, ("http://127.0.0.1:1",), uni_btc=UNI_BTC, vault=VAULT),
+              Chain("gone", 1002, ("http://127.0.0.1:1",), uni_btc=UNI_BTC)]
+    report = aggregate(reserves, mock_backend, mock_backend, chains, workers=4)
+
+    btc = report["btc"]
+    assert btc["total"] == 4 * BTC + 50_000
+    assert btc["by_bridge_source"] == {"NativeBTC": 3 * BTC, "FBTC": BTC, UNTAGGED: 50_000}
+    assert btc["by_type"] == {"balance": 4 * BTC + 50_000}
+    # 18 decimals are truncated to satoshis, like Vault._amounts.
+    assert report["evm"]["by_chain"] == {"dev": {"FBTC": 2 * BTC, "BTC": 15 * BTC // 10, WBTC18: BTC}}
+    assert report["evm"]["total"] == 45 * BTC // 10
+    assert report["reserves"] == btc["total"] + report["evm"]["total"]
+    assert report["supply"] == {"total": 7 * BTC, "by_chain": {"dev": 7 * BTC}}
+    assert report["collateral_ratio"] == report["reserves"] / (7 * BTC)
+
+    por = report["por"]["dev"]
+    assert (por["feeder_reserves"], por["feeder_supply"]) == (8 * BTC, 7 * BTC)
+    assert por["reserves_diff"] == report["reserves"] - 8 * BTC and por["supply_diff"] == 0
+
+
+# Command to run test: `python3 -m pytest scripts/tests/test_tvl_aggregator.py`
+def test_aggregate_errors(mock_backend, reserves):
+    chains = [Chain("dev", 1001, ("http://127.0.0.1:1",), uni_btc=UNI_BTC, vault=VAULT),
+              Chain("gone", 1002, ("http://127.0.0.1:1",), uni_btc=UNI_BTC, vault=VAULT)]
+    report = aggregate(reserves, mock_backend, mock_backend, chains, workers=4)
+
+    # Every failed read is reported once and left out of the totals; the rest still adds up.
+    assert sorted(report["errors"]) == sorted([
+        "btc 1missing: no mock balance for 1missing",
+        f"dev {XBTC}: no mock decimals for {XBTC}",
+        "gone: chain 1002 is not in the mock snapshot",
+        "gone uniBTC totalSupply: chain 1002 is not in the mock snapshot",
+        "gone PoR: chain 1002 is not in the mock snapshot",
+    ])
+    assert "1missing" not in report["btc"]["addresses"]
+    assert XBTC not in report["evm"]["by_token"] and "gone" not in report["evm"]["by_chain"]
+    assert report["supply"]["by_chain"] == {"dev": 7 * BTC} and set(report["por"]) == {"dev"}
+
+    # A backend that fails outright loses its reads, not the report.
+    class Down:
+        def balances(self, addresses):
+            raise RPCError("esplora unreachable")
+
+    report = aggregate(reserves, Down(), mock_backend, chains[:1], workers=4)
+    assert "btc: esplora unreachable" in report["errors"]
+    assert report["btc"]["total"] == 0 and report["reserves"] == report["evm"]["total"]
+    assert to_sats(10**18 - 1, 18) == BTC - 1 and to_sats(5, 6) == 500
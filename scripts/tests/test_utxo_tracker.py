@@ -0,0 +1,99 @@
+import pytest
+
+from utxo_tracker import FixtureBlockSource, ReorgTooDeep, UTXOTracker
+
+RESERVES = [{"addr": "bc1qa", "bridge_source": "NativeBTC"}, {"addr": "bc1qb", "bridge_source": "FBTC"},
+            {"addr": "bc1qc", "bridge_source": "NativeBTC"}]
+
+
+def tx(txid, vin=(), vout=()):
+    """A getblock verbosity 2 transaction; `vin` lists (txid, vout), empty for a coinbase."""
+    return {"txid": txid, "vin": [{"txid": t, "vout": n} for t, n in vin] or [{"coinbase": "00"}],
+            "vout": [{"n": n, "value": value, "scriptPubKey": {"address": address}}
+                     for n, (address, value) in enumerate(vout)]}
+
+
+def chain(blocks, branch="main", start=0, parent=None):
+    """Blocks at heights start, start + 1, ... holding the given transactions, hashed per branch."""
+    out = []
+    for height, txs in enumerate(blocks, start):
+        out.append({"height": height, "hash": f"{branch}-{height}", "previousblockhash": parent, "tx": txs})
+        parent = out[-1]["hash"]
+    return out
+
+
+@pytest.fixture
+def blocks():
+    return chain([
+        [tx("cb0", vout=[("bc1qother", 50)])],
+        [tx("cb1", vout=[("bc1qa", 50)])],
+        # One output to a reserve address and one elsewhere.
+        [tx("t2", vin=[("cb0", 0)], vout=[("bc1qb", 1.5), ("bc1qother", 48.4)])],
+        # bc1qa spends its coinbase, pays bc1qc and keeps the change; bc1qc's output is spent in the same block.
+        [tx("t3", vin=[("cb1", 0)], vout=[("bc1qc", 10), ("bc1qa", 39.99)]),
+         tx("t3b", vin=[("t3", 0)], vout=[("bc1qother", 9.99)])],
+    ])
+
+
+def totals(tracker):
+    return tracker.total, dict(tracker.by_address), tracker.totals()["by_bridge_source"]
+
+
+# Command to run test: `python3 -m pytest scripts/tests/test_utxo_tracker.py`
+def test_incremental_apply(blocks):
+    source = FixtureBlockSource(blocks)
+    tracker = UTXOTracker(RESERVES, window=6)
+    seen = []
+    assert tracker.sync(source, on_block=lambda t: seen.append(t.total)) == 4
+    assert seen == [0, 50 * 10**8, 5150 * 10**6, 4149 * 10**6]
+    assert tracker.utxos == {"t2:0": ("bc1qb", 150_000_000), "t3:1": ("bc1qa", 3_999_000_000)}
+    assert totals(tracker) == (4_149_000_000, {"bc1qa": 3_999_000_000, "bc1qb": 150_000_000, "bc1qc": 0},
+                               {"NativeBTC": 3_999_000_000, "FBTC": 150_000_000})
+    assert (tracker.tip_height, tracker.tip_hash) == (3, "main-3")
+
+    # Nothing new: no block is applied. A new block: only that one is.
+    assert tracker.sync(source) == 0
+    source.chain[4] = chain([[tx("t4", vin=[("t2", 0)], vout=[("bc1qother", 1.5)])]], start=4, parent="main-3")[0]
+    assert tracker.sync(source) == 1
+    assert tracker.total == 3_999_000_000 and tracker.by_address["bc1qb"] == 0
+
+    # A block that does not build on the tip is refused.
+    with pytest.raises(ValueError):
+        tracker.apply(chain([[]], branch="other", start=5, parent="main-3")[0])
+
+
+# Command to run test: `python3 -m pytest scripts/tests/test_utxo_tracker.py`
+def test_reorg_rollback(blocks, tmp_path):
+    source = FixtureBlockSource(blocks)
+    tracker = UTXOTracker(RESERVES, window=6)
+    tracker.sync(source)
+    state = tmp_path / "utxos.json"
+    tracker.save(str(state))
+
+    # Blocks 2 and 3 are replaced by a longer fork in which bc1qa never spends and bc1qc is paid elsewhere.
+    fork = chain([[tx("f2", vin=[("cb0", 0)], vout=[("bc1qc", 2)])], [], [tx("f4", vout=[("bc1qb", 0.5)])]],
+                 branch="fork", start=2, parent="main-1")
+    source.replace_from(fork)
+    assert tracker.sync(source) == 3
+    # Same result as a tracker that only ever saw the fork, and the undo records survive a restart.
+    fresh = UTXOTracker(RESERVES, window=6)
+    fresh.sync(source)
+    restored = UTXOTracker.load(str(state), RESERVES)
+    assert restored.sync(source) == 3
+    for t in (fresh, restored):
+        assert t.utxos == tracker.utxos and totals(t) == totals(tracker)
+        assert (t.tip_height, t.tip_hash) == (4, "fork-4")
+    assert totals(tracker) == (5_250_000_000, {"bc1qa": 5_000_000_000, "bc1qb": 50_000_000, "bc1qc": 200_000_000},
+                               {"NativeBTC": 5_200_000_000, "FBTC": 50_000_000})
+
+    # A branch of the same length is noticed without a new block.
+    source.replace_from(chain([[tx("g4", vout=[("bc1qa", 1)])]], branch="g", start=4, parent="fork-3"))
+    assert tracker.sync(source) == 1
+    assert tracker.by_address["bc1qb"] == 0 and tracker.by_address["bc1qa"] == 5_100_000_000
+
+    # Deeper than the undo window: the tracker refuses to guess.
+    shallow = UTXOTracker(RESERVES, window=1)
+    shallow.sync(source)
+    source.replace_from(chain([[], [], []], branch="deep", start=2, parent="main-1"))
+    with pytest.raises(ReorgTooDeep):
+        shallow.sync(source)